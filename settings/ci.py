@@ -47,6 +47,7 @@ WGER_SETTINGS['ALLOW_GUEST_USERS'] = True
 WGER_SETTINGS['ALLOW_UPLOAD_VIDEOS'] = False
 WGER_SETTINGS['MIN_ACCOUNT_AGE_TO_TRUST'] = 21  # in days
 WGER_SETTINGS['EXERCISE_CACHE_TTL'] = 3600  # in seconds
+WGER_SETTINGS['TROPHIES_ASYNC'] = False
 
 DATABASES = {
     'default': {
@@ -189,10 +189,17 @@ WGER_SETTINGS['SYNC_INGREDIENTS_DUMP_URL'] = env.str(
     'SYNC_INGREDIENTS_DUMP_URL',
     'https://wger.de/media/ingredients/ingredients.jsonl.gz',
 )
+WGER_SETTINGS['SYNC_INGREDIENTS_MANIFEST_URL'] = env.str(
+    'SYNC_INGREDIENTS_MANIFEST_URL',
+    'https://wger.de/media/ingredients/segments/manifest.json',
+)
 WGER_SETTINGS['SYNC_OFF_DAILY_DELTA_CELERY'] = env.bool('SYNC_OFF_DAILY_DELTA_CELERY', False)
 WGER_SETTINGS['EXPORT_INGREDIENTS_BULK_CELERY'] = env.bool('EXPORT_INGREDIENTS_BULK_CELERY', False)
+WGER_SETTINGS['OFF_BARCODE_LOOKUP_ASYNC'] = env.bool('OFF_BARCODE_LOOKUP_ASYNC', False)
 WGER_SETTINGS['USE_RECAPTCHA'] = env.bool('USE_RECAPTCHA', False)
 WGER_SETTINGS['USE_CELERY'] = env.bool('USE_CELERY', False)
+WGER_SETTINGS['TROPHIES_ASYNC'] = env.bool('TROPHIES_ASYNC', True)
+WGER_SETTINGS['TROPHIES_EVENT_DELAY'] = env.int('TROPHIES_EVENT_DELAY', 10)
 WGER_SETTINGS['CACHE_API_EXERCISES_CELERY'] = env.bool('CACHE_API_EXERCISES_CELERY', False)
 WGER_SETTINGS['CACHE_API_EXERCISES_CELERY_FORCE_UPDATE'] = env.bool(
     'CACHE_API_EXERCISES_CELERY_FORCE_UPDATE', False
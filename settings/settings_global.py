@@ -612,17 +612,25 @@ WGER_SETTINGS = {
     'ALLOW_UPLOAD_VIDEOS': False,
     'EMAIL_FROM': 'wger Workout Manager <wger@example.com>',
     'EXERCISE_CACHE_TTL': 4 * 604800,  # one month; entries are invalidated on write
+    'EXERCISE_CACHE_STALE_TTL': 604800,  # one week; expired entries served while rebuilt
+    'EXERCISE_SNAPSHOT_DELAY': 60,  # Seconds to wait for further changes before exporting
     'DOWNLOAD_INGREDIENTS_FROM': DOWNLOAD_INGREDIENT_WGER,
     'INGREDIENT_CACHE_TTL': 604800,  # one week
     'INGREDIENT_IMAGE_CHECK_INTERVAL': datetime.timedelta(weeks=12),
     'ROUTINE_CACHE_TTL': 4 * 604800,  # one month
+    'TIME_SERIES_CACHE_TTL': 4 * 604800,  # one month; entries are invalidated on write
+    'SYNC_TOMBSTONE_RETENTION': datetime.timedelta(days=180),  # Deleted entries in the delta feeds
     'MIN_ACCOUNT_AGE_TO_TRUST': 21,
+    'OFF_BARCODE_LOOKUP_ASYNC': False,  # Look unknown barcodes up on OFF in the background
+    'OFF_BARCODE_MISS_TTL': 86400,  # one day; barcodes unknown to OFF
+    'OFF_BARCODE_ERROR_TTL': 300,  # five minutes; barcodes whose lookup failed
     'SYNC_EXERCISES_CELERY': False,
     'SYNC_EXERCISE_IMAGES_CELERY': False,
     'SYNC_EXERCISE_VIDEOS_CELERY': False,
     'SYNC_INGREDIENTS_CELERY': False,
     'SYNC_OFF_DAILY_DELTA_CELERY': False,
     'SYNC_INGREDIENTS_DUMP_URL': 'https://wger.de/media/ingredients/ingredients.jsonl.gz',
+    'SYNC_INGREDIENTS_MANIFEST_URL': 'https://wger.de/media/ingredients/segments/manifest.json',
     'EXPORT_INGREDIENTS_BULK_CELERY': False,
     'CACHE_API_EXERCISES_CELERY': False,
     'CACHE_API_EXERCISES_CELERY_FORCE_UPDATE': False,
@@ -637,6 +645,8 @@ WGER_SETTINGS = {
     # Trophy system settings
     'TROPHIES_ENABLED': True,
     'TROPHIES_INACTIVE_USER_DAYS': 30,  # Days of inactivity before skipping trophy evaluation
+    'TROPHIES_ASYNC': True,  # Update statistics and trophies outside of the request
+    'TROPHIES_EVENT_DELAY': 10,  # Seconds to wait for further workout changes before processing
 }
 
 #
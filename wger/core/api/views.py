@@ -17,17 +17,21 @@
 
 # Standard Library
 import logging
+from itertools import groupby
 
 # Django
 from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.db import (
     DataError,
     IntegrityError,
     InterfaceError,
     OperationalError,
+    transaction,
 )
 from django.http import (
+    FileResponse,
     HttpResponseForbidden,
     JsonResponse,
 )
@@ -51,10 +55,14 @@ from rest_framework.decorators import (
     api_view,
     permission_classes,
 )
-from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.exceptions import (
+    NotFound,
+    ValidationError as DRFValidationError,
+)
 from rest_framework.fields import (
     BooleanField,
     CharField,
+    ChoiceField,
     DictField,
     JSONField,
     ListField,
@@ -91,8 +99,13 @@ from wger.core.models import (
     UserProfile,
     WeightUnit,
 )
+from wger.core.user_data import (
+    save_user_data_export,
+    user_data_export_path,
+)
 from wger.utils.headless_long_lived import mint_long_lived_refresh_token
 from wger.utils.powersync import REGISTRY as POWERSYNC_REGISTRY
+from wger.utils.viewsets import ownership_memo
 from wger.version import (
     MIN_APP_VERSION,
     MIN_SERVER_VERSION,
@@ -177,6 +190,67 @@ class VerifyEmailView(APIView):
         )
 
 
+USER_DATA_EXPORT_RESPONSE = inline_serializer(
+    name='UserDataExportResponse',
+    fields={'status': ChoiceField(choices=['done', 'scheduled'])},
+)
+
+
+class UserDataExportView(APIView):
+    """
+    Export of all the data of the logged-in user, as a zip archive that can be
+    imported on another instance with the import-user-data command
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=None,
+        responses={
+            200: OpenApiTypes.BINARY,
+            404: OpenApiResponse(description='No export was created yet'),
+        },
+    )
+    def get(self, request):
+        """
+        Download the last export
+        """
+        path = user_data_export_path(request.user.id)
+        if not default_storage.exists(path):
+            raise NotFound('No export was created yet')
+
+        return FileResponse(
+            default_storage.open(path, 'rb'),
+            as_attachment=True,
+            filename=f'wger-{request.user.username}.zip',
+            content_type='application/zip',
+        )
+
+    @extend_schema(
+        request=None,
+        responses={
+            200: USER_DATA_EXPORT_RESPONSE,
+            202: USER_DATA_EXPORT_RESPONSE,
+        },
+    )
+    def post(self, request):
+        """
+        Create a new export, replacing the previous one
+
+        With Celery the export is created in the background, poll the GET
+        endpoint until it is available.
+        """
+        if settings.WGER_SETTINGS['USE_CELERY']:
+            # wger
+            from wger.core.tasks import export_user_data_task
+
+            export_user_data_task.delay(request.user.id)
+            return Response({'status': 'scheduled'}, status=status.HTTP_202_ACCEPTED)
+
+        save_user_data_export(request.user)
+        return Response({'status': 'done'})
+
+
 class ApplicationVersionView(viewsets.ViewSet):
     """
     Returns the application's version
@@ -467,12 +541,23 @@ def upload_powersync_data(request):
             status=200,
         )
 
+    result, status_code = apply_powersync_op(table, http_verb, payload, user_id)
+    return JsonResponse(result, status=status_code)
+
+
+def apply_powersync_op(table: str, http_verb: str, payload, user_id: int) -> tuple[dict, int]:
+    """
+    Runs a single PowerSync op in its own savepoint
+
+    Returns the response body and the HTTP status for the op. If the op fails,
+    whatever it wrote is rolled back, without affecting an enclosing transaction.
+    """
     logger.info(f'Received PowerSync data for table {table} via {http_verb} for user {user_id}')
 
     handler = POWERSYNC_REGISTRY.get(table)
     if handler is None:
         logger.warning(f'Received unknown PowerSync table: {table}')
-        return JsonResponse({'error': f'Unknown table: {table}'}, status=200)
+        return {'error': f'Unknown table: {table}'}, 200
 
     # Handlers return either `None` (processed) or an error dict for a
     # deterministic refusal (validation, FK ownership, etc). We propagate these
@@ -481,27 +566,118 @@ def upload_powersync_data(request):
     #
     # The except ladder classifies transient infrastructure errors as retry (5xx)
     try:
-        result = handler.dispatch(http_verb, payload=payload, user_id=user_id)
+        with transaction.atomic():
+            result = handler.dispatch(http_verb, payload=payload, user_id=user_id)
 
     except (OperationalError, InterfaceError):
         # Transient infrastructure error (deadlock, lock timeout, dropped
         # connection, etc.). Expected to clear on its own, so let the client
         # retry.
         logger.warning(f'Transient DB error for PowerSync table {table}, asking client to retry')
-        return JsonResponse({'error': 'Temporarily unavailable'}, status=503)
+        return {'error': 'Temporarily unavailable'}, 503
 
     except (DjangoValidationError, DRFValidationError, IntegrityError, DataError) as e:
         # Deterministic refusal raised from save() (constraint, model clean,
         # custom create). Retry can't fix it, so reject permanently
         logger.warning(f'PowerSync {table} rejected: {e}')
-        return JsonResponse({'error': 'Validation failed', 'details': str(e)}, status=200)
+        return {'error': 'Validation failed', 'details': str(e)}, 200
 
     except Exception as e:
         # Unexpected and unclassified. Retry rather than silently drop the write;
         # a failure that persists is a server bug, made visible by these logs.
         logger.exception(f'Error processing PowerSync data for table {table}')
-        return JsonResponse({'error': str(e)}, status=500)
+        return {'error': str(e)}, 500
 
     if result is not None:
-        return JsonResponse(result, status=200)
-    return JsonResponse({'status': 'ok!'}, status=200)
+        return result, 200
+    return {'status': 'ok!'}, 200
+
+
+@extend_schema(
+    request=inline_serializer(
+        name='PowersyncBatchUpload',
+        fields={
+            'ops': ListField(
+                child=inline_serializer(
+                    name='PowersyncBatchOp',
+                    fields={
+                        'op': ChoiceField(choices=['PUT', 'PATCH', 'DELETE']),
+                        'table': CharField(),
+                        'data': JSONField(),
+                    },
+                )
+            ),
+        },
+    ),
+    responses={
+        # The status of every op is reported in the same order as they were
+        # sent. As for single ops, refusals are reported with 200.
+        200: inline_serializer(
+            name='PowersyncBatchUploadResponse',
+            fields={'results': ListField(child=DictField())},
+        ),
+        403: OpenApiResponse(description='The request is not authenticated'),
+        500: OpenApiResponse(description='Unclassified server error, the client should retry'),
+        503: OpenApiResponse(description='Transient database error, the client should retry'),
+    },
+)
+@api_view(['POST'])
+def upload_powersync_batch(request):
+    """
+    Applies an ordered list of PowerSync ops in one request
+
+    Consecutive ops for the same table run in one transaction, each op in its
+    own savepoint, so that a refused op doesn't affect the others. If an op
+    fails with an error the client should retry (5xx), the ops before it are
+    kept, the following ones are not processed and the batch is answered
+    with that status. Since the ops are idempotent, the client can simply send
+    the whole batch again.
+    """
+    if not request.user.is_authenticated:
+        return HttpResponseForbidden()
+
+    ops = request.data.get('ops') if isinstance(request.data, dict) else None
+    if not isinstance(ops, list):
+        return JsonResponse({'error': 'Missing required field: ops'}, status=200)
+
+    user_id = request.user.id
+    results = [{'error': 'Not processed'}] * len(ops)
+    status_code = 200
+
+    def op_table(item):
+        op = item[1]
+        return op.get('table') if isinstance(op, dict) else None
+
+    # The ops often reference the same routines, plans, etc.
+    with ownership_memo():
+        for table, group in groupby(enumerate(ops), key=op_table):
+            try:
+                with transaction.atomic():
+                    for index, op in group:
+                        try:
+                            http_verb = op['op']
+                            payload = op['data']
+                            table = op['table']
+                        except (KeyError, TypeError):
+                            results[index] = {'error': 'Missing required fields: op, table, data'}
+                            continue
+
+                        results[index], status_code = apply_powersync_op(
+                            table,
+                            http_verb,
+                            payload,
+                            user_id,
+                        )
+                        if status_code != 200:
+                            break
+            except (OperationalError, InterfaceError):
+                # The commit of the group failed, none of its ops were applied
+                logger.warning(
+                    f'Transient DB error for PowerSync table {table}, asking client to retry'
+                )
+                return JsonResponse({'results': results}, status=503)
+
+            if status_code != 200:
+                break
+
+    return JsonResponse({'results': results}, status=status_code)
@@ -0,0 +1,59 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+# wger
+from wger.core.user_data import (
+    export_user_data,
+    save_user_data_export,
+)
+
+
+class Command(BaseCommand):
+    """
+    Exports all the data of a user as a zip archive, see wger.core.user_data
+    """
+
+    help = 'Export all the data of a user, to be imported with import-user-data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', type=str)
+        parser.add_argument(
+            '--output',
+            dest='output',
+            help='Write the archive to this file instead of the default storage',
+        )
+
+    def handle(self, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]} does not exist')
+
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                manifest = export_user_data(user, f)
+            for table in manifest['tables']:
+                self.stdout.write(f'{table["name"]}: {table["count"]}')
+            name = options['output']
+        else:
+            name = save_user_data_export(user)
+
+        self.stdout.write(self.style.SUCCESS(f'Exported the data of {user.username} to {name}'))
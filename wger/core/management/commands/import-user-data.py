@@ -0,0 +1,52 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import IntegrityError
+
+# wger
+from wger.core.user_data import import_user_data
+
+
+class Command(BaseCommand):
+    """
+    Imports an archive written by export-user-data for a user
+    """
+
+    help = 'Import the data of a user written by export-user-data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str)
+        parser.add_argument('username', type=str)
+
+    def handle(self, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["username"]} does not exist')
+
+        try:
+            with open(options['file'], 'rb') as f:
+                counts = import_user_data(user, f)
+        except (ValueError, IntegrityError) as e:
+            raise CommandError(f'Could not import {options["file"]}: {e}')
+
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Imported the data of {user.username}'))
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.9 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0027_powersync_publication'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('model_name', models.CharField(max_length=50, verbose_name='Model')),
+                ('object_id', models.CharField(max_length=36, verbose_name='Object ID')),
+                ('deleted', models.DateTimeField(auto_now_add=True, verbose_name='Deleted')),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='User',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'ordering': ['id'],
+                'indexes': [
+                    models.Index(
+                        fields=['user', 'model_name', 'deleted'],
+                        name='core_tombst_user_id_503960_idx',
+                    )
+                ],
+            },
+        ),
+    ]
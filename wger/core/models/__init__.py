@@ -20,4 +20,5 @@ from .language import Language
 from .license import License
 from .profile import UserProfile
 from .rep_unit import RepetitionUnit
+from .tombstone import Tombstone
 from .weight_unit import WeightUnit
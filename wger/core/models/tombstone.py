@@ -0,0 +1,64 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    The ID of a deleted object of a user
+
+    Written when the entries of the user data endpoints that offer a delta feed
+    are deleted, so that clients syncing with updated_since learn about the
+    deletions as well. Tombstones are removed after SYNC_TOMBSTONE_RETENTION.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='User',
+    )
+    """The user the deleted object belonged to"""
+
+    model_name = models.CharField(
+        max_length=50,
+        verbose_name='Model',
+    )
+    """The label of the model of the deleted object, e.g. manager.workoutlog"""
+
+    object_id = models.CharField(
+        max_length=36,
+        verbose_name='Object ID',
+    )
+    """The primary key of the deleted object"""
+
+    deleted = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Deleted',
+    )
+    """When the object was deleted"""
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['user', 'model_name', 'deleted'])]
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+
+    def __str__(self):
+        return f'{self.model_name} {self.object_id}'
@@ -16,11 +16,18 @@
 
 # Standard Library
 import datetime
+import weakref
 
 # Django
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_out
+from django.core.files.storage import default_storage
+from django.db import (
+    models,
+    transaction,
+)
 from django.db.models.signals import (
+    post_delete,
     post_save,
     pre_save,
 )
@@ -28,10 +35,16 @@ from django.dispatch import receiver
 
 # wger
 from wger.core.models import (
+    Tombstone,
     UserCache,
     UserProfile,
 )
+from wger.core.user_data import user_data_export_path
 from wger.utils.helpers import disable_for_loaddata
+from wger.utils.viewsets import (
+    get_owner_lookup,
+    get_owner_user_id,
+)
 
 
 @disable_for_loaddata
@@ -66,6 +79,16 @@ def set_user_age(sender, instance, **kwargs):
         )
 
 
+@receiver(post_delete, sender=User)
+def delete_user_data_export(sender, instance, **kwargs):
+    """
+    The export of a deleted user's data is deleted with it
+    """
+    path = user_data_export_path(instance.pk)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+
+
 post_save.connect(create_user_profile, sender=User)
 post_save.connect(create_user_cache, sender=User)
 
@@ -85,3 +108,102 @@ def delete_temporary_user_on_logout(sender, request, user, **kwargs):
         return
     if is_temporary:
         user.delete()
+
+
+class TombstoneBatch:
+    """
+    The tombstones of the entries deleted in a transaction, written with one
+    query once the transaction is committed
+
+    The owners of the entries are looked up once per parent object, e.g. once
+    per measurement category instead of once per measurement.
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.tombstones: list[Tombstone] = []
+        self.owners: dict[tuple, int | None] = {}
+
+    def owner_user_id(self, instance: models.Model) -> int | None:
+        field_name, _, lookup = get_owner_lookup(type(instance)).partition('__')
+        if not lookup:
+            return getattr(instance, field_name)
+
+        field = instance._meta.get_field(field_name)
+        key = (field.related_model, getattr(instance, field.attname))
+        if key not in self.owners:
+            self.owners[key] = get_owner_user_id(instance)
+        return self.owners[key]
+
+    def add(self, instance: models.Model, origin):
+        # Entries deleted together with their parent, e.g. the log items of a
+        # nutrition plan, take the owner from it without a query
+        if isinstance(origin, models.Model):
+            lookup = get_owner_lookup(type(origin))
+            if lookup and '__' not in lookup:
+                self.owners.setdefault((type(origin), origin.pk), getattr(origin, lookup))
+
+        user_id = self.owner_user_id(instance)
+        if user_id is not None:
+            self.tombstones.append(
+                Tombstone(
+                    user_id=user_id,
+                    model_name=instance._meta.label_lower,
+                    object_id=str(instance.pk),
+                )
+            )
+
+    def __call__(self):
+        if _tombstone_batches.get(self.key) is self:
+            del _tombstone_batches[self.key]
+
+        # Users deleted later in the same transaction don't need tombstones
+        users = set(
+            User.objects.filter(pk__in={t.user_id for t in self.tombstones}).values_list(
+                'pk', flat=True
+            )
+        )
+        Tombstone.objects.bulk_create(
+            [tombstone for tombstone in self.tombstones if tombstone.user_id in users],
+            batch_size=1000,
+        )
+
+
+_tombstone_batches: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+"""
+The batches of the open transactions and savepoints, by connection and savepoint IDs
+
+Only the commit hook keeps a batch alive: if the transaction or savepoint is
+rolled back, Django drops the hook and the batch disappears from here as well.
+"""
+
+
+def get_tombstone_batch(using: str) -> TombstoneBatch:
+    """
+    The batch of the current transaction or savepoint, a new one is created
+    and registered with on_commit() if there is none yet
+    """
+    connection = transaction.get_connection(using)
+    key = (connection, tuple(connection.savepoint_ids))
+    batch = _tombstone_batches.get(key)
+    if batch is None:
+        batch = TombstoneBatch(key)
+        _tombstone_batches[key] = batch
+        transaction.on_commit(batch, using=using)
+    return batch
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    """
+    Remembers the ID of a deleted entry, for the delta feeds of the API
+
+    Connected by the apps to the post_delete signal of their models that are
+    synced with SyncViewSetMixin. Deletions always run in a transaction, the
+    tombstones are collected and written once it is committed.
+    """
+    # The tombstones of a deleted user are deleted with it
+    origin = kwargs.get('origin')
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+
+    get_tombstone_batch(using).add(instance, origin)
@@ -17,14 +17,19 @@ import logging
 import random
 
 # Django
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.contrib.sessions.backends.db import SessionStore
 from django.core.management import call_command
+from django.utils import timezone
 
 # Third Party
 from celery.schedules import crontab
 
 # wger
 from wger.celery_configuration import app
+from wger.core.models import Tombstone
+from wger.core.user_data import save_user_data_export
 
 
 logger = logging.getLogger(__name__)
@@ -64,6 +69,28 @@ def flush_expired_oidc_tokens_task():
     call_command('oidc_cleartokens')
 
 
+@app.task
+def delete_expired_tombstones_task():
+    """
+    Delete the tombstones of entries deleted longer than SYNC_TOMBSTONE_RETENTION ago
+
+    Clients that didn't sync for that long have to sync all entries again.
+    """
+    Tombstone.objects.filter(
+        deleted__lt=timezone.now() - settings.WGER_SETTINGS['SYNC_TOMBSTONE_RETENTION']
+    ).delete()
+
+
+@app.task
+def export_user_data_task(user_id: int):
+    """
+    Export all the data of a user to the default storage
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        save_user_data_export(user)
+
+
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(
@@ -90,3 +117,11 @@ def setup_periodic_tasks(sender, **kwargs):
         flush_expired_oidc_tokens_task.s(),
         name='Flush expired OIDC tokens',
     )
+    sender.add_periodic_task(
+        crontab(
+            hour=str(random.randint(0, 23)),
+            minute=str(random.randint(0, 59)),
+        ),
+        delete_expired_tombstones_task.s(),
+        name='Delete expired tombstones',
+    )
@@ -263,10 +263,8 @@ class UserDeleteTrophyIntegrationTestCase(WgerTestCase):
         UserStatisticsService.update_statistics(user)
         TrophyService.evaluate_all_trophies(user)
 
-        with mock.patch(
-            'wger.trophies.signals.UserStatisticsService.handle_workout_deletion'
-        ) as handle_deletion:
+        with mock.patch('wger.trophies.signals.TrophyEventService.enqueue') as enqueue:
             user.delete()
 
-        handle_deletion.assert_not_called()
+        enqueue.assert_not_called()
         self.assertEqual(User.objects.filter(username='trophyuser').count(), 0)
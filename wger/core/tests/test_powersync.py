@@ -16,6 +16,7 @@
 from unittest import mock
 
 # Django
+from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.db import (
     IntegrityError,
@@ -24,10 +25,13 @@ from django.db import (
 
 # Third Party
 from rest_framework import status
+from rest_framework.test import APITestCase
 
 # wger
 from wger.core.models import UserProfile
 from wger.core.tests import powersync_base_test
+from wger.core.tests.base_testcase import BaseTestCase
+from wger.weight.models import WeightEntry
 
 
 class UserProfilePowerSyncTestCase(
@@ -113,3 +117,114 @@ class UserProfilePowerSyncTestCase(
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json().get('error'), 'Validation failed')
+
+
+class PowerSyncBatchTestCase(BaseTestCase, APITestCase):
+    """
+    Several PowerSync ops sent in one request
+    """
+
+    url = '/api/v2/upload-powersync-data/batch'
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.get(username='test')
+        self.client.force_authenticate(user=self.user)
+        self.profile_id = self.user.userprofile.pk
+
+    def push_batch(self, ops):
+        return self.client.post(self.url, data={'ops': ops}, format='json')
+
+    def weight_op(self, uuid, weight):
+        return {
+            'op': 'PUT',
+            'table': 'weight_weightentry',
+            'data': {'id': uuid, 'date': '2030-01-15T10:00:00Z', 'weight': weight},
+        }
+
+    def test_anonymous(self):
+        self.client.force_authenticate(user=None)
+        response = self.push_batch([])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_missing_ops(self):
+        response = self.client.post(self.url, data={}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['error'], 'Missing required field: ops')
+
+    def test_results_in_order(self):
+        """Every op gets its own result, refusals don't affect the other ops"""
+        response = self.push_batch(
+            [
+                {
+                    'op': 'PATCH',
+                    'table': 'core_userprofile',
+                    'data': {'id': self.profile_id, 'weight_unit': 'lb'},
+                },
+                self.weight_op('22222222-2222-2222-2222-000000000098', '95.5'),
+                {'op': 'DELETE', 'table': 'core_userprofile', 'data': {'id': self.profile_id}},
+                self.weight_op('22222222-2222-2222-2222-000000000099', '96.5'),
+                {'op': 'PUT', 'table': 'unknown_table', 'data': {}},
+                {'table': 'core_userprofile'},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0], {'status': 'ok!'})
+        self.assertEqual(results[1], {'status': 'ok!'})
+        self.assertEqual(results[2]['error'], 'Method not allowed')
+        self.assertEqual(results[3], {'status': 'ok!'})
+        self.assertEqual(results[4]['error'], 'Unknown table: unknown_table')
+        self.assertEqual(results[5]['error'], 'Missing required fields: op, table, data')
+
+        self.assertEqual(UserProfile.objects.get(pk=self.profile_id).weight_unit, 'lb')
+        self.assertEqual(
+            WeightEntry.objects.filter(
+                uuid__startswith='22222222-2222-2222-2222-00000000009'
+            ).count(),
+            2,
+        )
+
+    def test_failed_op_is_rolled_back(self):
+        """A refused op only rolls back its own writes"""
+        original = WeightEntry.objects.count()
+
+        def dispatch(handler, verb, payload, user_id):
+            WeightEntry.objects.filter(user_id=user_id).delete()
+            raise IntegrityError('duplicate key')
+
+        with mock.patch(
+            'wger.utils.powersync.PowerSyncHandler.dispatch',
+            autospec=True,
+            side_effect=dispatch,
+        ):
+            response = self.push_batch(
+                [self.weight_op('22222222-2222-2222-2222-000000000099', '1')]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['error'], 'Validation failed')
+        self.assertEqual(WeightEntry.objects.count(), original)
+
+    def test_transient_error_stops_the_batch(self):
+        """The ops before a retryable error are kept, the following ones are not processed"""
+        with mock.patch(
+            'wger.utils.powersync.PowerSyncHandler.dispatch',
+            side_effect=[None, OperationalError('deadlock detected'), None],
+        ) as dispatch:
+            response = self.push_batch(
+                [
+                    self.weight_op('22222222-2222-2222-2222-000000000097', '1'),
+                    self.weight_op('22222222-2222-2222-2222-000000000098', '2'),
+                    self.weight_op('22222222-2222-2222-2222-000000000099', '3'),
+                ]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(dispatch.call_count, 2)
+        self.assertEqual(
+            response.json()['results'],
+            [{'status': 'ok!'}, {'error': 'Temporarily unavailable'}, {'error': 'Not processed'}],
+        )
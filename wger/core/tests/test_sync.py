@@ -0,0 +1,289 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+
+# Standard Library
+import datetime
+
+# Django
+from django.contrib.auth.models import User
+from django.db import (
+    IntegrityError,
+    connection,
+    transaction,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+# Third Party
+from rest_framework import status
+
+# wger
+from wger.core.models import Tombstone
+from wger.core.signals import _tombstone_batches
+from wger.core.tasks import delete_expired_tombstones_task
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.manager.models import (
+    WorkoutLog,
+    WorkoutSession,
+)
+from wger.measurements.models import (
+    Category,
+    Measurement,
+)
+from wger.nutrition.models import (
+    LogItem,
+    Meal,
+)
+from wger.weight.models import WeightEntry
+
+
+class KeysetPaginationTestCase(WgerTestCase):
+    """
+    Tests the keyset pagination and the delta feed of the user data endpoints
+    """
+
+    url = reverse('workoutlog-list')
+
+    def setUp(self):
+        super().setUp()
+        self.user_login('admin')
+        self.user = User.objects.get(username='admin')
+        WorkoutLog.objects.bulk_create(
+            WorkoutLog(user=self.user, exercise_id=1, repetitions=i, weight=10) for i in range(21)
+        )
+
+    def fetch_all(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(entry['id'] for entry in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages(self):
+        ids = self.fetch_all(self.url, {'cursor': '', 'limit': 5})
+
+        self.assertEqual(
+            ids,
+            [
+                str(pk)
+                for pk in WorkoutLog.objects.filter(user=self.user)
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            ],
+        )
+
+    def test_integer_keys(self):
+        self.user_login('test')
+        ids = self.fetch_all(reverse('weightentry-list'), {'cursor': '', 'limit': 3})
+
+        self.assertEqual(
+            ids,
+            list(
+                WeightEntry.objects.filter(user__username='test')
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            ),
+        )
+
+    def test_offset_pagination(self):
+        """
+        Without cursor or updated_since, the offset pagination is used
+        """
+        response = self.client.get(self.url, {'limit': 5})
+        self.assertEqual(response.data['count'], WorkoutLog.objects.filter(user=self.user).count())
+
+    def test_updated_since(self):
+        since = timezone.now()
+        log = WorkoutLog.objects.filter(user=self.user).first()
+        response = self.client.patch(
+            reverse('workoutlog-detail', kwargs={'pk': log.pk}),
+            {'repetitions': 99},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url, {'updated_since': since.isoformat()})
+        self.assertEqual([entry['id'] for entry in response.data['results']], [str(log.pk)])
+        self.assertGreaterEqual(
+            datetime.datetime.fromisoformat(response.data['results'][0]['last_update']),
+            since,
+        )
+
+    def test_updated_since_order(self):
+        """
+        The delta feed is ordered by the time of the last update
+        """
+        since = timezone.now()
+        logs = list(WorkoutLog.objects.filter(user=self.user).order_by('-pk')[:3])
+        for log in logs:
+            log.save()
+
+        ids = self.fetch_all(self.url, {'updated_since': since.isoformat(), 'limit': 2})
+        self.assertEqual(ids, [str(log.pk) for log in logs])
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'updated_since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {'cursor': 'cD1mb28%3D'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TombstoneTestCase(WgerTestCase):
+    """
+    Tests the tombstones of deleted entries
+    """
+
+    url = reverse('workoutlog-deleted')
+
+    def setUp(self):
+        super().setUp()
+        self.user_login('admin')
+        self.since = timezone.now()
+
+    def deleted_ids(self, url=None):
+        response = self.client.get(url or self.url, {'updated_since': self.since.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tombstone['id'] for tombstone in response.data['results']]
+
+    def test_delete(self):
+        log_id = 'aaaaaaaa-aaaa-aaaa-aaaa-000000000001'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('workoutlog-detail', kwargs={'pk': log_id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.deleted_ids(), [log_id])
+        self.assertEqual(self.deleted_ids(reverse('workoutsession-deleted')), [])
+
+    def test_cascade(self):
+        """
+        The entries deleted together with another object get tombstones as well
+        """
+        session_id = 'bbbbbbbb-bbbb-bbbb-bbbb-000000000002'
+        session = WorkoutSession.objects.get(pk=session_id)
+        log_ids = [str(pk) for pk in session.logs.values_list('pk', flat=True)]
+        with self.captureOnCommitCallbacks(execute=True):
+            session.delete()
+
+        self.assertEqual(self.deleted_ids(reverse('workoutsession-deleted')), [session_id])
+        self.assertCountEqual(self.deleted_ids(), log_ids)
+
+    def test_other_users(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkoutLog.objects.filter(user__username='test').delete()
+        self.assertEqual(self.deleted_ids(), [])
+
+    def test_user_deletion(self):
+        """
+        No tombstones are kept for deleted users
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(username='admin').delete()
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_retention(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkoutLog.objects.filter(user__username='admin').delete()
+        Tombstone.objects.update(deleted=timezone.now() - datetime.timedelta(days=365))
+
+        self.since = timezone.now() - datetime.timedelta(days=365)
+        response = self.client.get(self.url, {'updated_since': self.since.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        delete_expired_tombstones_task()
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_cascade_queries(self):
+        """
+        The tombstones of a cascade are written with one query, the owner is
+        taken from the deleted parent
+        """
+        category = Category.objects.create(user=User.objects.get(username='admin'), name='Arm')
+        Measurement.objects.bulk_create(
+            Measurement(category=category, value=30 + i, date=datetime.date(2020, 1, i + 1))
+            for i in range(20)
+        )
+        measurement_ids = [str(pk) for pk in category.measurement_set.values_list('pk', flat=True)]
+
+        with (
+            self.captureOnCommitCallbacks() as callbacks,
+            CaptureQueriesContext(connection) as queries,
+        ):
+            category.delete()
+        self.assertLess(len(queries), 10)
+
+        # Checking that the owner still exists and inserting the tombstones
+        with self.assertNumQueries(2):
+            for callback in callbacks:
+                callback()
+
+        self.assertCountEqual(self.deleted_ids(reverse('measurement-deleted')), measurement_ids)
+
+    def test_rollback(self):
+        """
+        Entries whose deletion was rolled back get no tombstones
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                WorkoutLog.objects.filter(pk='aaaaaaaa-aaaa-aaaa-aaaa-000000000001').delete()
+            try:
+                with transaction.atomic():
+                    WorkoutSession.objects.filter(user__username='admin').delete()
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        self.assertEqual(self.deleted_ids(), ['aaaaaaaa-aaaa-aaaa-aaaa-000000000001'])
+        self.assertEqual(self.deleted_ids(reverse('workoutsession-deleted')), [])
+
+    def test_rollback_discards_batch(self):
+        """
+        The batch of a rolled back savepoint is discarded with its commit hook,
+        later deletions get a new one
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    WorkoutLog.objects.filter(pk='aaaaaaaa-aaaa-aaaa-aaaa-000000000001').delete()
+                    self.assertEqual(len(_tombstone_batches), 1)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+            self.assertEqual(len(_tombstone_batches), 0)
+
+            WorkoutSession.objects.filter(user__username='admin').delete()
+
+        self.assertNotEqual(self.deleted_ids(reverse('workoutsession-deleted')), [])
+        self.assertEqual(len(_tombstone_batches), 0)
+
+    def test_meal_deletion(self):
+        """
+        Diary entries that lose their meal are part of the delta feed
+        """
+        meal = Meal.objects.first()
+        log = LogItem.objects.create(plan=meal.plan, meal=meal, ingredient_id=1, amount=100)
+        LogItem.objects.filter(pk=log.pk).update(
+            last_update=timezone.now() - datetime.timedelta(days=1)
+        )
+        meal.delete()
+
+        log.refresh_from_db()
+        self.assertIsNone(log.meal)
+        self.assertGreaterEqual(log.last_update, self.since)
@@ -0,0 +1,245 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import io
+import json
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+# Django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import (
+    CommandError,
+    call_command,
+)
+from django.test import override_settings
+from django.urls import reverse
+
+# Third Party
+from rest_framework import status
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.core.user_data import (
+    USER_DATA_MODELS,
+    export_user_data,
+    import_user_data,
+    user_data_export_path,
+)
+from wger.exercises.models import Exercise
+from wger.manager.models import (
+    Routine,
+    SlotEntry,
+    WorkoutLog,
+)
+from wger.nutrition.models import DiaryDay
+from wger.utils.viewsets import get_owner_lookup
+
+
+def count_user_data(user: User) -> dict[str, int]:
+    result = {}
+    for label in USER_DATA_MODELS:
+        model = apps.get_model(label)
+        result[label] = model.objects.filter(**{get_owner_lookup(model): user.pk}).count()
+    return result
+
+
+class UserDataExportTestCase(WgerTestCase):
+    """
+    Tests exporting all the data of a user and importing it again
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.get(username='admin')
+        self.counts = count_user_data(self.user)
+
+    def export(self) -> io.BytesIO:
+        file = io.BytesIO()
+        export_user_data(self.user, file)
+        file.seek(0)
+        return file
+
+    def test_archive(self):
+        with zipfile.ZipFile(self.export()) as archive:
+            manifest = json.loads(archive.read('manifest.json'))
+            tables = {table['name']: table for table in manifest['tables']}
+            self.assertEqual(list(tables), list(USER_DATA_MODELS))
+            self.assertEqual({name: t['count'] for name, t in tables.items()}, self.counts)
+
+            # References to the catalogue are stored by UUID, to the user not at all
+            self.assertIn('exercise__uuid', tables['manager.workoutlog']['columns'])
+            self.assertNotIn('user_id', tables['manager.workoutlog']['columns'])
+
+            # One batch per line, column by column
+            columns = tables['manager.workoutlog']['columns']
+            batch = json.loads(archive.read('manager.workoutlog.jsonl').splitlines()[0])
+            self.assertEqual(len(batch), len(columns))
+            self.assertEqual(len(batch[0]), self.counts['manager.workoutlog'])
+
+    def test_round_trip(self):
+        file = self.export()
+        routine = Routine.objects.filter(user=self.user).first()
+        logs = sorted(
+            WorkoutLog.objects.filter(user=self.user).values_list(
+                'pk', 'exercise__uuid', 'repetitions', 'weight', 'date', 'session_id'
+            )
+        )
+        self.user.delete()
+
+        new_user = User.objects.create_user('restored')
+        counts = import_user_data(new_user, file)
+
+        self.assertEqual(counts, self.counts)
+        self.assertEqual(count_user_data(new_user), self.counts)
+
+        # Integer keys are assigned anew and the references follow them
+        new_routine = Routine.objects.get(user=new_user)
+        self.assertEqual(new_routine.name, routine.name)
+        self.assertEqual(new_routine.created, routine.created)
+        self.assertEqual(
+            SlotEntry.objects.filter(slot__day__routine=new_routine).count(),
+            self.counts['manager.slotentry'],
+        )
+
+        # UUID keys are kept
+        self.assertEqual(
+            sorted(
+                WorkoutLog.objects.filter(user=new_user).values_list(
+                    'pk', 'exercise__uuid', 'repetitions', 'weight', 'date', 'session_id'
+                )
+            ),
+            logs,
+        )
+
+        # The diary is calculated from the imported log items
+        self.assertTrue(DiaryDay.objects.filter(plan__user=new_user).exists())
+
+    def test_missing_exercise(self):
+        """
+        Nothing is imported if the archive references an unknown exercise
+        """
+        file = self.export()
+        exercise_id = WorkoutLog.objects.filter(user=self.user).first().exercise_id
+        self.user.delete()
+        Exercise.objects.filter(pk=exercise_id).update(uuid='00000000-0000-0000-0000-000000000000')
+
+        new_user = User.objects.create_user('restored')
+        with self.assertRaises(ValueError):
+            import_user_data(new_user, file)
+        self.assertFalse(any(count_user_data(new_user).values()))
+
+    def only_table(self, label: str) -> io.BytesIO:
+        """
+        An export of the user with only one of the tables
+        """
+        file = io.BytesIO()
+        with zipfile.ZipFile(self.export()) as source, zipfile.ZipFile(file, 'w') as archive:
+            manifest = json.loads(source.read('manifest.json'))
+            manifest['tables'] = [t for t in manifest['tables'] if t['name'] == label]
+            archive.writestr('manifest.json', json.dumps(manifest))
+            archive.writestr(manifest['tables'][0]['file'], source.read(f'{label}.jsonl'))
+        file.seek(0)
+        return file
+
+    def test_references_outside_of_archive(self):
+        """
+        Rows can't be attached to the data of another user, e.g. with an
+        archive that leaves out the referenced table
+        """
+        new_user = User.objects.create_user('restored')
+        for label in ('manager.day', 'nutrition.meal'):
+            with self.subTest(label=label):
+                with self.assertRaisesMessage(ValueError, 'is not in the archive'):
+                    import_user_data(new_user, self.only_table(label))
+                self.assertFalse(any(count_user_data(new_user).values()))
+
+        # Optional references are dropped
+        file = self.only_table('manager.workoutlog')
+        WorkoutLog.objects.filter(user=self.user).delete()
+        import_user_data(new_user, file)
+
+        self.assertEqual(
+            WorkoutLog.objects.filter(user=new_user).count(), self.counts['manager.workoutlog']
+        )
+        self.assertFalse(WorkoutLog.objects.filter(user=new_user, session__isnull=False).exists())
+        self.assertFalse(WorkoutLog.objects.filter(user=new_user, routine__isnull=False).exists())
+
+    def test_commands(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'export.zip')
+            call_command('export-user-data', 'admin', output=path, stdout=io.StringIO())
+            self.user.delete()
+
+            User.objects.create_user('restored')
+            with self.assertRaises(CommandError):
+                call_command('import-user-data', path, 'unknown', stdout=io.StringIO())
+            call_command('import-user-data', path, 'restored', stdout=io.StringIO())
+
+        self.assertEqual(count_user_data(User.objects.get(username='restored')), self.counts)
+
+
+@override_settings(WGER_SETTINGS={**settings.WGER_SETTINGS, 'USE_CELERY': False})
+class UserDataExportApiTestCase(WgerTestCase):
+    """
+    Tests creating and downloading an export over the API
+    """
+
+    url = reverse('user-data-export')
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.get(username='test')
+        self.path = user_data_export_path(self.user.pk)
+        if default_storage.exists(self.path):
+            default_storage.delete(self.path)
+
+    def test_anonymous(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export(self):
+        self.user_login('test')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'done')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertIn('manifest.json', archive.namelist())
+
+        # Other users can't download it and it is deleted with the user
+        self.user_login('admin')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.user.delete()
+        self.assertFalse(default_storage.exists(self.path))
+
+    @override_settings(WGER_SETTINGS={**settings.WGER_SETTINGS, 'USE_CELERY': True})
+    def test_export_celery(self):
+        self.user_login('test')
+        with mock.patch('wger.core.tasks.export_user_data_task.delay') as delay:
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'scheduled')
+        delay.assert_called_once_with(self.user.pk)
@@ -0,0 +1,423 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Export and import of all the data of a user, e.g. to move an account to
+another instance or to restore it.
+
+The archive is a zip file with a manifest.json and one JSON Lines file per
+table. Every line of a table is a batch of up to USER_DATA_BATCH_SIZE rows,
+stored column by column like the record batches of Arrow or Parquet:
+
+    [[1, 2, 3], ["2024-01-01", "2024-01-02", "2024-01-03"], ["80.5", "80.1", "79.8"]]
+
+References to the user are left out, references to the exercises, ingredients
+and weight units of ingredients are stored by their UUID, so the archive can be
+imported on any instance with the same catalogue.
+"""
+
+# Standard Library
+import datetime
+import decimal
+import json
+import logging
+import tempfile
+import uuid
+import zipfile
+from itertools import batched
+from pathlib import Path
+from typing import BinaryIO
+
+# Django
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import (
+    models,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+# wger
+from wger.utils.timeseries import reset_time_series_cache
+from wger.utils.viewsets import get_owner_lookup
+
+
+logger = logging.getLogger(__name__)
+
+USER_DATA_FORMAT_VERSION = 1
+
+USER_DATA_MODELS = (
+    'manager.routine',
+    'manager.day',
+    'manager.label',
+    'manager.slot',
+    'manager.slotentry',
+    'manager.weightconfig',
+    'manager.maxweightconfig',
+    'manager.repetitionsconfig',
+    'manager.maxrepetitionsconfig',
+    'manager.setsconfig',
+    'manager.maxsetsconfig',
+    'manager.restconfig',
+    'manager.maxrestconfig',
+    'manager.rirconfig',
+    'manager.maxrirconfig',
+    'manager.workoutsession',
+    'manager.workoutlog',
+    'weight.weightentry',
+    'measurements.category',
+    'measurements.measurement',
+    'nutrition.nutritionplan',
+    'nutrition.meal',
+    'nutrition.mealitem',
+    'nutrition.logitem',
+    'gallery.image',
+)
+"""
+The models with the data of a user, every model only references the ones
+before it. The nutritional diary is left out, it is calculated from the log
+items after the import.
+"""
+
+USER_DATA_BATCH_SIZE = 1000
+"""Number of rows read, written and inserted at once"""
+
+USER_DATA_EXPORT_PATH = 'user-data'
+
+
+def user_data_export_path(user_id: int) -> str:
+    """
+    The path of the export of a user in the default storage
+
+    The name contains a hash, so it can't be guessed if the storage is public.
+    """
+    digest = salted_hmac('wger.core.user_data', str(user_id)).hexdigest()[:32]
+    return f'{USER_DATA_EXPORT_PATH}/{user_id}-{digest}.zip'
+
+
+def _encode(value):
+    """
+    JSON encoding of the values not supported by the json module
+
+    Unlike DjangoJSONEncoder, the microseconds of times are kept.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _is_user_field(field: models.Field) -> bool:
+    return field.is_relation and field.related_model is User
+
+
+def _get_columns(model) -> list[str]:
+    """
+    The columns of a table, the attribute names of the fields or, for references
+    to the catalogue with a UUID, the lookup of that UUID
+    """
+    columns = []
+    for field in model._meta.concrete_fields:
+        if _is_user_field(field):
+            continue
+        related = field.related_model
+        if (
+            related is not None
+            and related._meta.label_lower not in USER_DATA_MODELS
+            and any(f.name == 'uuid' for f in related._meta.concrete_fields)
+        ):
+            columns.append(f'{field.name}__uuid')
+        else:
+            columns.append(field.attname)
+    return columns
+
+
+def export_user_data(user: User, file: BinaryIO) -> dict:
+    """
+    Writes all the data of a user to a zip archive
+
+    Every table is read with one query and only one batch of rows is kept in
+    memory at a time.
+
+    :param user: The user to export.
+    :param file: A binary file object the archive is written to.
+    :return: The manifest of the archive.
+    """
+    tables = []
+    with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for label in USER_DATA_MODELS:
+            model = apps.get_model(label)
+            columns = _get_columns(model)
+            rows = (
+                model.objects.filter(**{get_owner_lookup(model): user.pk})
+                .order_by('pk')
+                .values_list(*columns)
+                .iterator(chunk_size=USER_DATA_BATCH_SIZE)
+            )
+
+            count = 0
+            with archive.open(f'{label}.jsonl', 'w', force_zip64=True) as f:
+                for batch in batched(rows, USER_DATA_BATCH_SIZE):
+                    columns_batch = [list(column) for column in zip(*batch)]
+                    f.write(json.dumps(columns_batch, default=_encode).encode() + b'\n')
+                    count += len(batch)
+
+            tables.append(
+                {'name': label, 'file': f'{label}.jsonl', 'columns': columns, 'count': count}
+            )
+
+        manifest = {
+            'version': USER_DATA_FORMAT_VERSION,
+            'created': timezone.now().isoformat(),
+            'tables': tables,
+        }
+        archive.writestr('manifest.json', json.dumps(manifest, indent=1))
+
+    return manifest
+
+
+def save_user_data_export(user: User) -> str:
+    """
+    Exports the data of a user to the default storage, replacing a previous export
+
+    The archive is written to a local temp file first and then uploaded, so this
+    works with any storage backend.
+
+    :return: The name of the saved file.
+    """
+    path = user_data_export_path(user.pk)
+    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp:
+        tmp_path = tmp.name
+        manifest = export_user_data(user, tmp)
+
+    try:
+        with open(tmp_path, 'rb') as f:
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            saved_name = default_storage.save(path, File(f))
+    finally:
+        Path(tmp_path).unlink()
+
+    count = sum(table['count'] for table in manifest['tables'])
+    logger.info(f'Exported {count} entries of user {user.pk} to {saved_name}')
+    return saved_name
+
+
+class _TableImporter:
+    """
+    Inserts the batches of one table of an archive
+
+    Integer primary keys are assigned anew by the database, the new keys are
+    recorded in `keys` so the references of the following tables can be
+    changed accordingly. UUID primary keys are kept, `keys` has the set of the
+    ones in the archive. References to the data of a user must point to a row
+    of the archive, so that an archive can't attach rows to the data of
+    another user.
+    """
+
+    def __init__(self, model, columns: list[str], user: User, keys: dict[str, dict | set]):
+        self.model = model
+        self.user = user
+        self.keys = keys
+        self.count = 0
+
+        self.user_fields = [f.attname for f in model._meta.concrete_fields if _is_user_field(f)]
+        self.auto_pk = isinstance(model._meta.pk, models.AutoField)
+
+        # The auto_now(_add) fields are overwritten by bulk_create and restored afterwards
+        self.timestamp_fields = [
+            f.attname
+            for f in model._meta.concrete_fields
+            if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+        ]
+
+        self.fields = {}
+        for column in columns:
+            name = column.removesuffix('__uuid')
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                logger.warning(f'Ignoring unknown column {column} of {model._meta.label_lower}')
+                continue
+            self.fields[column] = field
+        self.columns = columns
+
+    def _convert(self, column: str, field: models.Field, values: list) -> list:
+        label = self.model._meta.label_lower
+
+        if column.endswith('__uuid'):
+            uuid_field = field.related_model._meta.get_field('uuid')
+            uuids = [None if v is None else uuid_field.to_python(v) for v in values]
+            pks = dict(
+                field.related_model.objects.filter(uuid__in={u for u in uuids if u}).values_list(
+                    'uuid', 'pk'
+                )
+            )
+            missing = {u for u in uuids if u and u not in pks}
+            if missing:
+                raise ValueError(
+                    f'{label}: {len(missing)} {field.related_model._meta.verbose_name_plural} '
+                    f'do not exist on this instance, e.g. {next(iter(missing))}'
+                )
+            return [pks.get(u) for u in uuids]
+
+        if not field.is_relation:
+            return [None if v is None else field.to_python(v) for v in values]
+
+        values = [None if v is None else field.target_field.to_python(v) for v in values]
+        new_keys = self.keys.get(field.related_model._meta.label_lower)
+
+        # Tables shared by all users, e.g. the units
+        if new_keys is None:
+            return values
+
+        result = []
+        for value in values:
+            if value is not None and value not in new_keys:
+                if not field.null:
+                    raise ValueError(f'{label}: {field.name} {value} is not in the archive')
+                logger.warning(f'{label}: dropping reference to {field.name} {value}')
+                value = None
+            if isinstance(new_keys, dict) and value is not None:
+                value = new_keys[value]
+            result.append(value)
+        return result
+
+    def insert(self, batch: list[list]):
+        """
+        Inserts one batch, a list with the values of every column
+        """
+        data = {
+            self.fields[column].attname: self._convert(column, self.fields[column], values)
+            for column, values in zip(self.columns, batch)
+            if column in self.fields
+        }
+        pk_name = self.model._meta.pk.attname
+        old_pks = data.pop(pk_name) if self.auto_pk else None
+        timestamps = {name: data[name] for name in self.timestamp_fields if name in data}
+
+        size = len(batch[0]) if batch else 0
+        objects = [
+            self.model(
+                **{name: values[i] for name, values in data.items()},
+                **{name: self.user.pk for name in self.user_fields},
+            )
+            for i in range(size)
+        ]
+        self.model.objects.bulk_create(objects)
+
+        if self.auto_pk:
+            self.keys[self.model._meta.label_lower].update(
+                zip(old_pks, (obj.pk for obj in objects))
+            )
+        if timestamps:
+            for i, obj in enumerate(objects):
+                for name, values in timestamps.items():
+                    setattr(obj, name, values[i])
+            self.model.objects.bulk_update(objects, list(timestamps))
+
+        self.count += size
+
+
+def _read_primary_keys(archive: zipfile.ZipFile, model, table: dict | None) -> set:
+    """
+    The UUID primary keys of the rows of a table in the archive
+
+    They are read before the import, since rows can reference rows of the same
+    table that come later, e.g. the next log of a workout log.
+    """
+    pk = model._meta.pk
+    if table is None or pk.attname not in table['columns']:
+        return set()
+
+    index = table['columns'].index(pk.attname)
+    keys = set()
+    with archive.open(table['file']) as f:
+        for line in f:
+            keys.update(pk.to_python(value) for value in json.loads(line)[index])
+    return keys
+
+
+def import_user_data(user: User, file: BinaryIO) -> dict[str, int]:
+    """
+    Restores an archive written by export_user_data() for a user
+
+    The tables are inserted in the order of USER_DATA_MODELS with bulk_create,
+    one batch at a time, in a single transaction. The user should not have any
+    data yet, entries with a UUID already present on this instance can't be
+    imported again.
+
+    Afterwards, the nutritional diary of the user is calculated, the statistics
+    and trophies are recalculated and the cached time series are reset. The
+    files of the gallery images are not part of the archive and need to be
+    copied separately.
+
+    :param user: The user the data is imported for.
+    :param file: A binary, seekable file object with the archive.
+    :return: The number of imported rows per table.
+    :raise ValueError: If the archive is not valid or references exercises or
+        ingredients that do not exist on this instance.
+    """
+    # wger
+    from wger.nutrition.models import (
+        DiaryDay,
+        NutritionPlan,
+    )
+    from wger.trophies.models import TrophyEvent
+    from wger.trophies.services import TrophyEventService
+
+    counts = {}
+    with zipfile.ZipFile(file) as archive:
+        manifest = json.loads(archive.read('manifest.json'))
+        if manifest.get('version') != USER_DATA_FORMAT_VERSION:
+            raise ValueError(f'Unsupported archive version {manifest.get("version")}')
+
+        tables = {table['name']: table for table in manifest['tables']}
+        unknown = set(tables) - set(USER_DATA_MODELS)
+        if unknown:
+            raise ValueError(f'Unknown tables in the archive: {", ".join(sorted(unknown))}')
+
+        # All the tables are registered, references to a table that is not in
+        # the archive don't point to a row of it either
+        keys = {}
+        for label in USER_DATA_MODELS:
+            model = apps.get_model(label)
+            if isinstance(model._meta.pk, models.AutoField):
+                keys[label] = {}
+            else:
+                keys[label] = _read_primary_keys(archive, model, tables.get(label))
+
+        with transaction.atomic():
+            for label in USER_DATA_MODELS:
+                if label not in tables:
+                    continue
+                model = apps.get_model(label)
+                importer = _TableImporter(model, tables[label]['columns'], user, keys)
+                with archive.open(tables[label]['file']) as f:
+                    for line in f:
+                        importer.insert(json.loads(line))
+                counts[label] = importer.count
+
+    DiaryDay.rebuild(NutritionPlan.objects.filter(user=user))
+    if counts.get('manager.workoutlog') or counts.get('manager.workoutsession'):
+        TrophyEventService.enqueue(user.pk, TrophyEvent.TYPE_RECALCULATE)
+    reset_time_series_cache('weight', user.pk)
+    reset_time_series_cache('measurement', user.pk)
+
+    return counts
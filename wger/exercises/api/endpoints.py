@@ -5,3 +5,5 @@ MUSCLE_ENDPOINT = 'muscle'
 EQUIPMENT_ENDPOINT = 'equipment'
 IMAGE_ENDPOINT = 'exerciseimage'
 VIDEO_ENDPOINT = 'video'
+EXERCISE_SNAPSHOT_PATH = 'exercises/snapshots'
+EXERCISE_SNAPSHOT_MANIFEST_PATH = 'exercises/snapshots/manifest.json'
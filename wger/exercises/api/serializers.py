@@ -20,7 +20,6 @@ from difflib import SequenceMatcher
 # Django
 from django.conf import settings
 from django.contrib.postgres.search import TrigramSimilarity
-from django.core.cache import cache
 from django.db import (
     models,
     transaction,
@@ -53,7 +52,6 @@ from wger.exercises.models import (
 )
 from wger.exercises.views.helper import StreamVerbs
 from wger.utils.api_schema import ThumbnailsSerializer
-from wger.utils.cache import CacheKeyMapper
 from wger.utils.constants import CC_BY_SA_4_LICENSE_ID
 from wger.utils.db import is_postgres_db
 from wger.utils.url import make_absolute_url
@@ -670,19 +668,50 @@ class ExerciseInfoSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         """
-        Cache the response
+        Cache the response, see wger.exercises.cache
+
+        With 'rebuild_cache' in the context, the cached response is replaced.
         """
-        key = CacheKeyMapper.get_exercise_api_key(instance.uuid)
+        # wger
+        from wger.exercises.cache import (
+            get_cached_exercises,
+            set_cached_exercise,
+        )
 
-        representation = cache.get(key)
-        if representation:
-            return representation
+        if not self.context.get('rebuild_cache'):
+            cached = get_cached_exercises([instance.uuid])
+            if cached:
+                return cached[instance.uuid]
 
         representation = super().to_representation(instance)
-        cache.set(key, representation, settings.WGER_SETTINGS['EXERCISE_CACHE_TTL'])
+        set_cached_exercise(instance.uuid, representation)
         return representation
 
 
+class ExerciseSnapshotQuerySerializer(serializers.Serializer):
+    language__code = serializers.CharField(
+        required=False,
+        help_text='Only the exercises with a translation in this language',
+    )
+
+
+class ExerciseChangesQuerySerializer(ExerciseSnapshotQuerySerializer):
+    since = serializers.DateTimeField(
+        help_text='Only the changes after this time, e.g. the Last-Modified header of the '
+        'snapshot or "until" of the previous changes',
+    )
+
+
+class ExerciseChangesSerializer(serializers.Serializer):
+    """
+    Exercises changed and objects deleted within a period of time
+    """
+
+    until = serializers.DateTimeField()
+    exercises = ExerciseInfoSerializer(many=True)
+    deleted = DeletionLogSerializer(many=True)
+
+
 def get_default_license() -> License:
     return License.objects.get(pk=CC_BY_SA_4_LICENSE_ID)
 
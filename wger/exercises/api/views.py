@@ -14,13 +14,23 @@
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
 # Standard Library
+import gzip
+from datetime import datetime
 from uuid import UUID
 
 # Django
 from django.conf import settings
-from django.core.cache import cache
-from django.db.models import Prefetch
+from django.db.models import Q
+from django.http import (
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.http import (
+    http_date,
+    parse_etags,
+)
 from django.views.decorators.cache import cache_page
 
 # Third Party
@@ -29,8 +39,12 @@ from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from easy_thumbnails.alias import aliases
 from easy_thumbnails.files import get_thumbnailer
-from rest_framework import viewsets
+from rest_framework import (
+    status,
+    viewsets,
+)
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import CreateAPIView
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
@@ -47,16 +61,23 @@ from wger.exercises.api.serializers import (
     EquipmentSerializer,
     ExerciseAliasSerializer,
     ExerciseCategorySerializer,
+    ExerciseChangesQuerySerializer,
+    ExerciseChangesSerializer,
     ExerciseCommentSerializer,
     ExerciseImageSerializer,
     ExerciseInfoSerializer,
     ExerciseSerializer,
+    ExerciseSnapshotQuerySerializer,
     ExerciseSubmissionSerializer,
     ExerciseTranslationSerializer,
     ExerciseVideoSerializer,
     MuscleSerializer,
 )
 from wger.exercises.api.throttling import CreateScopedRateThrottle
+from wger.exercises.cache import (
+    get_cached_exercises,
+    get_exercise_info_queryset,
+)
 from wger.exercises.models import (
     Alias,
     DeletionLog,
@@ -69,9 +90,13 @@ from wger.exercises.models import (
     Muscle,
     Translation,
 )
+from wger.exercises.snapshot import (
+    ALL_LANGUAGES,
+    get_exercise_snapshot_manifest,
+    read_exercise_snapshot,
+)
 from wger.exercises.views.helper import StreamVerbs
 from wger.utils.api_schema import ImageThumbnailsSerializer
-from wger.utils.cache import CacheKeyMapper
 from wger.utils.url import make_absolute_url
 
 
@@ -239,20 +264,7 @@ class ExerciseInfoViewset(viewsets.ReadOnlyModelViewSet):
         Used by retrieve() and the cache-miss path in list(); warm list() requests
         skip it entirely (see list()).
         """
-        return Exercise.objects.select_related(
-            'category',
-            'license',
-        ).prefetch_related(
-            'muscles',
-            'muscles_secondary',
-            'equipment',
-            'exerciseimage_set',
-            'exercisevideo_set',
-            Prefetch(
-                'translations',
-                queryset=Translation.objects.prefetch_related('alias_set', 'exercisecomment_set'),
-            ),
-        )
+        return get_exercise_info_queryset()
 
     def list(self, request, *args, **kwargs):
         """Serve the list from the per-exercise cache, hitting the DB only for misses."""
@@ -263,26 +275,126 @@ class ExerciseInfoViewset(viewsets.ReadOnlyModelViewSet):
         page = self.paginate_queryset(queryset)
         exercises = page if page is not None else list(queryset)
 
-        keys = {
-            exercise.uuid: CacheKeyMapper.get_exercise_api_key(exercise.uuid)
-            for exercise in exercises
-        }
-        representations = cache.get_many(keys.values())
+        # Stale representations are served as well, and rebuilt in the background
+        representations = get_cached_exercises(exercise.uuid for exercise in exercises)
 
-        missing = [uuid for uuid, key in keys.items() if key not in representations]
+        missing = [exercise.uuid for exercise in exercises if exercise.uuid not in representations]
         if missing:
-            # to_representation() repopulates the cache as a side effect
-            for exercise in self.get_queryset().filter(uuid__in=missing):
-                representations[keys[exercise.uuid]] = self.get_serializer(exercise).data
+            missing_exercises = list(self.get_queryset().filter(uuid__in=missing))
+            serializer = self.get_serializer(
+                missing_exercises,
+                many=True,
+                context={**self.get_serializer_context(), 'rebuild_cache': True},
+            )
+            representations.update(
+                zip((exercise.uuid for exercise in missing_exercises), serializer.data)
+            )
 
         data = [
-            representations[keys[exercise.uuid]]
+            representations[exercise.uuid]
             for exercise in exercises
-            if keys[exercise.uuid] in representations
+            if exercise.uuid in representations
         ]
         return self.get_paginated_response(data) if page is not None else Response(data)
 
 
+class ExerciseSnapshotViewSet(viewsets.ViewSet):
+    """
+    API endpoint with the whole exercise catalogue, for clients that keep a copy
+
+    The snapshot contains the same data as /api/v2/exerciseinfo/ and is
+    exported in the background after changes. Until the first export is done,
+    the endpoint answers with 503. Clients send the ETag of their
+    copy in If-None-Match and only download the snapshot if it changed, or
+    fetch only the changes since its Last-Modified time.
+    """
+
+    @extend_schema(
+        parameters=[ExerciseSnapshotQuerySerializer],
+        responses={200: ExerciseInfoSerializer(many=True), 304: None, 503: None},
+    )
+    def list(self, request):
+        """
+        Return the snapshot of all exercises, or of those in one language
+        """
+        query = ExerciseSnapshotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        manifest = get_exercise_snapshot_manifest()
+        if manifest is None:
+            return Response(
+                {'detail': 'The snapshot is being exported, try again later'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(settings.WGER_SETTINGS['EXERCISE_SNAPSHOT_DELAY'])},
+            )
+
+        snapshot = manifest['snapshots'].get(
+            query.validated_data.get('language__code', ALL_LANGUAGES)
+        )
+        if snapshot is None:
+            raise NotFound('No snapshot for this language')
+
+        # The checksum is the one of the gzipped file, other encodings get their own tag
+        gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+        etag = f'"{snapshot["sha256"]}"' if gzipped else f'"{snapshot["sha256"]}-identity"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(datetime.fromisoformat(manifest['created']).timestamp()),
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return HttpResponseNotModified(headers=headers)
+
+        content = read_exercise_snapshot(snapshot['file'])
+        if gzipped:
+            headers['Content-Encoding'] = 'gzip'
+        else:
+            content = gzip.decompress(content)
+        return HttpResponse(content, content_type='application/json', headers=headers)
+
+    @extend_schema(
+        parameters=[ExerciseChangesQuerySerializer],
+        responses={200: ExerciseChangesSerializer},
+    )
+    @action(detail=False)
+    def changes(self, request):
+        """
+        Return the exercises that changed and the objects that were deleted
+        after the given time
+
+        Changes of aliases and comments alone are not included, they are only
+        picked up by the next snapshot.
+        """
+        query = ExerciseChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data['since']
+        until = timezone.now()
+
+        changed = Exercise.with_translations.filter(
+            Q(last_update__gt=since)
+            | Q(translations__last_update__gt=since)
+            | Q(exerciseimage__last_update__gt=since)
+            | Q(exercisevideo__last_update__gt=since)
+        )
+        if language := query.validated_data.get('language__code'):
+            changed = changed.filter(translations__language__short_name=language)
+
+        out = ExerciseChangesSerializer(
+            {
+                'until': until,
+                'exercises': get_exercise_info_queryset()
+                .filter(pk__in=changed.values('pk'))
+                .order_by('id'),
+                'deleted': DeletionLog.objects.filter(timestamp__gt=since).order_by('id'),
+            },
+            context={'request': request},
+        ).data
+        return Response(out)
+
+
 class ExerciseSubmissionViewSet(CreateAPIView):
     """
     API endpoint for submitting new exercises
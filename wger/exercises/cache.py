@@ -12,13 +12,242 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+"""
+Cache of the exercise API representations
+
+Every exercise is cached under its own key, see ExerciseInfoSerializer. An
+entry is fresh for EXERCISE_CACHE_TTL seconds, minus a random jitter so that
+the entries don't all expire at once. After that it is still served for up to
+EXERCISE_CACHE_STALE_TTL seconds, while it is rebuilt in the background.
+
+Changed exercises are removed from the cache with reset_exercise_api_cache(),
+which also queues them for a rebuild.
+"""
+
 # Standard Library
-from typing import Callable
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+from typing import (
+    Callable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import (
+    close_old_connections,
+    connection,
+)
+from django.db.models import Prefetch
 
 # wger
 from wger.exercises.api.serializers import ExerciseInfoSerializer
-from wger.exercises.models import Exercise
-from wger.utils.cache import reset_exercise_api_cache
+from wger.exercises.models import (
+    Exercise,
+    Translation,
+)
+from wger.utils.cache import (
+    CacheKeyMapper,
+    reset_exercise_api_cache,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_JITTER = 0.1
+"""Fraction of EXERCISE_CACHE_TTL by which the freshness of an entry is shortened at random"""
+
+REBUILD_CHUNK_SIZE = 50
+"""Number of exercises that are loaded and serialized together"""
+
+REBUILD_WORKERS = 4
+"""Number of chunks that are rebuilt in parallel"""
+
+REFRESH_TIMEOUT = 600
+"""Seconds during which a queued exercise is not queued again"""
+
+
+class CachedExercise(NamedTuple):
+    data: dict
+    fresh_until: float
+
+
+def get_exercise_info_queryset():
+    """
+    Heavy queryset with select_related/prefetch_related to avoid n+1 queries
+    when serializing exercises with ExerciseInfoSerializer
+    """
+    return Exercise.objects.select_related(
+        'category',
+        'license',
+    ).prefetch_related(
+        'muscles',
+        'muscles_secondary',
+        'equipment',
+        'exerciseimage_set',
+        'exercisevideo_set',
+        Prefetch(
+            'translations',
+            queryset=Translation.objects.prefetch_related('alias_set', 'exercisecomment_set'),
+        ),
+    )
+
+
+def get_cache_entries(uuids: Iterable) -> dict:
+    """
+    Returns the cache entries of the exercises that are cached, by uuid
+    """
+    keys = {uuid: CacheKeyMapper.get_exercise_api_key(uuid) for uuid in uuids}
+    entries = cache.get_many(keys.values())
+    return {
+        uuid: entries[key]
+        for uuid, key in keys.items()
+        # Entries written before stale-while-revalidate are rebuilt
+        if isinstance(entries.get(key), CachedExercise)
+    }
+
+
+def get_cached_exercises(uuids: Iterable) -> dict:
+    """
+    Returns the cached representations of the exercises, by uuid
+
+    Stale representations are returned as well, and queued for a rebuild.
+    """
+    now = time.time()
+    entries = get_cache_entries(uuids)
+
+    stale = [uuid for uuid, entry in entries.items() if entry.fresh_until < now]
+    if stale:
+        queue_exercise_api_refresh(stale)
+
+    return {uuid: entry.data for uuid, entry in entries.items()}
+
+
+def set_cached_exercise(uuid, data: dict):
+    """
+    Caches the representation of an exercise
+    """
+    ttl = settings.WGER_SETTINGS['EXERCISE_CACHE_TTL']
+    cache.set(
+        CacheKeyMapper.get_exercise_api_key(uuid),
+        CachedExercise(data, time.time() + ttl * random.uniform(1 - CACHE_TTL_JITTER, 1)),
+        ttl + settings.WGER_SETTINGS['EXERCISE_CACHE_STALE_TTL'],
+    )
+
+
+def rebuild_exercise_api_cache(uuids: Iterable, workers: int = REBUILD_WORKERS) -> int:
+    """
+    Serializes the given exercises and caches them, in chunks that are
+    processed by several threads in parallel
+
+    :return: The number of cached exercises
+    """
+    chunks = list(batched(uuids, REBUILD_CHUNK_SIZE))
+    if workers <= 1 or len(chunks) <= 1:
+        return sum(map(_rebuild_chunk, chunks))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wger-exercise-cache') as pool:
+        return sum(pool.map(_rebuild_chunk_in_thread, chunks))
+
+
+def _rebuild_chunk(uuids: tuple) -> int:
+    exercises = get_exercise_info_queryset().filter(uuid__in=uuids)
+    ExerciseInfoSerializer(exercises, many=True, context={'rebuild_cache': True}).data
+    cache.delete_many([CacheKeyMapper.exercise_api_refresh_key(uuid) for uuid in uuids])
+    return len(exercises)
+
+
+def _rebuild_chunk_in_thread(uuids: tuple) -> int:
+    try:
+        return _rebuild_chunk(uuids)
+    finally:
+        connection.close()
+
+
+def queue_exercise_api_refresh(uuids: Iterable, force: bool = False):
+    """
+    Rebuilds the cache of the given exercises in the background, unless they
+    are already queued
+
+    :param force: Queue the exercises even if they already are, e.g. because
+        they changed. A rebuild that is already running might have read them
+        before the change.
+    """
+    if force:
+        queued = [str(uuid) for uuid in uuids]
+        cache.set_many(
+            {CacheKeyMapper.exercise_api_refresh_key(uuid): True for uuid in queued},
+            REFRESH_TIMEOUT,
+        )
+    else:
+        queued = [
+            str(uuid)
+            for uuid in uuids
+            if cache.add(CacheKeyMapper.exercise_api_refresh_key(uuid), True, REFRESH_TIMEOUT)
+        ]
+    if not queued:
+        return
+
+    if settings.WGER_SETTINGS['USE_CELERY']:
+        # wger
+        from wger.exercises.tasks import refresh_exercise_api_cache_task
+
+        refresh_exercise_api_cache_task.delay(queued)
+    else:
+        exercise_api_cache_refresher.submit(queued)
+
+
+class ExerciseApiCacheRefresher:
+    """
+    Background thread that rebuilds the queued exercises of this process and
+    schedules an export of the snapshots afterwards, used when Celery is not
+    available
+    """
+
+    def __init__(self):
+        self.pending: Set[str] = set()
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self, uuids: list[str]):
+        with self.condition:
+            self.pending.update(uuids)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run,
+                    name='exercise-api-cache',
+                    daemon=True,
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                uuids, self.pending = self.pending, set()
+
+            # wger
+            from wger.exercises.snapshot import schedule_exercise_snapshot_export
+
+            try:
+                rebuild_exercise_api_cache(uuids)
+                schedule_exercise_snapshot_export()
+            except Exception as e:
+                logger.error(f'Error rebuilding the exercise API cache: {e}', exc_info=True)
+            close_old_connections()
+
+
+exercise_api_cache_refresher = ExerciseApiCacheRefresher()
 
 
 def cache_exercise(
@@ -42,7 +271,15 @@ def cache_api_exercises(
     force: bool,
     style_fn: Callable = lambda x: x,
 ):
+    """
+    Caches all exercises that are not cached or stale, or all of them with force
+    """
     print_fn('*** Caching API exercises ***')
-    for exercise in Exercise.with_translations.all():
-        cache_exercise(exercise, force, print_fn, style_fn)
-    print_fn(style_fn('Exercises cached!\n'))
+    uuids = list(Exercise.with_translations.values_list('uuid', flat=True))
+    if not force:
+        now = time.time()
+        entries = get_cache_entries(uuids)
+        uuids = [uuid for uuid in uuids if uuid not in entries or entries[uuid].fresh_until < now]
+
+    count = rebuild_exercise_api_cache(uuids)
+    print_fn(style_fn(f'{count} exercises cached!\n'))
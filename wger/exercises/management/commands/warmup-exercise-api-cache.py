@@ -16,13 +16,19 @@
 from django.core.management.base import BaseCommand
 
 # wger
-from wger.exercises.cache import cache_exercise
+from wger.exercises.cache import (
+    cache_api_exercises,
+    cache_exercise,
+)
 from wger.exercises.models import Exercise
+from wger.exercises.snapshot import export_exercise_snapshots
 
 
 class Command(BaseCommand):
     """
     Calls the exercise api to get all exercises and caches them in the database.
+
+    When caching all exercises, the snapshots of the catalogue are exported as well.
     """
 
     def add_arguments(self, parser):
@@ -50,5 +56,5 @@ class Command(BaseCommand):
             cache_exercise(exercise, force, self.stdout.write)
             return
 
-        for exercise in Exercise.with_translations.all():
-            cache_exercise(exercise, force, self.stdout.write)
+        cache_api_exercises(self.stdout.write, force, self.style.SUCCESS)
+        export_exercise_snapshots(self.stdout.write)
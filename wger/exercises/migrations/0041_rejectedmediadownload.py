@@ -0,0 +1,35 @@
+# Generated by Django 6.0.9 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('exercises', '0040_alter_exercise_license_author_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RejectedMediaDownload',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                (
+                    'uuid',
+                    models.UUIDField(
+                        editable=False,
+                        help_text='UUID of the rejected image or video',
+                        unique=True,
+                        verbose_name='UUID',
+                    ),
+                ),
+                ('etag', models.CharField(default='', max_length=200)),
+                ('last_modified', models.CharField(default='', max_length=100)),
+                ('timestamp', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
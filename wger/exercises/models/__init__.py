@@ -23,5 +23,6 @@ from .equipment import Equipment
 from .exercise_alias import Alias
 from .image import ExerciseImage
 from .muscle import Muscle
+from .rejected_download import RejectedMediaDownload
 from .translation import Translation
 from .video import ExerciseVideo
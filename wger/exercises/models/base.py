@@ -33,6 +33,7 @@ from django.db import (
     transaction,
 )
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import get_language
 
 # Third Party
@@ -359,7 +360,10 @@ class Exercise(AbstractLicenseModel, AbstractHistoryMixin, models.Model):
                 routine_ids.discard(None)
 
                 SlotEntry.objects.filter(exercise=self).update(exercise=replacement)
-                WorkoutLog.objects.filter(exercise=self).update(exercise=replacement)
+                WorkoutLog.objects.filter(exercise=self).update(
+                    exercise=replacement,
+                    last_update=timezone.now(),
+                )
 
                 for routine in Routine.objects.filter(id__in=routine_ids):
                     reset_routine_cache(routine)
@@ -0,0 +1,39 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.db import models
+
+
+class RejectedMediaDownload(models.Model):
+    """
+    An exercise image or video of the remote server that was downloaded and rejected
+
+    The validators of the response are kept, so that the file is requested
+    conditionally in the next syncs and only downloaded again if it changed.
+    """
+
+    uuid = models.UUIDField(
+        unique=True,
+        editable=False,
+        verbose_name='UUID',
+        help_text='UUID of the rejected image or video',
+    )
+
+    etag = models.CharField(max_length=200, default='')
+
+    last_modified = models.CharField(max_length=100, default='')
+
+    timestamp = models.DateTimeField(auto_now=True)
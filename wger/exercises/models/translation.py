@@ -146,11 +146,7 @@ class Translation(AbstractLicenseModel, AbstractHistoryMixin, models.Model):
         Reset all cached infos
         """
 
-        if self.description_source:
-            self.description = render_markdown(self.description_source)
-        elif self.description:
-            self.description = sanitize_html(self.description)
-
+        self.render_description()
         super().save(*args, **kwargs)
 
         # Api cache
@@ -166,6 +162,16 @@ class Translation(AbstractLicenseModel, AbstractHistoryMixin, models.Model):
 
         super().delete(*args, **kwargs)
 
+    def render_description(self):
+        """
+        Generates the HTML description from the Markdown source, or sanitizes
+        the existing one if there is no source
+        """
+        if self.description_source:
+            self.description = render_markdown(self.description_source)
+        elif self.description:
+            self.description = sanitize_html(self.description)
+
     def __str__(self):
         """
         Return a more human-readable representation
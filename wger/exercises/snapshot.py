@@ -0,0 +1,244 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Snapshots of the whole exercise catalogue, so that clients can mirror it with
+one request instead of paging through the exerciseinfo endpoint
+
+There is one gzipped JSON file with the ExerciseInfoSerializer output of all
+exercises, and one per language with the exercises that have a translation in
+it. The files are listed with their checksums in a manifest, and only written
+if their content changed. They are exported again after the exercises changed,
+see schedule_exercise_snapshot_export().
+"""
+
+# Standard Library
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Callable,
+    Optional,
+)
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+
+# wger
+from wger.exercises.api.endpoints import (
+    EXERCISE_SNAPSHOT_MANIFEST_PATH,
+    EXERCISE_SNAPSHOT_PATH,
+)
+from wger.exercises.cache import (
+    get_cached_exercises,
+    rebuild_exercise_api_cache,
+)
+from wger.exercises.models import (
+    Exercise,
+    Translation,
+)
+from wger.utils.cache import CacheKeyMapper
+
+
+logger = logging.getLogger(__name__)
+
+ALL_LANGUAGES = 'all'
+"""Name of the snapshot with the exercises of all languages"""
+
+
+def export_exercise_snapshots(print_fn: Callable = logger.info) -> dict:
+    """
+    Exports the snapshots of all exercises and of every language
+
+    :return: The manifest
+    """
+    # Changes after this point are picked up by the changes feed
+    created = timezone.now()
+
+    exercises = dict(Exercise.with_translations.order_by('id').values_list('id', 'uuid'))
+    exercises_by_language = defaultdict(set)
+    for language, exercise_id in Translation.objects.values_list(
+        'language__short_name', 'exercise_id'
+    ):
+        if exercise_id in exercises:
+            exercises_by_language[language].add(exercise_id)
+
+    representations = get_cached_exercises(exercises.values())
+    missing = [uuid for uuid in exercises.values() if uuid not in representations]
+    if missing:
+        rebuild_exercise_api_cache(missing)
+        representations.update(get_cached_exercises(missing))
+
+    snapshots = {ALL_LANGUAGES: _write_snapshot(ALL_LANGUAGES, exercises, representations)}
+    for language, exercise_ids in sorted(exercises_by_language.items()):
+        snapshots[language] = _write_snapshot(
+            language,
+            {pk: uuid for pk, uuid in exercises.items() if pk in exercise_ids},
+            representations,
+        )
+
+    manifest = {'created': created.isoformat(), 'snapshots': snapshots}
+    previous = _read_manifest()
+    if previous is not None:
+        default_storage.delete(EXERCISE_SNAPSHOT_MANIFEST_PATH)
+    default_storage.save(
+        EXERCISE_SNAPSHOT_MANIFEST_PATH,
+        ContentFile(json.dumps(manifest, indent=1).encode()),
+    )
+    cache.set(CacheKeyMapper.exercise_snapshot_manifest_key(), manifest, None)
+
+    # Remove the files of older exports. The ones of the previous export are
+    # kept until the next one, for clients that just read the previous manifest
+    files = {snapshot['file'] for snapshot in snapshots.values()}
+    if previous is not None:
+        files |= {snapshot['file'] for snapshot in previous['snapshots'].values()}
+    for name in default_storage.listdir(EXERCISE_SNAPSHOT_PATH)[1]:
+        if name.endswith('.json.gz') and name not in files:
+            default_storage.delete(f'{EXERCISE_SNAPSHOT_PATH}/{name}')
+
+    print_fn(f'Exported the snapshots of {len(exercises)} exercises in {len(snapshots)} files')
+    return manifest
+
+
+def _write_snapshot(language: str, exercises: dict, representations: dict) -> dict:
+    """
+    Saves the snapshot of the given exercises, unless a file with the same
+    checksum already exists
+    """
+    data = [representations[uuid] for uuid in exercises.values() if uuid in representations]
+
+    # No timestamp in the header, so the same exercises give the same checksum
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+        f.write(json.dumps(data, cls=DjangoJSONEncoder).encode())
+
+    content = buffer.getvalue()
+    checksum = hashlib.sha256(content).hexdigest()
+    file_name = f'exercises-{language}-{checksum[:16]}.json.gz'
+    path = f'{EXERCISE_SNAPSHOT_PATH}/{file_name}'
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(content))
+
+    return {'file': file_name, 'sha256': checksum, 'size': len(content), 'count': len(data)}
+
+
+def get_exercise_snapshot_manifest() -> dict | None:
+    """
+    Returns the manifest of the snapshots
+
+    If there are none yet, an export is scheduled and None is returned.
+    """
+    manifest = cache.get(CacheKeyMapper.exercise_snapshot_manifest_key())
+    if manifest is not None:
+        return manifest
+
+    manifest = _read_manifest()
+    if manifest is None:
+        schedule_exercise_snapshot_export()
+        return None
+
+    cache.set(CacheKeyMapper.exercise_snapshot_manifest_key(), manifest, None)
+    return manifest
+
+
+def _read_manifest() -> dict | None:
+    if not default_storage.exists(EXERCISE_SNAPSHOT_MANIFEST_PATH):
+        return None
+
+    with default_storage.open(EXERCISE_SNAPSHOT_MANIFEST_PATH, 'rb') as f:
+        return json.load(f)
+
+
+def read_exercise_snapshot(file_name: str) -> bytes:
+    """
+    Returns the gzipped content of a snapshot file
+    """
+    with default_storage.open(f'{EXERCISE_SNAPSHOT_PATH}/{file_name}', 'rb') as f:
+        return f.read()
+
+
+def schedule_exercise_snapshot_export():
+    """
+    Exports the snapshots after EXERCISE_SNAPSHOT_DELAY seconds, unless an
+    export is already scheduled, so that a burst of changes results in one
+    export
+
+    The export runs in a Celery task or, without Celery, in a background thread.
+    """
+    if not settings.WGER_SETTINGS['USE_CELERY']:
+        exercise_snapshot_exporter.submit()
+        return
+
+    # wger
+    from wger.exercises.tasks import export_exercise_snapshots_task
+
+    delay = settings.WGER_SETTINGS['EXERCISE_SNAPSHOT_DELAY']
+    if cache.add(CacheKeyMapper.exercise_snapshot_scheduled_key(), True, delay * 10):
+        export_exercise_snapshots_task.apply_async(countdown=delay)
+
+
+class ExerciseSnapshotExporter:
+    """
+    Background thread that exports the snapshots of this process, used when
+    Celery is not available
+    """
+
+    def __init__(self):
+        self.pending = False
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self):
+        with self.condition:
+            self.pending = True
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run,
+                    name='exercise-snapshots',
+                    daemon=True,
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+
+            # Wait for the rest of the burst
+            time.sleep(settings.WGER_SETTINGS['EXERCISE_SNAPSHOT_DELAY'])
+
+            with self.condition:
+                self.pending = False
+
+            try:
+                export_exercise_snapshots()
+            except Exception as e:
+                logger.error(f'Error exporting the exercise snapshots: {e}', exc_info=True)
+            close_old_connections()
+
+
+exercise_snapshot_exporter = ExerciseSnapshotExporter()
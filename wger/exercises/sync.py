@@ -13,16 +13,41 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Standard Library
+import logging
 import os
+import uuid
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from http import HTTPStatus
+from itertools import batched
+from typing import (
+    Iterator,
+    NamedTuple,
+)
 
 # Django
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.files.temp import NamedTemporaryFile
+from django.db import (
+    models,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 # Third Party
 import requests
+from simple_history.utils import (
+    bulk_create_with_history,
+    bulk_update_with_history,
+)
 
 # wger
 from wger.core.api.endpoints import (
@@ -52,6 +77,7 @@ from wger.exercises.models import (
     ExerciseImage,
     ExerciseVideo,
     Muscle,
+    RejectedMediaDownload,
     Translation,
 )
 from wger.exercises.models.video import validate_video
@@ -59,97 +85,307 @@ from wger.manager.models import (
     SlotEntry,
     WorkoutLog,
 )
+from wger.utils.cache import reset_exercise_api_cache
 from wger.utils.requests import (
+    REQUEST_TIMEOUT,
     get_all_paginated,
     get_paginated,
     wger_headers,
+    wger_session,
 )
 from wger.utils.url import make_uri
 
 
+logger = logging.getLogger(__name__)
+
+MEDIA_DOWNLOAD_WORKERS = 8
+"""Number of images or videos that are downloaded in parallel"""
+
+MEDIA_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+"""Size of the chunks a downloaded file is written to its temporary file with"""
+
+
 def sync_exercises(
     print_fn,
     remote_url=settings.WGER_SETTINGS['WGER_INSTANCE'],
     style_fn=lambda x: x,
+    batch_size=100,
 ):
-    """Synchronize the exercises from the remote server"""
+    """
+    Synchronize the exercises from the remote server
+
+    The exercises are processed one page at a time: the existing rows are
+    loaded with one query per model, compared with the remote data and only
+    the differences are written, with bulk inserts and updates.
+    """
     print_fn('*** Synchronizing exercises...')
 
-    url = make_uri(EXERCISE_ENDPOINT, server_url=remote_url, query={'limit': 100})
-    for data in get_paginated(url, headers=wger_headers()):
-        uuid = data['uuid']
-        created = data['created']
-        license_id = data['license']['id']
-        category_id = data['category']['id']
-        license_author = data['license_author']
-        equipment = [Equipment.objects.get(pk=i['id']) for i in data['equipment']]
-        muscles = [Muscle.objects.get(pk=i['id']) for i in data['muscles']]
-        muscles_sec = [Muscle.objects.get(pk=i['id']) for i in data['muscles_secondary']]
-
-        exercise, exercise_created = Exercise.objects.update_or_create(
-            uuid=uuid,
-            defaults={
-                'category_id': category_id,
-                'created': created,
-                'variation_group': data.get('variation_group'),
-            },
-        )
-        print_fn(f'{"created" if exercise_created else "updated"} exercise {uuid}')
+    lookups = ExerciseSyncLookups.load()
+    url = make_uri(EXERCISE_ENDPOINT, server_url=remote_url, query={'limit': batch_size})
+    for page in batched(get_paginated(url, headers=wger_headers()), batch_size):
+        with transaction.atomic():
+            stats = sync_exercise_batch(page, lookups)
+        print_fn(f'- processed {len(page)} exercises: {stats}')
 
-        exercise.muscles.set(muscles)
-        exercise.muscles_secondary.set(muscles_sec)
-        exercise.equipment.set(equipment)
-        exercise.save()
+    print_fn(style_fn('done!\n'))
 
-        for translation_data in data['translations']:
-            trans_uuid = translation_data['uuid']
-            name = translation_data['name']
-            description = translation_data['description']
-            description_source = translation_data['description_source']
-            language_id = translation_data['language']
-
-            translation, translation_created = Translation.objects.update_or_create(
-                uuid=trans_uuid,
-                defaults={
-                    'exercise': exercise,
-                    'name': name,
-                    'description': description,
-                    'description_source': description_source,
-                    'license_id': license_id,
-                    'license_author': license_author,
-                    'language_id': language_id,
-                },
-            )
-            out = (
-                f'- {"created" if translation_created else "updated"} translation '
-                f'{translation.language.short_name} {trans_uuid} - {name}'
-            )
-            print_fn(out)
 
-            for note in translation_data['notes']:
-                ExerciseComment.objects.update_or_create(
-                    uuid=note['uuid'],
-                    defaults={
-                        'uuid': note['uuid'],
-                        'translation': translation,
-                        'comment': note['comment'],
-                    },
-                )
+class ExerciseSyncLookups(NamedTuple):
+    """
+    The ids of the related objects the exercises can reference
+    """
 
-            Alias.objects.filter(translation=translation).delete()
-            for alias in translation_data['aliases']:
-                Alias.objects.update_or_create(
-                    uuid=alias['uuid'],
-                    defaults={
-                        'uuid': alias['uuid'],
-                        'translation': translation,
-                        'alias': alias['alias'],
-                    },
-                )
+    muscles: frozenset[int]
+    equipment: frozenset[int]
 
-        print_fn('')
+    @classmethod
+    def load(cls) -> 'ExerciseSyncLookups':
+        return cls(
+            muscles=frozenset(Muscle.objects.values_list('pk', flat=True)),
+            equipment=frozenset(Equipment.objects.values_list('pk', flat=True)),
+        )
 
-    print_fn(style_fn('done!\n'))
+    def muscle_ids(self, data: list[dict]) -> set[int]:
+        return self._ids(data, self.muscles, Muscle)
+
+    def equipment_ids(self, data: list[dict]) -> set[int]:
+        return self._ids(data, self.equipment, Equipment)
+
+    @staticmethod
+    def _ids(data: list[dict], known: frozenset[int], model) -> set[int]:
+        ids = {item['id'] for item in data}
+        if not ids <= known:
+            raise model.DoesNotExist(f'{model.__name__} {sorted(ids - known)} does not exist')
+        return ids
+
+
+class ExerciseSyncStats(Counter):
+    """
+    Number of created, updated and deleted rows per model in a batch
+    """
+
+    def __str__(self):
+        return ', '.join(f'{count} {key}' for key, count in self.items() if count) or 'no changes'
+
+
+def upsert_by_uuid(
+    model,
+    rows: dict[uuid.UUID, dict],
+    stats: ExerciseSyncStats,
+    name: str,
+    prepare=None,
+    written: set[uuid.UUID] | None = None,
+) -> dict[uuid.UUID, models.Model]:
+    """
+    Creates or updates the rows of a model, identified by their UUID
+
+    Only the rows with different values are written, the timestamp of the last
+    update is set manually since bulk updates don't go through save().
+
+    :param rows: the field values of each row, by UUID
+    :param prepare: optional callable applied to every new or changed instance
+    :param written: optional set the UUIDs of the created and updated rows are added to
+    :return: all the instances, by UUID
+    """
+    instances = model.objects.in_bulk(rows.keys(), field_name='uuid')
+    fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+    now = timezone.now()
+
+    created = []
+    updated = []
+    changed_fields = set()
+    for row_uuid, values in rows.items():
+        instance = instances.get(row_uuid)
+        if instance is None:
+            instance = model(uuid=row_uuid, **values)
+            if prepare:
+                prepare(instance)
+            instances[row_uuid] = instance
+            created.append(instance)
+            continue
+
+        original = [getattr(instance, field) for field in fields]
+        for field, value in values.items():
+            setattr(instance, field, value)
+        if prepare:
+            prepare(instance)
+
+        changed = {
+            field for field, value in zip(fields, original) if getattr(instance, field) != value
+        }
+        if changed:
+            if 'last_update' in fields:
+                instance.last_update = now
+                changed.add('last_update')
+            changed_fields |= changed
+            updated.append(instance)
+
+    if created:
+        bulk_create_with_history(created, model)
+    if updated:
+        bulk_update_with_history(updated, model, fields=sorted(changed_fields))
+
+    if written is not None:
+        written.update(instance.uuid for instance in (*created, *updated))
+
+    stats[f'{name} created'] += len(created)
+    stats[f'{name} updated'] += len(updated)
+    return instances
+
+
+def sync_exercise_batch(page: tuple[dict, ...], lookups: ExerciseSyncLookups) -> ExerciseSyncStats:
+    """
+    Applies a page of remote exercises to the database
+    """
+    stats = ExerciseSyncStats()
+
+    # Exercises
+    exercise_rows = {}
+    muscles = {}
+    muscles_secondary = {}
+    equipment = {}
+    for data in page:
+        exercise_uuid = uuid.UUID(data['uuid'])
+        variation_group = data.get('variation_group')
+        exercise_rows[exercise_uuid] = {
+            'category_id': data['category']['id'],
+            'variation_group': uuid.UUID(variation_group) if variation_group else None,
+        }
+        muscles[exercise_uuid] = lookups.muscle_ids(data['muscles'])
+        muscles_secondary[exercise_uuid] = lookups.muscle_ids(data['muscles_secondary'])
+        equipment[exercise_uuid] = lookups.equipment_ids(data['equipment'])
+
+    exercises = upsert_by_uuid(Exercise, exercise_rows, stats, 'exercises')
+
+    # The creation date is an auto_now_add field, which is overwritten when
+    # inserting the rows, so the remote one is written afterwards
+    created_dates = {}
+    for data in page:
+        exercise = exercises[uuid.UUID(data['uuid'])]
+        created = parse_datetime(data['created'])
+        if exercise.created != created:
+            exercise.created = created
+            created_dates[exercise.uuid] = exercise
+    if created_dates:
+        Exercise.objects.bulk_update(created_dates.values(), fields=['created'])
+
+    # Exercises whose relations changed, their timestamp is set at the end
+    touched = set()
+    for relation, field, targets in (
+        (Exercise.muscles, 'muscle_id', muscles),
+        (Exercise.muscles_secondary, 'muscle_id', muscles_secondary),
+        (Exercise.equipment, 'equipment_id', equipment),
+    ):
+        touched.update(sync_m2m(relation.through, field, exercises, targets))
+
+    # Translations, their comments and aliases
+    translation_rows = {}
+    comment_rows = {}
+    alias_rows = {}
+    for data in page:
+        exercise = exercises[uuid.UUID(data['uuid'])]
+        for translation_data in data['translations']:
+            translation_uuid = uuid.UUID(translation_data['uuid'])
+            translation_rows[translation_uuid] = {
+                'exercise_id': exercise.pk,
+                'name': translation_data['name'],
+                'description': translation_data['description'],
+                'description_source': translation_data['description_source'],
+                'license_id': data['license']['id'],
+                'license_author': data['license_author'],
+                'language_id': translation_data['language'],
+            }
+            for note in translation_data['notes']:
+                comment_rows[uuid.UUID(note['uuid'])] = (translation_uuid, note['comment'])
+            for alias in translation_data['aliases']:
+                alias_rows[uuid.UUID(alias['uuid'])] = (translation_uuid, alias['alias'])
+
+    translations = upsert_by_uuid(
+        Translation,
+        translation_rows,
+        stats,
+        'translations',
+        prepare=Translation.render_description,
+    )
+
+    written_comments = set()
+    upsert_by_uuid(
+        ExerciseComment,
+        {
+            comment_uuid: {'translation_id': translations[t].pk, 'comment': comment}
+            for comment_uuid, (t, comment) in comment_rows.items()
+        },
+        stats,
+        'comments',
+        written=written_comments,
+    )
+
+    # Aliases that are not on the remote anymore are removed
+    translation_ids = [translation.pk for translation in translations.values()]
+    stale_aliases = Alias.objects.filter(translation_id__in=translation_ids).exclude(
+        uuid__in=alias_rows.keys()
+    )
+    touched.update(stale_aliases.values_list('translation__exercise_id', flat=True))
+    deleted, _ = stale_aliases.delete()
+    stats['aliases deleted'] += deleted
+    written_aliases = set()
+    upsert_by_uuid(
+        Alias,
+        {
+            alias_uuid: {'translation_id': translations[t].pk, 'alias': alias}
+            for alias_uuid, (t, alias) in alias_rows.items()
+        },
+        stats,
+        'aliases',
+        written=written_aliases,
+    )
+
+    touched.update(translations[comment_rows[u][0]].exercise_id for u in written_comments)
+    touched.update(translations[alias_rows[u][0]].exercise_id for u in written_aliases)
+
+    # The bulk writes of the relations, comments and aliases don't go through
+    # save(), so the timestamp the changes feed relies on is set here
+    if touched:
+        now = timezone.now()
+        touched_exercises = [e for e in exercises.values() if e.pk in touched]
+        for exercise in touched_exercises:
+            exercise.last_update = now
+        Exercise.objects.bulk_update(touched_exercises, fields=['last_update'])
+
+    reset_exercise_api_cache(*exercises.keys())
+    return stats
+
+
+def sync_m2m(through, field: str, exercises: dict[uuid.UUID, Exercise], targets: dict) -> list[int]:
+    """
+    Replaces the rows of a many-to-many through table of the exercises whose
+    related ids differ from the given ones
+
+    :return: the IDs of the changed exercises
+    """
+    current = {}
+    rows = through.objects.filter(exercise_id__in=[e.pk for e in exercises.values()])
+    for exercise_id, target_id in rows.values_list('exercise_id', field):
+        current.setdefault(exercise_id, set()).add(target_id)
+
+    changed = [
+        exercises[exercise_uuid].pk
+        for exercise_uuid, ids in targets.items()
+        if current.get(exercises[exercise_uuid].pk, set()) != ids
+    ]
+    if not changed:
+        return changed
+
+    through.objects.filter(exercise_id__in=changed).delete()
+    through.objects.bulk_create(
+        [
+            through(exercise_id=exercises[exercise_uuid].pk, **{field: target_id})
+            for exercise_uuid, ids in targets.items()
+            if exercises[exercise_uuid].pk in changed
+            for target_id in ids
+        ]
+    )
+    return changed
 
 
 def sync_languages(
@@ -365,12 +601,122 @@ def handle_deleted_entries(
                 pass
 
 
+def media_download_session(workers: int = MEDIA_DOWNLOAD_WORKERS) -> requests.Session:
+    """
+    Returns a session whose connection pool can be shared by all download workers
+    """
+    return wger_session(pool_size=workers)
+
+
+class MediaDownload(NamedTuple):
+    """
+    A downloaded image or video
+
+    The content is written to a temporary file, which is deleted when closed.
+    It is None if the server answered that the file did not change (304).
+    """
+
+    status_code: int
+    headers: dict
+    file: File | None
+
+
+def download_media_files(
+    session: requests.Session,
+    media: list[dict],
+    url_field: str,
+    workers: int = MEDIA_DOWNLOAD_WORKERS,
+) -> Iterator[tuple[dict, MediaDownload]]:
+    """
+    Downloads the files of the given images or videos in a pool of threads
+
+    The files are yielded as they complete, so that the caller can save them
+    while the other ones are still being downloaded. The responses are streamed
+    to temporary files, so no file is kept in memory as a whole, and at most
+    twice as many files as there are workers are in flight at once. The caller
+    has to close the files.
+
+    Files that were rejected in an earlier run are requested conditionally,
+    the server answers with 304 and no content if they didn't change.
+
+    Files that can't be downloaded, e.g. because the server doesn't answer in
+    time, are logged and skipped, they are requested again in the next run.
+    """
+    ledger = RejectedMediaDownload.objects.in_bulk(
+        [data['uuid'] for data in media], field_name='uuid'
+    )
+
+    def download(data: dict) -> tuple[dict, MediaDownload | None]:
+        headers = {}
+        rejected = ledger.get(uuid.UUID(data['uuid']))
+        if rejected and rejected.etag:
+            headers['If-None-Match'] = rejected.etag
+        if rejected and rejected.last_modified:
+            headers['If-Modified-Since'] = rejected.last_modified
+
+        tmp = None
+        try:
+            with session.get(
+                data[url_field], headers=headers, timeout=REQUEST_TIMEOUT, stream=True
+            ) as response:
+                if response.status_code != HTTPStatus.NOT_MODIFIED:
+                    tmp = NamedTemporaryFile()
+                    for chunk in response.iter_content(MEDIA_DOWNLOAD_CHUNK_SIZE):
+                        tmp.write(chunk)
+                    tmp.flush()
+                    tmp.seek(0)
+                return data, MediaDownload(
+                    response.status_code, dict(response.headers), tmp and File(tmp)
+                )
+        except requests.RequestException as e:
+            if tmp is not None:
+                tmp.close()
+            logger.warning(f'Could not download {data[url_field]}, skipping: {e}')
+            return data, None
+
+    def completed(futures) -> Iterator[tuple[dict, MediaDownload]]:
+        for future in futures:
+            data, downloaded = future.result()
+            if downloaded is not None:
+                yield data, downloaded
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for data in media:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+            pending.add(executor.submit(download, data))
+
+        yield from completed(as_completed(pending))
+
+
+def remember_rejected_download(media_uuid: str, downloaded: MediaDownload):
+    """
+    Stores the validators of a rejected file in the database, so that it is not
+    downloaded again unless it changed on the server
+    """
+    RejectedMediaDownload.objects.update_or_create(
+        uuid=media_uuid,
+        defaults={
+            'etag': downloaded.headers.get('ETag') or '',
+            'last_modified': downloaded.headers.get('Last-Modified') or '',
+        },
+    )
+
+
 def download_exercise_images(
     print_fn=lambda x: x,
     remote_url=settings.WGER_SETTINGS['WGER_INSTANCE'],
     style_fn=lambda x: x,
+    workers=MEDIA_DOWNLOAD_WORKERS,
 ):
-    headers = wger_headers()
+    """
+    Synchronize the exercise images from the remote server
+
+    The metadata of existing images is updated and new images are downloaded
+    in parallel, while the database is only written from the calling thread.
+    """
     url = make_uri(IMAGE_ENDPOINT, server_url=remote_url)
 
     print_fn('*** Processing images ***')
@@ -385,104 +731,138 @@ def download_exercise_images(
     if deleted:
         print_fn(f'Deleted {deleted} images without associated image files')
 
-    for image_data in get_paginated(url, headers=headers):
-        image_uuid = image_data['uuid']
+    images = list(get_paginated(url, headers=wger_headers()))
+    exercises = in_bulk_by_uuid(Exercise, {data['exercise_uuid'] for data in images})
+    existing = in_bulk_by_uuid(ExerciseImage, {data['uuid'] for data in images})
 
+    downloads = []
+    for image_data in images:
+        image_uuid = image_data['uuid']
         print_fn(f'Processing image {image_uuid}')
 
-        try:
-            exercise = Exercise.objects.get(uuid=image_data['exercise_uuid'])
-        except Exercise.DoesNotExist:
+        exercise = exercises.get(image_data['exercise_uuid'])
+        if exercise is None:
             print_fn('    Remote exercise not found in local DB, skipping...')
             continue
 
-        try:
-            image = ExerciseImage.objects.get(uuid=image_uuid)
-            print_fn('    Image already present locally, updating fields...')
-            image.exercise = exercise
-            image.is_main = image_data['is_main']
-            image.style = image_data['style']
-            image.license_id = image_data['license']
-            image.license_title = image_data['license_title']
-            image.license_object_url = image_data['license_object_url']
-            image.license_author = image_data['license_author']
-            image.license_author_url = image_data['license_author_url']
-            image.license_derivative_source_url = image_data['license_derivative_source_url']
-            image.save()
-        except ExerciseImage.DoesNotExist:
-            print_fn('    Image not found in local DB, creating now...')
-            retrieved_image = requests.get(image_data['image'], headers=headers)
+        image = existing.get(image_uuid)
+        if image is None:
+            print_fn('    Image not found in local DB, downloading...')
+            downloads.append(image_data)
+            continue
+
+        print_fn('    Image already present locally, updating fields...')
+        image.exercise = exercise
+        image.is_main = image_data['is_main']
+        image.style = image_data['style']
+        image.license_id = image_data['license']
+        image.license_title = image_data['license_title']
+        image.license_object_url = image_data['license_object_url']
+        image.license_author = image_data['license_author']
+        image.license_author_url = image_data['license_author_url']
+        image.license_derivative_source_url = image_data['license_derivative_source_url']
+        image.save()
+        print_fn(style_fn('    successfully saved'))
+
+    session = media_download_session(workers)
+    for image_data, retrieved_image in download_media_files(session, downloads, 'image', workers):
+        image_uuid = image_data['uuid']
+        if retrieved_image.file is None:
+            print_fn(f'Image {image_uuid} was rejected before and did not change, skipping')
+            continue
+
+        with retrieved_image.file:
+            image = ExerciseImage.from_json(
+                exercises[image_data['exercise_uuid']],
+                retrieved_image,
+                image_data,
+                save_to_db=False,
+            )
             try:
-                ExerciseImage.from_json(exercise, retrieved_image, image_data)
+                image.save_image_file(retrieved_image.file, image_data)
             except ValidationError as e:
-                print_fn(style_fn(f'    invalid image, skipping: {"; ".join(e.messages)}'))
+                remember_rejected_download(image_uuid, retrieved_image)
+                print_fn(style_fn(f'Invalid image {image_uuid}, skipping: {"; ".join(e.messages)}'))
                 continue
+            image.save()
 
-        print_fn(style_fn('    successfully saved'))
+        print_fn(style_fn(f'Image {image_uuid} successfully saved'))
 
 
 def download_exercise_videos(
     print_fn,
     remote_url=settings.WGER_SETTINGS['WGER_INSTANCE'],
     style_fn=lambda x: x,
+    workers=MEDIA_DOWNLOAD_WORKERS,
 ):
-    headers = wger_headers()
+    """
+    Download the exercise videos that are not present locally from the remote server
+
+    The videos are downloaded in parallel, while the database is only written
+    from the calling thread.
+    """
     url = make_uri(VIDEO_ENDPOINT, server_url=remote_url)
 
     print_fn('*** Processing videos ***')
 
-    for video_data in get_paginated(url, headers=headers):
+    videos = list(get_paginated(url, headers=wger_headers()))
+    exercises = in_bulk_by_uuid(Exercise, {data['exercise_uuid'] for data in videos})
+    existing = in_bulk_by_uuid(ExerciseVideo, {data['uuid'] for data in videos})
+
+    downloads = []
+    for video_data in videos:
         video_uuid = video_data['uuid']
         print_fn(f'Processing video {video_uuid}')
 
-        try:
-            exercise = Exercise.objects.get(uuid=video_data['exercise_uuid'])
-        except Exercise.DoesNotExist:
+        if video_data['exercise_uuid'] not in exercises:
             print_fn('    Remote exercise not found in local DB, skipping...')
-            continue
-
-        try:
-            ExerciseVideo.objects.get(uuid=video_uuid)
+        elif video_uuid in existing:
             print_fn('    Video already present locally, skipping...')
-            continue
-        except ExerciseVideo.DoesNotExist:
-            print_fn('    Video not found in local DB, creating now...')
-            video = ExerciseVideo()
-            video.exercise = exercise
-            video.uuid = video_uuid
-            video.is_main = video_data['is_main']
-            video.license_id = video_data['license']
-            video.license_author = video_data['license_author']
-            video.size = video_data['size']
-            video.width = video_data['width']
-            video.height = video_data['height']
-            video.codec = video_data['codec']
-            video.codec_long = video_data['codec_long']
-            video.duration = video_data['duration']
-
-        # Save the downloaded video
-        # http://stackoverflow.com/questions/1308386/programmatically-saving-image-to-
-        retrieved_video = requests.get(video_data['video'], headers=headers)
-
-        # Temporary files on Windows don't support the delete attribute
-        if os.name == 'nt':
-            img_temp = NamedTemporaryFile()
         else:
-            img_temp = NamedTemporaryFile(delete=True)
-        img_temp.write(retrieved_video.content)
-        img_temp.flush()
+            print_fn('    Video not found in local DB, downloading...')
+            downloads.append(video_data)
 
-        # Validate file
-        video_file = File(img_temp)
-        try:
-            validate_video(video_file)
-        except ValidationError as e:
-            print_fn(style_fn(f'    invalid video, skipping: {"; ".join(e.messages)}'))
+    session = media_download_session(workers)
+    for video_data, retrieved_video in download_media_files(session, downloads, 'video', workers):
+        video_uuid = video_data['uuid']
+        if retrieved_video.file is None:
+            print_fn(f'Video {video_uuid} was rejected before and did not change, skipping')
             continue
 
-        video.video.save(
-            os.path.basename(os.path.basename(video_data['video'])),
-            video_file,
-        )
+        video = ExerciseVideo()
+        video.exercise = exercises[video_data['exercise_uuid']]
+        video.uuid = video_uuid
+        video.is_main = video_data['is_main']
+        video.license_id = video_data['license']
+        video.license_author = video_data['license_author']
+        video.size = video_data['size']
+        video.width = video_data['width']
+        video.height = video_data['height']
+        video.codec = video_data['codec']
+        video.codec_long = video_data['codec_long']
+        video.duration = video_data['duration']
+
+        with retrieved_video.file as video_file:
+            try:
+                validate_video(video_file)
+            except ValidationError as e:
+                remember_rejected_download(video_uuid, retrieved_video)
+                print_fn(style_fn(f'Invalid video {video_uuid}, skipping: {"; ".join(e.messages)}'))
+                continue
+
+            video.video.save(
+                os.path.basename(os.path.basename(video_data['video'])),
+                video_file,
+            )
         video.save()
-        print_fn(style_fn('    saved successfully'))
+        print_fn(style_fn(f'Video {video_uuid} saved successfully'))
+
+
+def in_bulk_by_uuid(model, uuids: set[str]) -> dict[str, models.Model]:
+    """
+    Returns the instances with the given UUIDs, by their UUID as string
+    """
+    return {
+        str(instance_uuid): instance
+        for instance_uuid, instance in model.objects.in_bulk(uuids, field_name='uuid').items()
+    }
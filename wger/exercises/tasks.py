@@ -18,13 +18,21 @@ import random
 
 # Django
 from django.conf import settings
+from django.core.cache import cache
 
 # Third Party
 from celery.schedules import crontab
 
 # wger
 from wger.celery_configuration import app
-from wger.exercises.cache import cache_api_exercises
+from wger.exercises.cache import (
+    cache_api_exercises,
+    rebuild_exercise_api_cache,
+)
+from wger.exercises.snapshot import (
+    export_exercise_snapshots,
+    schedule_exercise_snapshot_export,
+)
 from wger.exercises.sync import (
     download_exercise_images,
     download_exercise_videos,
@@ -36,6 +44,7 @@ from wger.exercises.sync import (
     sync_licenses,
     sync_muscles,
 )
+from wger.utils.cache import CacheKeyMapper
 
 
 logger = logging.getLogger(__name__)
@@ -78,6 +87,25 @@ def cache_api_exercises_task():
     """
     force = settings.WGER_SETTINGS['CACHE_API_EXERCISES_CELERY_FORCE_UPDATE']
     cache_api_exercises(logger.info, force)
+    export_exercise_snapshots(logger.info)
+
+
+@app.task
+def refresh_exercise_api_cache_task(uuids: list[str]):
+    """
+    Rebuilds the API cache of the given exercises
+    """
+    rebuild_exercise_api_cache(uuids)
+    schedule_exercise_snapshot_export()
+
+
+@app.task
+def export_exercise_snapshots_task():
+    """
+    Exports the snapshots of the exercise catalogue
+    """
+    cache.delete(CacheKeyMapper.exercise_snapshot_scheduled_key())
+    export_exercise_snapshots(logger.info)
 
 
 @app.on_after_finalize.connect
@@ -0,0 +1,200 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import datetime
+import gzip
+import json
+from unittest.mock import patch
+
+# Django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+# Third Party
+from rest_framework import status
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.exercises.api.endpoints import EXERCISE_SNAPSHOT_PATH
+from wger.exercises.models import (
+    DeletionLog,
+    Exercise,
+    Translation,
+)
+from wger.exercises.snapshot import (
+    ALL_LANGUAGES,
+    export_exercise_snapshots,
+    schedule_exercise_snapshot_export,
+)
+
+
+class ExerciseSnapshotTestCase(WgerTestCase):
+    """
+    Tests the snapshots of the exercise catalogue
+    """
+
+    url = reverse('exercise-snapshot-list')
+
+    def setUp(self):
+        super().setUp()
+        if default_storage.exists(EXERCISE_SNAPSHOT_PATH):
+            for name in default_storage.listdir(EXERCISE_SNAPSHOT_PATH)[1]:
+                default_storage.delete(f'{EXERCISE_SNAPSHOT_PATH}/{name}')
+
+    def test_export(self):
+        manifest = export_exercise_snapshots(print_fn=lambda x: None)
+
+        snapshots = manifest['snapshots']
+        self.assertEqual(snapshots[ALL_LANGUAGES]['count'], Exercise.with_translations.count())
+        self.assertEqual(
+            snapshots['de']['count'],
+            Exercise.with_translations.filter(translations__language__short_name='de')
+            .distinct()
+            .count(),
+        )
+
+        # Unchanged exercises give the same files
+        self.assertEqual(export_exercise_snapshots(print_fn=lambda x: None)['snapshots'], snapshots)
+
+    def test_export_removes_old_files(self):
+        """
+        The files of the previous export are only removed by the next one
+        """
+        old = export_exercise_snapshots(print_fn=lambda x: None)['snapshots'][ALL_LANGUAGES]
+
+        translation = Translation.objects.get(pk=1)
+        translation.name = 'Changed name'
+        translation.save()
+        new = export_exercise_snapshots(print_fn=lambda x: None)['snapshots'][ALL_LANGUAGES]
+
+        self.assertNotEqual(old['sha256'], new['sha256'])
+        self.assertTrue(default_storage.exists(f'{EXERCISE_SNAPSHOT_PATH}/{old["file"]}'))
+        self.assertTrue(default_storage.exists(f'{EXERCISE_SNAPSHOT_PATH}/{new["file"]}'))
+
+        translation.name = 'Changed name again'
+        translation.save()
+        export_exercise_snapshots(print_fn=lambda x: None)
+
+        self.assertFalse(default_storage.exists(f'{EXERCISE_SNAPSHOT_PATH}/{old["file"]}'))
+        self.assertTrue(default_storage.exists(f'{EXERCISE_SNAPSHOT_PATH}/{new["file"]}'))
+
+    @patch('wger.exercises.snapshot.schedule_exercise_snapshot_export')
+    def test_get_before_export(self, mock_schedule):
+        """
+        Without a snapshot, the export is scheduled and the request is not blocked
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        mock_schedule.assert_called_once_with()
+
+    def test_get(self):
+        """
+        The snapshot is served gzipped
+        """
+        export_exercise_snapshots(print_fn=lambda x: None)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Last-Modified', response)
+
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data), Exercise.with_translations.count())
+        self.assertEqual(
+            data[0],
+            self.client.get(reverse('exerciseinfo-detail', kwargs={'pk': data[0]['id']})).json(),
+        )
+
+    def test_not_modified(self):
+        export_exercise_snapshots(print_fn=lambda x: None)
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        # The uncompressed snapshot has its own tag
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(len(response.json()), Exercise.with_translations.count())
+
+    def test_language(self):
+        export_exercise_snapshots(print_fn=lambda x: None)
+        response = self.client.get(self.url, {'language__code': 'de'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for exercise in response.json():
+            self.assertIn(2, [translation['language'] for translation in exercise['translations']])
+
+        response = self.client.get(self.url, {'language__code': 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_changes(self):
+        since = timezone.now()
+        response = self.client.get(reverse('exercise-snapshot-changes'), {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['exercises'], [])
+        self.assertEqual(response.json()['deleted'], [])
+
+        translation = Translation.objects.get(pk=1)
+        translation.save()
+        DeletionLog.objects.create(model_type=DeletionLog.MODEL_EXERCISE)
+
+        response = self.client.get(reverse('exercise-snapshot-changes'), {'since': since})
+        self.assertEqual(
+            [exercise['id'] for exercise in response.json()['exercises']],
+            [translation.exercise_id],
+        )
+        self.assertEqual(len(response.json()['deleted']), 1)
+
+        until = datetime.datetime.fromisoformat(response.json()['until'])
+        self.assertGreater(until, since)
+        response = self.client.get(reverse('exercise-snapshot-changes'), {'since': until})
+        self.assertEqual(response.json()['exercises'], [])
+
+    def test_changes_requires_since(self):
+        response = self.client.get(reverse('exercise-snapshot-changes'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('wger.exercises.tasks.export_exercise_snapshots_task.apply_async')
+    def test_schedule_export(self, mock_apply_async):
+        """
+        A burst of changes results in one export
+        """
+        with override_settings(
+            WGER_SETTINGS={
+                **settings.WGER_SETTINGS,
+                'EXERCISE_SNAPSHOT_DELAY': 5,
+                'USE_CELERY': True,
+            }
+        ):
+            schedule_exercise_snapshot_export()
+            schedule_exercise_snapshot_export()
+
+        mock_apply_async.assert_called_once_with(countdown=5)
+
+    @patch('wger.exercises.snapshot.exercise_snapshot_exporter.submit')
+    def test_schedule_export_without_celery(self, mock_submit):
+        """
+        Without Celery, the export runs in a background thread
+        """
+        schedule_exercise_snapshot_export()
+        mock_submit.assert_called_once_with()
@@ -1,23 +1,35 @@
 # Standard Library
+import time
 from unittest.mock import (
     MagicMock,
     patch,
 )
 
 # Django
+from django.conf import settings
+from django.core.cache import cache
 from django.test import override_settings
 
 # wger
 from wger.core.tests.base_testcase import WgerTestCase
 from wger.exercises.api.serializers import ExerciseInfoSerializer
 from wger.exercises.cache import (
+    CACHE_TTL_JITTER,
+    CachedExercise,
+    ExerciseApiCacheRefresher,
     cache_api_exercises,
     cache_exercise,
+    queue_exercise_api_refresh,
+    rebuild_exercise_api_cache,
 )
 from wger.exercises.models import (
     Exercise,
     ExerciseImage,
 )
+from wger.utils.cache import (
+    CacheKeyMapper,
+    reset_exercise_api_cache,
+)
 
 
 class TestCacheExercise(WgerTestCase):
@@ -53,18 +65,29 @@ class TestCacheExercise(WgerTestCase):
         mock_serializer.assert_called_once_with(exercise)
         self.assertTrue(any('Warming cache' in msg for msg in output))
 
-    @patch('wger.exercises.cache.cache_exercise')
-    def test_cache_api_exercises_calls_all(self, mock_cache_exercise):
+    @patch('wger.exercises.cache.rebuild_exercise_api_cache', return_value=0)
+    def test_cache_api_exercises_calls_all(self, mock_rebuild):
         output = []
-        called_exercises = []
+        cache_api_exercises(print_fn=output.append, force=True)
 
-        def fake_cache(exercise, force, print_fn, style_fn):
-            called_exercises.append(exercise)
+        self.assertEqual(
+            set(mock_rebuild.call_args.args[0]),
+            set(Exercise.with_translations.values_list('uuid', flat=True)),
+        )
 
-        mock_cache_exercise.side_effect = fake_cache
-        cache_api_exercises(print_fn=output.append, force=True)
+    def test_cache_api_exercises_skips_fresh(self):
+        """
+        Without force, only the exercises that are not cached are rebuilt
+        """
+        exercise = Exercise.with_translations.first()
+        ExerciseInfoSerializer(exercise).data
+
+        with patch('wger.exercises.cache.rebuild_exercise_api_cache', return_value=0) as rebuild:
+            cache_api_exercises(print_fn=lambda x: None, force=False)
 
-        self.assertTrue(len(called_exercises) > 0)
+        uuids = rebuild.call_args.args[0]
+        self.assertNotIn(exercise.uuid, uuids)
+        self.assertEqual(len(uuids), Exercise.with_translations.count() - 1)
 
     @override_settings(SITE_URL='https://example.com')
     def test_cached_media_urls_are_absolute(self):
@@ -97,3 +120,93 @@ class TestCacheExercise(WgerTestCase):
                 muscle['image_url_main'].startswith('https://example.com/'),
                 f'Muscle image URL is not absolute: {muscle["image_url_main"]}',
             )
+
+
+class TestStaleWhileRevalidate(WgerTestCase):
+    """
+    Tests serving expired entries while they are rebuilt in the background
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.exercise = Exercise.objects.get(pk=1)
+        self.key = CacheKeyMapper.get_exercise_api_key(self.exercise.uuid)
+
+    def test_jittered_ttl(self):
+        ttl = settings.WGER_SETTINGS['EXERCISE_CACHE_TTL']
+        before = time.time()
+        ExerciseInfoSerializer(self.exercise).data
+
+        entry = cache.get(self.key)
+        self.assertIsInstance(entry, CachedExercise)
+        self.assertGreaterEqual(entry.fresh_until, before + ttl * (1 - CACHE_TTL_JITTER))
+        self.assertLessEqual(entry.fresh_until, time.time() + ttl)
+
+    @patch('wger.exercises.cache.exercise_api_cache_refresher.submit')
+    def test_stale_entry_is_served_and_refreshed(self, mock_submit):
+        cache.set(self.key, CachedExercise({'stale': True}, time.time() - 1))
+
+        self.assertEqual(ExerciseInfoSerializer(self.exercise).data, {'stale': True})
+        self.assertEqual(ExerciseInfoSerializer(self.exercise).data, {'stale': True})
+
+        # Only queued once
+        mock_submit.assert_called_once_with([str(self.exercise.uuid)])
+
+    @patch('wger.exercises.cache.exercise_api_cache_refresher.submit')
+    def test_fresh_entry_is_not_refreshed(self, mock_submit):
+        ExerciseInfoSerializer(self.exercise).data
+        ExerciseInfoSerializer(self.exercise).data
+
+        mock_submit.assert_not_called()
+
+    @patch('wger.exercises.cache.exercise_api_cache_refresher.submit')
+    def test_reset_queues_refresh(self, mock_submit):
+        ExerciseInfoSerializer(self.exercise).data
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reset_exercise_api_cache(self.exercise.uuid)
+
+        self.assertIsNone(cache.get(self.key))
+        mock_submit.assert_called_once_with([str(self.exercise.uuid)])
+
+    @patch('wger.exercises.cache.exercise_api_cache_refresher.submit')
+    def test_reset_queues_refresh_while_rebuilding(self, mock_submit):
+        """
+        A change is queued again even if a rebuild of the exercise is already
+        queued or running, which might have read the exercise before the change
+        """
+        queue_exercise_api_refresh([self.exercise.uuid])
+        mock_submit.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reset_exercise_api_cache(self.exercise.uuid)
+
+        mock_submit.assert_called_once_with([str(self.exercise.uuid)])
+
+    @patch('wger.exercises.snapshot.schedule_exercise_snapshot_export')
+    @patch('wger.exercises.cache.rebuild_exercise_api_cache')
+    def test_refresher_schedules_snapshot_export(self, mock_rebuild, mock_schedule):
+        """
+        The refresher doesn't export the snapshots itself, it schedules an export
+        """
+        refresher = ExerciseApiCacheRefresher()
+        refresher.submit([str(self.exercise.uuid)])
+        for _ in range(100):
+            if mock_schedule.called:
+                break
+            time.sleep(0.05)
+
+        mock_rebuild.assert_called_once_with({str(self.exercise.uuid)})
+        mock_schedule.assert_called_once_with()
+
+    @patch('wger.exercises.cache.REBUILD_CHUNK_SIZE', 2)
+    def test_rebuild(self):
+        cache.set(self.key, CachedExercise({'stale': True}, time.time() - 1))
+        uuids = list(Exercise.objects.values_list('uuid', flat=True)[:5])
+
+        self.assertEqual(rebuild_exercise_api_cache(uuids, workers=1), 5)
+
+        entries = cache.get_many([CacheKeyMapper.get_exercise_api_key(uuid) for uuid in uuids])
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(cache.get(self.key).data['id'], self.exercise.pk)
+        self.assertGreater(cache.get(self.key).fresh_until, time.time())
@@ -141,6 +141,8 @@ class DeletionLogTestCase(WgerTestCase):
 
         exercise_to_delete.delete(replace_by=str(replacement.uuid))
 
+        # The routine's generation changed, the stale entry is not reachable anymore
+        cache_key = CacheKeyMapper.routine_api_structure_key(routine.id, routine.user_id)
         self.assertIsNone(cache.get(cache_key))
 
     def test_exercise_replace_by_delete_is_atomic_on_failure(self):
@@ -13,14 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Standard Library
+import datetime
 import io
 from unittest.mock import patch
 
 # Django
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 # Third Party
+import requests
 from PIL import Image as PILImage
 
 # wger
@@ -30,12 +33,14 @@ from wger.core.models import (
 )
 from wger.core.tests.base_testcase import WgerTestCase
 from wger.exercises.models import (
+    Alias,
     Equipment,
     Exercise,
     ExerciseCategory,
     ExerciseImage,
     ExerciseVideo,
     Muscle,
+    RejectedMediaDownload,
     Translation,
 )
 from wger.exercises.sync import (
@@ -54,7 +59,10 @@ from wger.manager.models import (
     WorkoutLog,
 )
 from wger.utils.cache import CacheKeyMapper
-from wger.utils.requests import wger_headers
+from wger.utils.requests import (
+    REQUEST_TIMEOUT,
+    wger_headers,
+)
 
 
 def _valid_png_bytes():
@@ -589,9 +597,30 @@ class MockExerciseResponse:
     # yapf: enable
 
 
-class MockImageResponse:
+class MockMediaResponse:
+    """
+    Response of the image and video endpoints, which also serves the files
+    """
+
+    status_code = 200
+    content = b''
+
     def __init__(self):
-        self.status_code = 200
+        self.headers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        yield self.content
+
+
+class MockImageResponse(MockMediaResponse):
+    def __init__(self):
+        super().__init__()
         self.content = _valid_png_bytes()
 
     # yapf: disable
@@ -642,11 +671,11 @@ class MockImageResponse:
     # yapf: enable
 
 
-class MockInvalidImageResponse:
+class MockInvalidImageResponse(MockMediaResponse):
     """Image endpoint returns one record whose downloaded bytes are not a valid image."""
 
     def __init__(self):
-        self.status_code = 200
+        super().__init__()
         self.content = b'<html><script>alert(1)</script></html>'
 
     @staticmethod
@@ -676,9 +705,9 @@ class MockInvalidImageResponse:
         }
 
 
-class MockVideoResponse:
+class MockVideoResponse(MockMediaResponse):
     def __init__(self):
-        self.status_code = 200
+        super().__init__()
         self.content = b'fake video bytes'
 
     @staticmethod
@@ -709,7 +738,7 @@ class MockVideoResponse:
 
 
 class TestSyncMethods(WgerTestCase):
-    @patch('requests.get', return_value=MockLanguageResponse())
+    @patch('requests.Session.get', return_value=MockLanguageResponse())
     def test_language_sync(self, mock_request):
         language1 = Language.objects.get(pk=1)
         self.assertEqual(Language.objects.count(), 3)
@@ -721,6 +750,7 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/language/',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
 
         # Assert
@@ -730,7 +760,7 @@ class TestSyncMethods(WgerTestCase):
         self.assertEqual(Language.objects.get(short_name='eo').full_name, 'Esperanto')
         self.assertEqual(Language.objects.count(), 5)
 
-    @patch('requests.get', return_value=MockLicenseResponse())
+    @patch('requests.Session.get', return_value=MockLicenseResponse())
     def test_license_sync(self, mock_request):
         self.assertEqual(License.objects.count(), 3)
         self.assertEqual(License.objects.get(pk=1).url, '')
@@ -739,6 +769,7 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/license/',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(
             License.objects.get(pk=1).url,
@@ -750,7 +781,7 @@ class TestSyncMethods(WgerTestCase):
         )
         self.assertEqual(License.objects.count(), 4)
 
-    @patch('requests.get', return_value=MockCategoryResponse())
+    @patch('requests.Session.get', return_value=MockCategoryResponse())
     def test_categories_sync(self, mock_request):
         self.assertEqual(ExerciseCategory.objects.count(), 4)
         self.assertEqual(ExerciseCategory.objects.get(pk=1).name, 'Category')
@@ -759,12 +790,13 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/exercisecategory/',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(ExerciseCategory.objects.count(), 6)
         self.assertEqual(ExerciseCategory.objects.get(pk=1).name, 'A cooler, swaggier category')
         self.assertEqual(ExerciseCategory.objects.get(pk=16).name, 'Chest')
 
-    @patch('requests.get', return_value=MockMuscleResponse())
+    @patch('requests.Session.get', return_value=MockMuscleResponse())
     def test_muscle_sync(self, mock_request):
         self.assertEqual(Muscle.objects.count(), 6)
         self.assertEqual(Muscle.objects.get(pk=2).name, 'Biceps testii')
@@ -774,13 +806,14 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/muscle/',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(Muscle.objects.count(), 7)
         self.assertTrue(Muscle.objects.get(pk=2).is_front)
         self.assertEqual(Muscle.objects.get(pk=2).name, 'Novum musculus nomen eius')
         self.assertEqual(Muscle.objects.get(pk=10).name, 'Pectoralis major')
 
-    @patch('requests.get', return_value=MockEquipmentResponse())
+    @patch('requests.Session.get', return_value=MockEquipmentResponse())
     def test_equipment_sync(self, mock_request):
         self.assertEqual(Equipment.objects.count(), 3)
         self.assertEqual(Equipment.objects.get(pk=3).name, 'Something else')
@@ -789,12 +822,13 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/equipment/',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(Equipment.objects.count(), 4)
         self.assertEqual(Equipment.objects.get(pk=3).name, 'A big rock')
         self.assertEqual(Equipment.objects.get(pk=42).name, 'Gym mat')
 
-    @patch('requests.get', return_value=MockDeletionLogResponse())
+    @patch('requests.Session.get', return_value=MockDeletionLogResponse())
     def test_deletion_log(self, mock_request):
         self.assertEqual(Exercise.objects.count(), 8)
         self.assertEqual(Translation.objects.count(), 11)
@@ -810,6 +844,7 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/deletion-log/?limit=100',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(Exercise.objects.count(), 7)
         self.assertEqual(Translation.objects.count(), 8)
@@ -822,7 +857,7 @@ class TestSyncMethods(WgerTestCase):
         for pk in log_pks:
             self.assertEqual(WorkoutLog.objects.get(pk=pk).exercise_id, 2)
 
-    @patch('requests.get', return_value=MockDeletionLogResponse())
+    @patch('requests.Session.get', return_value=MockDeletionLogResponse())
     def test_deletion_log_resets_routine_cache(self, mock_request):
         """
         Test that syncing a deletion that replaces an exercise invalidates the
@@ -837,9 +872,11 @@ class TestSyncMethods(WgerTestCase):
 
         handle_deleted_entries(print)
 
+        # The routine's generation changed, the stale entry is not reachable anymore
+        cache_key = CacheKeyMapper.routine_api_structure_key(routine.id, routine.user_id)
         self.assertIsNone(cache.get(cache_key))
 
-    @patch('requests.get', return_value=MockExerciseResponse())
+    @patch('requests.Session.get', return_value=MockExerciseResponse())
     def test_exercise_sync(self, mock_request):
         self.assertEqual(Exercise.objects.count(), 8)
         self.assertEqual(Translation.objects.count(), 11)
@@ -851,6 +888,7 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/exerciseinfo/?limit=100',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
         self.assertEqual(Exercise.objects.count(), 9)
         self.assertEqual(Translation.objects.count(), 14)
@@ -915,7 +953,61 @@ class TestSyncMethods(WgerTestCase):
             '4e1bb2fc-3b0e-4a1a-bd3e-3728a0e6d8a7',
         )
 
-    @patch('requests.get', return_value=MockImageResponse())
+    @patch('requests.Session.get', return_value=MockExerciseResponse())
+    def test_exercise_sync_reports_per_batch(self, mock_request):
+        """The changes are reported once per batch, a second sync changes nothing"""
+        output = []
+        sync_exercises(output.append)
+
+        self.assertEqual(
+            output[1],
+            '- processed 2 exercises: 1 exercises created, 1 exercises updated, '
+            '3 translations created, 1 translations updated, 2 comments created, '
+            '1 comments updated, 1 aliases deleted, 3 aliases created',
+        )
+        translation = Translation.objects.get(uuid='7524ca8d-032e-482d-ab18-40e8a97851f6')
+        self.assertEqual(translation.history.first().name, 'A new, better, updated name')
+
+        output = []
+        history = Translation.history.count()
+        sync_exercises(output.append)
+        self.assertEqual(output[1], '- processed 2 exercises: no changes')
+        self.assertEqual(Translation.history.count(), history)
+
+    @patch('requests.Session.get', return_value=MockExerciseResponse())
+    def test_exercise_sync_relation_change_updates_timestamp(self, mock_request):
+        """Changed muscles and aliases bump the timestamp of the exercise"""
+        sync_exercises(lambda x: x)
+        long_ago = timezone.make_aware(datetime.datetime(2020, 1, 1))
+        Exercise.objects.update(last_update=long_ago)
+
+        exercise = Exercise.objects.get(uuid='ae3328ba-9a35-4731-bc23-5da50720c5aa')
+        exercise.muscles.clear()
+        other = Exercise.objects.get(uuid='1b020b3a-3732-4c7e-92fd-a0cec90ed69b')
+        Alias.objects.filter(translation__exercise=other).delete()
+        sync_exercises(lambda x: x)
+
+        exercise.refresh_from_db()
+        other.refresh_from_db()
+        self.assertGreater(exercise.last_update, long_ago)
+        self.assertGreater(other.last_update, long_ago)
+
+        Exercise.objects.update(last_update=long_ago)
+        sync_exercises(lambda x: x)
+        self.assertFalse(Exercise.objects.filter(last_update__gt=long_ago).exists())
+
+    @patch('requests.Session.get', return_value=MockExerciseResponse())
+    def test_exercise_sync_unknown_muscle(self, mock_request):
+        """Exercises referencing muscles that were not synchronized are rejected"""
+        Muscle.objects.filter(pk=4).delete()
+
+        with self.assertRaises(Muscle.DoesNotExist):
+            sync_exercises(lambda x: x)
+        self.assertFalse(
+            Exercise.objects.filter(uuid='1b020b3a-3732-4c7e-92fd-a0cec90ed69b').exists()
+        )
+
+    @patch('requests.Session.get', return_value=MockImageResponse())
     def test_image_sync(self, mock_request):
         """Test that download_exercise_images updates existing images and creates new ones"""
 
@@ -927,7 +1019,12 @@ class TestSyncMethods(WgerTestCase):
 
         # Assert
         existing_image = ExerciseImage.objects.get(uuid='00000000-0000-0000-0000-000000000001')
-        mock_request.assert_called()
+        mock_request.assert_any_call(
+            'https://wger.de/media/exercise-images/2/newtest.jpg',
+            headers={},
+            timeout=REQUEST_TIMEOUT,
+            stream=True,
+        )
         self.assertEqual(ExerciseImage.objects.count(), initial_image_count + 1)
 
         self.assertEqual(existing_image.is_main, True)
@@ -951,7 +1048,7 @@ class TestSyncMethods(WgerTestCase):
         self.assertEqual(new_image.license_title, 'New Image Title')
         self.assertEqual(new_image.license_author, 'New Author')
 
-    @patch('requests.get', return_value=MockInvalidImageResponse())
+    @patch('requests.Session.get', return_value=MockInvalidImageResponse())
     def test_image_sync_skips_invalid_image(self, mock_request):
         """A download whose bytes are not a valid image is skipped, not stored."""
 
@@ -965,8 +1062,27 @@ class TestSyncMethods(WgerTestCase):
         )
         self.assertEqual(ExerciseImage.objects.count(), count_before)
 
+    @patch('requests.Session.get')
+    def test_image_sync_skips_failed_download(self, mock_request):
+        """A file that can't be downloaded is skipped, the run continues"""
+
+        def get(url, **kwargs):
+            if url.endswith('.jpg'):
+                raise requests.ConnectionError('connection reset')
+            return MockImageResponse()
+
+        mock_request.side_effect = get
+        count_before = ExerciseImage.objects.count()
+
+        download_exercise_images()
+
+        self.assertFalse(
+            ExerciseImage.objects.filter(uuid='00000002-1d00-4e9d-a1a4-5f5ebd15e819').exists()
+        )
+        self.assertEqual(ExerciseImage.objects.count(), count_before)
+
     @patch('wger.exercises.sync.validate_video', side_effect=ValidationError('invalid video'))
-    @patch('requests.get', return_value=MockVideoResponse())
+    @patch('requests.Session.get', return_value=MockVideoResponse())
     def test_video_sync_skips_invalid_video(self, mock_request, mock_validate):
         """A video rejected by validate_video is skipped, not stored."""
 
@@ -980,3 +1096,31 @@ class TestSyncMethods(WgerTestCase):
             ExerciseVideo.objects.filter(uuid='00000088-1d00-4e9d-a1a4-5f5ebd15e819').exists()
         )
         self.assertEqual(ExerciseVideo.objects.count(), count_before)
+
+    @patch('requests.Session.get')
+    def test_image_sync_rejected_image_is_requested_conditionally(self, mock_download):
+        """A rejected image is only downloaded again if it changed on the server"""
+        response = MockInvalidImageResponse()
+        response.headers = {'ETag': '"abc"'}
+        mock_download.return_value = response
+        download_exercise_images()
+
+        response = MockInvalidImageResponse()
+        response.status_code = 304
+        response.content = b''
+        mock_download.return_value = response
+        download_exercise_images()
+
+        mock_download.assert_called_with(
+            'https://wger.de/media/exercise-images/2/evil.jpg',
+            headers={'If-None-Match': '"abc"'},
+            timeout=REQUEST_TIMEOUT,
+            stream=True,
+        )
+        self.assertEqual(
+            RejectedMediaDownload.objects.get(uuid='00000099-1d00-4e9d-a1a4-5f5ebd15e819').etag,
+            '"abc"',
+        )
+        self.assertFalse(
+            ExerciseImage.objects.filter(uuid='00000099-1d00-4e9d-a1a4-5f5ebd15e819').exists()
+        )
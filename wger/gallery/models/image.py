@@ -77,6 +77,8 @@ class Image(models.Model):
         """
         return f'Gallery image #{self.pk}'
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -9,3 +9,6 @@ BASE_CONFIG_FILTER_FIELDS = (
 )
 
 BASE_CONFIG_FIELDS = BASE_CONFIG_FILTER_FIELDS + ('requirements',)
+
+WORKOUT_LOG_BULK_MAX_ITEMS = 200
+"""Maximum number of logs that can be saved with one bulk request"""
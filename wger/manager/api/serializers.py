@@ -434,6 +434,7 @@ class WorkoutSessionSerializer(serializers.ModelSerializer):
             'impression',
             'time_start',
             'time_end',
+            'last_update',
         )
 
 
@@ -488,6 +489,7 @@ class WorkoutLogSerializer(serializers.ModelSerializer):
             'rir_target',
             'rest',
             'rest_target',
+            'last_update',
         )
 
 
@@ -18,16 +18,24 @@
 # Django
 from django.conf import settings
 from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Q
 
 # Third Party
 from drf_spectacular.utils import extend_schema
-from rest_framework import viewsets
+from rest_framework import (
+    exceptions,
+    status,
+    viewsets,
+)
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 # wger
-from wger.manager.api.consts import BASE_CONFIG_FILTER_FIELDS
+from wger.manager.api.consts import (
+    BASE_CONFIG_FILTER_FIELDS,
+    WORKOUT_LOG_BULK_MAX_ITEMS,
+)
 from wger.manager.api.filtersets import WorkoutLogFilterSet
 from wger.manager.api.permissions import RoutinePermission
 from wger.manager.api.serializers import (
@@ -53,6 +61,7 @@ from wger.manager.api.serializers import (
     WorkoutLogSerializer,
     WorkoutSessionSerializer,
 )
+from wger.manager.helpers import prefetch_config_data
 from wger.manager.models import (
     Day,
     MaxRepetitionsConfig,
@@ -72,7 +81,11 @@ from wger.manager.models import (
     WorkoutSession,
 )
 from wger.utils.cache import CacheKeyMapper
-from wger.utils.viewsets import WgerOwnerObjectModelViewSet
+from wger.utils.sync import SyncViewSetMixin
+from wger.utils.viewsets import (
+    WgerOwnerObjectModelViewSet,
+    check_fk_ownership_many,
+)
 
 
 def request_user_or_trainer_q(request):
@@ -132,10 +145,9 @@ class RoutineViewSet(viewsets.ModelViewSet):
         if cached_data is not None:
             return Response(cached_data)
 
-        out = WorkoutDayDataDisplayModeSerializer(
-            self.get_object().date_sequence,
-            many=True,
-        ).data
+        date_sequence = self.get_object().date_sequence
+        prefetch_config_data(date_sequence)
+        out = WorkoutDayDataDisplayModeSerializer(date_sequence, many=True).data
         cache.set(cache_key, out, settings.WGER_SETTINGS['ROUTINE_CACHE_TTL'])
 
         return Response(out)
@@ -151,7 +163,9 @@ class RoutineViewSet(viewsets.ModelViewSet):
         if cached_data is not None:
             return Response(cached_data)
 
-        out = WorkoutDayDataGymModeSerializer(self.get_object().date_sequence, many=True).data
+        date_sequence = self.get_object().date_sequence
+        prefetch_config_data(date_sequence)
+        out = WorkoutDayDataGymModeSerializer(date_sequence, many=True).data
         cache.set(cache_key, out, settings.WGER_SETTINGS['ROUTINE_CACHE_TTL'])
 
         return Response(out)
@@ -246,7 +260,7 @@ class PublicRoutineTemplateViewSet(viewsets.ReadOnlyModelViewSet):
         return Routine.public.all()
 
 
-class WorkoutSessionViewSet(WgerOwnerObjectModelViewSet):
+class WorkoutSessionViewSet(SyncViewSetMixin, WgerOwnerObjectModelViewSet):
     """
     API endpoint for workout sessions objects
     """
@@ -291,7 +305,7 @@ class WorkoutSessionViewSet(WgerOwnerObjectModelViewSet):
         return [(Routine, 'routine'), (Day, 'day')]
 
 
-class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
+class WorkoutLogViewSet(SyncViewSetMixin, WgerOwnerObjectModelViewSet):
     """
     API endpoint for workout log objects
     """
@@ -317,6 +331,77 @@ class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
         """
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        request=WorkoutLogSerializer(many=True),
+        responses={201: WorkoutLogSerializer(many=True)},
+    )
+    @action(detail=False, methods=['post'], pagination_class=None)
+    def bulk(self, request):
+        """
+        Create or update several logs at once, e.g. all logs of a finished workout
+
+        Items with the id of an existing log update it, all others are created.
+        The batch is only saved if every item is valid, and the caches and
+        trophies are updated once for the whole batch.
+        """
+        if not isinstance(request.data, list) or not all(
+            isinstance(item, dict) for item in request.data
+        ):
+            raise exceptions.ValidationError('Request data is not a list of dictionaries')
+
+        if len(request.data) > WORKOUT_LOG_BULK_MAX_ITEMS:
+            raise exceptions.ValidationError(
+                f'At most {WORKOUT_LOG_BULK_MAX_ITEMS} logs can be saved at once'
+            )
+
+        if not check_fk_ownership_many(request.data, self.get_owner_objects(), request.user.pk):
+            raise exceptions.PermissionDenied('You are not allowed to do this')
+
+        ids = set()
+        for item in request.data:
+            if item.get('id') is None:
+                continue
+            try:
+                ids.add(WorkoutLog._meta.pk.to_python(item['id']))
+            except DjangoValidationError:
+                raise exceptions.ValidationError(f'"{item["id"]}" is not a valid log id')
+
+        existing = WorkoutLog.objects.in_bulk(ids)
+        if any(log.user_id != request.user.pk for log in existing.values()):
+            raise exceptions.PermissionDenied('You are not allowed to do this')
+
+        serializers = []
+        errors = []
+        for item in request.data:
+            pk = item.get('id')
+            serializer = WorkoutLogSerializer(
+                existing.get(WorkoutLog._meta.pk.to_python(pk)) if pk is not None else None,
+                data=item,
+                context=self.get_serializer_context(),
+            )
+            serializer.is_valid()
+            serializers.append(serializer)
+            errors.append(serializer.errors)
+        if any(errors):
+            raise exceptions.ValidationError(errors)
+
+        logs = []
+        for serializer in serializers:
+            log = serializer.instance or WorkoutLog()
+            for field, value in serializer.validated_data.items():
+                setattr(log, field, value)
+            logs.append(log)
+
+        try:
+            WorkoutLog.bulk_save(request.user, logs)
+        except DjangoValidationError as error:
+            raise exceptions.ValidationError(error.messages)
+
+        return Response(
+            WorkoutLogSerializer(logs, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
     @staticmethod
     def get_owner_objects():
         """
@@ -0,0 +1,263 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Incremental engine for the day-by-day sequence of a routine
+
+Walking a routine means going through every date between its start and end and
+deciding which day is performed on it. The result only depends on the routine's
+structure (start, end, fit_in_week and the ordered days), on the dates of the
+sessions logged for each day and on the current date. The engine therefore
+keeps, besides the walked sequence, a compact checkpoint of its counters for
+every walked date. When the sessions change, only the part of the sequence
+after the first affected date needs to be walked again.
+"""
+
+# Standard Library
+import bisect
+import datetime
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Iterable,
+    List,
+    NamedTuple,
+)
+
+# Django
+from django.utils import timezone
+
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+class SequenceCheckpoint(NamedTuple):
+    """
+    The state of the walker right before the given date is processed
+    """
+
+    date: datetime.date
+    entry_count: int
+    day_index: int
+    iterations: tuple[int, ...]
+    is_first: bool
+
+
+class SequenceEntry(NamedTuple):
+    """
+    Compact version of a WorkoutDayData, the day is stored as an index
+    in the routine's ordered days (None for fit_in_week placeholders)
+    """
+
+    date: datetime.date
+    day_index: int | None
+    iteration: int
+
+
+@dataclass
+class DateSequenceState:
+    """
+    The cacheable result of walking a routine
+    """
+
+    signature: tuple
+    """Structure the sequence was walked for, a change invalidates everything"""
+
+    horizon: datetime.date
+    """Last date for which the checkpoints don't depend on the current date"""
+
+    sessions: frozenset[tuple[int, datetime.date]]
+    """The (day id, date) pairs of the sessions the sequence was walked with"""
+
+    entries: List[SequenceEntry] = field(default_factory=list)
+    checkpoints: List[SequenceCheckpoint] = field(default_factory=list)
+
+
+class DateSequenceEngine:
+    """
+    Walks the days of a routine, optionally resuming from a previous state
+
+    If a day needs logs to continue it will be repeated until the user adds one.
+    """
+
+    start: datetime.date
+    end: datetime.date
+    fit_in_week: bool
+    days: List[Any]
+    sessions: frozenset[tuple[int, datetime.date]]
+    today: datetime.date
+
+    walked_days: int
+    """Number of dates processed by the last call to build()"""
+
+    def __init__(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        fit_in_week: bool,
+        days: List[Any],
+        sessions: Iterable[tuple[int, datetime.date]],
+        today: datetime.date | None = None,
+    ):
+        self.start = start
+        self.end = end
+        self.fit_in_week = fit_in_week
+        self.days = days
+        self.sessions = frozenset(sessions)
+        self.today = today if today is not None else timezone.localdate()
+        self.walked_days = 0
+
+    @property
+    def signature(self) -> tuple:
+        return (
+            self.start,
+            self.end,
+            self.fit_in_week,
+            tuple((day.id, day.need_logs_to_advance) for day in self.days),
+        )
+
+    def resume_checkpoint(self, previous: DateSequenceState | None) -> int | None:
+        """
+        Returns the index of the last checkpoint of the previous state that is
+        still valid, or None if the sequence has to be walked from the start.
+
+        The step for a date looks at the sessions of the previous date, so a
+        session change on date D makes all checkpoints after D + 1 stale. Steps
+        for dates in the future always advance, so only the checkpoints up to
+        tomorrow are independent of the current date.
+        """
+        if previous is None or previous.signature != self.signature:
+            return None
+
+        bound = min(previous.horizon, self.today + ONE_DAY)
+        changed = previous.sessions ^ self.sessions
+        if changed:
+            bound = min(bound, min(date for _, date in changed) + ONE_DAY)
+
+        dates = [checkpoint.date for checkpoint in previous.checkpoints]
+        index = bisect.bisect_right(dates, bound) - 1
+        return index if index >= 0 else None
+
+    def build(self, previous: DateSequenceState | None = None) -> DateSequenceState:
+        """
+        Walks the routine and returns the new state, reusing the valid part
+        of the previous one if given
+        """
+        horizon = self.today + ONE_DAY
+        state = DateSequenceState(
+            signature=self.signature,
+            horizon=horizon,
+            sessions=self.sessions,
+        )
+        self.walked_days = 0
+
+        nr_of_days = len(self.days)
+        if not nr_of_days:
+            return state
+
+        session_map = {}
+        for day_id, date in self.sessions:
+            session_map.setdefault(day_id, set()).add(date)
+
+        checkpoint_index = self.resume_checkpoint(previous)
+        if checkpoint_index is None:
+            current_date = self.start
+            day_index = 0
+            iterations = [1] * nr_of_days
+            is_first = True
+        else:
+            checkpoint = previous.checkpoints[checkpoint_index]
+            state.entries = previous.entries[: checkpoint.entry_count]
+            state.checkpoints = previous.checkpoints[:checkpoint_index]
+            current_date = checkpoint.date
+            day_index = checkpoint.day_index
+            iterations = list(checkpoint.iterations)
+            is_first = checkpoint.is_first
+
+        entries = state.entries
+        while current_date <= self.end:
+            if current_date <= horizon:
+                state.checkpoints.append(
+                    SequenceCheckpoint(
+                        date=current_date,
+                        entry_count=len(entries),
+                        day_index=day_index,
+                        iterations=tuple(iterations),
+                        is_first=is_first,
+                    )
+                )
+            self.walked_days += 1
+
+            current_day = self.days[day_index]
+            previous_date = current_date - ONE_DAY
+
+            # Checks whether the user can proceed to the next day in the sequence
+            #
+            # This is possible if
+            # - the day doesn't require logs
+            # - the day requires logs, and they exist. Note that we check for logs on the previous
+            #   day, since when a user logs a session for a day, the advancement should happen on
+            #   the next day, not immediately.
+            # - the date is in the future (used e.g. for calendars where we assume we will proceed)
+            has_session = previous_date in session_map.get(current_day.id, ())
+            can_proceed = (
+                not current_day.need_logs_to_advance
+                or (current_day.need_logs_to_advance and has_session)
+                or current_date > self.today
+            )
+
+            wrapped = False
+            if can_proceed and not is_first:
+                iterations[day_index] += 1
+                day_index = (day_index + 1) % nr_of_days
+                wrapped = day_index == 0
+
+            # If fit_in_week is set we need to fill the rest of the week with placeholders.
+            # This must only happen when the cycle actually wrapped around, not when the
+            # first day is stuck at index 0 waiting for logs (need_logs_to_advance).
+            if self.fit_in_week and nr_of_days % 7 != 0 and wrapped:
+                days_to_monday = 7 - current_date.weekday()
+                for i in range(days_to_monday):
+                    placeholder_date = current_date + datetime.timedelta(days=i)
+                    if placeholder_date > self.end:
+                        break
+                    entries.append(
+                        SequenceEntry(
+                            date=placeholder_date,
+                            day_index=None,
+                            # This is ugly, but we don't want to advance the iteration
+                            iteration=iterations[day_index] - 1,
+                        )
+                    )
+                current_date += datetime.timedelta(days=days_to_monday)
+                if current_date > self.end:
+                    continue
+
+            # Add day data and advance the date
+            entries.append(
+                SequenceEntry(
+                    date=current_date,
+                    day_index=day_index,
+                    iteration=iterations[day_index],
+                )
+            )
+            current_date += ONE_DAY
+            is_first = False
+
+        return state
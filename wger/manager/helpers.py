@@ -15,9 +15,9 @@
 
 # Standard Library
 from decimal import Decimal
+from typing import List
 
 # Django
-from django.core.cache import cache
 from django.utils.translation import gettext as _
 
 # Third Party
@@ -183,24 +183,43 @@ def render_workout_day(
 
 
 def reset_routine_cache(instance: Routine, structure: bool = True):
-    """Resets all caches related to a routine"""
+    """
+    Resets all caches related to a routine
 
-    cache.delete(CacheKeyMapper.routine_date_sequence_key(instance.id))
-    cache.delete(
-        CacheKeyMapper.routine_api_date_sequence_display_key(instance.id, instance.user_id)
-    )
-    cache.delete(CacheKeyMapper.routine_api_date_sequence_gym_key(instance.id, instance.user_id))
-    cache.delete(CacheKeyMapper.routine_api_logs(instance.id, instance.user_id))
-    cache.delete(CacheKeyMapper.routine_api_stats(instance.id, instance.user_id))
+    All routine cache keys contain the routine's generation counters, so this
+    is a single increment regardless of the size of the routine. The old
+    entries are not reachable anymore and simply expire.
+    """
+    CacheKeyMapper.bump_generation(CacheKeyMapper.routine_generation_key(instance.id))
 
     if structure:
-        cache.delete(CacheKeyMapper.routine_api_structure_key(instance.id, instance.user_id))
+        CacheKeyMapper.bump_generation(CacheKeyMapper.routine_structure_generation_key(instance.id))
+
+
+def reset_user_routine_cache(user_id: int):
+    """Resets the routine API caches of all routines as seen by the given user"""
+    CacheKeyMapper.bump_generation(CacheKeyMapper.user_routines_generation_key(user_id))
 
-    if instance.pk:
-        for day in instance.days.all():
-            for slot in day.slots.all():
-                for entry in slot.entries.all():
-                    cache.delete(CacheKeyMapper.slot_entry_configs_key(entry.id))
+
+def prefetch_config_data(date_sequence: List[WorkoutDayData]) -> None:
+    """
+    Calculates the config data of all slot entries in a date sequence
+
+    Every entry is walked once, up to the highest iteration its day appears
+    with in the sequence, instead of once per day and iteration.
+    """
+    max_iterations = {}
+    for day_data in date_sequence:
+        if day_data.day is None or day_data.iteration is None:
+            continue
+
+        day, iteration = max_iterations.get(id(day_data.day), (day_data.day, 0))
+        max_iterations[id(day)] = (day, max(iteration, day_data.iteration))
+
+    for day, iteration in max_iterations.values():
+        for slot in getattr(day, 'prefetched_slots', day.slots.all()):
+            for entry in getattr(slot, 'prefetched_entries', slot.entries.all()):
+                entry.get_config_data_range(iteration)
 
 
 def brzycki_one_rm(weight: float | None, reps: float | None) -> Decimal:
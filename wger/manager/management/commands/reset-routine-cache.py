@@ -21,20 +21,38 @@ from django.core.management.base import BaseCommand
 from tqdm import tqdm
 
 # wger
-from wger.manager.helpers import reset_routine_cache
+from wger.manager.helpers import (
+    reset_routine_cache,
+    reset_user_routine_cache,
+)
 from wger.manager.models import Routine
 
 
 class Command(BaseCommand):
     help = 'Resets the cache for all routines.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            action='store',
+            dest='user_id',
+            type=int,
+            default=None,
+            help='Only reset the routines of this user',
+        )
+
     def handle(self, *args, **options):
-        total_routines = Routine.objects.count()
+        routines = Routine.objects.all()
+        if options['user_id']:
+            reset_user_routine_cache(options['user_id'])
+            routines = routines.filter(user_id=options['user_id'])
+
+        total_routines = routines.count()
         self.stdout.write(f'Updating cache for {total_routines} routines...')
 
         with tqdm(total=total_routines, unit='routine', unit_scale=True) as pbar:
             routine: Routine
-            for routine in Routine.objects.all():
+            for routine in routines:
                 reset_routine_cache(routine)
                 _ = routine.date_sequence
                 pbar.update(1)
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.9 on 2026-10-18 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('manager', '0028_backfill_session_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutlog',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Last update'),
+        ),
+        migrations.AddField(
+            model_name='workoutsession',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Last update'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(fields=['user', 'id'], name='manager_wor_user_id_f74352_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(
+                fields=['user', 'last_update'], name='manager_wor_user_id_8e0251_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(fields=['user', 'id'], name='manager_wor_user_id_401423_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutsession',
+            index=models.Index(
+                fields=['user', 'last_update'], name='manager_wor_user_id_6f2519_idx'
+            ),
+        ),
+    ]
@@ -155,6 +155,8 @@ class AbstractChangeConfig(models.Model):
 
         super().save(**kwargs)
 
+    owner_user_lookup = 'slot_entry__slot__day__routine__user_id'
+
     def get_owner_object(self):
         """
         Get owner information
@@ -114,6 +114,8 @@ class Day(models.Model):
 
         return super().save(*args, **kwargs)
 
+    owner_user_lookup = 'routine__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
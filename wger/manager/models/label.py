@@ -88,6 +88,8 @@ class Label(models.Model):
         """
         return f'Label {self.label} for routine {self.routine}'
 
+    owner_user_lookup = 'routine__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
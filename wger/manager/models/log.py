@@ -17,7 +17,10 @@
 # Django
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import (
+    models,
+    transaction,
+)
 from django.utils import timezone
 
 # wger
@@ -221,9 +224,24 @@ class WorkoutLog(models.Model):
     Target rest time
     """
 
+    last_update = models.DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+        editable=False,
+        null=True,
+    )
+    """
+    Last time the log was changed, used for the delta feeds of the API. Empty for
+    entries loaded from fixtures
+    """
+
     # Metaclass to set some other properties
     class Meta:
         ordering = ['date', 'repetitions', 'weight']
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['user', 'last_update']),
+        ]
 
     def __str__(self):
         """
@@ -231,6 +249,8 @@ class WorkoutLog(models.Model):
         """
         return f'Log entry: {self.repetitions} - {self.weight} kg on {self.date}'
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -248,6 +268,113 @@ class WorkoutLog(models.Model):
         if self.weight is not None and self.weight_unit is None:
             raise ValidationError('Weight unit must be present if weight has a value.')
 
+    @staticmethod
+    def get_or_create_session(user: User, date, routine, day) -> WorkoutSession:
+        """
+        Returns the session of the user for the date and routine, creating it
+        with the given day if there is none yet
+        """
+        try:
+            return WorkoutSession.objects.get_or_create(
+                user=user,
+                date=date,
+                routine=routine,
+                defaults={'day': day},
+            )[0]
+        except WorkoutSession.MultipleObjectsReturned:
+            # TODO: duplicate sessions can exist for the same (user, date, routine)
+            #       when routine is NULL, as the unique_together does not cover a NULL
+            #       routine in PostgreSQL.
+            #       This is a fix till we correctly take care of the problem, we just
+            #       reuse one session (ids are uuid7, so ordering by id yields the
+            #       earliest) instead of crashing the log POST with MultipleObjectsReturned.
+            return (
+                WorkoutSession.objects.filter(
+                    user=user,
+                    date=date,
+                    routine=routine,
+                )
+                .order_by('id')
+                .first()
+            )
+
+    def fill_session_day(self):
+        """
+        Sets the day of the log's session, if it has none yet
+
+        The app creates its sessions itself and can leave the day empty, which
+        hides them from days with need_logs_to_advance. Only filled in when all
+        logs of the session agree on one day, like migration 0028 does: a wrong
+        day would open the gate on a day the user never trained.
+
+        Can be removed once the app versions that set the day are widely adopted.
+        """
+        if self.session_id and self.slot_entry and self.session.day_id is None:
+            days = list(
+                WorkoutLog.objects.filter(
+                    session_id=self.session_id,
+                    slot_entry__isnull=False,
+                )
+                .values_list('slot_entry__slot__day_id', 'slot_entry__slot__day__routine_id')
+                .distinct()
+            )
+
+            if len(days) == 1 and days[0][1] == self.session.routine_id:
+                self.session.day_id = days[0][0]
+                self.session.save(update_fields=['day', 'last_update'])
+
+    @classmethod
+    def bulk_save(cls, user: User, logs: list['WorkoutLog']):
+        """
+        Creates or updates several logs of a user at once
+
+        New logs are inserted and the others updated with one query each. The
+        sessions are looked up once per date and routine, and instead of the
+        post_save signal of every log, workout_logs_bulk_saved is sent once.
+
+        Unlike save(), this does not drop references to objects of other users,
+        the caller has to check their ownership.
+        """
+        # wger
+        from wger.manager.signals import workout_logs_bulk_saved
+
+        date_field = WorkoutSession._meta.get_field('date')
+        sessions = {}
+        for log in logs:
+            log.user = user
+            log.clean()
+
+            if not log.session_id:
+                key = (date_field.to_python(log.date), log.routine_id)
+                if key not in sessions:
+                    day = None
+                    if log.slot_entry and log.slot_entry.slot.day.routine_id == log.routine_id:
+                        day = log.slot_entry.slot.day
+                    sessions[key] = cls.get_or_create_session(user, log.date, log.routine, day)
+                log.session = sessions[key]
+
+        created = [log for log in logs if log._state.adding]
+        updated = [log for log in logs if not log._state.adding]
+
+        # bulk_update() doesn't set the auto_now fields
+        now = timezone.now()
+        for log in updated:
+            log.last_update = now
+        with transaction.atomic():
+            cls.objects.bulk_create(created)
+            cls.objects.bulk_update(
+                updated,
+                [field.name for field in cls._meta.concrete_fields if not field.primary_key],
+            )
+
+            filled_sessions = set()
+            for log in logs:
+                if log.session_id not in filled_sessions and log.slot_entry_id:
+                    filled_sessions.add(log.session_id)
+                    log.fill_session_day()
+
+        workout_logs_bulk_saved.send(sender=cls, user=user, created=created, updated=updated)
+
     def save(self, *args, **kwargs):
         """
         Plumbing
@@ -277,29 +404,7 @@ class WorkoutLog(models.Model):
             if self.slot_entry and self.slot_entry.slot.day.routine_id == self.routine_id:
                 day = self.slot_entry.slot.day
 
-            try:
-                self.session = WorkoutSession.objects.get_or_create(
-                    user=self.user,
-                    date=self.date,
-                    routine=self.routine,
-                    defaults={'day': day},
-                )[0]
-            except WorkoutSession.MultipleObjectsReturned:
-                # TODO: duplicate sessions can exist for the same (user, date, routine)
-                #       when routine is NULL, as the unique_together does not cover a NULL
-                #       routine in PostgreSQL.
-                #       This is a fix till we correctly take care of the problem, we just
-                #       reuse one session (ids are uuid7, so ordering by id yields the
-                #       earliest) instead of crashing the log POST with MultipleObjectsReturned.
-                self.session = (
-                    WorkoutSession.objects.filter(
-                        user=self.user,
-                        date=self.date,
-                        routine=self.routine,
-                    )
-                    .order_by('id')
-                    .first()
-                )
+            self.session = self.get_or_create_session(self.user, self.date, self.routine, day)
 
         # If the user of next_log is not this user, remove foreign key
         if self.next_log and self.next_log.user != self.user:
@@ -308,22 +413,4 @@ class WorkoutLog(models.Model):
         # Save to db
         super().save(*args, **kwargs)
 
-        # The app creates its sessions itself and can leave the day empty, which
-        # hides them from days with need_logs_to_advance. Only filled in when all
-        # logs of the session agree on one day, like migration 0028 does: a wrong
-        # day would open the gate on a day the user never trained.
-        #
-        # Can be removed once the app versions that set the day are widely adopted.
-        if self.session_id and self.slot_entry and self.session.day_id is None:
-            days = list(
-                WorkoutLog.objects.filter(
-                    session_id=self.session_id,
-                    slot_entry__isnull=False,
-                )
-                .values_list('slot_entry__slot__day_id', 'slot_entry__slot__day__routine_id')
-                .distinct()
-            )
-
-            if len(days) == 1 and days[0][1] == self.session.routine_id:
-                self.session.day_id = days[0][0]
-                self.session.save(update_fields=['day'])
+        self.fill_session_day()
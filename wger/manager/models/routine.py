@@ -17,11 +17,7 @@
 # Standard Library
 import datetime
 import logging
-from collections import (
-    Counter,
-    defaultdict,
-)
-from decimal import Decimal
+from collections import defaultdict
 from typing import List
 
 # Django
@@ -34,13 +30,11 @@ from django.urls import reverse
 from django.utils import timezone
 
 # wger
-from wger.exercises.models import Exercise
 from wger.manager.dataclasses import (
-    GroupedLogData,
-    LogData,
     RoutineLogData,
     WorkoutDayData,
 )
+from wger.manager.date_sequence import DateSequenceEngine
 from wger.manager.managers import (
     PublicRoutineTemplateManager,
     RoutineManager,
@@ -145,6 +139,8 @@ class Routine(models.Model):
         else:
             return f'Routine {self.id} - {self.created}'
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -231,84 +227,32 @@ class Routine(models.Model):
         if not days:
             return []
 
-        # Precompute session dates from prefetched logs
-        workout_session_map = defaultdict(set)
-        for day in days:
-            for session in day.workoutsession_set.all():
-                workout_session_map[day.id].add(session.date)
-
-        # Main sequence generation logic
-        labels = self.label_dict
-        current_date = self.start
+        # Walk the routine, resuming from the last cached state if the sessions
+        # changed only after its start
         days_list = list(days)
-        nr_of_days = len(days_list)
-        iteration_counter = Counter()
-        sequence = []
-        is_first = True
-        day_index = 0
-
-        for day in days:
-            iteration_counter[day.id] = 1
-
-        while current_date <= self.end:
-            current_day = days_list[day_index]
-            previous_date = current_date - datetime.timedelta(days=1)
-
-            # Checks whether the user can proceed to the next day in the sequence
-            #
-            # This is possible if
-            # - the day doesn't require logs
-            # - the day requires logs, and they exist. Note that we check for logs on the previous
-            #   day, since when a user logs a session for a day, the advancement should happen on
-            #   the next day, not immediately.
-            # - the date is in the future (used e.g. for calendars where we assume we will proceed)
-            has_session = previous_date in workout_session_map[current_day.id]
-            can_proceed = (
-                not current_day.need_logs_to_advance
-                or (current_day.need_logs_to_advance and has_session)
-                or current_date > timezone.localdate()
-            )
+        engine = DateSequenceEngine(
+            start=self.start,
+            end=self.end,
+            fit_in_week=self.fit_in_week,
+            days=days_list,
+            sessions=(
+                (day.id, session.date) for day in days for session in day.workoutsession_set.all()
+            ),
+        )
+        state_key = CacheKeyMapper.routine_date_sequence_state_key(self.id)
+        state = engine.build(cache.get(state_key))
+        cache.set(state_key, state, settings.WGER_SETTINGS['ROUTINE_CACHE_TTL'])
 
-            wrapped = False
-            if can_proceed and not is_first:
-                iteration_counter[current_day.id] += 1
-                day_index = (day_index + 1) % nr_of_days
-                wrapped = day_index == 0
-                current_day = days_list[day_index]
-
-            # If fit_in_week is set we need to fill the rest of the week with placeholders.
-            # This must only happen when the cycle actually wrapped around, not when the
-            # first day is stuck at index 0 waiting for logs (need_logs_to_advance).
-            if self.fit_in_week and nr_of_days % 7 != 0 and wrapped:
-                days_to_monday = 7 - current_date.weekday()
-                for i in range(days_to_monday):
-                    placeholder_date = current_date + datetime.timedelta(days=i)
-                    if placeholder_date > self.end:
-                        break
-                    sequence.append(
-                        WorkoutDayData(
-                            date=placeholder_date,
-                            day=None,
-                            label=labels.get(placeholder_date),
-                            # This is ugly, but we don't want to advance the iteration
-                            iteration=iteration_counter[current_day.id] - 1,
-                        )
-                    )
-                current_date += datetime.timedelta(days=days_to_monday)
-                if current_date > self.end:
-                    continue
-
-            # Add day data and advance the date
-            sequence.append(
-                WorkoutDayData(
-                    iteration=iteration_counter[current_day.id],
-                    date=current_date,
-                    day=current_day,
-                    label=labels.get(current_date),
-                )
+        labels = self.label_dict
+        sequence = [
+            WorkoutDayData(
+                iteration=entry.iteration,
+                date=entry.date,
+                day=days_list[entry.day_index] if entry.day_index is not None else None,
+                label=labels.get(entry.date),
             )
-            current_date += datetime.timedelta(days=1)
-            is_first = False
+            for entry in state.entries
+        ]
 
         # For need_logs_to_advance days the sequence bakes in today's date (future
         # dates are optimistically advanced), so that projection is only valid for the
@@ -387,123 +331,6 @@ class Routine(models.Model):
             RoutineLogData: An object containing the calculated statistics.
         """
         # wger
-        from wger.manager.helpers import brzycki_intensity
-
-        result = RoutineLogData()
-        intensity_counter = GroupedLogData()
-
-        def update_grouped_log_data(
-            entry: GroupedLogData,
-            date: datetime.date,
-            week_nr: int,
-            iter: int,
-            exercise: Exercise,
-            value: Decimal | int | None,
-        ):
-            """
-            Updates grouped log data
-
-            This method just adds the value to the corresponding entries
-            """
-            if value is None:
-                return
-
-            muscles = exercise.muscles.all()
-
-            entry.daily[date].exercises[exercise.id] += value
-            entry.weekly[week_nr].exercises[exercise.id] += value
-            entry.iteration[iter].exercises[exercise.id] += value
-            entry.mesocycle.exercises[exercise.id] += value
-
-            entry.daily[date].total += value
-            entry.weekly[week_nr].total += value
-            entry.iteration[iter].total += value
-            entry.mesocycle.total += value
-
-            for muscle in muscles:
-                pk = muscle.id
-
-                entry.daily[date].muscle[pk] += value
-                entry.weekly[week_nr].muscle[pk] += value
-                entry.iteration[iter].muscle[pk] += value
-                entry.mesocycle.muscle[pk] += value
-
-        def safe_divide(numerator, denominator):
-            return numerator / denominator if denominator != 0 else numerator
-
-        def avg_log_data(data: LogData, count: LogData) -> None:
-            data.total = safe_divide(data.total, count.total)
-            data.upper_body = safe_divide(data.upper_body, count.upper_body)
-            data.lower_body = safe_divide(data.lower_body, count.lower_body)
-            for k in data.muscle:
-                data.muscle[k] = safe_divide(data.muscle[k], count.muscle[k])
-            for k in data.exercises:
-                data.exercises[k] = safe_divide(data.exercises[k], count.exercises[k])
-
-        def calculate_average_intensity(result: GroupedLogData, counters: GroupedLogData) -> None:
-            avg_log_data(result.mesocycle, counters.mesocycle)
-
-            for res_group, cnt_group in (
-                (result.daily, counters.daily),
-                (result.weekly, counters.weekly),
-                (result.iteration, counters.iteration),
-            ):
-                for key in res_group:
-                    avg_log_data(res_group[key], cnt_group[key])
-
-        # Iterate over each workout session associated with the routine
-        for session in self.sessions.all():
-            session_date = session.date
-            week_number = session_date.isocalendar().week
-
-            # TODO: filter for lb
-            for log in session.logs.kg().reps():
-                iteration = log.iteration
-                exercise = log.exercise
-                weight = log.weight
-                reps = log.repetitions
-
-                values_not_none = reps is not None and weight is not None
-                exercise_volume = weight * reps if values_not_none else 0
-
-                update_grouped_log_data(
-                    entry=result.volume,
-                    iter=iteration,
-                    week_nr=week_number,
-                    date=session_date,
-                    exercise=exercise,
-                    value=exercise_volume,
-                )
-
-                # Each log always corresponds to one set
-                update_grouped_log_data(
-                    entry=result.sets,
-                    iter=iteration,
-                    week_nr=week_number,
-                    date=session_date,
-                    exercise=exercise,
-                    value=1,
-                )
-
-                if values_not_none:
-                    update_grouped_log_data(
-                        entry=intensity_counter,
-                        iter=iteration,
-                        week_nr=week_number,
-                        date=session_date,
-                        exercise=exercise,
-                        value=1,
-                    )
-
-                    update_grouped_log_data(
-                        entry=result.intensity,
-                        iter=iteration,
-                        week_nr=week_number,
-                        date=session_date,
-                        exercise=exercise,
-                        value=brzycki_intensity(weight, reps),
-                    )
-
-        calculate_average_intensity(result.intensity, intensity_counter)
-
-        return result
+        from wger.manager.log_statistics import calculate_log_statistics
+
+        return calculate_log_statistics(self.pk)
@@ -123,6 +123,17 @@ class WorkoutSession(models.Model):
     Time the workout session ended
     """
 
+    last_update = models.DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+        editable=False,
+        null=True,
+    )
+    """
+    Last time the session was changed, used for the delta feeds of the API. Empty for
+    entries loaded from fixtures
+    """
+
     def __str__(self):
         """
         Return a more human-readable representation
@@ -138,7 +149,11 @@ class WorkoutSession(models.Model):
             'date',
         ]
         unique_together = ('date', 'user', 'routine')
-        indexes = [models.Index(fields=['routine', 'date'])]
+        indexes = [
+            models.Index(fields=['routine', 'date']),
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['user', 'last_update']),
+        ]
 
     def clean(self):
         """
@@ -151,6 +166,8 @@ class WorkoutSession(models.Model):
         if self.time_end and self.time_start and self.time_start > self.time_end:
             raise ValidationError(_('The start time cannot be after the end time.'))
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
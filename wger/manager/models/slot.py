@@ -58,6 +58,8 @@ class Slot(models.Model):
         """
         return f'Set {self.id}'
 
+    owner_user_lookup = 'day__routine__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -18,9 +18,15 @@
 import importlib
 import logging
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    replace,
+)
 from decimal import Decimal
-from typing import List
+from typing import (
+    Iterator,
+    List,
+)
 
 # Django
 from django.conf import settings
@@ -318,6 +324,8 @@ class SlotEntry(models.Model):
 
         return super().save(*args, **kwargs)
 
+    owner_user_lookup = 'slot__day__routine__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -379,46 +387,94 @@ class SlotEntry(models.Model):
         earning one application per qualifying iteration.
         """
 
+        target = max(iteration, 1)
+
+        # Already calculated by get_config_data_range
+        prefetched = getattr(self, '_prefetched_config_data', {})
+        if target in prefetched:
+            return replace(prefetched[target])
+
         # If there are no progressions, the value will be always the same
-        key = CacheKeyMapper.slot_entry_configs_key(self.pk)
+        key = CacheKeyMapper.slot_entry_configs_key(self.pk, self.slot.day.routine_id)
         result = cache.get(key)
         if result and not self.has_progression:
             return result
 
+        # If there is a custom class set, pass all responsibilities to it
+        if self.class_name:
+            return self._get_custom_config_data(iteration)
+
+        for states in self._walk_config_states(target):
+            pass
+        result = self._build_config_data(states)
+
+        cache.set(
+            key,
+            result,
+            settings.WGER_SETTINGS['ROUTINE_CACHE_TTL'],
+        )
+
+        return result
+
+    def get_config_data_range(self, max_iteration: int) -> dict[int, SetConfigData]:
+        """
+        Calculates the configuration for all iterations from 1 to max_iteration.
+
+        The result is the same as calling get_config_data for every iteration,
+        but the configs are only walked once. The data is also kept on the
+        instance, so following calls to get_config_data are served from it.
+        """
+        target = max(max_iteration, 1)
+
+        if self.class_name:
+            result = {i: self._get_custom_config_data(i) for i in range(1, target + 1)}
+        elif not self.has_progression:
+            data = self.get_config_data(1)
+            result = {i: replace(data) for i in range(1, target + 1)}
+        else:
+            result = {
+                i: self._build_config_data(states)
+                for i, states in enumerate(self._walk_config_states(target), start=1)
+            }
+
+        self._prefetched_config_data = result
+        return {i: replace(data) for i, data in result.items()}
+
+    def _get_custom_config_data(self, iteration: int) -> SetConfigData:
+        """Passes the calculation to the custom class set in class_name"""
+        try:
+            module = importlib.import_module(f'wger.manager.config_calculations.{self.class_name}')
+        except ImportError:
+            raise ImportError(f'Class {self.class_name} not found')
+        custom_logic = module.SetCalculations(
+            iteration=iteration,
+            sets_configs=self.setsconfig_set.filter(iteration__lte=iteration),
+            max_sets_configs=self.maxsetsconfig_set.filter(iteration__lte=iteration),
+            weight_configs=self.weightconfig_set.filter(iteration__lte=iteration),
+            max_weight_configs=self.maxweightconfig_set.filter(iteration__lte=iteration),
+            repetition_configs=self.repetitionsconfig_set.filter(iteration__lte=iteration),
+            max_repetition_configs=self.maxrepetitionsconfig_set.filter(iteration__lte=iteration),
+            rir_configs=self.rirconfig_set.filter(iteration__lte=iteration),
+            max_rir_configs=self.maxrirconfig_set.filter(iteration__lte=iteration),
+            rest_configs=self.restconfig_set.filter(iteration__lte=iteration),
+            max_rest_configs=self.maxrestconfig_set.filter(iteration__lte=iteration),
+            logs=self.workoutlog_set.filter(iteration__lte=iteration),
+        )
+
+        return custom_logic.calculate()
+
+    def _walk_config_states(self, target: int) -> Iterator[dict[str, _WalkState]]:
+        """
+        Walks the configs of all fields up to the target iteration and yields
+        the walk states after every iteration
+        """
+
         # Defence-in-depth: ignore any log rows that don't belong to the
         # routine's owner. The API ownership check should already prevent
         # cross-user logs from being attached to a slot entry, but this
         # filter ensures progression calculations stay user-scoped.
         logs = list(self.workoutlog_set.filter(user=self.slot.day.routine.user))
 
-        # If there is a custom class set, pass all responsibilities to it
-        if self.class_name:
-            try:
-                module = importlib.import_module(
-                    f'wger.manager.config_calculations.{self.class_name}'
-                )
-            except ImportError:
-                raise ImportError(f'Class {self.class_name} not found')
-            custom_logic = module.SetCalculations(
-                iteration=iteration,
-                sets_configs=self.setsconfig_set.filter(iteration__lte=iteration),
-                max_sets_configs=self.maxsetsconfig_set.filter(iteration__lte=iteration),
-                weight_configs=self.weightconfig_set.filter(iteration__lte=iteration),
-                max_weight_configs=self.maxweightconfig_set.filter(iteration__lte=iteration),
-                repetition_configs=self.repetitionsconfig_set.filter(iteration__lte=iteration),
-                max_repetition_configs=self.maxrepetitionsconfig_set.filter(
-                    iteration__lte=iteration
-                ),
-                rir_configs=self.rirconfig_set.filter(iteration__lte=iteration),
-                max_rir_configs=self.maxrirconfig_set.filter(iteration__lte=iteration),
-                rest_configs=self.restconfig_set.filter(iteration__lte=iteration),
-                max_rest_configs=self.maxrestconfig_set.filter(iteration__lte=iteration),
-                logs=self.workoutlog_set.filter(iteration__lte=iteration),
-            )
-
-            return custom_logic.calculate()
-
-        target = max(iteration, 1)
         configs_by_field = {
             field: {
                 config.iteration: config
@@ -468,6 +524,10 @@ class SlotEntry(models.Model):
                 )
                 states[field].apply(candidate, is_open, FIELD_CAPS[field])
 
+            yield states
+
+    def _build_config_data(self, states: dict[str, _WalkState]) -> SetConfigData:
+        """Converts the walk states of an iteration to the displayed config data"""
         sets = states['sets'].value
         max_sets = states['maxsets'].value
 
@@ -483,7 +543,7 @@ class SlotEntry(models.Model):
         rest = states['rest'].value
         max_rest = states['maxrest'].value
 
-        result = SetConfigData(
+        return SetConfigData(
             slot_entry_id=self.id,
             exercise=self.exercise_id,
             type=str(self.type),
@@ -517,11 +577,3 @@ class SlotEntry(models.Model):
             if max_rest and rest and max_rest > rest
             else None,
         )
-
-        cache.set(
-            key,
-            result,
-            settings.WGER_SETTINGS['ROUTINE_CACHE_TTL'],
-        )
-
-        return result
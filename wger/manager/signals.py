@@ -16,14 +16,16 @@
 from functools import wraps
 
 # Django
-from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models.signals import (
+    post_delete,
     post_save,
     pre_delete,
 )
+from django.dispatch import Signal
 
 # wger
+from wger.core.signals import record_tombstone
 from wger.gym.helpers import get_user_last_activity
 from wger.manager.helpers import reset_routine_cache
 from wger.manager.models import (
@@ -45,7 +47,13 @@ from wger.manager.models import (
     WorkoutLog,
     WorkoutSession,
 )
-from wger.utils.cache import CacheKeyMapper
+
+
+workout_logs_bulk_saved = Signal()
+"""
+Sent by WorkoutLog.bulk_save() instead of post_save, once for all logs. The
+arguments are the user and the lists of created and updated logs.
+"""
 
 
 def ignore_missing_relations(handler):
@@ -78,6 +86,23 @@ def update_activity_cache(sender, instance, **kwargs):
     user.usercache.save()
 
 
+def handle_workout_logs_bulk_saved(sender, user, created, updated, **kwargs):
+    """
+    Does the work of handle_workout_log_change once for a batch of logs
+    """
+    logs = created + updated
+    if logs:
+        update_activity_cache(sender, logs[0])
+
+    routines = {}
+    for log in logs:
+        if log.routine_id and log.routine_id not in routines:
+            routines[log.routine_id] = log.routine
+
+    for routine in routines.values():
+        reset_routine_cache(routine, structure=False)
+
+
 def update_cache_routine(sender, instance: Routine, **kwargs):
     reset_routine_cache(instance)
 
@@ -106,7 +131,6 @@ def handle_config_change(sender, instance: AbstractChangeConfig, **kwargs):
 def handle_workout_log_change(sender, instance: WorkoutLog, **kwargs):
     update_activity_cache(sender, instance, **kwargs)
     if instance.routine:
-        cache.delete(CacheKeyMapper.routine_api_logs(instance.routine.id, instance.user_id))
         reset_routine_cache(instance.routine, structure=False)
 
 
@@ -114,12 +138,14 @@ def handle_workout_log_change(sender, instance: WorkoutLog, **kwargs):
 def handle_workout_session_change(sender, instance: WorkoutSession, **kwargs):
     update_activity_cache(sender, instance, **kwargs)
     if instance.routine:
-        cache.delete(CacheKeyMapper.routine_api_logs(instance.routine.id, instance.user_id))
         reset_routine_cache(instance.routine, structure=False)
 
 
 post_save.connect(handle_workout_session_change, sender=WorkoutSession)
 post_save.connect(handle_workout_log_change, sender=WorkoutLog)
+workout_logs_bulk_saved.connect(handle_workout_logs_bulk_saved, sender=WorkoutLog)
+post_delete.connect(record_tombstone, sender=WorkoutSession)
+post_delete.connect(record_tombstone, sender=WorkoutLog)
 
 post_save.connect(update_cache_routine, sender=Routine)
 post_save.connect(update_cache_day, sender=Day)
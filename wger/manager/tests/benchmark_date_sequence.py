@@ -0,0 +1,148 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Benchmark for full vs incremental rebuilds of a routine's date sequence
+
+This is not collected by the regular test run, start it explicitly with:
+
+    python manage.py test wger.manager.tests.benchmark_date_sequence
+"""
+
+# Standard Library
+import datetime
+import timeit
+
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.manager.date_sequence import DateSequenceEngine
+from wger.manager.models import (
+    Day,
+    Routine,
+    WorkoutSession,
+)
+from wger.utils.cache import CacheKeyMapper
+
+
+REPEAT = 200
+
+
+class DateSequenceBenchmark(WgerTestCase):
+    """
+    Logs a session on every day of a 120-day routine and compares the time
+    needed to rebuild the sequence from scratch and from the cached state
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        today = timezone.localdate()
+        self.routine = Routine.objects.create(
+            user_id=1,
+            name='Benchmark',
+            start=today - datetime.timedelta(days=Routine.MAX_DURATION_DAYS - 10),
+            end=today + datetime.timedelta(days=9),
+        )
+        self.days = [
+            Day.objects.create(
+                routine=self.routine,
+                order=i,
+                need_logs_to_advance=i % 2 == 0,
+            )
+            for i in range(5)
+        ]
+
+    def print_result(self, name: str, full: float, incremental: float):
+        print(
+            f'{name:<32} full: {full * 1000:8.3f} ms'
+            f'  incremental: {incremental * 1000:8.3f} ms'
+            f'  speedup: {full / incremental:6.1f}x'
+        )
+
+    def test_engine(self):
+        """
+        Only the walk, without any database access
+        """
+        sessions = set()
+        previous = None
+        full_time = 0.0
+        incremental_time = 0.0
+        full_walked = 0
+        incremental_walked = 0
+
+        for offset in range((timezone.localdate() - self.routine.start).days):
+            day = self.days[offset % len(self.days)]
+            sessions.add((day.id, self.routine.start + datetime.timedelta(days=offset)))
+
+            def engine():
+                return DateSequenceEngine(
+                    start=self.routine.start,
+                    end=self.routine.end,
+                    fit_in_week=False,
+                    days=self.days,
+                    sessions=sessions,
+                )
+
+            full = engine()
+            full_time += timeit.timeit(full.build, number=REPEAT) / REPEAT
+            full_walked += full.walked_days
+
+            incremental = engine()
+            incremental_time += (
+                timeit.timeit(lambda: incremental.build(previous), number=REPEAT) / REPEAT
+            )
+            incremental_walked += incremental.walked_days
+
+            self.assertEqual(full.build().entries, incremental.build(previous).entries)
+            previous = full.build()
+
+        print()
+        print(f'{"Walked dates":<32} full: {full_walked:8d}  incremental: {incremental_walked:8d}')
+        self.print_result('Engine, one session per day', full_time, incremental_time)
+
+    def test_date_sequence(self):
+        """
+        The whole date_sequence property, including the queries
+        """
+        state_key = CacheKeyMapper.routine_date_sequence_state_key(self.routine.pk)
+        full_time = 0.0
+        incremental_time = 0.0
+
+        for offset in range((timezone.localdate() - self.routine.start).days):
+            WorkoutSession.objects.create(
+                user_id=1,
+                routine=self.routine,
+                day=self.days[offset % len(self.days)],
+                date=self.routine.start + datetime.timedelta(days=offset),
+            )
+            state = cache.get(state_key)
+
+            def full():
+                cache.set(state_key, None)
+                cache.delete(CacheKeyMapper.routine_date_sequence_key(self.routine.pk))
+                return self.routine.date_sequence
+
+            def incremental():
+                cache.set(state_key, state)
+                cache.delete(CacheKeyMapper.routine_date_sequence_key(self.routine.pk))
+                return self.routine.date_sequence
+
+            full_time += timeit.timeit(full, number=10) / 10
+            incremental_time += timeit.timeit(incremental, number=10) / 10
+
+        self.print_result('date_sequence, one session/day', full_time, incremental_time)
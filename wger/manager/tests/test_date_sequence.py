@@ -0,0 +1,165 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import datetime
+from types import SimpleNamespace
+
+# Django
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.manager.date_sequence import DateSequenceEngine
+from wger.manager.models import (
+    Day,
+    Routine,
+    WorkoutSession,
+)
+from wger.utils.cache import CacheKeyMapper
+
+
+START = datetime.date(2024, 1, 1)
+TODAY = datetime.date(2024, 2, 15)
+
+
+class DateSequenceEngineTestCase(SimpleTestCase):
+    """
+    Test that resuming the walk from a checkpoint gives the same results as a full walk
+    """
+
+    def setUp(self):
+        self.days = [
+            SimpleNamespace(id=1, need_logs_to_advance=True),
+            SimpleNamespace(id=2, need_logs_to_advance=False),
+            SimpleNamespace(id=3, need_logs_to_advance=True),
+        ]
+        self.sessions = {(1, START + datetime.timedelta(days=i)) for i in range(0, 40, 3)}
+        self.sessions |= {(3, START + datetime.timedelta(days=i)) for i in range(2, 40, 5)}
+
+    def engine(self, sessions, today=TODAY, fit_in_week=False):
+        return DateSequenceEngine(
+            start=START,
+            end=START + datetime.timedelta(days=119),
+            fit_in_week=fit_in_week,
+            days=self.days,
+            sessions=sessions,
+            today=today,
+        )
+
+    def test_full_walk(self):
+        engine = self.engine(self.sessions)
+        state = engine.build()
+
+        self.assertEqual(engine.walked_days, 120)
+        self.assertEqual(len(state.entries), 120)
+        self.assertEqual(state.entries[0].day_index, 0)
+        self.assertEqual(state.entries[0].iteration, 1)
+        self.assertEqual(state.horizon, TODAY + datetime.timedelta(days=1))
+
+    def test_resume_after_new_session(self):
+        """
+        A new session only re-walks the dates after it
+        """
+        previous = self.engine(self.sessions).build()
+        sessions = self.sessions | {(1, START + datetime.timedelta(days=41))}
+
+        engine = self.engine(sessions)
+        state = engine.build(previous)
+
+        self.assertEqual(state.entries, self.engine(sessions).build().entries)
+        self.assertEqual(engine.walked_days, 120 - 42)
+
+    def test_resume_after_deleted_session(self):
+        previous = self.engine(self.sessions).build()
+        sessions = self.sessions - {(3, START + datetime.timedelta(days=32))}
+
+        engine = self.engine(sessions)
+        state = engine.build(previous)
+
+        self.assertEqual(state.entries, self.engine(sessions).build().entries)
+        self.assertEqual(engine.walked_days, 120 - 33)
+
+    def test_resume_next_day(self):
+        """
+        Dates after "today" always advance, those must be walked again once time moves on
+        """
+        previous = self.engine(self.sessions).build()
+        tomorrow = TODAY + datetime.timedelta(days=1)
+
+        engine = self.engine(self.sessions, today=tomorrow)
+        state = engine.build(previous)
+
+        self.assertEqual(state.entries, self.engine(self.sessions, today=tomorrow).build().entries)
+        self.assertEqual(engine.walked_days, 120 - (TODAY - START).days - 1)
+
+    def test_resume_fit_in_week(self):
+        previous = self.engine(self.sessions, fit_in_week=True).build()
+        sessions = self.sessions | {(1, START + datetime.timedelta(days=20))}
+
+        engine = self.engine(sessions, fit_in_week=True)
+        state = engine.build(previous)
+
+        self.assertEqual(state.entries, self.engine(sessions, fit_in_week=True).build().entries)
+        self.assertLess(engine.walked_days, 120)
+
+    def test_structure_change_walks_everything(self):
+        previous = self.engine(self.sessions).build()
+        self.days[1].need_logs_to_advance = True
+
+        engine = self.engine(self.sessions)
+        engine.build(previous)
+
+        self.assertEqual(engine.walked_days, 120)
+
+
+class RoutineDateSequenceStateTestCase(WgerTestCase):
+    """
+    Test that the date sequence of a routine reuses its cached state
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.routine = Routine.objects.get(pk=1)
+        self.day = Day.objects.filter(routine=self.routine).first()
+        self.day.need_logs_to_advance = True
+        self.day.save()
+
+    def test_session_keeps_the_state(self):
+        _ = self.routine.date_sequence
+        state_key = CacheKeyMapper.routine_date_sequence_state_key(self.routine.pk)
+        self.assertIsNotNone(cache.get(state_key))
+
+        WorkoutSession(
+            user_id=1,
+            routine=self.routine,
+            day=self.day,
+            date=self.routine.start + datetime.timedelta(days=2),
+        ).save()
+        self.assertIsNotNone(cache.get(state_key))
+
+        sequence = self.routine.date_sequence
+        cache.delete(CacheKeyMapper.routine_date_sequence_key(self.routine.pk))
+        cache.delete(state_key)
+        self.assertEqual(sequence, self.routine.date_sequence)
+
+    def test_structure_change_resets_the_state(self):
+        _ = self.routine.date_sequence
+        self.day.need_logs_to_advance = False
+        self.day.save()
+
+        state_key = CacheKeyMapper.routine_date_sequence_state_key(self.routine.pk)
+        self.assertIsNone(cache.get(state_key))
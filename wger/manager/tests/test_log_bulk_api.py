@@ -0,0 +1,185 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import datetime
+from unittest import mock
+
+# Django
+from django.urls import reverse
+
+# Third Party
+from rest_framework import status
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.manager.api.consts import WORKOUT_LOG_BULK_MAX_ITEMS
+from wger.manager.models import (
+    WorkoutLog,
+    WorkoutSession,
+)
+from wger.trophies.services import TrophyEventService
+
+
+OWN_LOG = 'aaaaaaaa-aaaa-aaaa-aaaa-000000000001'
+
+
+class WorkoutLogBulkApiTestCase(WgerTestCase):
+    """
+    Tests saving several logs with one request
+    """
+
+    url = reverse('workoutlog-bulk')
+
+    def setUp(self):
+        super().setUp()
+        self.user_login('admin')
+        self.date = datetime.date(2030, 6, 15)
+
+    def log_data(self, count, **kwargs):
+        return [
+            {
+                'exercise': 1,
+                'routine': 1,
+                'date': self.date.isoformat(),
+                'weight': 30 + i,
+                'weight_unit': 1,
+                'repetitions': 8,
+                'repetitions_unit': 1,
+                **kwargs,
+            }
+            for i in range(count)
+        ]
+
+    def test_create(self):
+        """
+        All logs are created and share one automatically created session
+        """
+        before = WorkoutLog.objects.count()
+        response = self.client.post(
+            self.url, data=self.log_data(20), content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(len(response.json()), 20)
+        self.assertEqual(WorkoutLog.objects.count(), before + 20)
+
+        sessions = WorkoutSession.objects.filter(user_id=1, routine_id=1, date=self.date)
+        self.assertEqual(sessions.count(), 1)
+        self.assertEqual(
+            WorkoutLog.objects.filter(pk__in=[log['id'] for log in response.json()])
+            .exclude(session=sessions.get())
+            .count(),
+            0,
+        )
+
+    def test_create_and_update(self):
+        """
+        Items with the id of an existing log update it
+        """
+        data = self.log_data(2)
+        data[0]['id'] = OWN_LOG
+        data[0]['weight'] = 99
+
+        before = WorkoutLog.objects.count()
+        response = self.client.post(self.url, data=data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(WorkoutLog.objects.count(), before + 1)
+        self.assertEqual(WorkoutLog.objects.get(pk=OWN_LOG).weight, 99)
+
+    def test_signals_once_per_batch(self):
+        """
+        The trophy events of the logs are queued with one query, not once per log
+        """
+        with mock.patch.object(
+            TrophyEventService,
+            'enqueue_many',
+            wraps=TrophyEventService.enqueue_many,
+        ) as enqueue_many:
+            response = self.client.post(
+                self.url,
+                data=self.log_data(20),
+                content_type='application/json',
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        # Once for the new session and once for all logs
+        self.assertEqual(enqueue_many.call_count, 2)
+        self.assertEqual(len(enqueue_many.call_args.args[1]), 20)
+
+    def test_foreign_routine(self):
+        """
+        A batch with a reference to another user's object is rejected as a whole
+        """
+        data = self.log_data(3)
+        data[2]['routine'] = 3
+
+        before = WorkoutLog.objects.count()
+        response = self.client.post(self.url, data=data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(WorkoutLog.objects.count(), before)
+
+    def test_foreign_log(self):
+        """
+        Logs of other users can't be updated
+        """
+        foreign_log = WorkoutLog.objects.exclude(user_id=1).first()
+        data = self.log_data(1, id=str(foreign_log.pk))
+
+        response = self.client.post(self.url, data=data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_item(self):
+        """
+        A single invalid item rejects the whole batch, with the errors per item
+        """
+        data = self.log_data(3)
+        data[1]['weight_unit'] = None
+
+        before = WorkoutLog.objects.count()
+        response = self.client.post(self.url, data=data, content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(WorkoutLog.objects.count(), before)
+
+    def test_invalid_data(self):
+        """
+        The request must be a list of objects, of a limited size
+        """
+        response = self.client.post(self.url, data={}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url,
+            data=self.log_data(WORKOUT_LOG_BULK_MAX_ITEMS + 1),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url,
+            data=self.log_data(1, id='not-a-uuid'),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anonymous(self):
+        self.user_logout()
+        response = self.client.post(
+            self.url, data=self.log_data(1), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
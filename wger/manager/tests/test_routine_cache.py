@@ -23,7 +23,12 @@ from django.urls import reverse
 # wger
 from wger.core.tests.api_base_test import ApiBaseTestCase
 from wger.core.tests.base_testcase import BaseTestCase
+from wger.manager.helpers import (
+    reset_routine_cache,
+    reset_user_routine_cache,
+)
 from wger.manager.models import (
+    Routine,
     WorkoutLog,
     WorkoutSession,
 )
@@ -113,3 +118,59 @@ class RoutineCacheInvalidationTestCase(BaseTestCase, ApiBaseTestCase):
 
         for key in self.volatile_keys:
             self.assertIsNotNone(cache.get(key))
+
+
+class RoutineCacheGenerationTestCase(BaseTestCase, ApiBaseTestCase):
+    """
+    Tests that resetting the routine caches only bumps the generation counters
+    """
+
+    ROUTINE_ID = 1
+    USER_ID = 1
+
+    def test_reset_is_constant(self):
+        """
+        Resetting the cache doesn't depend on the size of the routine
+        """
+        routine = Routine.objects.get(pk=self.ROUTINE_ID)
+
+        with self.assertNumQueries(0):
+            reset_routine_cache(routine)
+
+    def test_reset_invalidates_all_viewers(self):
+        """
+        The API caches of other users, e.g. trainers, are also invalidated
+        """
+        key = CacheKeyMapper.routine_api_stats(self.ROUTINE_ID, 2)
+        cache.set(key, {'stale': 'data'})
+
+        reset_routine_cache(Routine.objects.get(pk=self.ROUTINE_ID), structure=False)
+
+        self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(CacheKeyMapper.routine_api_stats(self.ROUTINE_ID, 2)))
+
+    def test_reset_user_routine_cache(self):
+        structure_key = CacheKeyMapper.routine_api_structure_key(self.ROUTINE_ID, self.USER_ID)
+        date_sequence_key = CacheKeyMapper.routine_date_sequence_key(self.ROUTINE_ID)
+        cache.set(structure_key, {'stale': 'data'})
+        cache.set(date_sequence_key, ['stale'])
+
+        reset_user_routine_cache(self.USER_ID)
+
+        self.assertIsNone(
+            cache.get(CacheKeyMapper.routine_api_structure_key(self.ROUTINE_ID, self.USER_ID))
+        )
+        self.assertEqual(
+            cache.get(CacheKeyMapper.routine_date_sequence_key(self.ROUTINE_ID)), ['stale']
+        )
+
+    def test_evicted_generation_does_not_reuse_keys(self):
+        """
+        If a generation counter is evicted, it doesn't start again at an old value
+        """
+        key = CacheKeyMapper.routine_api_logs(self.ROUTINE_ID, self.USER_ID)
+        cache.set(key, {'stale': 'data'})
+
+        cache.delete(CacheKeyMapper.routine_generation_key(self.ROUTINE_ID))
+
+        self.assertNotEqual(key, CacheKeyMapper.routine_api_logs(self.ROUTINE_ID, self.USER_ID))
@@ -374,3 +374,46 @@ class RoutineStatisticsTestCase(WgerTestCase):
 
         # No exception happens
         self.routine.calculate_log_statistics()
+
+    def test_null_weight_counts_as_set(self):
+        """
+        Logs without weight are counted as sets but don't change the intensity
+        """
+        WorkoutLog(
+            user_id=1,
+            routine=self.routine,
+            date=datetime.date(2024, 2, 12),
+            repetitions_unit_id=REP_UNIT_REPETITIONS,
+            repetitions=5,
+            weight_unit_id=WEIGHT_UNIT_KG,
+            weight=None,
+            exercise_id=1,
+            iteration=4,
+        ).save()
+
+        stats = self.routine.calculate_log_statistics()
+        self.assertEqual(stats.sets.iteration[4].total, 1)
+        self.assertEqual(stats.volume.iteration[4].total, 0)
+        self.assertEqual(stats.volume.iteration[4].exercises, {1: 0})
+        self.assertNotIn(4, stats.intensity.iteration)
+        self.assertAlmostEqual(float(stats.intensity.mesocycle.total), 0.9629, places=3)
+
+    def test_number_of_queries(self):
+        """
+        The logs and the muscles of their exercises are loaded with one query each
+        """
+        with self.assertNumQueries(2):
+            self.routine.calculate_log_statistics()
+
+    def test_no_logs(self):
+        routine = Routine.objects.create(
+            user_id=1,
+            name='Empty routine',
+            start=datetime.date(2024, 1, 1),
+            end=datetime.date(2024, 1, 10),
+        )
+
+        stats = routine.calculate_log_statistics()
+        self.assertEqual(stats.sets.mesocycle, LogData())
+        self.assertEqual(stats.volume.daily, {})
+        self.assertEqual(stats.intensity.mesocycle.total, 0)
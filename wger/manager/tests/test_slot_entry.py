@@ -1189,18 +1189,22 @@ class SlotEntryTestCase(WgerTestCase):
     def test_cache_get_config_data(self):
         """Tests that cache used in get_config_data is correctly (re)set"""
 
-        key = CacheKeyMapper.slot_entry_configs_key(self.slot_entry.pk)
+        def key():
+            return CacheKeyMapper.slot_entry_configs_key(
+                self.slot_entry.pk,
+                self.slot_entry.slot.day.routine_id,
+            )
 
         set_config = SetsConfig(slot_entry=self.slot_entry, iteration=1, value=4)
         set_config.save()
 
-        self.assertIsNone(cache.get(key))
+        self.assertIsNone(cache.get(key()))
         self.slot_entry.get_config_data(1)
-        self.assertTrue(cache.get(key))
+        self.assertTrue(cache.get(key()))
 
         set_config.value = 5
         set_config.save()
-        self.assertIsNone(cache.get(key))
+        self.assertIsNone(cache.get(key()))
 
     def test_delayed_config_not_served_from_constant_cache(self):
         """
@@ -1216,6 +1220,46 @@ class SlotEntryTestCase(WgerTestCase):
         # Iteration 3 must reflect the config, not the cached iteration-1 result
         self.assertEqual(self.slot_entry.get_config_data(3).weight, Decimal(100))
 
+    def test_get_config_data_range(self):
+        """
+        The bulk walk returns the same data as one walk per iteration
+        """
+        self._setup_gated_weight_progression()
+        MaxWeightConfig(slot_entry=self.slot_entry, iteration=1, value=25).save()
+        SetsConfig(slot_entry=self.slot_entry, iteration=4, value=3).save()
+
+        self._log_repetitions(iteration=1, repetitions=5)
+        self._log_repetitions(iteration=2, repetitions=3)
+        self._log_repetitions(iteration=3, repetitions=5)
+        self._log_repetitions(iteration=5, repetitions=5)
+
+        expected = {i: self.slot_entry.get_config_data(i) for i in range(1, 9)}
+        self.assertEqual(
+            SlotEntry.objects.get(pk=self.slot_entry.pk).get_config_data_range(8), expected
+        )
+
+    def test_get_config_data_range_no_progression(self):
+        SetsConfig(slot_entry=self.slot_entry, iteration=1, value=4).save()
+
+        result = self.slot_entry.get_config_data_range(3)
+        self.assertEqual(list(result), [1, 2, 3])
+        self.assertEqual({data.sets for data in result.values()}, {4})
+
+    def test_get_config_data_range_is_reused(self):
+        """
+        get_config_data is served from the bulk walk and returns copies
+        """
+        self._setup_gated_weight_progression()
+        self._log_repetitions(iteration=1, repetitions=5)
+
+        self.slot_entry.get_config_data_range(4)
+        with self.assertNumQueries(0):
+            data = self.slot_entry.get_config_data(2)
+        self.assertEqual(data.weight, Decimal('22.5'))
+
+        data.sets = 10
+        self.assertEqual(self.slot_entry.get_config_data(2).sets, 1)
+
 
 class WalkConfigValuesTestCase(SimpleTestCase):
     """
@@ -24,6 +24,7 @@ from wger.measurements.models import (
     Category,
     Measurement,
 )
+from wger.utils.timeseries import TimeSeriesSerializer
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -58,4 +59,13 @@ class MeasurementSerializer(serializers.ModelSerializer):
             'date',
             'value',
             'notes',
+            'last_update',
         )
+
+
+class MeasurementTimeSeriesSerializer(TimeSeriesSerializer):
+    """
+    Time series of the measurements, one per category
+    """
+
+    category = serializers.UUIDField()
@@ -30,11 +30,14 @@ from wger.measurements.api.filtersets import MeasurementEntryFilterSet
 from wger.measurements.api.serializers import (
     CategorySerializer,
     MeasurementSerializer,
+    MeasurementTimeSeriesSerializer,
 )
 from wger.measurements.models import (
     Category,
     Measurement,
 )
+from wger.utils.sync import SyncViewSetMixin
+from wger.utils.timeseries import TimeSeriesViewSetMixin
 from wger.utils.viewsets import WgerOwnerObjectModelViewSet
 
 
@@ -76,13 +79,17 @@ class CategoryViewSet(WgerOwnerObjectModelViewSet):
         return [(User, 'user')]
 
 
-class MeasurementViewSet(WgerOwnerObjectModelViewSet):
+class MeasurementViewSet(SyncViewSetMixin, TimeSeriesViewSetMixin, WgerOwnerObjectModelViewSet):
     """
     API endpoint for measurements
     """
 
     permission_classes = [IsAuthenticated]
     serializer_class = MeasurementSerializer
+    time_series_name = 'measurement'
+    time_series_value_field = 'value'
+    time_series_group_by = ('category',)
+    time_series_serializer_class = MeasurementTimeSeriesSerializer
     is_private = True
     ordering_fields = '__all__'
     filterset_class = MeasurementEntryFilterSet
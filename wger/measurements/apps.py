@@ -1,3 +1,4 @@
+# Django
 from django.apps import AppConfig
 
 
@@ -5,3 +6,6 @@ class MeasurementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'wger.measurements'
     verbose_name = 'Measurements'
+
+    def ready(self):
+        import wger.measurements.signals
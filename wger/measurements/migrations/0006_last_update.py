@@ -0,0 +1,27 @@
+# Generated by Django 6.0.9 on 2026-10-18 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('measurements', '0005_alter_measurement_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurement',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Last update'),
+        ),
+        migrations.AddIndex(
+            model_name='measurement',
+            index=models.Index(fields=['category', 'id'], name='measurement_categor_38fc8d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='measurement',
+            index=models.Index(
+                fields=['category', 'last_update'], name='measurement_categor_8943a1_idx'
+            ),
+        ),
+    ]
@@ -48,6 +48,8 @@ class Category(models.Model):
         max_length=30,
     )
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
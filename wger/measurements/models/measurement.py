@@ -31,6 +31,10 @@ class Measurement(models.Model):
         ordering = [
             '-date',
         ]
+        indexes = [
+            models.Index(fields=['category', 'id']),
+            models.Index(fields=['category', 'last_update']),
+        ]
 
     id = models.UUIDField(
         default=uuid7,
@@ -64,6 +68,19 @@ class Measurement(models.Model):
         blank=True,
     )
 
+    last_update = models.DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+        editable=False,
+        null=True,
+    )
+    """
+    Last time the measurement was changed, used for the delta feeds of the API. Empty for
+    entries loaded from fixtures
+    """
+
+    owner_user_lookup = 'category__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Django
+from django.contrib.auth.models import User
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+# wger
+from wger.core.signals import record_tombstone
+from wger.measurements.models import (
+    Category,
+    Measurement,
+)
+from wger.utils.timeseries import reset_time_series_cache
+
+
+@receiver(post_save, sender=Measurement)
+@receiver(post_delete, sender=Measurement)
+def reset_measurement_time_series(sender, instance: Measurement, **kwargs):
+    """
+    Resets the cached measurement time series of the entry's user
+    """
+    # When a whole category or user is deleted, the cache is reset once for it
+    origin = kwargs.get('origin')
+    if isinstance(origin, (Category, User)) or getattr(origin, 'model', None) in (Category, User):
+        return
+
+    user_ids = Category.objects.filter(pk=instance.category_id).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        reset_time_series_cache('measurement', user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_category_time_series(sender, instance: Category, **kwargs):
+    """
+    Resets the cached measurement time series of the category's user
+    """
+    reset_time_series_cache('measurement', instance.user_id)
+
+
+post_delete.connect(record_tombstone, sender=Measurement)
@@ -12,8 +12,15 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.core.cache import cache
+from django.urls import reverse
+
 # wger
 from wger.core.tests import api_base_test
+from wger.core.tests.api_base_test import ApiBaseTestCase
+from wger.core.tests.base_testcase import BaseTestCase
 from wger.measurements.models import Measurement
 
 
@@ -30,3 +37,35 @@ class MeasurementsApiTestCase(api_base_test.ApiBaseResourceTestCase):
         'date': '2021-08-12',
         'value': 99.99,
     }
+
+
+class MeasurementsTimeSeriesApiTestCase(BaseTestCase, ApiBaseTestCase):
+    """
+    Tests the aggregated and downsampled measurement time series
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authenticate('test')
+
+    def test_series_per_category(self):
+        measurements = Measurement.objects.filter(category__user__username='test')
+        response = self.client.get(reverse('measurement-timeseries'), {'bucket': 'day'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(sum(day['count'] for day in data), measurements.count())
+        self.assertEqual(
+            {day['category'] for day in data},
+            {str(pk) for pk in measurements.values_list('category', flat=True)},
+        )
+
+    def test_cache_is_invalidated_on_write(self):
+        url = reverse('measurement-timeseries')
+        count = len(self.client.get(url, {'points': 100}).json())
+
+        measurement = Measurement.objects.filter(category__user__username='test').first()
+        Measurement.objects.create(category=measurement.category, value=10)
+
+        self.assertEqual(len(self.client.get(url, {'points': 100}).json()), count + 1)
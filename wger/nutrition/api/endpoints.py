@@ -2,3 +2,6 @@ IMAGE_ENDPOINT = 'ingredient-image'
 INGREDIENTS_ENDPOINT = 'ingredient'
 INGREDIENTS_SYNC_ENDPOINT = 'ingredient-sync'
 INGREDIENT_BULK_EXPORT_PATH = 'ingredients/ingredients.jsonl.gz'
+INGREDIENT_SEGMENTS_PATH = 'ingredients/segments'
+INGREDIENT_SEGMENTS_MANIFEST_PATH = 'ingredients/segments/manifest.json'
+INGREDIENT_SEGMENTS_SYNC_STATE_PATH = 'ingredients/segments-synced.json'
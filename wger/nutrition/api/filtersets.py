@@ -35,7 +35,9 @@ from django_filters import rest_framework as filters
 
 # wger
 from wger.core.models import Language
+from wger.nutrition.barcode import resolve_barcode
 from wger.nutrition.models import (
+    DiaryDay,
     Ingredient,
     LogItem,
 )
@@ -73,6 +75,15 @@ class LogItemFilterSet(filters.FilterSet):
         }
 
 
+class DiaryDayFilterSet(filters.FilterSet):
+    class Meta:
+        model = DiaryDay
+        fields = {
+            'date': ['exact', 'gte', 'lte'],
+            'plan': ['exact'],
+        }
+
+
 class IngredientFilterSet(filters.FilterSet):
     code = filters.CharFilter(method='search_barcode')
     name__search = filters.CharFilter(method='search_name_fulltext')
@@ -88,7 +99,9 @@ class IngredientFilterSet(filters.FilterSet):
         """
         'exact' search for the barcode.
 
-        It this is not known locally, try fetching the result from OFF
+        It this is not known locally, try fetching the result from OFF, see
+        resolve_barcode(). In the asynchronous mode, the result is empty until
+        the lookup finished.
         """
 
         if not value:
@@ -97,9 +110,9 @@ class IngredientFilterSet(filters.FilterSet):
         result = queryset.filter(code=value)
         if not result.exists():
             logger.debug('barcode not found locally, trying to fetch ingredient from OFF')
-            ingredient = Ingredient.fetch_ingredient_from_off(value)
-            if ingredient is not None:
-                result = queryset.filter(pk=ingredient.pk)
+            lookup = resolve_barcode(value)
+            if lookup.ingredient is not None:
+                result = queryset.filter(pk=lookup.ingredient.pk)
 
         return result
 
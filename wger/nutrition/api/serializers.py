@@ -30,6 +30,7 @@ from wger.core.api.serializers import (
     LanguageSerializer,
     LicenseSerializer,
 )
+from wger.nutrition.barcode import BarcodeStatus
 from wger.nutrition.models import (
     Image,
     Ingredient,
@@ -209,6 +210,15 @@ class IngredientInfoSerializer(serializers.ModelSerializer):
         return result
 
 
+class BarcodeLookupSerializer(serializers.Serializer):
+    """
+    Result of a barcode lookup
+    """
+
+    status = serializers.ChoiceField(choices=[status.value for status in BarcodeStatus])
+    ingredient = IngredientInfoSerializer(allow_null=True)
+
+
 class MealItemSerializer(serializers.ModelSerializer):
     """
     MealItem serializer
@@ -243,6 +253,7 @@ class LogItemSerializer(serializers.ModelSerializer):
             'weight_unit',
             'datetime',
             'amount',
+            'last_update',
         )
 
 
@@ -308,6 +319,15 @@ class NutritionalValuesSerializer(serializers.Serializer):
     sodium = serializers.FloatField(allow_null=True)
 
 
+class DailyNutritionalValuesSerializer(NutritionalValuesSerializer):
+    """
+    Summed nutritional values of the diary entries of a plan on one day
+    """
+
+    plan = serializers.UUIDField(source='plan_id')
+    date = serializers.DateField()
+
+
 class IngredientValuesSerializer(NutritionalValuesSerializer):
     """
     Nutritional values for a given amount and unit of an ingredient.
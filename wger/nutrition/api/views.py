@@ -31,16 +31,23 @@ from drf_spectacular.utils import (
     OpenApiParameter,
     extend_schema,
 )
-from rest_framework import viewsets
+from rest_framework import (
+    status,
+    viewsets,
+)
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 # wger
 from wger.nutrition.api.filtersets import (
+    DiaryDayFilterSet,
     IngredientFilterSet,
     LogItemFilterSet,
 )
 from wger.nutrition.api.serializers import (
+    BarcodeLookupSerializer,
+    DailyNutritionalValuesSerializer,
     IngredientImageSerializer,
     IngredientInfoSerializer,
     IngredientSerializer,
@@ -53,8 +60,17 @@ from wger.nutrition.api.serializers import (
     NutritionPlanInfoSerializer,
     NutritionPlanSerializer,
 )
+from wger.nutrition.barcode import (
+    BarcodeStatus,
+    resolve_barcode,
+)
 from wger.nutrition.forms import UnitChooserForm
+from wger.nutrition.helpers import (
+    nutritional_values_aggregates,
+    nutritional_values_expressions,
+)
 from wger.nutrition.models import (
+    DiaryDay,
     Image,
     Ingredient,
     IngredientWeightUnit,
@@ -64,6 +80,7 @@ from wger.nutrition.models import (
     NutritionPlan,
 )
 from wger.utils.pagination import IngredientCursorPagination
+from wger.utils.sync import SyncViewSetMixin
 from wger.utils.viewsets import WgerOwnerObjectModelViewSet
 
 
@@ -105,6 +122,43 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
         self.throttle_scope = 'ingredient_list' if self.action == 'list' else 'ingredient_detail'
         return super().get_throttles()
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'code',
+                OpenApiTypes.STR,
+                OpenApiParameter.QUERY,
+                required=True,
+                description='The barcode to look up',
+            ),
+        ],
+        responses={200: BarcodeLookupSerializer, 202: BarcodeLookupSerializer},
+    )
+    @action(detail=False, pagination_class=None)
+    def barcode(self, request):
+        """
+        Looks up an ingredient by its barcode, on Open Food Facts if it is not
+        in the local database
+
+        If the lookup runs in the background, the status is "pending" (with
+        a 202 response) until it finished, so clients can poll this endpoint.
+        """
+        code = request.query_params.get('code')
+        if not code:
+            raise ValidationError({'code': 'This parameter is required'})
+
+        lookup = resolve_barcode(code)
+        out = BarcodeLookupSerializer(
+            {'status': lookup.status.value, 'ingredient': lookup.ingredient},
+            context=self.get_serializer_context(),
+        ).data
+        return Response(
+            out,
+            status=status.HTTP_202_ACCEPTED
+            if lookup.status == BarcodeStatus.PENDING
+            else status.HTTP_200_OK,
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -329,7 +383,9 @@ class NutritionPlanInfoViewSet(NutritionPlanViewSet):
         return NutritionPlan.objects.filter(user=self.request.user).prefetch_related(
             Prefetch(
                 'meal_set',
-                queryset=Meal.objects.prefetch_related(
+                queryset=Meal.objects.annotate(
+                    **nutritional_values_aggregates('mealitem__')
+                ).prefetch_related(
                     Prefetch(
                         'mealitem_set',
                         queryset=MealItem.objects.select_related(
@@ -372,7 +428,10 @@ class MealViewSet(WgerOwnerObjectModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return Meal.objects.none()
 
-        return Meal.objects.filter(plan__user=self.request.user)
+        queryset = Meal.objects.filter(plan__user=self.request.user)
+        if self.action == 'nutritional_values':
+            queryset = queryset.annotate(**nutritional_values_aggregates('mealitem__'))
+        return queryset
 
     def perform_create(self, serializer):
         """
@@ -446,7 +505,7 @@ class MealItemViewSet(WgerOwnerObjectModelViewSet):
         return Response(serializer.data)
 
 
-class LogItemViewSet(WgerOwnerObjectModelViewSet):
+class LogItemViewSet(SyncViewSetMixin, WgerOwnerObjectModelViewSet):
     """
     API endpoint for a meal log item
     """
@@ -464,7 +523,10 @@ class LogItemViewSet(WgerOwnerObjectModelViewSet):
         if getattr(self, 'swagger_fake_view', False):
             return LogItem.objects.none()
 
-        return LogItem.objects.select_related('plan').filter(plan__user=self.request.user)
+        queryset = LogItem.objects.select_related('plan').filter(plan__user=self.request.user)
+        if self.action == 'nutritional_values':
+            queryset = queryset.annotate(**nutritional_values_expressions())
+        return queryset
 
     @staticmethod
     def get_owner_objects():
@@ -481,3 +543,31 @@ class LogItemViewSet(WgerOwnerObjectModelViewSet):
         """
         serializer = NutritionalValuesSerializer(self.get_object().get_nutritional_values())
         return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('plan', OpenApiTypes.UUID, description='Only days of this plan'),
+            OpenApiParameter('date', OpenApiTypes.DATE),
+            OpenApiParameter('date__gte', OpenApiTypes.DATE),
+            OpenApiParameter('date__lte', OpenApiTypes.DATE),
+        ],
+        responses={200: DailyNutritionalValuesSerializer(many=True)},
+    )
+    @action(detail=False)
+    def nutritional_values_by_day(self, request):
+        """
+        Return the summed nutritional values of the diary entries per plan and day
+
+        The values are read from the daily rollups, so that e.g. a whole year is
+        a single range scan.
+        """
+        filterset = DiaryDayFilterSet(
+            request.query_params,
+            queryset=DiaryDay.objects.filter(user=request.user).order_by('date', 'plan_id'),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        serializer = DailyNutritionalValuesSerializer(filterset.qs, many=True)
+        return Response(serializer.data)
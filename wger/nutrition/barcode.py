@@ -0,0 +1,170 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Resolution of barcodes that are not in the local database with Open Food Facts
+
+Looking up a barcode on OFF blocks for up to a few seconds, so:
+
+- barcodes that OFF doesn't know, or that failed to load, are remembered for
+  OFF_BARCODE_MISS_TTL and OFF_BARCODE_ERROR_TTL seconds respectively
+- a barcode is only looked up once at a time, concurrent lookups of the same
+  barcode wait for the running one instead of sending their own request
+- with OFF_BARCODE_LOOKUP_ASYNC, the lookup runs in the background and the
+  caller gets BarcodeStatus.PENDING right away, to ask again later
+"""
+
+# Standard Library
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+# wger
+from wger.nutrition.models import Ingredient
+from wger.nutrition.models.ingredient import OFF_REQUEST_ERRORS
+from wger.utils.cache import CacheKeyMapper
+
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_TIMEOUT = 30
+"""Seconds after which a lookup is considered failed, e.g. if its worker died"""
+
+LOOKUP_POLL_INTERVAL = 0.1
+"""Seconds between the checks whether a concurrent lookup finished"""
+
+
+class BarcodeStatus(str, Enum):
+    FOUND = 'found'
+    NOT_FOUND = 'not_found'
+    PENDING = 'pending'
+
+
+class BarcodeResult(NamedTuple):
+    status: BarcodeStatus
+    ingredient: Optional[Ingredient] = None
+
+
+def resolve_barcode(code: str, asynchronous: Optional[bool] = None) -> BarcodeResult:
+    """
+    Returns the ingredient with the given barcode, looking it up on OFF if it
+    is not in the local database
+
+    :param code: The barcode.
+    :param asynchronous: Whether to look the barcode up in the background and
+        return PENDING instead of waiting for it. Defaults to the
+        OFF_BARCODE_LOOKUP_ASYNC setting.
+    """
+    if asynchronous is None:
+        asynchronous = settings.WGER_SETTINGS['OFF_BARCODE_LOOKUP_ASYNC']
+
+    result = _get_known(code)
+    if result is not None:
+        return result
+
+    if cache.add(CacheKeyMapper.off_barcode_lookup_key(code), True, LOOKUP_TIMEOUT):
+        if asynchronous:
+            _schedule_lookup(code)
+            return BarcodeResult(BarcodeStatus.PENDING)
+        return lookup_barcode(code)
+
+    # Someone else is already looking the barcode up
+    if asynchronous:
+        return BarcodeResult(BarcodeStatus.PENDING)
+
+    deadline = time.monotonic() + LOOKUP_TIMEOUT
+    while cache.get(CacheKeyMapper.off_barcode_lookup_key(code)) and time.monotonic() < deadline:
+        time.sleep(LOOKUP_POLL_INTERVAL)
+
+    return _get_known(code) or BarcodeResult(BarcodeStatus.NOT_FOUND)
+
+
+def lookup_barcode(code: str) -> BarcodeResult:
+    """
+    Looks up a barcode on OFF and remembers a miss or error
+
+    The caller must hold the lookup key of the barcode, it is released once
+    the result is stored. Use resolve_barcode() instead of calling this directly.
+    """
+    try:
+        try:
+            ingredient = Ingredient.fetch_ingredient_from_off(code, raise_errors=True)
+        except OFF_REQUEST_ERRORS:
+            cache.set(
+                CacheKeyMapper.off_barcode_miss_key(code),
+                True,
+                settings.WGER_SETTINGS['OFF_BARCODE_ERROR_TTL'],
+            )
+            return BarcodeResult(BarcodeStatus.NOT_FOUND)
+
+        if ingredient is None:
+            cache.set(
+                CacheKeyMapper.off_barcode_miss_key(code),
+                True,
+                settings.WGER_SETTINGS['OFF_BARCODE_MISS_TTL'],
+            )
+            return BarcodeResult(BarcodeStatus.NOT_FOUND)
+
+        return BarcodeResult(BarcodeStatus.FOUND, ingredient)
+    finally:
+        # Only now, so that the waiting lookups find the ingredient or the miss
+        cache.delete(CacheKeyMapper.off_barcode_lookup_key(code))
+
+
+def _get_known(code: str) -> Optional[BarcodeResult]:
+    """
+    Returns the result for a barcode that is in the local database or is
+    remembered as a miss, None otherwise
+    """
+    ingredient = Ingredient.objects.filter(code=code).first()
+    if ingredient is not None:
+        return BarcodeResult(BarcodeStatus.FOUND, ingredient)
+
+    if cache.get(CacheKeyMapper.off_barcode_miss_key(code)):
+        return BarcodeResult(BarcodeStatus.NOT_FOUND)
+
+    return None
+
+
+def _schedule_lookup(code: str):
+    if settings.WGER_SETTINGS['USE_CELERY']:
+        # wger
+        from wger.nutrition.tasks import lookup_barcode_task
+
+        lookup_barcode_task.delay(code)
+    else:
+        barcode_executor.submit(_lookup_in_background, code)
+
+
+def _lookup_in_background(code: str):
+    try:
+        lookup_barcode(code)
+    except Exception as e:
+        logger.error(f'Error looking up barcode {code}: {e}', exc_info=True)
+    finally:
+        close_old_connections()
+
+
+barcode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='wger-barcode')
+"""Runs the lookups of this process in the background, used when Celery is not available"""
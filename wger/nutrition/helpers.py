@@ -21,7 +21,26 @@ from dataclasses import (
     dataclass,
 )
 from decimal import Decimal
-from typing import Union
+from typing import (
+    Dict,
+    Union,
+)
+
+# Django
+from django.apps import apps
+from django.db.models import (
+    DecimalField,
+    Expression,
+    ExpressionWrapper,
+    F,
+    Sum,
+    Value,
+)
+from django.db.models.functions import (
+    Coalesce,
+    NullIf,
+    Round,
+)
 
 # wger
 from wger.nutrition.consts import KJ_PER_KCAL
@@ -43,8 +62,13 @@ class BaseMealItem:
         """
         Sums the nutritional info for the ingredient in the MealItem
 
-        All values are in grams
+        All values are in grams. If the item was loaded annotated with
+        nutritional_values_expressions, the values calculated by the database
+        are used.
         """
+        if NutritionalValues.is_annotated(self):
+            return NutritionalValues.from_dict(self.__dict__)
+
         values = NutritionalValues()
 
         # Calculate the base weight of the item
@@ -117,6 +141,99 @@ class NutritionalValues:
     def to_dict(self):
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NutritionalValues':
+        """
+        Reads the values from a row annotated with nutritional_values_expressions
+        or nutritional_values_aggregates
+        """
+        return cls(**{name: data[name] for name in NUTRITIONAL_VALUES_FIELDS})
+
+    @staticmethod
+    def is_annotated(instance) -> bool:
+        """
+        Whether the model instance was loaded with the nutritional values annotated
+        """
+        return all(name in instance.__dict__ for name in NUTRITIONAL_VALUES_FIELDS)
+
+
+NUTRITIONAL_VALUES_FIELDS = (
+    'energy',
+    'protein',
+    'carbohydrates',
+    'carbohydrates_sugar',
+    'fat',
+    'fat_saturated',
+    'fiber',
+    'sodium',
+)
+
+OPTIONAL_NUTRITIONAL_VALUES_FIELDS = (
+    'carbohydrates_sugar',
+    'fat_saturated',
+    'fiber',
+    'sodium',
+)
+
+
+def nutritional_values_output_field():
+    """
+    Output field for the calculated values
+
+    Values of an item have at most seven decimal places (three for the
+    ingredient, two for the amount and two for the division by 100).
+    """
+    return DecimalField(max_digits=20, decimal_places=7)
+
+
+def nutritional_values_expressions(prefix: str = '') -> Dict[str, Expression]:
+    """
+    Database version of BaseMealItem.get_nutritional_values
+
+    Returns, for each nutritional value, an expression that calculates it for a
+    meal or log item. The prefix is the path to the item, e.g. 'mealitem__' when
+    annotating meals. The weight unit is converted to grams in the query, optional
+    values that are not set (or 0) for the ingredient are NULL.
+    """
+    ingredient_model = apps.get_model('nutrition', 'Ingredient')
+    grams = F(f'{prefix}amount') * Coalesce(F(f'{prefix}weight_unit__gram'), 1)
+
+    expressions = {}
+    for name in NUTRITIONAL_VALUES_FIELDS:
+        value = F(f'{prefix}ingredient__{name}')
+
+        # Round like the values are when loaded into the model, not all databases
+        # enforce the field's decimal places when storing them
+        decimal_places = getattr(ingredient_model._meta.get_field(name), 'decimal_places', None)
+        if decimal_places is not None:
+            value = Round(value, decimal_places)
+
+        if name in OPTIONAL_NUTRITIONAL_VALUES_FIELDS:
+            value = NullIf(value, Value(0))
+
+        expressions[name] = ExpressionWrapper(
+            value * grams * Value(Decimal('0.01')),
+            output_field=nutritional_values_output_field(),
+        )
+    return expressions
+
+
+def nutritional_values_aggregates(prefix: str = '') -> Dict[str, Expression]:
+    """
+    Sums of nutritional_values_expressions, same as adding NutritionalValues
+
+    Optional values stay NULL if none of the items has them.
+    """
+    aggregates = {}
+    for name, expression in nutritional_values_expressions(prefix).items():
+        aggregate = Sum(expression, output_field=nutritional_values_output_field())
+        if name not in OPTIONAL_NUTRITIONAL_VALUES_FIELDS:
+            aggregate = Coalesce(
+                aggregate, Value(0), output_field=nutritional_values_output_field()
+            )
+        aggregates[name] = aggregate
+    return aggregates
+
 
 def remove_problematic_characters(
     string: str, characters_to_be_removed: set[str] = CHARACTERS_TO_REMOVE_FROM_INGREDIENT_NAME
@@ -28,6 +28,7 @@ from django.utils import timezone
 
 # wger
 from wger.nutrition.models import (
+    DiaryDay,
     Ingredient,
     LogItem,
     Meal,
@@ -150,3 +151,4 @@ class Command(BaseCommand):
                     self.stdout.write(f'  created {options["nr_diary_dates"]} diary entries')
 
             LogItem.objects.bulk_create(diary_entries)
+            DiaryDay.rebuild(NutritionPlan.objects.filter(user=user))
@@ -15,6 +15,7 @@
 # Standard Library
 import logging
 import os
+from gzip import GzipFile
 
 # Third Party
 import requests
@@ -26,7 +27,10 @@ from wger.nutrition.consts import (
     SyncMode,
 )
 from wger.nutrition.extract_info.off import extract_info_from_off
-from wger.nutrition.management.products import ImportProductCommand
+from wger.nutrition.management.products import (
+    ImportProductCommand,
+    parse_off_lines,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -86,11 +90,12 @@ class Command(ImportProductCommand):
         for product in db.products.find({'lang': {'$in': list(languages.keys())}}):
             try:
                 ingredient_data = extract_info_from_off(product, languages[product['lang']])
-            except (KeyError, ValueError):
+            except (KeyError, ValueError, TypeError):
                 # self.stdout.write(f'--> KeyError while extracting info from OFF: {e}')
                 self.counter['skipped'] += 1
             else:
                 self.process_ingredient(ingredient_data)
+        self.flush()
 
     def import_daily_delta(self, languages: dict[str, int], destination: str):
         download_folder, tmp_folder = self.get_download_folder(destination)
@@ -108,14 +113,8 @@ class Command(ImportProductCommand):
         self.download_file(delta_url, file_path)
 
         self.stdout.write('Start processing...')
-        for entry in self.iterate_gz_file_contents(file_path, list(languages.keys())):
-            try:
-                ingredient_data = extract_info_from_off(entry, languages[entry['lang']])
-            except (KeyError, ValueError) as e:
-                self.stdout.write(f'--> Error while extracting info from OFF: {e}')
-                self.counter['skipped'] += 1
-            else:
-                self.process_ingredient(ingredient_data)
+        with GzipFile(file_path, 'rb') as dump:
+            self.import_lines(file_path, dump, parse_off_lines, languages)
 
         if tmp_folder:
             self.stdout.write(f'Removing temporary folder {download_folder}')
@@ -128,14 +127,8 @@ class Command(ImportProductCommand):
         self.download_file(OFF_FULL_DUMP_URL, file_path)
 
         self.stdout.write('Start processing...')
-        for entry in self.iterate_gz_file_contents(file_path, list(languages.keys())):
-            try:
-                ingredient_data = extract_info_from_off(entry, languages[entry['lang']])
-            except (KeyError, ValueError) as e:
-                self.stdout.write(f'--> Error while extracting info from OFF: {e}')
-                self.counter['skipped'] += 1
-            else:
-                self.process_ingredient(ingredient_data)
+        with GzipFile(file_path, 'rb') as dump:
+            self.import_lines(file_path, dump, parse_off_lines, languages)
 
         if tmp_folder:
             self.stdout.write(f'Removing temporary folder {download_folder}')
@@ -144,6 +137,7 @@ class Command(ImportProductCommand):
     def handle(self, **options):
         if options['mode'] == 'insert':
             self.mode = SyncMode.INSERT
+        self.workers = options['workers']
 
         languages = {lang.short_name: lang.pk for lang in Language.objects.all()}
 
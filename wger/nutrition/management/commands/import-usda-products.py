@@ -13,17 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Standard Library
-import json
 import logging
 import os
-from json import JSONDecodeError
 from zipfile import ZipFile
 
 # wger
 from wger.core.models import Language
 from wger.nutrition.consts import SyncMode
-from wger.nutrition.extract_info.usda import extract_info_from_usda
-from wger.nutrition.management.products import ImportProductCommand
+from wger.nutrition.management.products import (
+    ImportProductCommand,
+    parse_usda_lines,
+)
 from wger.utils.constants import ENGLISH_SHORT_NAME
 
 
@@ -52,6 +52,7 @@ class Command(ImportProductCommand):
     def handle(self, **options):
         if options['mode'] == 'insert':
             self.mode = SyncMode.INSERT
+        self.workers = options['workers']
 
         dataset_url = f'https://fdc.nal.usda.gov/fdc-datasets/{options["dataset"]}'
         download_folder, tmp_folder = self.get_download_folder(options['folder'])
@@ -87,30 +88,7 @@ class Command(ImportProductCommand):
         # Since the file is almost JSONL, just process each line individually
         self.stdout.write('Start processing...')
         with open(extracted_file_path, 'r') as extracted_file:
-            for line in extracted_file.readlines():
-                # Try to skip the first and last lines in the file
-                if 'FoundationFoods' in line or 'BrandedFoods' in line:
-                    continue
-
-                if line.strip() == '}':
-                    continue
-
-                try:
-                    json_data = json.loads(line.strip().strip(','))
-                except JSONDecodeError as e:
-                    self.stdout.write(f'--> Error while decoding JSON: {e}')
-                    continue
-
-                try:
-                    ingredient_data = extract_info_from_usda(json_data, english.pk)
-                except KeyError as e:
-                    self.stdout.write(f'--> KeyError while extracting ingredient info: {e}')
-                    self.counter['skipped'] += 1
-                except ValueError as e:
-                    self.stdout.write(f'--> ValueError while extracting ingredient info: {e}')
-                    self.counter['skipped'] += 1
-                else:
-                    self.process_ingredient(ingredient_data)
+            self.import_lines(extracted_file_path, extracted_file, parse_usda_lines, english.pk)
 
         if tmp_folder:
             self.stdout.write(f'Removing temporary folder {download_folder}')
@@ -0,0 +1,44 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Django
+from django.core.management.base import BaseCommand
+
+# wger
+from wger.nutrition.models import (
+    DiaryDay,
+    NutritionPlan,
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily rollups of the nutrition diary from the logged entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            action='store',
+            dest='user_id',
+            type=int,
+            default=None,
+            help='Only rebuild the diary of this user',
+        )
+
+    def handle(self, *args, **options):
+        plans = None
+        if options['user_id']:
+            plans = NutritionPlan.objects.filter(user_id=options['user_id'])
+
+        count = DiaryDay.rebuild(plans)
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} diary days!'))
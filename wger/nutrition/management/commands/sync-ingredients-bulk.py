@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Django
+from django.conf import settings
 from django.core.management.base import CommandError
 
 # wger
@@ -21,6 +22,7 @@ from wger.nutrition.consts import SyncMode
 from wger.nutrition.sync import (
     download_ingredient_dump,
     sync_ingredients_from_dump,
+    sync_ingredients_from_segments,
 )
 
 
@@ -62,9 +64,35 @@ class Command(WgerCommand):
             ),
         )
 
+        parser.add_argument(
+            '--segments',
+            action='store',
+            default=None,
+            dest='manifest_url',
+            nargs='?',
+            const=settings.WGER_SETTINGS['SYNC_INGREDIENTS_MANIFEST_URL'],
+            type=str,
+            help=(
+                'Sync from the segmented dump instead, only downloading the segments that '
+                'changed since the last sync. Optionally takes the URL of the manifest. '
+                f'Default: {settings.WGER_SETTINGS["SYNC_INGREDIENTS_MANIFEST_URL"]}'
+            ),
+        )
+
     def handle(self, **options):
         super().handle(**options)
 
+        if options['manifest_url']:
+            try:
+                sync_ingredients_from_segments(
+                    self.stdout.write,
+                    manifest_url=options['manifest_url'],
+                    style_fn=self.style.SUCCESS,
+                )
+            except FileNotFoundError as e:
+                raise CommandError(str(e))
+            return
+
         remote_url = self.remote_url
         mode = SyncMode.INSERT if options['mode'] == 'insert' else SyncMode.UPDATE
 
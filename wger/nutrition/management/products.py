@@ -15,38 +15,145 @@
 # Standard Library
 import json
 import logging
+import multiprocessing
 import os
 import tempfile
 from collections import Counter
-from gzip import GzipFile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import (
+    batched,
+    islice,
+)
 from json import JSONDecodeError
-from typing import Optional
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
 
 # Django
+import django
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 
 # Third Party
 import requests
 from tqdm import tqdm
 
 # wger
+from wger.core.models import Language
 from wger.nutrition.consts import SyncMode
 from wger.nutrition.dataclasses import IngredientData
-from wger.nutrition.models import Ingredient
+from wger.nutrition.extract_info.off import extract_info_from_off
+from wger.nutrition.extract_info.usda import extract_info_from_usda
+from wger.nutrition.models import (
+    DiaryDay,
+    Ingredient,
+    IngredientWeightUnit,
+)
+from wger.nutrition.sync import has_changes
+from wger.utils.constants import ENGLISH_SHORT_NAME
 from wger.utils.requests import wger_headers
 
 
 logger = logging.getLogger(__name__)
 
 
+class ParsedShard(NamedTuple):
+    """
+    The products parsed from a shard of lines of a dump
+    """
+
+    ingredients: list[IngredientData]
+    skipped: int
+    """Products that could not be imported, e.g. because of missing values"""
+
+    errors: int
+    """Lines that are not valid JSON"""
+
+
+def parse_off_lines(lines: Sequence[bytes], languages: dict[str, int]) -> ParsedShard:
+    """
+    Parses the products of the given languages from lines of the OFF JSONL dump
+
+    This runs in the worker processes of the import.
+    """
+    ingredients = []
+    skipped = 0
+    errors = 0
+    for line in lines:
+        try:
+            product = json.loads(line)
+        except JSONDecodeError:
+            errors += 1
+            continue
+
+        if product.get('lang') not in languages:
+            continue
+
+        try:
+            ingredient_data = extract_info_from_off(product, languages[product['lang']])
+        except (KeyError, ValueError, TypeError):
+            skipped += 1
+            continue
+
+        ingredient_data.clean_name()
+        ingredients.append(ingredient_data)
+
+    return ParsedShard(ingredients, skipped, errors)
+
+
+def parse_usda_lines(lines: Sequence[str], language_id: int) -> ParsedShard:
+    """
+    Parses the products from lines of the (almost JSONL) USDA dataset
+
+    This runs in the worker processes of the import.
+    """
+    ingredients = []
+    skipped = 0
+    errors = 0
+    for line in lines:
+        # Skip the first and last lines in the file
+        if 'FoundationFoods' in line or 'BrandedFoods' in line or line.strip() == '}':
+            continue
+
+        try:
+            product = json.loads(line.strip().strip(','))
+        except JSONDecodeError:
+            errors += 1
+            continue
+
+        try:
+            ingredient_data = extract_info_from_usda(product, language_id)
+        except (KeyError, ValueError, TypeError):
+            skipped += 1
+            continue
+
+        ingredient_data.clean_name()
+        ingredients.append(ingredient_data)
+
+    return ParsedShard(ingredients, skipped, errors)
+
+
 class ImportProductCommand(BaseCommand):
     """
     Import an Open Food facts Dump
+
+    Large dumps are imported in a pipeline: the lines of the file are read in
+    shards, which are parsed by a pool of worker processes while the products
+    of the previous shards are written to the database in bulk, one
+    transaction per bucket. After every bucket the number of processed lines
+    is stored in a checkpoint file next to the dump, so that an interrupted
+    import continues where it stopped.
     """
 
     mode = SyncMode.UPDATE
-    bulk_update_bucket: list[Ingredient] = []
-    bulk_size = 500
+    bulk_size = 2000
+    shard_size = 5000
     counter: Counter
 
     help = "Don't run this command directly. Use either import-off-products or import-usda-products"
@@ -54,6 +161,8 @@ class ImportProductCommand(BaseCommand):
     def __init__(self, stdout=None, stderr=None, no_color=False, force_color=False):
         super().__init__(stdout, stderr, no_color, force_color)
         self.counter = Counter()
+        self.bulk_update_bucket: list[IngredientData] = []
+        self.workers = os.cpu_count() or 1
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -83,61 +192,240 @@ class ImportProductCommand(BaseCommand):
             ),
         )
 
+        parser.add_argument(
+            '--workers',
+            action='store',
+            default=self.workers,
+            dest='workers',
+            type=int,
+            help=f'Number of processes parsing the dump. Default: {self.workers}',
+        )
+
     def handle(self, **options):
         raise NotImplementedError('Do not run this command on its own!')
 
     def process_ingredient(self, ingredient_data: IngredientData):
-        #
-        # Add entries as new products
+        """
+        Adds a product to the bucket, which is written once it is full
+        """
         ingredient_data.clean_name()
-        if self.mode == SyncMode.INSERT:
-            self.bulk_update_bucket.append(Ingredient(**ingredient_data.dict()))
-            if len(self.bulk_update_bucket) > self.bulk_size:
+        self.bulk_update_bucket.append(ingredient_data)
+        if len(self.bulk_update_bucket) >= self.bulk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the products in the bucket to the database
+        """
+        bucket = self.bulk_update_bucket
+        self.bulk_update_bucket = []
+        if not bucket:
+            return
+
+        try:
+            with transaction.atomic():
+                if self.mode == SyncMode.INSERT:
+                    Ingredient.objects.bulk_create([Ingredient(**data.dict()) for data in bucket])
+                    self.counter['new'] += len(bucket)
+                else:
+                    self.upsert_ingredients(bucket)
+        except Exception as e:
+            self.stdout.write('--> Error while saving the product bucket. Saving individually')
+            self.stdout.write(str(e))
+
+            # Try saving the ingredients individually as most will be correct
+            for ingredient_data in bucket:
                 try:
-                    Ingredient.objects.bulk_create(self.bulk_update_bucket)
-                    self.stdout.write('***** Bulk adding products *****')
+                    with transaction.atomic():
+                        self.save_ingredient(ingredient_data)
+
+                # ¯\_(ツ)_/¯
                 except Exception as e:
-                    self.stdout.write(
-                        '--> Error while saving the product bucket. Saving individually'
-                    )
-                    self.stdout.write(e)
+                    self.stdout.write(f'--> Error while saving the product individually: {e}')
+                    self.stdout.write(repr(ingredient_data))
+                    self.counter['error'] += 1
 
-                    # Try saving the ingredients individually as most will be correct
-                    for ingredient in self.bulk_update_bucket:
-                        try:
-                            ingredient.save()
+    def save_ingredient(self, ingredient_data: IngredientData):
+        if self.mode == SyncMode.INSERT:
+            Ingredient.objects.create(**ingredient_data.dict())
+            self.counter['new'] += 1
+            return
 
-                        # ¯\_(ツ)_/¯
-                        except Exception as e:
-                            self.stdout.write('--> Error while saving the product individually')
-                            self.stdout.write(e)
+        obj, created = Ingredient.objects.update_or_create(
+            remote_id=ingredient_data.remote_id,
+            defaults=ingredient_data.dict(),
+        )
+        obj.update_or_create_serving_unit_from_off(ingredient_data)
+        self.counter['new' if created else 'edited'] += 1
 
-                self.counter['new'] += self.bulk_size
-                self.bulk_update_bucket = []
+    def upsert_ingredients(self, bucket: list[IngredientData]):
+        """
+        Creates the new products and updates the changed ones, keyed by their remote ID
 
-        # Update existing entries
-        else:
-            try:
-                # Update an existing product (look-up key is the code) or create a new
-                # one. While this might not be the most efficient query (there will always
-                # be a SELECT first), it's ok because this script is run very rarely.
-                obj, created = Ingredient.objects.update_or_create(
-                    remote_id=ingredient_data.remote_id,
-                    defaults=ingredient_data.dict(),
-                )
-                obj.update_or_create_serving_unit_from_off(ingredient_data)
-
-                if created:
-                    self.counter['new'] += 1
-                    # self.stdout.write('-> added to the database')
-                else:
-                    self.counter['edited'] += 1
-                    # self.stdout.write('-> updated')
+        The products of the bucket are loaded with one query, new ones are
+        inserted with one bulk insert and changed ones updated with one bulk update.
+        """
+        products = {data.remote_id: data for data in bucket}
+        existing = {}
+        for ingredient in Ingredient.objects.filter(remote_id__in=products.keys()):
+            existing.setdefault(ingredient.remote_id, ingredient)
+
+        new = []
+        changed = []
+        for remote_id, ingredient_data in products.items():
+            values = ingredient_data.dict()
+            ingredient = existing.get(remote_id)
+            if ingredient is None:
+                new.append(Ingredient(**values))
+            elif has_changes(ingredient, values):
+                for name, value in values.items():
+                    setattr(ingredient, name, value)
+                ingredient.last_update = timezone.now()
+                changed.append(ingredient)
+
+        Ingredient.objects.bulk_create(new)
+        if changed:
+            fields = list(next(iter(products.values())).dict()) + ['last_update']
+            Ingredient.objects.bulk_update(changed, fields)
+
+            # Bulk updates don't send the post_save signal updating the diary
+            DiaryDay.refresh_ingredients([ingredient.pk for ingredient in changed])
+
+        self.counter['new'] += len(new)
+        self.counter['edited'] += len(changed)
+        self.counter['unchanged'] += len(products) - len(new) - len(changed)
+
+        # Not every database returns the IDs of bulk inserted rows
+        if any(ingredient.pk is None for ingredient in new):
+            new = list(Ingredient.objects.filter(remote_id__in=[i.remote_id for i in new]))
+
+        self.sync_serving_units(
+            [
+                (ingredient, products[ingredient.remote_id])
+                for ingredient in new + list(existing.values())
+            ]
+        )
+
+    def sync_serving_units(self, ingredients: list[tuple[Ingredient, IngredientData]]):
+        """
+        Creates or updates the weight units of the serving sizes of the products
+
+        A serving size matches an existing weight unit with the same name or
+        amount of grams, see Ingredient.update_or_create_serving_unit_from_off.
+        """
+        languages = dict(Language.objects.values_list('id', 'short_name'))
+        serving_units = {}
+        for ingredient, ingredient_data in ingredients:
+            serving_unit = Ingredient.serving_unit_from_off(
+                ingredient_data,
+                languages.get(ingredient.language_id, ENGLISH_SHORT_NAME),
+            )
+            if serving_unit is not None:
+                serving_units[ingredient.pk] = serving_unit
+
+        if not serving_units:
+            return
 
-            except Exception as e:
-                self.stdout.write(f'--> Error while performing update_or_create: {e}')
-                self.stdout.write(repr(ingredient_data))
-                self.counter['error'] += 1
+        existing = {}
+        for unit in IngredientWeightUnit.objects.filter(
+            ingredient_id__in=serving_units.keys()
+        ).order_by('pk'):
+            existing.setdefault(unit.ingredient_id, []).append(unit)
+
+        new = []
+        changed = []
+        regrammed = []
+        for ingredient_id, (name, gram) in serving_units.items():
+            unit = next(
+                (
+                    unit
+                    for unit in existing.get(ingredient_id, [])
+                    if unit.name.lower() == name.lower() or unit.gram == gram
+                ),
+                None,
+            )
+            if unit is None:
+                new.append(IngredientWeightUnit(ingredient_id=ingredient_id, name=name, gram=gram))
+            elif (unit.name, unit.gram) != (name, gram):
+                if unit.gram != gram:
+                    regrammed.append(unit.pk)
+                unit.name = name
+                unit.gram = gram
+                changed.append(unit)
+
+        IngredientWeightUnit.objects.bulk_create(new)
+        IngredientWeightUnit.objects.bulk_update(changed, ['name', 'gram'])
+
+        # Bulk updates don't send the post_save signal updating the diary
+        if regrammed:
+            DiaryDay.refresh_weight_units(regrammed)
+
+    def import_lines(self, path: str, lines: Iterable, parse: Callable[..., ParsedShard], *args):
+        """
+        Imports the products in the lines of a dump
+
+        :param path: The path of the dump, the checkpoint is stored next to it
+        :param lines: The lines of the dump
+        :param parse: The function parsing a shard of lines, called with the
+            lines and the additional arguments in the worker processes
+        """
+        checkpoint_path = f'{path}.checkpoint'
+        start = 0
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                start = int(checkpoint.read() or 0)
+            self.stdout.write(f'Resuming the import after line {start}')
+
+        offset = start
+        for shard, line_count in self.parse_shards(islice(lines, start, None), parse, *args):
+            self.counter['skipped'] += shard.skipped
+            self.counter['error'] += shard.errors
+            offset += line_count
+
+            for ingredient_data in shard.ingredients:
+                self.bulk_update_bucket.append(ingredient_data)
+
+            # Only store the offset once all products up to it are saved
+            if len(self.bulk_update_bucket) >= self.bulk_size:
+                self.flush()
+                with open(checkpoint_path, 'w') as checkpoint:
+                    checkpoint.write(str(offset))
+                self.stdout.write(f'Processed {offset} lines: {dict(self.counter)}')
+
+        self.flush()
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def parse_shards(
+        self,
+        lines: Iterable,
+        parse: Callable[..., ParsedShard],
+        *args,
+    ) -> Iterator[tuple[ParsedShard, int]]:
+        """
+        Parses the lines in shards, in order, and yields them with their number of lines
+
+        The shards are parsed by a pool of worker processes, reading ahead at
+        most two shards per worker so the memory use stays bounded.
+        """
+        shards = batched(lines, self.shard_size)
+
+        # Daemonic processes, e.g. of the parallel test runner, can't have children
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            for shard in shards:
+                yield parse(shard, *args), len(shard)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=django.setup) as executor:
+            pending = []
+            for shard in shards:
+                pending.append((executor.submit(parse, shard, *args), len(shard)))
+                if len(pending) >= 2 * self.workers:
+                    future, line_count = pending.pop(0)
+                    yield future.result(), line_count
+
+            for future, line_count in pending:
+                yield future.result(), line_count
 
     def get_download_folder(self, folder: str) -> tuple[str, Optional[tempfile.TemporaryDirectory]]:
         if folder:
@@ -155,18 +443,6 @@ class ImportProductCommand(BaseCommand):
         self.stdout.write(f'Using folder {download_folder} for storing downloaded files')
         return download_folder, tmp_folder
 
-    def iterate_gz_file_contents(self, path: str, languages: list[str]):
-        with GzipFile(path, 'rb') as gzid:
-            for line in gzid:
-                try:
-                    product = json.loads(line)
-                    if product.get('lang') not in languages:
-                        continue
-                    yield product
-                except JSONDecodeError:
-                    self.stdout.write(' Error parsing and/or filtering  json record, skipping')
-                    continue
-
     def download_file(self, url: str, destination: str) -> None:
         if os.path.exists(destination):
             self.stdout.write(f'File already downloaded at {destination}')
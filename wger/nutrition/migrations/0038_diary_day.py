@@ -0,0 +1,105 @@
+# Generated by Django 6.0.9 on 2026-10-18 04:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+from wger.nutrition.helpers import (
+    NUTRITIONAL_VALUES_FIELDS,
+    nutritional_values_aggregates,
+)
+
+
+def build_diary_days(apps, schema_editor):
+    """
+    Sums the existing diary entries into their daily rollups
+    """
+    LogItem = apps.get_model('nutrition', 'LogItem')
+    DiaryDay = apps.get_model('nutrition', 'DiaryDay')
+
+    rows = (
+        LogItem.objects.annotate(log_date=TruncDate('datetime'))
+        .values('plan_id', 'plan__user_id', 'log_date')
+        .annotate(**nutritional_values_aggregates())
+        .order_by()
+    )
+
+    batch = []
+    for row in rows.iterator(chunk_size=1000):
+        batch.append(
+            DiaryDay(
+                user_id=row['plan__user_id'],
+                plan_id=row['plan_id'],
+                date=row['log_date'],
+                **{name: row[name] for name in NUTRITIONAL_VALUES_FIELDS},
+            )
+        )
+        if len(batch) >= 1000:
+            DiaryDay.objects.bulk_create(batch)
+            batch = []
+    DiaryDay.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('nutrition', '0037_powersync_synced_ingredient_tables'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiaryDay',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('date', models.DateField(editable=False, verbose_name='Date')),
+                ('energy', models.DecimalField(decimal_places=7, default=0, max_digits=20)),
+                ('protein', models.DecimalField(decimal_places=7, default=0, max_digits=20)),
+                ('carbohydrates', models.DecimalField(decimal_places=7, default=0, max_digits=20)),
+                (
+                    'carbohydrates_sugar',
+                    models.DecimalField(decimal_places=7, max_digits=20, null=True),
+                ),
+                ('fat', models.DecimalField(decimal_places=7, default=0, max_digits=20)),
+                ('fat_saturated', models.DecimalField(decimal_places=7, max_digits=20, null=True)),
+                ('fiber', models.DecimalField(decimal_places=7, max_digits=20, null=True)),
+                ('sodium', models.DecimalField(decimal_places=7, max_digits=20, null=True)),
+                (
+                    'plan',
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='nutrition.nutritionplan',
+                        verbose_name='Nutrition plan',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='User',
+                    ),
+                ),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='idx_diary_day_user_date')],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('plan', 'date'), name='unique_diary_day_plan_date'
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            build_diary_days,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
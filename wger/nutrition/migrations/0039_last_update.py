@@ -0,0 +1,27 @@
+# Generated by Django 6.0.9 on 2026-10-18 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('nutrition', '0038_diary_day'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logitem',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Last update'),
+        ),
+        migrations.AddIndex(
+            model_name='logitem',
+            index=models.Index(fields=['plan', 'id'], name='nutrition_l_plan_id_61451d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logitem',
+            index=models.Index(
+                fields=['plan', 'last_update'], name='nutrition_l_plan_id_f2b648_idx'
+            ),
+        ),
+    ]
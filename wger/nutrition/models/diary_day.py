@@ -0,0 +1,201 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Standard Library
+import datetime
+from typing import Iterable
+
+# Django
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# wger
+from wger.nutrition.helpers import (
+    NUTRITIONAL_VALUES_FIELDS,
+    NutritionalValues,
+    nutritional_values_aggregates,
+)
+
+# Local
+from .log import LogItem
+from .plan import NutritionPlan
+
+
+def local_date(value: datetime.datetime) -> datetime.date:
+    """
+    The (local) day of a diary entry's timestamp
+    """
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+class DiaryDay(models.Model):
+    """
+    The summed nutritional values of the diary entries of a plan on one day
+
+    This is a rollup of the LogItems, it is updated when they are saved or
+    deleted and can be rebuilt with the rebuild-nutrition-diary command.
+    """
+
+    class Meta:
+        ordering = [
+            'date',
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='idx_diary_day_user_date'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['plan', 'date'],
+                name='unique_diary_day_plan_date',
+            )
+        ]
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='User',
+        editable=False,
+        on_delete=models.CASCADE,
+    )
+
+    plan = models.ForeignKey(
+        NutritionPlan,
+        verbose_name='Nutrition plan',
+        editable=False,
+        on_delete=models.CASCADE,
+    )
+
+    date = models.DateField(verbose_name='Date', editable=False)
+
+    energy = models.DecimalField(max_digits=20, decimal_places=7, default=0)
+    protein = models.DecimalField(max_digits=20, decimal_places=7, default=0)
+    carbohydrates = models.DecimalField(max_digits=20, decimal_places=7, default=0)
+    carbohydrates_sugar = models.DecimalField(max_digits=20, decimal_places=7, null=True)
+    fat = models.DecimalField(max_digits=20, decimal_places=7, default=0)
+    fat_saturated = models.DecimalField(max_digits=20, decimal_places=7, null=True)
+    fiber = models.DecimalField(max_digits=20, decimal_places=7, null=True)
+    sodium = models.DecimalField(max_digits=20, decimal_places=7, null=True)
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return f'Diary of plan {self.plan_id} for {self.date}'
+
+    owner_user_lookup = 'plan__user_id'
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self.plan
+
+    def get_nutritional_values(self) -> NutritionalValues:
+        return NutritionalValues.from_dict(self.__dict__)
+
+    @staticmethod
+    def summed_log_items(log_items: models.QuerySet) -> models.QuerySet:
+        """
+        Sums the nutritional values of the log items per plan and (local) day
+        """
+        return (
+            log_items.annotate(log_date=TruncDate('datetime'))
+            .values('plan_id', 'plan__user_id', 'log_date')
+            .annotate(**nutritional_values_aggregates())
+            .order_by()
+        )
+
+    @classmethod
+    def from_summed_log_items(cls, row: dict) -> 'DiaryDay':
+        return cls(
+            user_id=row['plan__user_id'],
+            plan_id=row['plan_id'],
+            date=row['log_date'],
+            **{name: row[name] for name in NUTRITIONAL_VALUES_FIELDS},
+        )
+
+    @classmethod
+    def refresh(cls, plan_id, dates: Iterable[datetime.date]):
+        """
+        Recalculates the given days of a plan from its log items
+        """
+        dates = set(dates)
+        log_items = LogItem.objects.filter(plan_id=plan_id, datetime__date__in=dates)
+        rows = {row['log_date']: row for row in cls.summed_log_items(log_items)}
+
+        for date in dates:
+            if date not in rows:
+                cls.objects.filter(plan_id=plan_id, date=date).delete()
+                continue
+
+            row = rows[date]
+            cls.objects.update_or_create(
+                plan_id=plan_id,
+                date=date,
+                defaults={
+                    'user_id': row['plan__user_id'],
+                    **{name: row[name] for name in NUTRITIONAL_VALUES_FIELDS},
+                },
+            )
+
+    @classmethod
+    def refresh_ingredients(cls, ingredient_ids: Iterable[int]):
+        """
+        Recalculates all days with entries of the given ingredients
+        """
+        cls._refresh_days_of(LogItem.objects.filter(ingredient_id__in=ingredient_ids))
+
+    @classmethod
+    def refresh_weight_units(cls, weight_unit_ids: Iterable[int]):
+        """
+        Recalculates all days with entries in the given weight units
+        """
+        cls._refresh_days_of(LogItem.objects.filter(weight_unit_id__in=weight_unit_ids))
+
+    @classmethod
+    def _refresh_days_of(cls, log_items: models.QuerySet):
+        days = {}
+        for plan_id, date in log_items.values_list('plan_id', 'datetime'):
+            days.setdefault(plan_id, set()).add(local_date(date))
+
+        for plan_id, dates in days.items():
+            cls.refresh(plan_id, dates)
+
+    @classmethod
+    def rebuild(cls, plans: models.QuerySet | None = None, batch_size: int = 1000) -> int:
+        """
+        Recalculates all days of the given plans (default: all) from their log items
+
+        Returns the number of days written.
+        """
+        days = cls.objects.all()
+        log_items = LogItem.objects.all()
+        if plans is not None:
+            days = days.filter(plan__in=plans)
+            log_items = log_items.filter(plan__in=plans)
+        days.delete()
+
+        count = 0
+        batch = []
+        for row in cls.summed_log_items(log_items).iterator(chunk_size=batch_size):
+            batch.append(cls.from_summed_log_items(row))
+            if len(batch) >= batch_size:
+                count += len(cls.objects.bulk_create(batch))
+                batch = []
+        count += len(cls.objects.bulk_create(batch))
+
+        return count
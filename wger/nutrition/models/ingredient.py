@@ -58,6 +58,9 @@ from wger.utils.requests import wger_user_agent
 
 logger = logging.getLogger(__name__)
 
+OFF_REQUEST_ERRORS = (JSONDecodeError, ReadTimeout, ConnectTimeout, HTTPError)
+"""Errors of a request to OFF that are handled as a transient failure"""
+
 
 class Ingredient(AbstractLicenseModel, models.Model):
     """
@@ -444,34 +447,15 @@ class Ingredient(AbstractLicenseModel, models.Model):
         Returns (boolean, boolean). First boolean is whether serving unit was created,
         second boolean whether it was updated.
         """
-        if not ingredient_data.serving_size_unit:
-            return False, False
-
-        gram = ingredient_data.serving_size_gram
-        if not gram:
-            gram = self._derive_serving_size_gram(
-                ingredient_data.serving_size_amount,
-                ingredient_data.serving_size_unit,
-            )
-
-        if not gram:
+        serving_unit = self.serving_unit_from_off(ingredient_data, self.language.short_name)
+        if serving_unit is None:
             return False, False
+        name, gram = serving_unit
 
         # Local import to avoid model import cycles.
         # wger
         from wger.nutrition.models import IngredientWeightUnit
 
-        amount = ingredient_data.serving_size_amount or 1
-        unit = ingredient_data.serving_size_unit
-
-        # Build a descriptive name, e.g. "1 Portion (2 biscuits)" for amount > 1
-        if amount > 1:
-            with translation.override(self.language.short_name):
-                portion = gettext('Portion')
-            name = f'1 {portion} ({amount:g} {unit})'
-        else:
-            name = unit
-
         # Try to find the unit locally. This can happen either because the name matches or
         # the exact gram amount. This would cover scenarios where the name was changed on
         # OFF's side or our serving size parser, e.g.: "2 biscuits" -> "1 Portion (2 biscuits)"
@@ -494,6 +478,41 @@ class Ingredient(AbstractLicenseModel, models.Model):
             )
             return True, False  # (created, updated)
 
+    @classmethod
+    def serving_unit_from_off(
+        cls,
+        ingredient_data: IngredientData,
+        language: str,
+    ) -> tuple[str, int] | None:
+        """
+        The name and grams of the serving size of an OFF product, if it has one
+
+        The name is translated to the given language.
+        """
+        if not ingredient_data.serving_size_unit:
+            return None
+
+        gram = ingredient_data.serving_size_gram
+        if not gram:
+            gram = cls._derive_serving_size_gram(
+                ingredient_data.serving_size_amount,
+                ingredient_data.serving_size_unit,
+            )
+
+        if not gram:
+            return None
+
+        amount = ingredient_data.serving_size_amount or 1
+        unit = ingredient_data.serving_size_unit
+
+        # Build a descriptive name, e.g. "1 Portion (2 biscuits)" for amount > 1
+        if amount > 1:
+            with translation.override(language):
+                portion = gettext('Portion')
+            return f'1 {portion} ({amount:g} {unit})', gram
+
+        return unit, gram
+
     @staticmethod
     def _derive_serving_size_gram(amount, unit):
         """
@@ -527,19 +546,28 @@ class Ingredient(AbstractLicenseModel, models.Model):
             return None
 
     @staticmethod
-    def _fetch_off_product(code: str, context: str = ''):
+    def _fetch_off_product(code: str, context: str = '', raise_errors: bool = False):
         """
         Fetch product data from OFF and handle transient API errors.
+
+        The errors are logged and None is returned, like for unknown products,
+        unless raise_errors is set.
         """
         try:
             api = API(user_agent=wger_user_agent(), timeout=3)
             return api.product.get(code)
         except JSONDecodeError as e:
             logger.info(f'Got JSONDecodeError from OFF{context}: {e}')
+            if raise_errors:
+                raise
         except (ReadTimeout, ConnectTimeout):
             logger.info(f'Timeout from OFF{context}')
+            if raise_errors:
+                raise
         except HTTPError as e:
             logger.info(f'Got HTTPError from OFF{context}: {e}')
+            if raise_errors:
+                raise
 
         return None
 
@@ -579,12 +607,15 @@ class Ingredient(AbstractLicenseModel, models.Model):
         return self.update_or_create_serving_unit_from_off(ingredient_data)
 
     @classmethod
-    def fetch_ingredient_from_off(cls, code: str):
+    def fetch_ingredient_from_off(cls, code: str, raise_errors: bool = False):
         """
         Searches OFF by barcode and creates a local ingredient from the result
+
+        :param raise_errors: Raise the errors of the request to OFF (one of
+            OFF_REQUEST_ERRORS), instead of returning None.
         """
         logger.info(f'Searching for ingredient {code} in OFF')
-        result = cls._fetch_off_product(code)
+        result = cls._fetch_off_product(code, raise_errors=raise_errors)
 
         if not result:
             logger.info('Product not found')
@@ -46,6 +46,10 @@ class LogItem(BaseMealItem, models.Model):
         ordering = [
             '-datetime',
         ]
+        indexes = [
+            models.Index(fields=['plan', 'id']),
+            models.Index(fields=['plan', 'last_update']),
+        ]
 
     id = models.UUIDField(
         default=uuid7,
@@ -117,12 +121,25 @@ class LogItem(BaseMealItem, models.Model):
     The amount of units
     """
 
+    last_update = models.DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+        editable=False,
+        null=True,
+    )
+    """
+    Last time the log was changed, used for the delta feeds of the API. Empty for
+    entries loaded from fixtures
+    """
+
     def __str__(self):
         """
         Return a more human-readable representation
         """
         return f'Diary entry for {self.datetime}, plan {self.plan.pk}'
 
+    owner_user_lookup = 'plan__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
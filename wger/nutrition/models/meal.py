@@ -25,7 +25,10 @@ from wger.utils.fields import Html5TimeField
 from wger.utils.uuid import uuid7
 
 # Local
-from ..helpers import NutritionalValues
+from ..helpers import (
+    NutritionalValues,
+    nutritional_values_aggregates,
+)
 from .plan import NutritionPlan
 
 
@@ -77,6 +80,8 @@ class Meal(models.Model):
         """
         return f'{self.order} Meal'
 
+    owner_user_lookup = 'plan__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -86,10 +91,13 @@ class Meal(models.Model):
     def get_nutritional_values(self):
         """
         Sums the nutritional info of all items in the meal
-        """
-        nutritional_values = NutritionalValues()
 
-        for item in self.mealitem_set.select_related():
-            nutritional_values += item.get_nutritional_values()
+        If the meal was loaded annotated with nutritional_values_aggregates,
+        the values calculated by the database are used.
+        """
+        if NutritionalValues.is_annotated(self):
+            return NutritionalValues.from_dict(self.__dict__)
 
-        return nutritional_values
+        return NutritionalValues.from_dict(
+            self.mealitem_set.aggregate(**nutritional_values_aggregates())
+        )
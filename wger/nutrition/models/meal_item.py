@@ -85,6 +85,8 @@ class MealItem(BaseMealItem, models.Model):
         """
         return f'{self.amount}g ingredient {self.ingredient_id}'
 
+    owner_user_lookup = 'meal__plan__user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
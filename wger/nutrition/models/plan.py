@@ -22,12 +22,19 @@ import logging
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.db import models
+from django.db.models import (
+    Q,
+    Subquery,
+)
 from django.urls import reverse
 from django.utils.timezone import make_aware
 
 # wger
 from wger.nutrition.consts import ENERGY_FACTOR
-from wger.nutrition.helpers import NutritionalValues
+from wger.nutrition.helpers import (
+    NutritionalValues,
+    nutritional_values_aggregates,
+)
 from wger.utils.cache import cache_mapper
 from wger.utils.uuid import uuid7
 from wger.weight.models import WeightEntry
@@ -132,7 +139,6 @@ class NutritionPlan(models.Model):
         """
         nutritional_representation = cache.get(cache_mapper.get_nutrition_cache_by_key(self.pk))
         if not nutritional_representation:
-            nutritional_values = NutritionalValues()
             result = {
                 'total': NutritionalValues(),
                 'percent': {'protein': 0, 'carbohydrates': 0, 'fat': 0},
@@ -140,8 +146,9 @@ class NutritionPlan(models.Model):
             }
 
             # Energy
-            for meal in self.meal_set.select_related():
-                nutritional_values += meal.get_nutritional_values()
+            nutritional_values = NutritionalValues.from_dict(
+                self.meal_set.aggregate(**nutritional_values_aggregates('mealitem__'))
+            )
             result['total'] = nutritional_values
 
             energy = nutritional_values.energy
@@ -178,18 +185,17 @@ class NutritionPlan(models.Model):
         """
         target = self.creation_date
         target_aware = make_aware(datetime.datetime.combine(target, datetime.time()))
-        closest_entry_gte = (
-            WeightEntry.objects.filter(user=self.user)
-            .filter(date__gte=target_aware)
-            .order_by('date')
-            .first()
-        )
-        closest_entry_lte = (
-            WeightEntry.objects.filter(user=self.user)
-            .filter(date__lte=target_aware)
-            .order_by('-date')
-            .first()
-        )
+        entries = WeightEntry.objects.filter(user_id=self.user_id)
+        gte = entries.filter(date__gte=target_aware).order_by('date').values('pk')[:1]
+        lte = entries.filter(date__lte=target_aware).order_by('-date').values('pk')[:1]
+
+        # Both candidates are fetched with a single query
+        closest_entry_gte = closest_entry_lte = None
+        for entry in WeightEntry.objects.filter(Q(pk=Subquery(gte)) | Q(pk=Subquery(lte))):
+            if entry.date >= target_aware:
+                closest_entry_gte = entry
+            if entry.date <= target_aware:
+                closest_entry_lte = entry
         if closest_entry_gte is None or closest_entry_lte is None:
             return closest_entry_gte or closest_entry_lte
         if abs(closest_entry_gte.date.date() - target) < abs(
@@ -199,6 +205,8 @@ class NutritionPlan(models.Model):
         else:
             return closest_entry_lte
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -235,3 +243,17 @@ class NutritionPlan(models.Model):
             date = datetime.date.today()
 
         return self.logitem_set.filter(datetime__date=date).select_related()
+
+    def get_log_nutritional_values(self, start=None, end=None) -> dict:
+        """
+        Returns the summed nutritional values of the logged items, by day
+
+        The optional start and end dates are inclusive.
+        """
+        days = self.diaryday_set.all()
+        if start:
+            days = days.filter(date__gte=start)
+        if end:
+            days = days.filter(date__lte=end)
+
+        return {day.date: day.get_nutritional_values() for day in days}
@@ -17,18 +17,28 @@ from django.core.cache import cache
 from django.db.models.signals import (
     post_delete,
     post_save,
+    pre_delete,
+    pre_save,
 )
+from django.utils import timezone
 
 # Third Party
 from easy_thumbnails.files import get_thumbnailer
 
 # wger
+from wger.core.signals import record_tombstone
+from wger.nutrition.helpers import NUTRITIONAL_VALUES_FIELDS
 from wger.nutrition.models import (
+    DiaryDay,
     Image,
+    Ingredient,
+    IngredientWeightUnit,
+    LogItem,
     Meal,
     MealItem,
     NutritionPlan,
 )
+from wger.nutrition.models.diary_day import local_date
 from wger.utils.cache import cache_mapper
 
 
@@ -47,6 +57,86 @@ post_save.connect(reset_nutritional_values_canonical_form, sender=MealItem)
 post_delete.connect(reset_nutritional_values_canonical_form, sender=MealItem)
 
 
+def log_item_day(instance: LogItem):
+    """
+    The (plan, date) of the diary day a log item belongs to
+    """
+    return instance.plan_id, local_date(instance.datetime)
+
+
+def remember_diary_day(sender, instance: LogItem, raw=False, **kwargs):
+    """
+    Remembers the day the entry belonged to before it is changed, so that its
+    rollup can be updated as well if the entry moves to another day or plan
+    """
+    instance._previous_diary_day = None
+    if raw or instance._state.adding:
+        return
+
+    previous = LogItem.objects.filter(pk=instance.pk).only('plan_id', 'datetime').first()
+    if previous:
+        instance._previous_diary_day = log_item_day(previous)
+
+
+def update_diary_day(sender, instance: LogItem, **kwargs):
+    """
+    Updates the rollups of the days touched by the diary entry
+    """
+    days = {log_item_day(instance)}
+    if getattr(instance, '_previous_diary_day', None):
+        days.add(instance._previous_diary_day)
+
+    for plan_id in {plan_id for plan_id, _ in days}:
+        DiaryDay.refresh(plan_id, [date for day_plan_id, date in days if day_plan_id == plan_id])
+
+
+def update_diary_days_of_ingredient(
+    sender, instance: Ingredient, created, raw=False, update_fields=None, **kwargs
+):
+    """
+    Updates the rollups of all days with entries of an ingredient that changed
+
+    Saves of other fields only, e.g. the date of the last image check, are skipped.
+    """
+    if created or raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(NUTRITIONAL_VALUES_FIELDS):
+        return
+
+    DiaryDay.refresh_ingredients([instance.pk])
+
+
+def update_diary_days_of_weight_unit(
+    sender, instance: IngredientWeightUnit, created, raw=False, update_fields=None, **kwargs
+):
+    """
+    Updates the rollups of all days with entries in a weight unit whose grams changed
+    """
+    if created or raw:
+        return
+    if update_fields is not None and 'gram' not in update_fields:
+        return
+
+    DiaryDay.refresh_weight_units([instance.pk])
+
+
+def touch_log_items_of_meal(sender, instance: Meal, **kwargs):
+    """
+    The diary entries of a deleted meal lose their meal. That update doesn't go
+    through save(), so mark the entries as changed for the delta feed here
+    """
+    instance.log_items.update(last_update=timezone.now())
+
+
+pre_save.connect(remember_diary_day, sender=LogItem)
+post_save.connect(update_diary_day, sender=LogItem)
+post_delete.connect(update_diary_day, sender=LogItem)
+post_delete.connect(record_tombstone, sender=LogItem)
+pre_delete.connect(touch_log_items_of_meal, sender=Meal)
+post_save.connect(update_diary_days_of_ingredient, sender=Ingredient)
+post_save.connect(update_diary_days_of_weight_unit, sender=IngredientWeightUnit)
+
+
 def auto_delete_file_on_delete(sender, instance: Image, **kwargs):
     """
     Delete the image along with its thumbnails
@@ -14,22 +14,50 @@
 
 # Standard Library
 import gzip
+import hashlib
+import io
 import json
 import logging
 import os
+import shutil
 import tempfile
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+)
+from decimal import Decimal
+from itertools import (
+    batched,
+    groupby,
+)
 from pathlib import Path
 from typing import (
     List,
     Optional,
 )
+from urllib.parse import urljoin
+from uuid import UUID
 
 # Django
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.files.base import File
+from django.core.files.base import (
+    ContentFile,
+    File,
+)
 from django.core.files.storage import default_storage
-from django.db import IntegrityError
+from django.db import (
+    IntegrityError,
+    connection,
+    models,
+    transaction,
+)
+from django.db.models import (
+    Count,
+    F,
+    Max,
+)
+from django.db.models.functions import Floor
 from django.utils import timezone
 
 # Third Party
@@ -49,6 +77,9 @@ from wger.core.models.language import Language
 from wger.nutrition.api.endpoints import (
     IMAGE_ENDPOINT,
     INGREDIENT_BULK_EXPORT_PATH,
+    INGREDIENT_SEGMENTS_MANIFEST_PATH,
+    INGREDIENT_SEGMENTS_PATH,
+    INGREDIENT_SEGMENTS_SYNC_STATE_PATH,
     INGREDIENTS_ENDPOINT,
     INGREDIENTS_SYNC_ENDPOINT,
 )
@@ -60,6 +91,7 @@ from wger.nutrition.extract_info.wger import (
     extract_weight_unit_info_from_wger_api,
 )
 from wger.nutrition.models import (
+    DiaryDay,
     Image,
     Ingredient,
     IngredientWeightUnit,
@@ -73,8 +105,10 @@ from wger.utils.constants import (
 )
 from wger.utils.language import load_language
 from wger.utils.requests import (
+    REQUEST_TIMEOUT,
     get_paginated,
     wger_headers,
+    wger_session,
     wger_user_agent,
 )
 from wger.utils.url import make_uri
@@ -95,22 +129,6 @@ def _resolve_language_codes(language_codes: Optional[str]) -> List[str] | None:
     return language_ids
 
 
-def _sync_ingredient_from_api_data(data: dict) -> Ingredient:
-    """
-    Create or update a single ingredient (and its weight units) from API data.
-    """
-    uuid = data['uuid']
-    ingredient_data = extract_info_from_wger_api(data).dict()
-    ingredient_data['uuid'] = uuid
-
-    ingredient, _ = Ingredient.objects.update_or_create(uuid=uuid, defaults=ingredient_data)
-    weight_units_data = extract_weight_unit_info_from_wger_api(data)
-    if weight_units_data is not None:
-        sync_weight_units(ingredient, weight_units_data)
-
-    return ingredient
-
-
 def sync_weight_units(ingredient: Ingredient, weight_units_data: list[WeightUnitData]):
     """
     Synchronize weight units for an ingredient from remote data.
@@ -132,6 +150,171 @@ def sync_weight_units(ingredient: Ingredient, weight_units_data: list[WeightUnit
     ingredient.ingredientweightunit_set.exclude(uuid__in=remote_uuids).delete()
 
 
+def has_changes(instance: models.Model, data: dict) -> bool:
+    """
+    Whether saving the data would change the instance
+
+    The values are compared as the database stores them, e.g. the float 12.3
+    for a decimal field with three decimal places as Decimal('12.300').
+    """
+    for name, value in data.items():
+        field = instance._meta.get_field(name)
+        value = field.to_python(value)
+        if isinstance(field, models.DecimalField) and value is not None:
+            value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+        if value != getattr(instance, name):
+            return True
+    return False
+
+
+def _upsert(model: type[models.Model], objs: list[models.Model], update_fields: list[str]):
+    """
+    Inserts the objects, or updates the given fields of the rows with the same UUID
+    """
+    model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        # MySQL always uses the unique indexes of the table, and doesn't
+        # accept an explicit conflict target
+        unique_fields=['uuid']
+        if connection.features.supports_update_conflicts_with_target
+        else None,
+        update_fields=update_fields,
+    )
+
+
+def sync_ingredient_batch(rows: list[dict]) -> tuple[int, int]:
+    """
+    Create or update a page of ingredients (and their weight units) from API data
+
+    The existing rows are loaded with one query and only new or changed
+    ingredients are written, with one INSERT ... ON CONFLICT (uuid) DO UPDATE.
+    The weight units of the page are compared and written the same way.
+
+    Returns the number of processed and of skipped, invalid records.
+    """
+    errors = 0
+    remote: dict[UUID, tuple[dict, list[WeightUnitData] | None]] = {}
+    for data in rows:
+        try:
+            ingredient_data = extract_info_from_wger_api(data).dict()
+            ingredient_data['uuid'] = UUID(str(data['uuid']))
+            weight_units_data = extract_weight_unit_info_from_wger_api(data)
+        except (KeyError, ValueError, TypeError) as e:
+            # A single malformed or invalid record must not abort the whole run
+            errors += 1
+            logger.warning(f'Skipping malformed ingredient during sync: {e}')
+            continue
+        remote[ingredient_data['uuid']] = (ingredient_data, weight_units_data)
+
+    if not remote:
+        return 0, errors
+
+    try:
+        with transaction.atomic():
+            _apply_ingredient_batch(remote)
+    except IntegrityError as e:
+        # Find and skip the offending records one by one
+        logger.warning(f'Could not sync ingredient page in bulk, retrying one by one: {e}')
+        for uuid, (ingredient_data, weight_units_data) in list(remote.items()):
+            try:
+                with transaction.atomic():
+                    ingredient, _ = Ingredient.objects.update_or_create(
+                        uuid=uuid,
+                        defaults=ingredient_data,
+                    )
+                    if weight_units_data is not None:
+                        sync_weight_units(ingredient, weight_units_data)
+            except IntegrityError as e:
+                errors += 1
+                del remote[uuid]
+                logger.warning(f'Skipping ingredient {uuid} during sync: {e}')
+
+    return len(remote), errors
+
+
+def _apply_ingredient_batch(remote: dict[UUID, tuple[dict, list[WeightUnitData] | None]]):
+    existing = Ingredient.objects.in_bulk(remote.keys(), field_name='uuid')
+
+    changed = []
+    updated_ids = []
+    for uuid, (ingredient_data, _) in remote.items():
+        ingredient = existing.get(uuid)
+        if ingredient is None:
+            changed.append(Ingredient(**ingredient_data))
+        elif has_changes(ingredient, ingredient_data):
+            changed.append(Ingredient(**ingredient_data))
+            updated_ids.append(ingredient.pk)
+
+    if changed:
+        ingredient_data, _ = next(iter(remote.values()))
+        update_fields = [name for name in ingredient_data if name != 'uuid']
+        _upsert(Ingredient, changed, update_fields + ['last_update'])
+
+    ids = {uuid: ingredient.pk for uuid, ingredient in existing.items()}
+    new_uuids = remote.keys() - ids.keys()
+    if new_uuids:
+        ids.update(Ingredient.objects.filter(uuid__in=new_uuids).values_list('uuid', 'id'))
+
+    _apply_weight_unit_batch(
+        {
+            ids[uuid]: weight_units_data
+            for uuid, (_, weight_units_data) in remote.items()
+            if weight_units_data is not None
+        }
+    )
+
+    # The rollups of the diary entries with these ingredients are out of date
+    if updated_ids:
+        DiaryDay.refresh_ingredients(updated_ids)
+
+
+def _apply_weight_unit_batch(weight_units: dict[int, list[WeightUnitData]]):
+    """
+    Synchronize the weight units of several ingredients, by ingredient ID
+    """
+    if not weight_units:
+        return
+
+    remote = {
+        UUID(str(unit_data.uuid)): IngredientWeightUnit(
+            uuid=unit_data.uuid,
+            ingredient_id=ingredient_id,
+            name=unit_data.name,
+            gram=unit_data.gram,
+        )
+        for ingredient_id, units_data in weight_units.items()
+        for unit_data in units_data
+    }
+    existing = IngredientWeightUnit.objects.in_bulk(remote.keys(), field_name='uuid')
+
+    changed = [
+        unit
+        for uuid, unit in remote.items()
+        if uuid not in existing
+        or has_changes(
+            existing[uuid],
+            {'ingredient_id': unit.ingredient_id, 'name': unit.name, 'gram': unit.gram},
+        )
+    ]
+    if changed:
+        _upsert(IngredientWeightUnit, changed, ['ingredient', 'name', 'gram'])
+
+    # The upsert doesn't send the post_save signal updating the diary
+    regrammed = [
+        existing[uuid].pk
+        for uuid, unit in remote.items()
+        if uuid in existing and existing[uuid].gram != unit.gram
+    ]
+    if regrammed:
+        DiaryDay.refresh_weight_units(regrammed)
+
+    # Remove local units that no longer exist on the remote
+    IngredientWeightUnit.objects.filter(ingredient_id__in=weight_units).exclude(
+        uuid__in=remote.keys()
+    ).delete()
+
+
 def fetch_ingredient_image(pk: int):
     # wger
     from wger.nutrition.models import Ingredient
@@ -200,7 +383,7 @@ def fetch_image_from_wger_instance(ingredient):
             logger.warning(f'Skipping invalid ingredient image: {"; ".join(e.messages)}')
             return
         image.ingredient.last_image_check = timezone.now()
-        image.ingredient.save()
+        image.ingredient.save(update_fields=['last_image_check'])
 
 
 def fetch_image_from_off(ingredient: Ingredient):
@@ -216,7 +399,7 @@ def fetch_image_from_off(ingredient: Ingredient):
     # errors in the response (keys missing, etc.) since in any case we don't want to retry
     # too often.
     ingredient.last_image_check = timezone.now()
-    ingredient.save()
+    ingredient.save(update_fields=['last_image_check'])
 
     off_api = API(
         user_agent=wger_user_agent(),
@@ -369,6 +552,7 @@ def sync_ingredients(
     # the probe when nobody is watching (e.g. inside the celery range-worker)
     # to avoid an unnecessary request against the throttled `ingredient_list`
     # scope.
+    session = wger_session()
     total = None
     if show_progress_bar:
         count_url = make_uri(
@@ -377,7 +561,7 @@ def sync_ingredients(
             query={**filter_query, 'limit': 1},
         )
         try:
-            count_response = requests.get(count_url, headers=wger_headers(), timeout=30).json()
+            count_response = session.get(count_url, headers=wger_headers(), timeout=30).json()
             total = count_response.get('count')
         except (requests.RequestException, ValueError) as e:
             logger.info(f'Could not fetch total ingredient count: {e}')
@@ -400,17 +584,13 @@ def sync_ingredients(
 
     count = 0
     errors = 0
-    for data in get_paginated(url, headers=wger_headers()):
-        try:
-            _sync_ingredient_from_api_data(data)
-        except (KeyError, ValueError, TypeError) as e:
-            # A single malformed or invalid record must not abort the whole run
-            errors += 1
-            logger.warning(f'Skipping malformed ingredient during sync: {e}')
-            continue
-        count += 1
-        pbar.update(1)
-        if not show_progress_bar and count % API_MAX_ITEMS == 0:
+    results = get_paginated(url, headers=wger_headers(), session=session)
+    for page in batched(results, API_MAX_ITEMS):
+        page_count, page_errors = sync_ingredient_batch(list(page))
+        count += page_count
+        errors += page_errors
+        pbar.update(page_count)
+        if not show_progress_bar:
             print_fn(f'Processed {count} ingredients...')
 
     pbar.close()
@@ -422,6 +602,10 @@ def sync_ingredients(
 BULK_SIZE = 500
 
 
+INGREDIENT_SEGMENT_SIZE = 10_000
+"""Number of ingredient IDs in each segment of the segmented dump"""
+
+
 def export_ingredient_dump(
     print_fn,
     style_fn=lambda x: x,
@@ -433,43 +617,24 @@ def export_ingredient_dump(
     Each line is the same JSON format as the ingredient API endpoint,
     so clients can parse it with extract_info_from_wger_api().
 
+    The segmented dump is updated first, see export_ingredient_segments(). Since
+    gzip streams can be concatenated, the full dump is then assembled from the
+    segment files without serializing the ingredients again.
+
     Uses default_storage so the dump works with any configured backend
     (local filesystem, S3, GCS, etc.).
     """
-
-    queryset = Ingredient.objects.select_related(
-        'language',
-        'license',
-    ).prefetch_related('ingredientweightunit_set')
-    total = queryset.count()
-    queryset = queryset.iterator(chunk_size=2000)
-
-    print_fn('*** Exporting ingredients to JSONL dump...')
-
-    pbar = tqdm(
-        total=total,
-        unit='ingredients',
-        desc='Exporting',
-        disable=not show_progress_bar,
-        smoothing=0.1,
-        mininterval=1.0,
-    )
+    manifest = export_ingredient_segments(print_fn, style_fn, show_progress_bar)
+    count = sum(segment['count'] for segment in manifest['segments'])
 
     # Write to a local temp file first, then upload via storage backend
-    count = 0
     with tempfile.NamedTemporaryFile(suffix='.jsonl.gz', delete=False) as tmp:
         tmp_path = tmp.name
+        for segment in manifest['segments']:
+            with default_storage.open(f'{INGREDIENT_SEGMENTS_PATH}/{segment["file"]}', 'rb') as f:
+                shutil.copyfileobj(f, tmp)
 
     try:
-        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
-            for ingredient in queryset:
-                data = IngredientSerializer(ingredient).data
-                f.write(json.dumps(data) + '\n')
-                count += 1
-                pbar.update(1)
-
-        pbar.close()
-
         # Upload to the configured storage backend
         with open(tmp_path, 'rb') as f:
             # delete old file first if it exists, then save the new one
@@ -483,6 +648,173 @@ def export_ingredient_dump(
     return saved_name
 
 
+def export_ingredient_segments(
+    print_fn,
+    style_fn=lambda x: x,
+    show_progress_bar: bool = False,
+    segment_size: int = INGREDIENT_SEGMENT_SIZE,
+) -> dict:
+    """
+    Export the ingredients as gzipped JSONL segments plus a manifest
+
+    The ingredients are partitioned by ID range into segments. A segment is
+    only serialized again if the number or last update of its ingredients, or
+    its weight units, changed since the previous export. The segment files are
+    named after their SHA-256 checksum, so a file never changes once written.
+
+    The manifest lists the ID range, checksum and file name of every segment,
+    clients only need to download the segments whose checksum changed, see
+    sync_ingredients_from_segments().
+    """
+    previous = _read_json_from_storage(INGREDIENT_SEGMENTS_MANIFEST_PATH)
+    previous_segments = {}
+    if previous and previous.get('segment_size') == segment_size:
+        previous_segments = {segment['id']: segment for segment in previous['segments']}
+
+    signatures = _segment_signatures(segment_size)
+    print_fn(f'*** Exporting ingredients to {len(signatures)} JSONL segments...')
+
+    pbar = tqdm(
+        total=len(signatures),
+        unit='segments',
+        desc='Exporting',
+        disable=not show_progress_bar,
+        smoothing=0.1,
+        mininterval=1.0,
+    )
+
+    segments = []
+    written = 0
+    for segment_id, signature in signatures.items():
+        segment = previous_segments.get(segment_id)
+        if (
+            segment is None
+            or {key: segment.get(key) for key in signature} != signature
+            or not default_storage.exists(f'{INGREDIENT_SEGMENTS_PATH}/{segment["file"]}')
+        ):
+            segment = {
+                'id': segment_id,
+                'start': segment_id * segment_size,
+                'end': (segment_id + 1) * segment_size,
+                **signature,
+                **_write_ingredient_segment(segment_id, segment_size),
+            }
+            written += 1
+        segments.append(segment)
+        pbar.update(1)
+
+    pbar.close()
+
+    manifest = {
+        'version': 1,
+        'segment_size': segment_size,
+        'created': timezone.now().isoformat(),
+        'segments': segments,
+    }
+    if default_storage.exists(INGREDIENT_SEGMENTS_MANIFEST_PATH):
+        default_storage.delete(INGREDIENT_SEGMENTS_MANIFEST_PATH)
+    default_storage.save(
+        INGREDIENT_SEGMENTS_MANIFEST_PATH,
+        ContentFile(json.dumps(manifest, indent=1).encode()),
+    )
+
+    # Remove the files of the segments that were rewritten or are empty now
+    files = {segment['file'] for segment in segments}
+    for segment in previous['segments'] if previous else []:
+        path = f'{INGREDIENT_SEGMENTS_PATH}/{segment["file"]}'
+        if segment['file'] not in files and default_storage.exists(path):
+            default_storage.delete(path)
+
+    print_fn(style_fn(f'done! Wrote {written} of {len(segments)} segments\n'))
+    return manifest
+
+
+def _segment_signatures(segment_size: int) -> dict[int, dict]:
+    """
+    Number and last update of the ingredients and weight units of every segment
+
+    Weight units have no modification date. Their IDs only grow, so the highest
+    ID and the number of units cover additions and deletions, and a checksum of
+    their names and grams covers edits. The units are streamed once for this,
+    ordered by ingredient, without loading them all into memory.
+    """
+    signatures = {}
+    ingredients = (
+        Ingredient.objects.annotate(segment=Floor(F('id') / segment_size))
+        .values('segment')
+        .annotate(count=Count('id'), last_update=Max('last_update'))
+        .order_by('segment')
+    )
+    for row in ingredients:
+        signatures[int(row['segment'])] = {
+            'count': row['count'],
+            'last_update': row['last_update'].isoformat(),
+            'weight_units': 0,
+            'last_weight_unit': None,
+            'weight_units_checksum': None,
+        }
+
+    weight_units = (
+        IngredientWeightUnit.objects.order_by('ingredient_id', 'id')
+        .values_list('ingredient_id', 'id', 'name', 'gram')
+        .iterator(chunk_size=10000)
+    )
+    for segment_id, units in groupby(weight_units, key=lambda row: row[0] // segment_size):
+        count = 0
+        last_id = None
+        checksum = hashlib.sha256()
+        for _, unit_id, name, gram in units:
+            count += 1
+            last_id = unit_id if last_id is None else max(last_id, unit_id)
+            checksum.update(f'{unit_id}\t{name}\t{gram}\n'.encode())
+        signatures[segment_id].update(
+            weight_units=count,
+            last_weight_unit=last_id,
+            weight_units_checksum=checksum.hexdigest(),
+        )
+
+    return signatures
+
+
+def _write_ingredient_segment(segment_id: int, segment_size: int) -> dict:
+    """
+    Serialize the ingredients of a segment and save the file, unless a file
+    with the same checksum already exists
+    """
+    queryset = (
+        Ingredient.objects.filter(
+            id__gte=segment_id * segment_size,
+            id__lt=(segment_id + 1) * segment_size,
+        )
+        .select_related('language', 'license')
+        .prefetch_related('ingredientweightunit_set')
+        .order_by('id')
+    )
+
+    # No timestamp in the header, so the same ingredients give the same checksum
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+        for ingredient in queryset.iterator(chunk_size=2000):
+            f.write((json.dumps(IngredientSerializer(ingredient).data) + '\n').encode())
+
+    content = buffer.getvalue()
+    checksum = hashlib.sha256(content).hexdigest()
+    file_name = f'ingredients-{segment_id:05d}-{checksum[:16]}.jsonl.gz'
+    path = f'{INGREDIENT_SEGMENTS_PATH}/{file_name}'
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(content))
+
+    return {'file': file_name, 'sha256': checksum, 'size': len(content)}
+
+
+def _read_json_from_storage(path: str) -> dict | None:
+    if not default_storage.exists(path):
+        return None
+
+    with default_storage.open(path, 'rb') as f:
+        return json.load(f)
+
+
 def _open_jsonl(file_path: Path):
     """Open a JSONL file, transparently handling both gzip and plain text."""
     with open(file_path, 'rb') as f:
@@ -660,3 +992,131 @@ def download_ingredient_dump(
 
     print_fn(style_fn(f'Download complete: {file_path}\n'))
     return file_path
+
+
+def sync_ingredients_from_segments(
+    print_fn,
+    manifest_url: str = settings.WGER_SETTINGS['SYNC_INGREDIENTS_MANIFEST_URL'],
+    style_fn=lambda x: x,
+    workers: int = 4,
+) -> int:
+    """
+    Sync the ingredients from the segmented dump of a remote wger instance
+
+    Only the segments whose checksum changed since the last sync are
+    downloaded. They are fetched by a pool of threads, which also apply them
+    unless the database is SQLite (that only allows one writer at a time).
+    The checksums of the segments that were applied without errors are stored
+    in the default storage.
+
+    Raises FileNotFoundError if the remote server has no segmented dump.
+
+    Returns the number of processed ingredients.
+    """
+    session = wger_session(pool_size=workers)
+    response = session.get(manifest_url, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 404:
+        raise FileNotFoundError(f'Segmented ingredient dump not found at {manifest_url}.')
+    response.raise_for_status()
+    manifest = response.json()
+
+    state = _read_json_from_storage(INGREDIENT_SEGMENTS_SYNC_STATE_PATH) or {}
+    synced = state.get('segments', {}) if state.get('manifest_url') == manifest_url else {}
+    changed = [
+        segment
+        for segment in manifest['segments']
+        if synced.get(str(segment['id'])) != segment['sha256']
+    ]
+    print_fn(
+        f'*** Syncing {len(changed)} of {len(manifest["segments"])} ingredient segments '
+        f'from {manifest_url}...'
+    )
+
+    apply_in_workers = connection.vendor != 'sqlite'
+
+    def fetch(segment: dict):
+        content = _download_ingredient_segment(session, manifest_url, segment)
+        if not apply_in_workers:
+            return content, None
+
+        try:
+            return None, _apply_ingredient_segment(content)
+        finally:
+            connection.close()
+
+    count = 0
+    errors = 0
+    try:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='wger-segments'
+        ) as executor:
+            futures = {executor.submit(fetch, segment): segment for segment in changed}
+            for future in as_completed(futures):
+                content, result = future.result()
+                processed, failed = result or _apply_ingredient_segment(content)
+                count += processed
+                errors += failed
+
+                # Segments with invalid records are downloaded again next time
+                segment = futures[future]
+                if not failed:
+                    synced[str(segment['id'])] = segment['sha256']
+    finally:
+        # Keep the progress, an interrupted sync continues with the missing segments
+        synced = {
+            key: value
+            for key, value in synced.items()
+            if int(key) in {segment['id'] for segment in manifest['segments']}
+        }
+        if default_storage.exists(INGREDIENT_SEGMENTS_SYNC_STATE_PATH):
+            default_storage.delete(INGREDIENT_SEGMENTS_SYNC_STATE_PATH)
+        default_storage.save(
+            INGREDIENT_SEGMENTS_SYNC_STATE_PATH,
+            ContentFile(json.dumps({'manifest_url': manifest_url, 'segments': synced}).encode()),
+        )
+
+    print_fn(style_fn(f'done! Processed {count} ingredients ({errors} errors)\n'))
+    return count
+
+
+def _download_ingredient_segment(
+    session: requests.Session,
+    manifest_url: str,
+    segment: dict,
+) -> bytes:
+    """
+    Download a segment file and check its checksum
+    """
+    url = urljoin(manifest_url, segment['file'])
+    response = session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+
+    # Prevent requests from transparently decompressing the gzip file
+    content = response.raw.read(decode_content=False)
+    if hashlib.sha256(content).hexdigest() != segment['sha256']:
+        raise ValueError(f'Checksum mismatch for the ingredient segment {url}')
+
+    return content
+
+
+def _apply_ingredient_segment(content: bytes) -> tuple[int, int]:
+    """
+    Create or update the ingredients of a segment, one page at a time
+
+    Returns the number of processed and of skipped, invalid records.
+    """
+    rows = []
+    errors = 0
+    for line in gzip.decompress(content).splitlines():
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            errors += 1
+
+    count = 0
+    for batch in batched(rows, API_MAX_ITEMS):
+        processed, failed = sync_ingredient_batch(list(batch))
+        count += processed
+        errors += failed
+
+    return count, errors
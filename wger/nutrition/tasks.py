@@ -30,6 +30,7 @@ from celery.schedules import crontab
 from wger.celery_configuration import app
 from wger.core.api.min_server_version import check_min_server_version
 from wger.nutrition.api.endpoints import INGREDIENTS_ENDPOINT
+from wger.nutrition.barcode import lookup_barcode
 from wger.nutrition.sync import (
     download_ingredient_dump,
     download_ingredient_images,
@@ -37,6 +38,7 @@ from wger.nutrition.sync import (
     fetch_ingredient_image,
     sync_ingredients,
     sync_ingredients_from_dump,
+    sync_ingredients_from_segments,
 )
 from wger.utils.requests import wger_headers
 from wger.utils.url import make_uri
@@ -63,6 +65,15 @@ def fetch_ingredient_image_task(pk: int):
     fetch_ingredient_image(pk)
 
 
+@app.task
+def lookup_barcode_task(code: str):
+    """
+    Looks up a barcode that is not in the local database on Open Food Facts,
+    see resolve_barcode()
+    """
+    lookup_barcode(code)
+
+
 @app.task
 def fetch_all_ingredient_images_task():
     """
@@ -92,7 +103,7 @@ def sync_ingredient_id_range_task(
     overall load on the remote scales linearly with the catalogue size — no
     deep-OFFSET penalty.
 
-    Idempotent: `update_or_create` in `_sync_ingredient_from_api_data` makes
+    Idempotent: the upserts by UUID in `sync_ingredient_batch` make
     re-running the same range safe. A failed worker simply retries (autoretry
     above) or is replayed by celery without leaving the local DB inconsistent.
     """
@@ -168,9 +179,10 @@ def sync_ingredients_bulk_or_api_task():
     """
     Sync ingredients from a remote wger instance.
 
-    Tries to download a bulk JSONL dump first. If the dump is not available
-    (e.g. the remote server hasn't generated one), falls back to the paginated
-    API sync.
+    Tries the segmented dump first, which only downloads the segments that
+    changed since the last sync, then the full bulk JSONL dump. If neither is
+    available (e.g. the remote server hasn't generated one), falls back to the
+    paginated API sync.
     """
     try:
         check_min_server_version(settings.WGER_SETTINGS['WGER_INSTANCE'])
@@ -178,6 +190,12 @@ def sync_ingredients_bulk_or_api_task():
         logger.error(f'Ingredient sync aborted, server incompatible: {e}')
         return
 
+    try:
+        sync_ingredients_from_segments(logger.info)
+        return
+    except FileNotFoundError:
+        logger.info('Segmented dump not available, falling back to the bulk dump.')
+
     try:
         file_path = download_ingredient_dump(logger.info)
         try:
@@ -192,7 +210,8 @@ def sync_ingredients_bulk_or_api_task():
 @app.task
 def export_ingredients_dump_task():
     """
-    Export all ingredients as a gzipped JSONL file for bulk synchronization.
+    Export all ingredients as a gzipped JSONL file and as segments for bulk
+    synchronization.
     """
     export_ingredient_dump(logger.info)
 
@@ -0,0 +1,113 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Benchmark for importing an Open Food Facts dump, product by product with
+update_or_create vs with the sharded parser and the bulk writer
+
+Both importers run twice over the same dump: once into an empty table and once
+more, updating every product. The number of products can be changed with the
+BENCHMARK_PRODUCTS environment variable. This is not collected by the regular
+test run, start it explicitly with:
+
+    python manage.py test wger.nutrition.tests.benchmark_import_products
+"""
+
+# Standard Library
+import gzip
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+
+# Django
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+# wger
+from wger.core.models import Language
+from wger.nutrition.extract_info.off import extract_info_from_off
+from wger.nutrition.models import Ingredient
+from wger.nutrition.tests.test_import_products import off_product
+
+
+PRODUCTS = int(os.environ.get('BENCHMARK_PRODUCTS', 20_000))
+
+
+def import_sequential(path: str, languages: dict[str, int]):
+    """
+    The previous implementation: one update_or_create per product
+    """
+    with gzip.open(path, 'rb') as dump:
+        for line in dump:
+            product = json.loads(line)
+            if product.get('lang') not in languages:
+                continue
+
+            ingredient_data = extract_info_from_off(product, languages[product['lang']])
+            ingredient_data.clean_name()
+            obj, created = Ingredient.objects.update_or_create(
+                remote_id=ingredient_data.remote_id,
+                defaults=ingredient_data.dict(),
+            )
+            obj.update_or_create_serving_unit_from_off(ingredient_data)
+
+
+class ImportProductsBenchmark(TransactionTestCase):
+    fixtures = ['languages', 'licenses']
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'openfoodfacts-products.jsonl.gz')
+        with gzip.open(self.path, 'wt') as dump:
+            for i in range(PRODUCTS):
+                product = off_product(f'{i:013d}', f'Product {i}', serving_size='1 bar (40 g)')
+                dump.write(json.dumps(product))
+                dump.write('\n')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def measure(self, run) -> tuple[float, float]:
+        Ingredient.objects.all().delete()
+        times = []
+        for _ in range(2):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        self.assertEqual(Ingredient.objects.count(), PRODUCTS)
+        return times[0], times[1]
+
+    def test_import(self):
+        languages = {lang.short_name: lang.pk for lang in Language.objects.all()}
+
+        sequential = self.measure(lambda: import_sequential(self.path, languages))
+        bulk = self.measure(
+            lambda: call_command(
+                'import-off-products',
+                '--jsonl',
+                folder=self.folder.name,
+                stdout=StringIO(),
+            )
+        )
+
+        print()
+        print(f'{PRODUCTS} products, {os.cpu_count()} CPUs')
+        for label, sequential_time, bulk_time in zip(('Insert', 'Update'), sequential, bulk):
+            print(
+                f'{label + " products/second":<24} sequential: {PRODUCTS / sequential_time:8.0f}'
+                f'  bulk: {PRODUCTS / bulk_time:8.0f}'
+                f'  speedup: {sequential_time / bulk_time:6.1f}x'
+            )
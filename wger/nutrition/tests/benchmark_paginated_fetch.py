@@ -0,0 +1,161 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Benchmark for fetching a paginated ingredient sync from a local stub server,
+page by page with bare requests vs with the pooled and prefetching PageFetcher
+
+The stub server answers every page after LATENCY seconds and the consumer
+spends PROCESSING seconds on each page, similar to writing it to the database.
+The number of ingredients can be changed with the BENCHMARK_INGREDIENTS
+environment variable. This is not collected by the regular test run, start it
+explicitly with:
+
+    python manage.py test wger.nutrition.tests.benchmark_paginated_fetch
+"""
+
+# Standard Library
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from urllib.parse import (
+    parse_qs,
+    urlparse,
+)
+
+# Third Party
+import requests
+
+# wger
+from wger.utils.constants import API_MAX_ITEMS
+from wger.utils.requests import get_paginated
+
+
+INGREDIENTS = int(os.environ.get('BENCHMARK_INGREDIENTS', 1_000_000))
+LATENCY = 0.02
+PROCESSING = 0.02
+
+
+def ingredient(pk: int) -> dict:
+    return {
+        'id': pk,
+        'uuid': f'00000000-0000-0000-0000-{pk:012d}',
+        'code': f'{pk:013d}',
+        'name': f'Ingredient {pk}',
+        'energy': 250,
+        'protein': '10.000',
+        'carbohydrates': '30.000',
+        'carbohydrates_sugar': '5.000',
+        'fat': '10.000',
+        'fat_saturated': '2.000',
+        'fiber': '3.000',
+        'sodium': '0.500',
+        'language': {'id': 2},
+        'license': {'id': 5},
+        'license_author': 'Open Food Facts',
+        'weight_units': [],
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    results = json.dumps([ingredient(pk) for pk in range(API_MAX_ITEMS)]).encode()
+    last_results = json.dumps(
+        [ingredient(pk) for pk in range((INGREDIENTS - 1) % API_MAX_ITEMS + 1)]
+    ).encode()
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query).get('page', ['0'])[0])
+        last_page = (INGREDIENTS - 1) // API_MAX_ITEMS
+        next_url = f'http://{self.headers["Host"]}/?page={page + 1}' if page < last_page else None
+        body = b''.join(
+            (
+                b'{"next": ',
+                json.dumps(next_url).encode(),
+                b', "previous": null, "results": ',
+                self.results if next_url else self.last_results,
+                b'}',
+            )
+        )
+
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get_paginated_sequential(url: str, headers=None):
+    """
+    The previous implementation: one new connection per page, no prefetching
+    """
+    while True:
+        response = requests.get(url, headers=headers or {}).json()
+        yield from response['results']
+
+        url = response['next']
+        if not url:
+            break
+
+
+class PaginatedFetchBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/?page=0'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def measure(self, fetch) -> tuple[int, float]:
+        count = 0
+        start = time.perf_counter()
+        for count, _ in enumerate(fetch(self.url), start=1):
+            if count % API_MAX_ITEMS == 0:
+                time.sleep(PROCESSING)
+        return count, time.perf_counter() - start
+
+    def test_sync(self):
+        sequential_count, sequential_time = self.measure(get_paginated_sequential)
+        fetcher_count, fetcher_time = self.measure(get_paginated)
+        self.assertEqual(sequential_count, INGREDIENTS)
+        self.assertEqual(fetcher_count, INGREDIENTS)
+
+        pages = (INGREDIENTS - 1) // API_MAX_ITEMS + 1
+        print()
+        print(
+            f'{INGREDIENTS} ingredients in {pages} pages, '
+            f'{LATENCY * 1000:.0f} ms latency and {PROCESSING * 1000:.0f} ms processing per page'
+        )
+        print(
+            f'{"Total time":<24} sequential: {sequential_time:8.2f} s'
+            f'  fetcher: {fetcher_time:8.2f} s'
+        )
+        print(
+            f'{"Ingredients per second":<24} sequential: {INGREDIENTS / sequential_time:8.0f}'
+            f'  fetcher: {INGREDIENTS / fetcher_time:8.0f}'
+            f'  speedup: {sequential_time / fetcher_time:6.1f}x'
+        )
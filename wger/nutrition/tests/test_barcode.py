@@ -0,0 +1,166 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import threading
+from unittest.mock import patch
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+
+# Third Party
+from requests import ReadTimeout
+from rest_framework import status
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.nutrition.barcode import (
+    BarcodeStatus,
+    resolve_barcode,
+)
+from wger.nutrition.models import Ingredient
+from wger.utils.cache import CacheKeyMapper
+
+
+UNKNOWN_CODE = '0000000000000'
+
+
+def barcode_settings(**kwargs):
+    return override_settings(WGER_SETTINGS={**settings.WGER_SETTINGS, **kwargs})
+
+
+@patch('wger.nutrition.models.Ingredient.fetch_ingredient_from_off')
+class ResolveBarcodeTestCase(WgerTestCase):
+    """
+    Tests looking up barcodes that are not in the local database
+    """
+
+    def test_local(self, mock_fetch):
+        result = resolve_barcode('1234567890987654321')
+
+        self.assertEqual(result.status, BarcodeStatus.FOUND)
+        self.assertEqual(result.ingredient.pk, 1)
+        mock_fetch.assert_not_called()
+
+    def test_found(self, mock_fetch):
+        mock_fetch.return_value = Ingredient.objects.get(pk=2)
+
+        result = resolve_barcode(UNKNOWN_CODE)
+
+        self.assertEqual(result.status, BarcodeStatus.FOUND)
+        self.assertEqual(result.ingredient.pk, 2)
+        self.assertIsNone(cache.get(CacheKeyMapper.off_barcode_lookup_key(UNKNOWN_CODE)))
+
+    def test_miss_is_remembered(self, mock_fetch):
+        """
+        A barcode unknown to OFF is only looked up once
+        """
+        mock_fetch.return_value = None
+
+        for _ in range(3):
+            self.assertEqual(resolve_barcode(UNKNOWN_CODE).status, BarcodeStatus.NOT_FOUND)
+
+        mock_fetch.assert_called_once_with(UNKNOWN_CODE, raise_errors=True)
+
+    def test_error_is_remembered(self, mock_fetch):
+        """
+        A failed lookup is remembered as well, for a shorter time
+        """
+        mock_fetch.side_effect = ReadTimeout()
+
+        with patch('wger.nutrition.barcode.cache.set', wraps=cache.set) as mock_set:
+            self.assertEqual(resolve_barcode(UNKNOWN_CODE).status, BarcodeStatus.NOT_FOUND)
+            self.assertEqual(resolve_barcode(UNKNOWN_CODE).status, BarcodeStatus.NOT_FOUND)
+
+        mock_fetch.assert_called_once()
+        mock_set.assert_called_once_with(
+            CacheKeyMapper.off_barcode_miss_key(UNKNOWN_CODE), True, 300
+        )
+        self.assertIsNone(cache.get(CacheKeyMapper.off_barcode_lookup_key(UNKNOWN_CODE)))
+
+    @patch('wger.nutrition.barcode.LOOKUP_POLL_INTERVAL', 0.01)
+    def test_concurrent_lookup(self, mock_fetch):
+        """
+        While a barcode is being looked up, other lookups wait for its result
+        """
+        cache.add(CacheKeyMapper.off_barcode_lookup_key(UNKNOWN_CODE), True)
+
+        def finish_lookup():
+            cache.set(CacheKeyMapper.off_barcode_miss_key(UNKNOWN_CODE), True)
+            cache.delete(CacheKeyMapper.off_barcode_lookup_key(UNKNOWN_CODE))
+
+        timer = threading.Timer(0.1, finish_lookup)
+        timer.start()
+        result = resolve_barcode(UNKNOWN_CODE)
+        timer.join()
+
+        self.assertEqual(result.status, BarcodeStatus.NOT_FOUND)
+        mock_fetch.assert_not_called()
+
+    @patch('wger.nutrition.barcode.barcode_executor.submit')
+    def test_asynchronous(self, mock_submit, mock_fetch):
+        """
+        In the asynchronous mode, the lookup is only started once
+        """
+        self.assertEqual(resolve_barcode(UNKNOWN_CODE, True).status, BarcodeStatus.PENDING)
+        self.assertEqual(resolve_barcode(UNKNOWN_CODE, True).status, BarcodeStatus.PENDING)
+
+        mock_submit.assert_called_once()
+        mock_fetch.assert_not_called()
+
+    @patch('wger.nutrition.tasks.lookup_barcode_task.delay')
+    def test_asynchronous_celery(self, mock_delay, mock_fetch):
+        with barcode_settings(USE_CELERY=True):
+            self.assertEqual(resolve_barcode(UNKNOWN_CODE, True).status, BarcodeStatus.PENDING)
+
+        mock_delay.assert_called_once_with(UNKNOWN_CODE)
+
+
+@patch('wger.nutrition.models.Ingredient.fetch_ingredient_from_off')
+class BarcodeApiTestCase(WgerTestCase):
+    """
+    Tests the endpoint to poll a barcode lookup
+    """
+
+    url = '/api/v2/ingredient/barcode/'
+
+    def test_found(self, mock_fetch):
+        response = self.client.get(self.url + '?code=1234567890987654321')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'found')
+        self.assertEqual(response.json()['ingredient']['id'], 1)
+
+    def test_not_found(self, mock_fetch):
+        mock_fetch.return_value = None
+
+        response = self.client.get(self.url + f'?code={UNKNOWN_CODE}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'status': 'not_found', 'ingredient': None})
+
+    @patch('wger.nutrition.barcode.barcode_executor.submit')
+    def test_pending(self, mock_submit, mock_fetch):
+        with barcode_settings(OFF_BARCODE_LOOKUP_ASYNC=True):
+            response = self.client.get(self.url + f'?code={UNKNOWN_CODE}')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json(), {'status': 'pending', 'ingredient': None})
+        mock_submit.assert_called_once()
+
+    def test_missing_code(self, mock_fetch):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
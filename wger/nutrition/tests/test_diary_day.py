@@ -0,0 +1,163 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+# Django
+from django.core.management import call_command
+from django.utils import timezone
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.nutrition.helpers import NutritionalValues
+from wger.nutrition.models import (
+    DiaryDay,
+    Ingredient,
+    IngredientWeightUnit,
+    LogItem,
+    NutritionPlan,
+)
+
+
+PLAN = 'cc000000-0000-0000-0000-000000000001'
+DAY = datetime.date(2016, 5, 15)
+
+
+class DiaryDayTestCase(WgerTestCase):
+    """
+    Tests that the daily rollups follow the diary entries
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.plan = NutritionPlan.objects.get(pk=PLAN)
+
+    def expected(self, date: datetime.date) -> NutritionalValues:
+        values = NutritionalValues()
+        for item in self.plan.get_log_entries(date):
+            values += item.get_nutritional_values()
+        return values
+
+    def assertDayMatches(self, date: datetime.date):
+        day = DiaryDay.objects.get(plan=self.plan, date=date)
+        self.assertEqual(day.user_id, self.plan.user_id)
+        for name, value in self.expected(date).to_dict.items():
+            if value is None:
+                self.assertIsNone(getattr(day, name), name)
+            else:
+                self.assertAlmostEqual(getattr(day, name), value, 4, name)
+
+    def add_item(self, date: datetime.date, amount=100, weight_unit_id=None) -> LogItem:
+        return LogItem.objects.create(
+            plan=self.plan,
+            ingredient_id=1,
+            weight_unit_id=weight_unit_id,
+            amount=amount,
+            datetime=timezone.make_aware(datetime.datetime.combine(date, datetime.time(12))),
+        )
+
+    def test_fixtures(self):
+        self.assertEqual(
+            list(self.plan.diaryday_set.values_list('date', flat=True)),
+            [datetime.date(2016, 5, 14), DAY],
+        )
+        self.assertDayMatches(datetime.date(2016, 5, 14))
+        self.assertDayMatches(DAY)
+
+    def test_create(self):
+        energy = DiaryDay.objects.get(plan=self.plan, date=DAY).energy
+        self.add_item(DAY)
+
+        self.assertDayMatches(DAY)
+        self.assertGreater(DiaryDay.objects.get(plan=self.plan, date=DAY).energy, energy)
+
+    def test_create_new_day(self):
+        self.add_item(datetime.date(2016, 6, 1))
+        self.assertDayMatches(datetime.date(2016, 6, 1))
+
+    def test_update(self):
+        item = self.add_item(DAY)
+        item.amount = 250
+        item.save()
+
+        self.assertDayMatches(DAY)
+
+    def test_move_to_other_day(self):
+        item = self.add_item(datetime.date(2016, 6, 1))
+        item.datetime = timezone.make_aware(datetime.datetime(2016, 6, 2, 12))
+        item.save()
+
+        self.assertFalse(DiaryDay.objects.filter(plan=self.plan, date='2016-06-01').exists())
+        self.assertDayMatches(datetime.date(2016, 6, 2))
+
+    def test_delete(self):
+        item = self.add_item(datetime.date(2016, 6, 1))
+        item.delete()
+        self.assertFalse(DiaryDay.objects.filter(plan=self.plan, date='2016-06-01').exists())
+
+        self.plan.logitem_set.filter(datetime__date=DAY).first().delete()
+        self.assertDayMatches(DAY)
+
+    def test_ingredient_change(self):
+        self.add_item(DAY)
+        ingredient = Ingredient.objects.get(pk=1)
+        ingredient.energy += 100
+        ingredient.save()
+
+        self.assertDayMatches(DAY)
+
+    def test_ingredient_change_other_fields(self):
+        """
+        Saves that don't touch the nutritional values leave the diary alone
+        """
+        ingredient = Ingredient.objects.get(pk=1)
+        ingredient.last_image_check = timezone.now()
+        with self.assertNumQueries(1):
+            ingredient.save(update_fields=['last_image_check'])
+
+    def test_weight_unit_change(self):
+        self.add_item(DAY, amount=2, weight_unit_id=1)
+        energy = DiaryDay.objects.get(plan=self.plan, date=DAY).energy
+        unit = IngredientWeightUnit.objects.get(pk=1)
+        unit.gram = 250
+        unit.save()
+
+        self.assertDayMatches(DAY)
+        self.assertGreater(DiaryDay.objects.get(plan=self.plan, date=DAY).energy, energy)
+
+    def test_log_nutritional_values(self):
+        days = self.plan.get_log_nutritional_values(start=DAY)
+
+        self.assertEqual(list(days), [DAY])
+        self.assertAlmostEqual(days[DAY].energy, self.expected(DAY).energy, 4)
+
+    def test_rebuild_command(self):
+        DiaryDay.objects.all().update(energy=Decimal(0))
+        call_command('rebuild-nutrition-diary', stdout=StringIO())
+
+        self.assertDayMatches(DAY)
+        self.assertDayMatches(datetime.date(2016, 5, 14))
+
+    def test_rebuild_user(self):
+        other = DiaryDay.objects.exclude(user=self.plan.user)
+        other_count = other.count()
+        other.update(energy=Decimal(0))
+
+        DiaryDay.rebuild(NutritionPlan.objects.filter(user=self.plan.user))
+
+        self.assertDayMatches(DAY)
+        self.assertEqual(other.filter(energy=0).count(), other_count)
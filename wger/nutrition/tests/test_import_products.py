@@ -14,9 +14,11 @@
 
 # Standard Library
 import gzip
+import io
 import json
 import os
 import tempfile
+from unittest import mock
 
 # Django
 from django.core.management import call_command
@@ -24,6 +26,7 @@ from django.core.management import call_command
 # wger
 from wger.core.tests.base_testcase import WgerTestCase
 from wger.nutrition.consts import OFF_FULL_DUMP_URL
+from wger.nutrition.management.products import ImportProductCommand
 from wger.nutrition.models import Ingredient
 
 
@@ -87,6 +90,32 @@ class ImportOffProductsTestCase(WgerTestCase):
         self.assertEqual(Ingredient.objects.count(), count_after_first)
         self.assertEqual(Ingredient.objects.get(remote_id='222').name, 'Second name')
 
+    def test_unchanged_products_are_not_updated(self):
+        """
+        Re-importing a product with decimal nutrients doesn't count as a change
+        """
+        product = off_product(
+            '223',
+            'Same product',
+            nutriments={
+                'energy-kcal_100g': 235,
+                'proteins_100g': 12.3,
+                'carbohydrates_100g': 30.45,
+                'fat_100g': 7.125,
+                'saturated-fat_100g': 1.1,
+                'sodium_100g': 0.0123,
+            },
+        )
+        self.run_import([product])
+        last_update = Ingredient.objects.get(remote_id='223').last_update
+
+        out = io.StringIO()
+        self.run_import([product], stdout=out)
+
+        self.assertIn("'unchanged': 1", out.getvalue())
+        self.assertIn("'edited': 0", out.getvalue())
+        self.assertEqual(Ingredient.objects.get(remote_id='223').last_update, last_update)
+
     def test_products_in_other_languages_are_skipped(self):
         count_before = Ingredient.objects.count()
 
@@ -164,3 +193,57 @@ class ImportOffProductsTestCase(WgerTestCase):
 
         self.assertEqual(Ingredient.objects.count(), count_before + 1)
         self.assertTrue(Ingredient.objects.filter(remote_id='1001').exists())
+
+    def test_serving_sizes_are_imported(self):
+        self.run_import([off_product('1100', 'Biscuits', serving_size='2 biscuits (30 g)')])
+
+        ingredient = Ingredient.objects.get(remote_id='1100')
+        unit = ingredient.ingredientweightunit_set.get()
+        self.assertEqual(unit.gram, 30)
+
+        # Importing the product again updates the unit instead of adding one
+        self.run_import([off_product('1100', 'Biscuits', serving_size='2 biscuits (35 g)')])
+
+        unit = ingredient.ingredientweightunit_set.get()
+        self.assertEqual(unit.gram, 35)
+
+    def test_import_in_several_buckets(self):
+        """
+        Products are written in buckets, with several worker processes
+        """
+        count_before = Ingredient.objects.count()
+
+        with (
+            mock.patch.object(ImportProductCommand, 'bulk_size', 3),
+            mock.patch.object(ImportProductCommand, 'shard_size', 2),
+        ):
+            self.run_import(
+                [off_product(str(2000 + i), f'Product {i}') for i in range(10)],
+                workers=2,
+            )
+
+        self.assertEqual(Ingredient.objects.count(), count_before + 10)
+
+    def test_import_resumes_from_checkpoint(self):
+        """
+        An interrupted import continues after the last line that was saved
+        """
+        count_before = Ingredient.objects.count()
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, os.path.basename(OFF_FULL_DUMP_URL))
+            with gzip.open(path, 'wt') as dump:
+                for i in range(5):
+                    dump.write(json.dumps(off_product(str(3000 + i), f'Product {i}')))
+                    dump.write('\n')
+
+            with open(f'{path}.checkpoint', 'w') as checkpoint:
+                checkpoint.write('3')
+
+            call_command('import-off-products', '--jsonl', folder=folder)
+
+            self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+        self.assertEqual(Ingredient.objects.count(), count_before + 2)
+        self.assertFalse(Ingredient.objects.filter(remote_id='3002').exists())
+        self.assertTrue(Ingredient.objects.filter(remote_id='3003').exists())
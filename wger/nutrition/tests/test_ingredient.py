@@ -736,7 +736,7 @@ class IngredientApiCodeSearch(BaseTestCase, ApiBaseTestCase):
         mock_fetch_from_off.return_value = None
 
         response = self.client.get(self.url + '?code=122333444455555666666')
-        mock_fetch_from_off.assert_called_with('122333444455555666666')
+        mock_fetch_from_off.assert_called_with('122333444455555666666', raise_errors=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 0)
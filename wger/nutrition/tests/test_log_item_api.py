@@ -161,3 +161,40 @@ class LogItemApiTestCase(BaseTestCase, ApiBaseTestCase):
         response = self.client.get(f'{self.url}{LOG_OTHER}/nutritional_values/')
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_nutritional_values_action_values(self):
+        """The values calculated by the database match the ones of the entry"""
+        self.authenticate('test')
+        response = self.client.get(f'{self.url}{LOG_OWNED}/nutritional_values/')
+        expected = LogItem.objects.get(pk=LOG_OWNED).get_nutritional_values()
+
+        self.assertAlmostEqual(response.json()['energy'], float(expected.energy), 4)
+        self.assertAlmostEqual(response.json()['protein'], float(expected.protein), 4)
+
+    def test_nutritional_values_by_day(self):
+        self.authenticate('test')
+        response = self.client.get(f'{self.url}nutritional_values_by_day/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([day['date'] for day in response.json()], ['2016-05-14', '2016-05-15'])
+        self.assertIn('energy', response.json()[0])
+
+        self.assertEqual(response.json()[0]['plan'], PLAN_OWNED)
+
+        response = self.client.get(
+            f'{self.url}nutritional_values_by_day/', {'date__gte': '2016-05-15'}
+        )
+        self.assertEqual([day['date'] for day in response.json()], ['2016-05-15'])
+
+    def test_nutritional_values_by_day_invalid_filter(self):
+        self.authenticate('test')
+        response = self.client.get(f'{self.url}nutritional_values_by_day/', {'date': 'yesterday'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nutritional_values_by_day_other_plan(self):
+        self.authenticate('test')
+        response = self.client.get(f'{self.url}nutritional_values_by_day/', {'plan': PLAN_OTHER})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
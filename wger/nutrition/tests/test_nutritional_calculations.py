@@ -14,6 +14,7 @@
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
 # Standard Library
+import datetime
 import logging
 from decimal import Decimal
 
@@ -24,6 +25,7 @@ from django.urls import reverse
 # wger
 from wger.core.tests.base_testcase import WgerTestCase
 from wger.nutrition import models
+from wger.nutrition.helpers import NutritionalValues
 
 
 logger = logging.getLogger(__name__)
@@ -255,6 +257,56 @@ class NutritionalValuesCalculationsTestCase(WgerTestCase):
         self.assertAlmostEqual(values['percent']['protein'], Decimal(26.06), 2)
 
 
+class NutritionalValuesAggregationTestCase(WgerTestCase):
+    """
+    Tests that the values summed by the database match the ones of the single items
+    """
+
+    def assertValuesEqual(self, values: NutritionalValues, expected: NutritionalValues):
+        for name, value in expected.to_dict.items():
+            if value is None:
+                self.assertIsNone(getattr(values, name), name)
+            else:
+                self.assertAlmostEqual(getattr(values, name), value, 4, name)
+
+    def test_plans(self):
+        for plan in models.NutritionPlan.objects.all():
+            expected = NutritionalValues()
+            for meal in plan.meal_set.all():
+                meal_expected = NutritionalValues()
+                for item in meal.mealitem_set.all():
+                    meal_expected += item.get_nutritional_values()
+
+                self.assertValuesEqual(meal.get_nutritional_values(), meal_expected)
+                expected += meal_expected
+
+            self.assertValuesEqual(plan.get_nutritional_values()['total'], expected)
+
+    def test_plan_queries(self):
+        """
+        The plan's values and the closest weight entry need one query each
+        """
+        plan = models.NutritionPlan.objects.get(pk='11111111-1111-1111-1111-000000000004')
+        cache.clear()
+
+        with self.assertNumQueries(2):
+            plan.get_nutritional_values()
+
+    def test_log_values_by_day(self):
+        plan = models.NutritionPlan.objects.get(pk='cc000000-0000-0000-0000-000000000001')
+        days = plan.get_log_nutritional_values()
+
+        self.assertEqual(list(days), [datetime.date(2016, 5, 14), datetime.date(2016, 5, 15)])
+        for date, values in days.items():
+            expected = NutritionalValues()
+            for item in plan.get_log_entries(date):
+                expected += item.get_nutritional_values()
+            self.assertValuesEqual(values, expected)
+
+        days = plan.get_log_nutritional_values(start=datetime.date(2016, 5, 15))
+        self.assertEqual(list(days), [datetime.date(2016, 5, 15)])
+
+
 class NutritionalValuesApiTestCase(WgerTestCase):
     """
     Tests the nutritional_values action of the nutrition diary API endpoint
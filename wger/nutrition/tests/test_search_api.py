@@ -241,7 +241,7 @@ class SearchIngredientApiTestCase(BaseTestCase, ApiBaseTestCase):
 
         response = self.client.get(self.url + '?code=0000000000000')
 
-        mock_fetch.assert_called_once_with('0000000000000')
+        mock_fetch.assert_called_once_with('0000000000000', raise_errors=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 1)
         self.assertEqual(response.data['results'][0]['id'], 2)
@@ -255,7 +255,7 @@ class SearchIngredientApiTestCase(BaseTestCase, ApiBaseTestCase):
 
         response = self.client.get(self.url + '?code=0000000000000')
 
-        mock_fetch.assert_called_once_with('0000000000000')
+        mock_fetch.assert_called_once_with('0000000000000', raise_errors=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 0)
 
@@ -32,12 +32,18 @@ from wger.nutrition.models import (
     Ingredient,
     IngredientWeightUnit,
 )
-from wger.nutrition.sync import sync_ingredients
+from wger.nutrition.sync import (
+    sync_ingredient_batch,
+    sync_ingredients,
+)
 from wger.nutrition.tasks import (
     sync_all_ingredients_chunked_task,
     sync_ingredient_id_range_task,
 )
-from wger.utils.requests import wger_headers
+from wger.utils.requests import (
+    REQUEST_TIMEOUT,
+    wger_headers,
+)
 
 
 class MockIngredientResponse:
@@ -124,7 +130,7 @@ class MockIngredientResponse:
 
 
 class TestSyncMethods(WgerTestCase):
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_ingredient_sync(self, mock_request):
         # Arrange
         ingredient = Ingredient.objects.get(pk=1)
@@ -142,6 +148,7 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             'https://wger.de/api/v2/ingredient-sync/?page_size=999',
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
 
         # Assert
@@ -176,7 +183,7 @@ class TestSyncMethods(WgerTestCase):
         self.assertIsNone(new_ingredient.nutriscore)
         self.assertEqual(new_ingredient.ingredientweightunit_set.count(), 0)
 
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_sync_removes_deleted_weight_units(self, mock_request):
         """Weight units that no longer exist on the remote are deleted locally"""
         # Arrange - sync once to create the weight units
@@ -194,7 +201,41 @@ class TestSyncMethods(WgerTestCase):
         # Assert - local-only unit should be removed
         self.assertEqual(ingredient.ingredientweightunit_set.count(), 2)
 
-    @patch('requests.get')
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
+    def test_sync_only_writes_changes(self, mock_request):
+        """Ingredients and weight units that didn't change are not written again"""
+        sync_ingredients(lambda x: x)
+        ingredient = Ingredient.objects.get(pk=1)
+        unit = ingredient.ingredientweightunit_set.get(name='Serving')
+
+        with patch('wger.nutrition.sync._upsert') as upsert:
+            sync_ingredients(lambda x: x)
+        upsert.assert_not_called()
+
+        self.assertEqual(Ingredient.objects.get(pk=1).last_update, ingredient.last_update)
+        self.assertEqual(IngredientWeightUnit.objects.get(pk=unit.pk).gram, 85)
+
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
+    def test_sync_updates_diary_of_changed_ingredients(self, mock_request):
+        """The diary rollups of ingredients that changed are recalculated"""
+        with patch(
+            'wger.nutrition.sync.DiaryDay.refresh_ingredients',
+        ) as refresh_ingredients:
+            sync_ingredients(lambda x: x)
+        refresh_ingredients.assert_called_once_with([1])
+
+    def test_sync_ingredient_batch_moves_weight_units(self):
+        """A weight unit that belongs to another ingredient on the remote is moved"""
+        data = MockIngredientResponse.json()['results']
+        data[1]['weight_units'] = [data[0]['weight_units'].pop()]
+        sync_ingredient_batch(MockIngredientResponse.json()['results'])
+
+        self.assertEqual(sync_ingredient_batch(data), (2, 0))
+        unit = IngredientWeightUnit.objects.get(uuid='a1b2c3d4-0000-0000-0000-000000000002')
+        self.assertEqual(unit.ingredient.uuid, UUID('582f1b7f-a8bd-4951-9edd-247bc68b28f4'))
+        self.assertEqual(Ingredient.objects.get(pk=1).ingredientweightunit_set.count(), 1)
+
+    @patch('requests.Session.get')
     def test_sync_skips_ingredient_failing_sanity_checks(self, mock_request):
         """A record that fails sanity_checks() is skipped without aborting the sync."""
         response = MagicMock()
@@ -254,7 +295,7 @@ class TestSyncMethods(WgerTestCase):
         )
         self.assertEqual(Ingredient.objects.count(), count_before + 1)
 
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_ingredient_sync_languages(self, mock_request):
         # Call the function with the language_codes parameter
         sync_ingredients(lambda x: x, language_codes='en')
@@ -264,9 +305,10 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             expected_url,
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
 
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_ingredient_sync_incremental(self, mock_request):
         """Incremental sync passes `last_update__gt` to the cursor endpoint."""
         sync_ingredients(lambda x: x, last_update_gt='2026-04-20T00:00:00Z')
@@ -278,9 +320,10 @@ class TestSyncMethods(WgerTestCase):
         mock_request.assert_called_with(
             expected_url,
             headers=wger_headers(),
+            timeout=REQUEST_TIMEOUT,
         )
 
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_ingredient_sync_fetches_count_when_progress_bar_enabled(self, mock_request):
         """With show_progress_bar=True, the first call probes for the total count.
 
@@ -299,7 +342,7 @@ class TestSyncMethods(WgerTestCase):
         last_call_args = mock_request.call_args_list[-1].args
         self.assertIn('/api/v2/ingredient-sync/', last_call_args[0])
 
-    @patch('requests.get', return_value=MockIngredientResponse())
+    @patch('requests.Session.get', return_value=MockIngredientResponse())
     def test_ingredient_sync_skips_count_probe_without_progress_bar(self, mock_request):
         """Without progress-bar, the count probe is skipped to save a request.
 
@@ -314,7 +357,7 @@ class TestSyncMethods(WgerTestCase):
             self.assertIn('/api/v2/ingredient-sync/', call.args[0])
             self.assertNotIn('/api/v2/ingredient/?', call.args[0])
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_ingredient_sync_continues_when_count_fetch_fails(self, mock_request):
         """A failing count fetch must not abort the sync — fallback to no-ETA bar."""
         # First call (count) raises, subsequent calls return a valid response
@@ -34,13 +34,28 @@ from django.test import SimpleTestCase
 
 # wger
 from wger.core.tests.base_testcase import WgerTestCase
-from wger.nutrition.consts import SyncMode
-from wger.nutrition.models import Ingredient
+from wger.nutrition import sync
+from wger.nutrition.api.endpoints import (
+    INGREDIENT_SEGMENTS_MANIFEST_PATH,
+    INGREDIENT_SEGMENTS_PATH,
+    INGREDIENT_SEGMENTS_SYNC_STATE_PATH,
+)
+from wger.nutrition.api.serializers import IngredientSerializer
+from wger.nutrition.consts import (
+    ENERGY_FACTOR,
+    SyncMode,
+)
+from wger.nutrition.models import (
+    Ingredient,
+    IngredientWeightUnit,
+)
 from wger.nutrition.sync import (
     _open_jsonl,
     download_ingredient_dump,
     export_ingredient_dump,
+    export_ingredient_segments,
     sync_ingredients_from_dump,
+    sync_ingredients_from_segments,
 )
 
 
@@ -485,3 +500,168 @@ class TestBulkSyncManagementCommands(WgerTestCase):
                     'https://example.com',
                     stdout=out,
                 )
+
+
+class TestIngredientSegments(WgerTestCase):
+    """Test the segmented export and the sync of the changed segments."""
+
+    manifest_url = 'https://example.com/media/ingredients/segments/manifest.json'
+
+    def setUp(self):
+        super().setUp()
+
+        # The storage outlives the test's transaction, start without previous exports or syncs
+        for path in (INGREDIENT_SEGMENTS_MANIFEST_PATH, INGREDIENT_SEGMENTS_SYNC_STATE_PATH):
+            default_storage.delete(path)
+
+        # Segments with invalid records are synced again, make the fixtures pass
+        # the sanity checks
+        for ingredient in Ingredient.objects.all():
+            if ingredient.carbohydrates_sugar:
+                ingredient.carbohydrates_sugar = min(
+                    ingredient.carbohydrates_sugar, ingredient.carbohydrates
+                )
+            ingredient.energy = round(
+                ingredient.protein * ENERGY_FACTOR['protein']
+                + ingredient.carbohydrates * ENERGY_FACTOR['carbohydrates']
+                + ingredient.fat * ENERGY_FACTOR['fat']
+                + (ingredient.fiber or 0) * ENERGY_FACTOR['fiber']
+            )
+            ingredient.save()
+
+    def _export(self) -> dict:
+        return export_ingredient_segments(lambda x: x, segment_size=5)
+
+    def _serve_storage(self, url, **kwargs):
+        """Answer the requests with the exported files"""
+        path = f'{INGREDIENT_SEGMENTS_PATH}/{url.rsplit("/", 1)[1]}'
+        with default_storage.open(path, 'rb') as f:
+            content = f.read()
+
+        response = MagicMock()
+        response.status_code = 200
+        response.raw.read.return_value = content
+        if url.endswith('.json'):
+            response.json.return_value = json.loads(content)
+        return response
+
+    def test_export_segments(self):
+        manifest = self._export()
+
+        self.assertEqual(sum(segment['count'] for segment in manifest['segments']), 14)
+        for segment in manifest['segments']:
+            self.assertTrue(default_storage.exists(f'{INGREDIENT_SEGMENTS_PATH}/{segment["file"]}'))
+        self.assertTrue(default_storage.exists(INGREDIENT_SEGMENTS_MANIFEST_PATH))
+
+    def test_export_only_rewrites_changed_segments(self):
+        manifest = self._export()
+
+        ingredient = Ingredient.objects.get(pk=1)
+        ingredient.name = 'A new name'
+        ingredient.save()
+
+        with patch(
+            'wger.nutrition.sync._write_ingredient_segment',
+            wraps=sync._write_ingredient_segment,
+        ) as write_segment:
+            new_manifest = self._export()
+
+        write_segment.assert_called_once_with(0, 5)
+        self.assertNotEqual(manifest['segments'][0]['file'], new_manifest['segments'][0]['file'])
+        self.assertEqual(manifest['segments'][1:], new_manifest['segments'][1:])
+
+        # The old file of the segment is removed
+        self.assertFalse(
+            default_storage.exists(f'{INGREDIENT_SEGMENTS_PATH}/{manifest["segments"][0]["file"]}')
+        )
+
+    def test_export_rewrites_segments_with_edited_weight_units(self):
+        """
+        Editing a weight unit in place doesn't touch its ingredient, the segment
+        is still serialized again
+        """
+        manifest = self._export()
+
+        unit = IngredientWeightUnit.objects.order_by('pk').first()
+        IngredientWeightUnit.objects.filter(pk=unit.pk).update(gram=unit.gram + 1)
+
+        with patch(
+            'wger.nutrition.sync._write_ingredient_segment',
+            wraps=sync._write_ingredient_segment,
+        ) as write_segment:
+            new_manifest = self._export()
+
+        segment_id = unit.ingredient_id // 5
+        write_segment.assert_called_once_with(segment_id, 5)
+        self.assertNotEqual(
+            manifest['segments'][segment_id]['file'],
+            new_manifest['segments'][segment_id]['file'],
+        )
+
+    def test_full_dump_is_assembled_from_segments(self):
+        with patch('wger.nutrition.sync.IngredientSerializer', wraps=IngredientSerializer) as ser:
+            saved_name = export_ingredient_dump(lambda x: x)
+            self.assertEqual(ser.call_count, 14)
+
+        with default_storage.open(saved_name, 'rb') as f:
+            lines = gzip.decompress(f.read()).decode('utf-8').strip().split('\n')
+        self.assertEqual(len(lines), 14)
+
+    @patch('requests.Session.get')
+    def test_sync_only_fetches_changed_segments(self, mock_get: MagicMock):
+        mock_get.side_effect = self._serve_storage
+        manifest = self._export()
+
+        ingredient = Ingredient.objects.get(pk=1)
+        name = ingredient.name
+        Ingredient.objects.filter(pk=1).update(name='Changed locally')
+
+        count = sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
+
+        self.assertGreater(count, 0)
+        self.assertEqual(mock_get.call_count, 1 + len(manifest['segments']))
+        self.assertEqual(Ingredient.objects.get(pk=1).name, name)
+
+        # Nothing changed on the server, only the manifest is fetched
+        mock_get.reset_mock()
+        count = sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
+        self.assertEqual(count, 0)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_sync_retries_segments_with_errors(self, mock_get: MagicMock):
+        """A segment with invalid records is not marked as synced"""
+        mock_get.side_effect = self._serve_storage
+        manifest = self._export()
+
+        apply = sync._apply_ingredient_segment
+        with patch(
+            'wger.nutrition.sync._apply_ingredient_segment',
+            side_effect=lambda content: (apply(content)[0], 1),
+        ):
+            sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
+
+        mock_get.reset_mock()
+        sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
+        self.assertEqual(mock_get.call_count, 1 + len(manifest['segments']))
+
+    @patch('requests.Session.get')
+    def test_sync_rejects_corrupt_segment(self, mock_get: MagicMock):
+        self._export()
+
+        def corrupt(url, **kwargs):
+            response = self._serve_storage(url)
+            if url.endswith('.jsonl.gz'):
+                response.raw.read.return_value = gzip.compress(b'{}\n')
+            return response
+
+        mock_get.side_effect = corrupt
+        with self.assertRaisesMessage(ValueError, 'Checksum mismatch'):
+            sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
+
+    @patch('requests.Session.get')
+    def test_sync_missing_manifest(self, mock_get: MagicMock):
+        mock_get.return_value.status_code = 404
+
+        with self.assertRaises(FileNotFoundError):
+            sync_ingredients_from_segments(lambda x: x, manifest_url=self.manifest_url)
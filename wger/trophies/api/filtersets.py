@@ -19,6 +19,7 @@ from django_filters import rest_framework as filters
 
 # wger
 from wger.trophies.models import (
+    PersonalRecord,
     Trophy,
     UserTrophy,
 )
@@ -58,3 +59,16 @@ class UserTrophyFilterSet(filters.FilterSet):
             'trophy__is_repeatable': ['exact'],
             'trophy__trophy_type': ['exact', 'in'],
         }
+
+
+class PersonalRecordFilterSet(filters.FilterSet):
+    """
+    Filter set for PersonalRecord model.
+    """
+
+    class Meta:
+        model = PersonalRecord
+        fields = {
+            'exercise': ['exact', 'in'],
+            'updated': ['exact', 'gt', 'gte', 'lt', 'lte'],
+        }
@@ -26,6 +26,7 @@ from rest_framework import serializers
 
 # wger
 from wger.trophies.models import (
+    PersonalRecord,
     Trophy,
     UserStatistics,
     UserTrophy,
@@ -104,6 +105,28 @@ class UserTrophySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class PersonalRecordSerializer(serializers.ModelSerializer):
+    """
+    Serializer for PersonalRecord model.
+
+    Shows the user's best results per exercise, the weights are in kg.
+    """
+
+    class Meta:
+        model = PersonalRecord
+        fields = (
+            'id',
+            'exercise',
+            'one_rep_max_estimate',
+            'one_rep_max_log',
+            'weight',
+            'repetitions',
+            'weight_log',
+            'updated',
+        )
+        read_only_fields = fields
+
+
 class UserStatisticsSerializer(serializers.ModelSerializer):
     """
     Serializer for UserStatistics model.
@@ -25,16 +25,19 @@ from rest_framework.response import Response
 
 # wger
 from wger.trophies.api.filtersets import (
+    PersonalRecordFilterSet,
     TrophyFilterSet,
     UserTrophyFilterSet,
 )
 from wger.trophies.api.serializers import (
+    PersonalRecordSerializer,
     TrophyProgressSerializer,
     TrophySerializer,
     UserStatisticsSerializer,
     UserTrophySerializer,
 )
 from wger.trophies.models import (
+    PersonalRecord,
     Trophy,
     UserStatistics,
     UserTrophy,
@@ -195,3 +198,33 @@ class UserStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
             return UserStatistics.objects.none()
 
         return UserStatistics.objects.filter(user=self.request.user)
+
+
+class PersonalRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for user's personal records.
+
+    Returns the current user's best results per exercise.
+
+    list:
+    Return the current user's personal records
+
+    retrieve:
+    Return a personal record by ID
+    """
+
+    serializer_class = PersonalRecordSerializer
+    filterset_class = PersonalRecordFilterSet
+    ordering_fields = ['exercise', 'one_rep_max_estimate', 'weight', 'updated']
+
+    is_private = True
+
+    def get_queryset(self):
+        """
+        Return only the current user's personal records.
+        """
+        # REST API generation
+        if getattr(self, 'swagger_fake_view', False):
+            return PersonalRecord.objects.none()
+
+        return PersonalRecord.objects.filter(user=self.request.user)
@@ -18,6 +18,7 @@
 
 # Local
 from .base import BaseTrophyChecker
+from .context import TrophyEvaluationContext
 from .date_based import DateBasedChecker
 from .inactivity_return import InactivityReturnChecker
 from .registry import CheckerRegistry
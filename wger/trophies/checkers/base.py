@@ -32,6 +32,9 @@ from django.utils import formats
 # wger
 from wger.trophies.models import Trophy
 
+# Local
+from .context import TrophyEvaluationContext
+
 
 class BaseTrophyChecker(ABC):
     """
@@ -41,7 +44,13 @@ class BaseTrophyChecker(ABC):
     evaluate whether a user has earned that trophy.
     """
 
-    def __init__(self, user: User, trophy: 'Trophy', params: dict):
+    def __init__(
+        self,
+        user: User,
+        trophy: 'Trophy',
+        params: dict,
+        context: Optional[TrophyEvaluationContext] = None,
+    ):
         """
         Initialize the checker.
 
@@ -49,23 +58,20 @@ class BaseTrophyChecker(ABC):
             user: The user to check the trophy for
             trophy: The trophy being checked
             params: Parameters from the trophy's checker_params field
+            context: The user's data shared by all checkers of an evaluation run.
+                A new one is created if not given.
         """
         self.user = user
         self.trophy = trophy
         self.params = params
-        self._statistics = None
+        self.context = context or TrophyEvaluationContext(user)
 
     @property
     def statistics(self):
         """
-        Lazy-load the user's statistics.
+        The user's statistics, loaded once per evaluation context.
         """
-        if self._statistics is None:
-            # wger
-            from wger.trophies.models import UserStatistics
-
-            self._statistics, _ = UserStatistics.objects.get_or_create(user=self.user)
-        return self._statistics
+        return self.context.statistics
 
     @abstractmethod
     def check(self) -> bool:
@@ -0,0 +1,99 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Standard Library
+from functools import cached_property
+from typing import (
+    Dict,
+    FrozenSet,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# Django
+from django.contrib.auth.models import User
+
+# wger
+from wger.manager.models import WorkoutSession
+from wger.trophies.models import (
+    PersonalRecord,
+    Trophy,
+    UserStatistics,
+    UserTrophy,
+)
+
+
+class TrophyEvaluationContext:
+    """
+    The data of a user needed to evaluate the trophies.
+
+    Everything is loaded lazily and only once, so that all checkers of an
+    evaluation run share the same queries instead of each one running its own.
+    """
+
+    def __init__(self, user: User):
+        self.user = user
+        self._personal_records: Dict[int, Optional[PersonalRecord]] = {}
+
+    @cached_property
+    def statistics(self) -> UserStatistics:
+        """
+        The user's statistics, created if they don't exist yet
+        """
+        statistics, _ = UserStatistics.objects.get_or_create(user=self.user)
+        return statistics
+
+    @cached_property
+    def earned_trophy_ids(self) -> Set[int]:
+        """
+        The IDs of all trophies the user has earned
+        """
+        return set(
+            UserTrophy.objects.filter(user=self.user).values_list('trophy_id', flat=True).distinct()
+        )
+
+    @cached_property
+    def workout_days(self) -> FrozenSet[Tuple[int, int]]:
+        """
+        The (month, day) pairs of all dates the user worked out on
+        """
+        return frozenset(
+            WorkoutSession.objects.filter(user=self.user)
+            .values_list('date__month', 'date__day')
+            .distinct()
+        )
+
+    def has_earned(self, trophy: Trophy) -> bool:
+        return trophy.id in self.earned_trophy_ids
+
+    def personal_record(self, exercise_id: int) -> Optional[PersonalRecord]:
+        """
+        The user's personal record in the given exercise, if any
+        """
+        if exercise_id not in self._personal_records:
+            self._personal_records[exercise_id] = PersonalRecord.objects.filter(
+                user=self.user,
+                exercise_id=exercise_id,
+            ).first()
+
+        return self._personal_records[exercise_id]
+
+    def add_earned(self, user_trophy: UserTrophy):
+        """
+        Records a newly awarded trophy, so that later checks see it
+        """
+        self.earned_trophy_ids.add(user_trophy.trophy_id)
@@ -63,16 +63,8 @@ class DateBasedChecker(BaseTrophyChecker):
         if month == 1 and day == 1:
             return self.statistics.worked_out_jan_1
 
-        # For other dates, we need to query the workout sessions
-        # This is done in the statistics service when updating
-        # wger
-        from wger.manager.models import WorkoutSession
-
-        return WorkoutSession.objects.filter(
-            user=self.user,
-            date__month=month,
-            date__day=day,
-        ).exists()
+        # For other dates, look at the dates of all workout sessions
+        return (month, day) in self.context.workout_days
 
     def get_progress(self) -> float:
         """
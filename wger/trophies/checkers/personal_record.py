@@ -21,8 +21,6 @@ from typing import Optional
 
 # wger
 from wger.manager.models import WorkoutLog
-from wger.trophies.models.trophy import Trophy
-from wger.trophies.models.user_trophy import UserTrophy
 
 # Local
 from .base import BaseTrophyChecker
@@ -71,39 +69,22 @@ class PersonalRecordChecker(BaseTrophyChecker):
         return round(float(result), 2)
 
     def check(self) -> bool:
-        """Check if user has beaten Personal Record."""
+        """
+        Check if user has beaten Personal Record.
+
+        The log is compared with the user's entry in the personal record index,
+        so it must not have been applied to the index yet.
+        """
+        # wger
+        from wger.trophies.services.personal_records import PersonalRecordService
+
         log = self.params.get('log', None)
 
         if not log:
             return False
 
-        exercise = getattr(log, 'exercise', None)
-
-        pr_trophy = Trophy.objects.get(name='Personal Record')
-        if not pr_trophy:
-            raise Exception("Trophy 'Personal Record' not found.")
-
-        last_pr = (
-            UserTrophy.objects.filter(
-                user=log.user,
-                trophy=pr_trophy,
-                context_data__exercise_id=exercise.id,
-            )
-            .order_by('-earned_at')
-            .first()
-        )
-
-        if last_pr and last_pr.context_data:
-            prev = last_pr.context_data.get('one_rep_max_estimate')
-            try:
-                current = self._estimate_one_rep_max()
-            except Exception:
-                return False
-
-            if prev is not None and prev >= current:
-                return False
-
-        return True
+        record = self.context.personal_record(log.exercise_id)
+        return PersonalRecordService.is_new_record(record, log)
 
     def get_progress(self) -> float:
         """Get progress as percentage."""
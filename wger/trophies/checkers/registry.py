@@ -30,6 +30,7 @@ from wger.trophies.models.trophy import Trophy
 
 # Local
 from .base import BaseTrophyChecker
+from .context import TrophyEvaluationContext
 from .date_based import DateBasedChecker
 from .inactivity_return import InactivityReturnChecker
 from .personal_record import PersonalRecordChecker
@@ -115,6 +116,7 @@ class CheckerRegistry:
         cls,
         user: User,
         trophy: Trophy,
+        context: Optional[TrophyEvaluationContext] = None,
     ) -> Optional[BaseTrophyChecker]:
         """
         Factory method to create a checker instance for a trophy.
@@ -122,6 +124,7 @@ class CheckerRegistry:
         Args:
             user: The user to check the trophy for
             trophy: The trophy to check
+            context: Optional evaluation context to share with other checkers
 
         Returns:
             An instance of the appropriate checker class, or None if the
@@ -141,6 +144,7 @@ class CheckerRegistry:
                 user=user,
                 trophy=trophy,
                 params=trophy.checker_params or {},
+                context=context,
             )
         except Exception as e:
             logger.error(
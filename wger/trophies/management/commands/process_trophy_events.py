@@ -0,0 +1,38 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.core.management.base import BaseCommand
+
+# wger
+from wger.trophies.services import TrophyEventService
+
+
+class Command(BaseCommand):
+    """
+    Apply the trophy events of all users that are still pending.
+
+    With Celery this is done periodically. Without it, the events are processed
+    by a thread of the web process, this command (e.g. run by cron) catches the
+    ones that were left over when the process stopped.
+    """
+
+    help = 'Apply the pending trophy events of all users'
+
+    def handle(self, **options):
+        processed = TrophyEventService.process_all()
+        if int(options['verbosity']) >= 1:
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} pending trophy events'))
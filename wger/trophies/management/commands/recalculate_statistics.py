@@ -30,6 +30,7 @@ from django.utils import timezone
 from tqdm import tqdm
 
 # wger
+from wger.trophies.services.personal_records import PersonalRecordService
 from wger.trophies.services.statistics import UserStatisticsService
 
 
@@ -37,8 +38,9 @@ class Command(BaseCommand):
     """
     Recalculate user statistics from workout history.
 
-    This command performs a full recalculation of UserStatistics for
-    specified users by analyzing their complete workout history.
+    This command performs a full recalculation of UserStatistics and of the
+    personal records for specified users by analyzing their complete workout
+    history.
     """
 
     help = 'Recalculate user statistics from workout history'
@@ -91,6 +93,7 @@ class Command(BaseCommand):
                 self.stdout.write(f'Recalculating statistics for user: {username}')
 
             stats = UserStatisticsService.update_statistics(user)
+            PersonalRecordService.rebuild(user)
 
             if verbosity >= 2:
                 self.stdout.write(
@@ -127,6 +130,12 @@ class Command(BaseCommand):
                 if verbosity >= 1:
                     self.stdout.write('Recalculating statistics for all users')
 
+            # The personal records of all users are rebuilt in one go
+            if not active_only:
+                records = PersonalRecordService.rebuild()
+                if verbosity >= 1:
+                    self.stdout.write(f'Rebuilt {records} personal records')
+
             total_users = users.count()
             processed = 0
             errors = 0
@@ -135,6 +144,8 @@ class Command(BaseCommand):
                 for user in users:
                     try:
                         UserStatisticsService.update_statistics(user)
+                        if active_only:
+                            PersonalRecordService.rebuild(user)
                         processed += 1
 
                         if verbosity >= 2:
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.9 on 2026-10-18 05:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('trophies', '0003_migrate_context_data_uuids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrophyEvent',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                (
+                    'event_type',
+                    models.CharField(
+                        choices=[
+                            ('log_created', 'Workout log created'),
+                            ('session_saved', 'Workout session saved'),
+                            ('recalculate', 'Workouts edited or deleted'),
+                        ],
+                        max_length=20,
+                        verbose_name='Type',
+                    ),
+                ),
+                ('object_id', models.UUIDField(blank=True, null=True, verbose_name='Object ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='trophy_events',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='User',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Trophy event',
+                'verbose_name_plural': 'Trophy events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 6.0.9 on 2026-10-18 05:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('exercises', '0040_alter_exercise_license_author_and_more'),
+        ('manager', '0028_backfill_session_day'),
+        ('trophies', '0004_trophy_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                (
+                    'one_rep_max_estimate',
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text='Best one rep max estimated with the Brzycki formula, in kg',
+                        max_digits=8,
+                        null=True,
+                        verbose_name='Estimated one rep max',
+                    ),
+                ),
+                (
+                    'weight',
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text='Heaviest weight lifted, in kg',
+                        max_digits=8,
+                        null=True,
+                        verbose_name='Weight',
+                    ),
+                ),
+                (
+                    'repetitions',
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text='Most repetitions done with the heaviest weight',
+                        max_digits=6,
+                        null=True,
+                        verbose_name='Repetitions',
+                    ),
+                ),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+                (
+                    'exercise',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='exercises.exercise',
+                        verbose_name='Exercise',
+                    ),
+                ),
+                (
+                    'one_rep_max_log',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='+',
+                        to='manager.workoutlog',
+                        verbose_name='Log of the estimated one rep max',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='personal_records',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='User',
+                    ),
+                ),
+                (
+                    'weight_log',
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='+',
+                        to='manager.workoutlog',
+                        verbose_name='Log of the heaviest weight',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Personal record',
+                'verbose_name_plural': 'Personal records',
+                'ordering': ['exercise_id'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('user', 'exercise'), name='unique_personal_record'
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated manually to fill the personal record index from the existing logs.
+
+from itertools import batched
+
+from django.db import migrations
+from django.db.migrations.state import StateApps
+
+
+def build_personal_records(apps: StateApps, schema_editor):
+    # wger
+    from wger.trophies.services.personal_records import (
+        LOG_FIELDS,
+        REBUILD_BATCH_SIZE,
+        PersonalRecordService,
+    )
+
+    PersonalRecord = apps.get_model('trophies', 'PersonalRecord')
+    WorkoutLog = apps.get_model('manager', 'WorkoutLog')
+
+    rows = (
+        WorkoutLog.objects.order_by('user_id', 'exercise_id', 'date', 'id')
+        .values_list('user_id', *LOG_FIELDS)
+        .iterator(chunk_size=REBUILD_BATCH_SIZE)
+    )
+    records = PersonalRecordService.build_records(rows, model=PersonalRecord)
+    for batch in batched(records, REBUILD_BATCH_SIZE):
+        PersonalRecord.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('trophies', '0005_personal_record'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            build_personal_records,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
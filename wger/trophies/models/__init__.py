@@ -15,6 +15,8 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # Local
+from .personal_record import PersonalRecord
 from .trophy import Trophy
+from .trophy_event import TrophyEvent
 from .user_statistics import UserStatistics
 from .user_trophy import UserTrophy
@@ -0,0 +1,120 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.contrib.auth.models import User
+from django.db import models
+
+# wger
+from wger.exercises.models import Exercise
+from wger.manager.models import WorkoutLog
+
+
+class PersonalRecord(models.Model):
+    """
+    The best results of a user in an exercise
+
+    This is an index over the user's workout logs, updated incrementally when
+    logs are created and rebuilt when they are edited or deleted. All weights
+    are stored in kg.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='personal_records',
+        verbose_name='User',
+    )
+    """The user the record belongs to"""
+
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Exercise',
+    )
+    """The exercise of the record"""
+
+    one_rep_max_estimate = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        null=True,
+        verbose_name='Estimated one rep max',
+        help_text='Best one rep max estimated with the Brzycki formula, in kg',
+    )
+    """Best estimated one rep max"""
+
+    one_rep_max_log = models.ForeignKey(
+        WorkoutLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Log of the estimated one rep max',
+    )
+    """The log with the best estimated one rep max"""
+
+    weight = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        null=True,
+        verbose_name='Weight',
+        help_text='Heaviest weight lifted, in kg',
+    )
+    """Heaviest weight lifted"""
+
+    repetitions = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        null=True,
+        verbose_name='Repetitions',
+        help_text='Most repetitions done with the heaviest weight',
+    )
+    """Most repetitions done with the heaviest weight"""
+
+    weight_log = models.ForeignKey(
+        WorkoutLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Log of the heaviest weight',
+    )
+    """The log with the heaviest weight and most repetitions"""
+
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Updated',
+    )
+    """When the record last changed"""
+
+    class Meta:
+        ordering = ['exercise_id']
+        verbose_name = 'Personal record'
+        verbose_name_plural = 'Personal records'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'exercise'],
+                name='unique_personal_record',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.exercise_id}: {self.one_rep_max_estimate}'
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self
@@ -0,0 +1,75 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Django
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class TrophyEvent(models.Model):
+    """
+    A change to the workouts of a user that still has to be applied to the
+    statistics and trophies
+
+    The events are written by the signal handlers and processed in the
+    background, all pending events of a user at once.
+    """
+
+    TYPE_LOG_CREATED = 'log_created'
+    TYPE_SESSION_SAVED = 'session_saved'
+    TYPE_RECALCULATE = 'recalculate'
+
+    TYPE_CHOICES = (
+        (TYPE_LOG_CREATED, 'Workout log created'),
+        (TYPE_SESSION_SAVED, 'Workout session saved'),
+        (TYPE_RECALCULATE, 'Workouts edited or deleted'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='trophy_events',
+        verbose_name='User',
+    )
+    """The user whose workouts changed"""
+
+    event_type = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        verbose_name='Type',
+    )
+    """What changed"""
+
+    object_id = models.UUIDField(
+        null=True,
+        blank=True,
+        verbose_name='Object ID',
+    )
+    """The ID of the created log or the saved session, if any"""
+
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created',
+    )
+    """When the event was written"""
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Trophy event'
+        verbose_name_plural = 'Trophy events'
+
+    def __str__(self):
+        return f'{self.user_id} - {self.event_type}'
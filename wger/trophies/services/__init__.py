@@ -15,8 +15,15 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # Local
+from .events import TrophyEventService
+from .personal_records import PersonalRecordService
 from .statistics import UserStatisticsService
 from .trophy import TrophyService
 
 
-__all__ = ['UserStatisticsService', 'TrophyService']
+__all__ = [
+    'UserStatisticsService',
+    'TrophyService',
+    'TrophyEventService',
+    'PersonalRecordService',
+]
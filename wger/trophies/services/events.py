@@ -0,0 +1,295 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Standard Library
+import logging
+import threading
+import time
+import uuid
+from typing import (
+    Optional,
+    Set,
+)
+
+# Django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import (
+    close_old_connections,
+    transaction,
+)
+
+# wger
+from wger.manager.models import (
+    WorkoutLog,
+    WorkoutSession,
+)
+from wger.trophies.checkers.context import TrophyEvaluationContext
+from wger.trophies.checkers.registry import CheckerRegistry
+from wger.trophies.models import (
+    Trophy,
+    TrophyEvent,
+)
+from wger.utils.cache import CacheKeyMapper
+
+# Local
+from .personal_records import PersonalRecordService
+from .statistics import UserStatisticsService
+from .trophy import TrophyService
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrophyEventService:
+    """
+    Queue of workout changes that are applied to the statistics and trophies
+    outside of the request that made them.
+
+    The events are stored in the database, and all pending events of a user
+    are processed at once: a burst of logs from one workout results in a single
+    statistics update and trophy evaluation. Depending on the settings, the
+    events are processed:
+
+    - by a Celery task, if USE_CELERY is set
+    - by a background thread of the current process otherwise
+    - right away, if TROPHIES_ASYNC is not set
+    """
+
+    @classmethod
+    def enqueue(cls, user_id: int, event_type: str, object_id: Optional[uuid.UUID] = None):
+        """
+        Store an event and make sure it gets processed
+        """
+        cls.enqueue_many(user_id, [(event_type, object_id)])
+
+    @classmethod
+    def enqueue_many(cls, user_id: int, events: list[tuple[str, Optional[uuid.UUID]]]):
+        """
+        Store several events of a user with one query and make sure they get
+        processed, e.g. for a batch of logs
+
+        Args:
+            events: The type and object ID of every event
+        """
+        TrophyEvent.objects.bulk_create(
+            TrophyEvent(user_id=user_id, event_type=event_type, object_id=object_id)
+            for event_type, object_id in events
+        )
+
+        if not settings.WGER_SETTINGS['TROPHIES_ASYNC']:
+            cls.process(user_id)
+        else:
+            transaction.on_commit(lambda: cls.schedule(user_id))
+
+    @classmethod
+    def schedule(cls, user_id: int):
+        """
+        Schedule the processing of the user's events, unless it already is
+
+        Processing is delayed by TROPHIES_EVENT_DELAY seconds, so that the
+        events that follow shortly after are processed together.
+        """
+        delay = settings.WGER_SETTINGS['TROPHIES_EVENT_DELAY']
+
+        if settings.WGER_SETTINGS['USE_CELERY']:
+            # wger
+            from wger.trophies.tasks import process_trophy_events_task
+
+            key = CacheKeyMapper.trophy_events_scheduled_key(user_id)
+            if cache.add(key, True, delay * 10):
+                process_trophy_events_task.apply_async((user_id,), countdown=delay)
+        else:
+            trophy_event_worker.submit(user_id)
+
+    @classmethod
+    def process(cls, user_id: int) -> int:
+        """
+        Apply all pending events of a user
+
+        Returns:
+            The number of processed events
+        """
+        cache.delete(CacheKeyMapper.trophy_events_scheduled_key(user_id))
+
+        with transaction.atomic():
+            events = list(
+                TrophyEvent.objects.select_for_update(skip_locked=True)
+                .filter(user_id=user_id)
+                .order_by('id')
+            )
+            if not events:
+                return 0
+
+            user = User.objects.select_related('userprofile').filter(pk=user_id).first()
+            if user is not None:
+                cls._apply(user, events)
+
+            TrophyEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+
+        return len(events)
+
+    @classmethod
+    def process_all(cls) -> int:
+        """
+        Apply the pending events of all users, e.g. those left over by a
+        process that stopped before handling them
+
+        An error with the events of one user is logged, the other users are
+        processed nonetheless.
+
+        Returns:
+            The number of processed events
+        """
+        processed = 0
+        user_ids = TrophyEvent.objects.values_list('user_id', flat=True).distinct()
+        for user_id in list(user_ids):
+            try:
+                processed += cls.process(user_id)
+            except Exception as e:
+                logger.error(
+                    f'Error processing trophy events for user {user_id}: {e}', exc_info=True
+                )
+        return processed
+
+    @classmethod
+    def _apply(cls, user: User, events: list[TrophyEvent]):
+        object_ids = [event.object_id for event in events if event.object_id]
+        logs = WorkoutLog.objects.filter(pk__in=object_ids).select_related(
+            'session',
+            'exercise',
+            'repetitions_unit',
+            'weight_unit',
+        )
+        logs = {log.pk: log for log in logs}
+        sessions = {
+            session.pk: session for session in WorkoutSession.objects.filter(pk__in=object_ids)
+        }
+
+        # Logs and sessions that were deleted in the meantime are covered by
+        # the recalculation event of the deletion
+        workouts = []
+        for event in events:
+            if event.event_type == TrophyEvent.TYPE_LOG_CREATED and event.object_id in logs:
+                workouts.append((logs[event.object_id], None))
+            elif event.event_type == TrophyEvent.TYPE_SESSION_SAVED and event.object_id in sessions:
+                workouts.append((None, sessions[event.object_id]))
+
+        # Edited or deleted logs require a rebuild of the personal records, like
+        # of the statistics. The new logs are applied on top of it, to find out
+        # which of them are a new record.
+        new_logs = [log for log, session in workouts if log is not None]
+        if any(event.event_type == TrophyEvent.TYPE_RECALCULATE for event in events):
+            UserStatisticsService.update_statistics(user)
+            PersonalRecordService.rebuild(user, exclude_log_ids=[log.pk for log in new_logs])
+        elif workouts:
+            UserStatisticsService.increment_workouts(user, workouts)
+        record_logs = PersonalRecordService.add_logs(user, new_logs)
+
+        if TrophyService.should_skip_user(user):
+            return
+
+        context = TrophyEvaluationContext(user)
+        if record_logs:
+            cls._award_personal_records(user, record_logs, context)
+        TrophyService.evaluate_all_trophies(user, context=context)
+
+    @classmethod
+    def _award_personal_records(
+        cls,
+        user: User,
+        logs: list[WorkoutLog],
+        context: TrophyEvaluationContext,
+    ):
+        """
+        Award the Personal Record trophy for the new logs that beat the previous record
+
+        Whether a log is a record was already decided with the personal record
+        index, which also makes sure that a log is never awarded twice.
+        """
+        trophy = Trophy.objects.filter(name='Personal Record', is_active=True).first()
+        if trophy is None:
+            return
+
+        for log in logs:
+            checker = CheckerRegistry.create_checker(user, trophy, context)
+            checker.params = {'log': log}
+            user_trophy = TrophyService.award_trophy(
+                user,
+                trophy,
+                progress=100.0,
+                context_data=checker.get_context_data(),
+            )
+            context.add_earned(user_trophy)
+
+
+class TrophyEventWorker:
+    """
+    Background thread that processes the trophy events of this process, used
+    when Celery is not available
+
+    When the thread starts, it first processes the events left over by an
+    earlier process, e.g. one that was restarted before handling them. They
+    can also be processed with the process_trophy_events command.
+    """
+
+    def __init__(self):
+        self.pending: Set[int] = set()
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self, user_id: int):
+        with self.condition:
+            self.pending.add(user_id)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run,
+                    name='trophy-events',
+                    daemon=True,
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def run(self):
+        try:
+            TrophyEventService.process_all()
+        except Exception as e:
+            logger.error(f'Error processing the pending trophy events: {e}', exc_info=True)
+        close_old_connections()
+
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+
+            # Wait for the rest of the burst
+            time.sleep(settings.WGER_SETTINGS['TROPHIES_EVENT_DELAY'])
+
+            with self.condition:
+                user_ids, self.pending = self.pending, set()
+
+            for user_id in user_ids:
+                try:
+                    TrophyEventService.process(user_id)
+                except Exception as e:
+                    logger.error(
+                        f'Error processing trophy events for user {user_id}: {e}', exc_info=True
+                    )
+            close_old_connections()
+
+
+trophy_event_worker = TrophyEventWorker()
@@ -0,0 +1,271 @@
+#  This file is part of wger Workout Manager <https://github.com/wger-project>.
+#  Copyright (C) 2013 - 2021 wger Team
+#
+#  wger Workout Manager is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  wger Workout Manager is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Standard Library
+import logging
+from decimal import Decimal
+from itertools import (
+    batched,
+    groupby,
+)
+from typing import (
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+# Django
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+# wger
+from wger.manager.consts import WEIGHT_UNIT_LB
+from wger.manager.models import WorkoutLog
+from wger.trophies.models import PersonalRecord
+from wger.utils.units import AbstractWeight
+
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 1000
+"""Number of records written with one query when rebuilding the index"""
+
+LOG_FIELDS = ('id', 'exercise_id', 'weight', 'weight_unit_id', 'repetitions', 'rir')
+
+
+class PersonalRecordService:
+    """
+    Maintains the index of the personal records, the best estimated one rep
+    max and the heaviest weight of every user and exercise.
+
+    New logs are applied incrementally, which also tells whether they are a new
+    personal record. Since the previous best can't be recovered from the index,
+    edited or deleted logs require a rebuild from the logs.
+    """
+
+    @classmethod
+    def estimate_one_rep_max(
+        cls,
+        weight: Optional[Decimal],
+        weight_unit_id: Optional[int],
+        repetitions: Optional[Decimal],
+        rir: Optional[Decimal] = None,
+    ) -> Optional[Decimal]:
+        """
+        Estimates the one rep max in kg with Brzycki's formula:
+        1RM = weight * (36 / (37 - repetitions))
+
+        The reps in reserve are added to the repetitions. Returns None if the
+        formula can't be applied.
+        """
+        if weight is None or repetitions is None:
+            return None
+
+        repetitions += rir or 0
+        if repetitions <= 0 or repetitions >= 37:
+            return None
+
+        estimate = cls.normalize_weight(weight, weight_unit_id) * (
+            Decimal('36') / (Decimal('37') - repetitions)
+        )
+        return estimate.quantize(Decimal('0.01'))
+
+    @classmethod
+    def normalize_weight(cls, weight: Decimal, weight_unit_id: Optional[int]) -> Decimal:
+        mode = 'lb' if weight_unit_id == WEIGHT_UNIT_LB else 'kg'
+        return Decimal(AbstractWeight(weight, mode).kg).quantize(Decimal('0.01'))
+
+    @classmethod
+    def get_record(cls, user: User, exercise_id: int) -> Optional[PersonalRecord]:
+        return PersonalRecord.objects.filter(user=user, exercise_id=exercise_id).first()
+
+    @classmethod
+    def is_new_record(cls, record: Optional[PersonalRecord], log: WorkoutLog) -> bool:
+        """
+        Whether the log beats the best estimated one rep max of the record
+
+        Without a previous estimate, every log counts as a record.
+        """
+        if record is None or record.one_rep_max_estimate is None:
+            return True
+
+        estimate = cls.estimate_one_rep_max(
+            log.weight,
+            log.weight_unit_id,
+            log.repetitions,
+            log.rir,
+        )
+        return estimate is not None and estimate > record.one_rep_max_estimate
+
+    @classmethod
+    def add_logs(cls, user: User, logs: Iterable[WorkoutLog]) -> List[WorkoutLog]:
+        """
+        Applies new logs to the user's records, in the given order
+
+        The records of all exercises are loaded with one query and written in
+        bulk.
+
+        Returns:
+            The logs that are a new personal record
+        """
+        logs = list(logs)
+        if not logs:
+            return []
+
+        records = {
+            record.exercise_id: record
+            for record in PersonalRecord.objects.filter(
+                user=user,
+                exercise_id__in={log.exercise_id for log in logs},
+            )
+        }
+        existing = set(records)
+
+        now = timezone.now()
+        new_records = []
+        changed = set()
+        for log in logs:
+            record = records.get(log.exercise_id)
+            if cls.is_new_record(record, log):
+                new_records.append(log)
+
+            if record is None:
+                record = PersonalRecord(user=user, exercise_id=log.exercise_id)
+            if cls._apply_log(
+                record,
+                log.weight,
+                log.weight_unit_id,
+                log.repetitions,
+                log.rir,
+                log.id,
+            ):
+                record.updated = now
+                records[log.exercise_id] = record
+                changed.add(log.exercise_id)
+
+        PersonalRecord.objects.bulk_create(
+            [records[exercise_id] for exercise_id in changed - existing]
+        )
+        PersonalRecord.objects.bulk_update(
+            [records[exercise_id] for exercise_id in changed & existing],
+            (
+                'one_rep_max_estimate',
+                'one_rep_max_log',
+                'weight',
+                'repetitions',
+                'weight_log',
+                'updated',
+            ),
+        )
+        return new_records
+
+    @classmethod
+    def rebuild(cls, user: Optional[User] = None, exclude_log_ids: Sequence = ()) -> int:
+        """
+        Recalculates the records of a user, or of all users, from their logs
+
+        Args:
+            user: The user to rebuild the records of, all users if None
+            exclude_log_ids: Logs to leave out, e.g. new logs that are applied
+                afterwards with add_logs()
+
+        Returns:
+            The number of records
+        """
+        logs = WorkoutLog.objects.order_by('user_id', 'exercise_id', 'date', 'id')
+        records = PersonalRecord.objects.all()
+        if user is not None:
+            logs = logs.filter(user=user)
+            records = records.filter(user=user)
+        if exclude_log_ids:
+            logs = logs.exclude(pk__in=exclude_log_ids)
+
+        rows = logs.values_list('user_id', *LOG_FIELDS).iterator(chunk_size=REBUILD_BATCH_SIZE)
+        count = 0
+        with transaction.atomic():
+            records.delete()
+            for batch in batched(cls.build_records(rows), REBUILD_BATCH_SIZE):
+                PersonalRecord.objects.bulk_create(batch)
+                count += len(batch)
+
+        return count
+
+    @classmethod
+    def build_records(cls, rows, model=PersonalRecord) -> Iterable[PersonalRecord]:
+        """
+        Builds the records from the values of the logs
+
+        Args:
+            rows: The user ID and the LOG_FIELDS of every log, ordered by user,
+                exercise and date
+            model: The record model, the historical one in migrations
+        """
+        for (user_id, exercise_id), exercise_rows in groupby(
+            rows, key=lambda row: (row[0], row[2])
+        ):
+            record = model(user_id=user_id, exercise_id=exercise_id)
+            changed = False
+            for _, log_id, _, weight, weight_unit_id, repetitions, rir in exercise_rows:
+                changed |= cls._apply_log(record, weight, weight_unit_id, repetitions, rir, log_id)
+
+            if changed:
+                yield record
+
+    @classmethod
+    def _apply_log(
+        cls,
+        record: PersonalRecord,
+        weight: Optional[Decimal],
+        weight_unit_id: Optional[int],
+        repetitions: Optional[Decimal],
+        rir: Optional[Decimal],
+        log_id,
+    ) -> bool:
+        """
+        Updates the record with the values of a log
+
+        Returns:
+            Whether the record changed
+        """
+        changed = False
+
+        estimate = cls.estimate_one_rep_max(weight, weight_unit_id, repetitions, rir)
+        if estimate is not None and (
+            record.one_rep_max_estimate is None or estimate > record.one_rep_max_estimate
+        ):
+            record.one_rep_max_estimate = estimate
+            record.one_rep_max_log_id = log_id
+            changed = True
+
+        if weight is not None:
+            weight = cls.normalize_weight(weight, weight_unit_id)
+            if (
+                record.weight is None
+                or weight > record.weight
+                or (
+                    weight == record.weight
+                    and repetitions is not None
+                    and (record.repetitions is None or repetitions > record.repetitions)
+                )
+            ):
+                record.weight = weight
+                record.repetitions = repetitions
+                record.weight_log_id = log_id
+                changed = True
+
+        return changed
@@ -18,7 +18,11 @@
 import datetime
 import logging
 from decimal import Decimal
-from typing import Optional
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
 
 # Django
 from django.contrib.auth.models import User
@@ -130,7 +134,7 @@ class UserStatisticsService:
         Incrementally update statistics when a new workout is logged.
 
         This method performs efficient incremental updates rather than
-        full recalculation. It's called by signal handlers when:
+        full recalculation. It's called when:
         - A new WorkoutLog is created
         - A WorkoutSession is created/updated
 
@@ -139,11 +143,50 @@ class UserStatisticsService:
             workout_log: The new workout log (if triggered by log creation)
             session: The workout session (if triggered by session creation)
 
+        Returns:
+            The updated UserStatistics instance
+        """
+        return cls.increment_workouts(user, [(workout_log, session)])
+
+    @classmethod
+    def increment_workouts(
+        cls,
+        user: User,
+        workouts: List[Tuple[Optional[WorkoutLog], Optional[WorkoutSession]]],
+    ) -> UserStatistics:
+        """
+        Incrementally update statistics with several new logs or saved sessions.
+
+        The changes are applied in the given order and the statistics are saved once.
+
+        Args:
+            user: The user to update statistics for
+            workouts: (workout log, session) pairs, one of them can be None
+
         Returns:
             The updated UserStatistics instance
         """
         stats = cls.get_or_create_statistics(user)
 
+        for workout_log, session in workouts:
+            cls._increment_workout(stats, workout_log, session)
+
+        # Count sessions for total workouts (recalculate to be accurate)
+        stats.total_workouts = WorkoutSession.objects.filter(user=user).count()
+
+        stats.save()
+        return stats
+
+    @classmethod
+    def _increment_workout(
+        cls,
+        stats: UserStatistics,
+        workout_log: Optional[WorkoutLog],
+        session: Optional[WorkoutSession],
+    ):
+        """
+        Applies a new workout log or saved session to the statistics, without saving them
+        """
         # Update total weight if a log was provided
         if workout_log and workout_log.weight is not None:
             weight_kg = cls._normalize_weight(workout_log.weight, workout_log.weight_unit_id)
@@ -207,12 +250,6 @@ class UserStatisticsService:
             if stats.latest_workout_time is None or session.time_start > stats.latest_workout_time:
                 stats.latest_workout_time = session.time_start
 
-        # Count sessions for total workouts (recalculate to be accurate)
-        stats.total_workouts = WorkoutSession.objects.filter(user=user).count()
-
-        stats.save()
-        return stats
-
     @classmethod
     def handle_workout_deletion(cls, user: User) -> UserStatistics:
         """
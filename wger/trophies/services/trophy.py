@@ -29,6 +29,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 
 # wger
+from wger.trophies.checkers.context import TrophyEvaluationContext
 from wger.trophies.checkers.registry import CheckerRegistry
 from wger.trophies.models import (
     Trophy,
@@ -54,7 +55,12 @@ class TrophyService:
     """
 
     @classmethod
-    def evaluate_all_trophies(cls, user: User) -> List[UserTrophy]:
+    def evaluate_all_trophies(
+        cls,
+        user: User,
+        trophies: Optional[List[Trophy]] = None,
+        context: Optional[TrophyEvaluationContext] = None,
+    ) -> List[UserTrophy]:
         """
         Evaluate all unearned trophies for a user.
 
@@ -62,8 +68,14 @@ class TrophyService:
         appropriate checker class. Awards trophies where criteria are met.
         Always re-evaluates repeatable trophies.
 
+        All checkers share one evaluation context, so the user's earned
+        trophies and statistics are only loaded once.
+
         Args:
             user: The user to evaluate trophies for
+            trophies: The active trophies, to avoid loading them again when
+                evaluating many users. Loaded if not given.
+            context: The evaluation context, if the caller already has one
 
         Returns:
             List of newly awarded UserTrophy instances
@@ -73,18 +85,26 @@ class TrophyService:
 
         # Evaluate all active trophies. evaluate_trophy() will skip non-repeatable trophies
         # the user already has, while repeatable trophies are always checked.
-        trophies = Trophy.objects.filter(is_active=True).order_by('order', 'name')
+        if trophies is None:
+            trophies = Trophy.objects.filter(is_active=True).order_by('order', 'name')
 
+        if context is None:
+            context = TrophyEvaluationContext(user)
         awarded = []
         for trophy in trophies:
-            user_trophy = cls.evaluate_trophy(user, trophy)
+            user_trophy = cls.evaluate_trophy(user, trophy, context)
             if user_trophy:
                 awarded.append(user_trophy)
 
         return awarded
 
     @classmethod
-    def evaluate_trophy(cls, user: User, trophy: Trophy) -> Optional[UserTrophy]:
+    def evaluate_trophy(
+        cls,
+        user: User,
+        trophy: Trophy,
+        context: Optional[TrophyEvaluationContext] = None,
+    ) -> Optional[UserTrophy]:
         """
         Evaluate a single trophy for a user.
 
@@ -94,6 +114,8 @@ class TrophyService:
         Args:
             user: The user to evaluate the trophy for
             trophy: The trophy to evaluate
+            context: The evaluation context shared with the other trophies of
+                the user. A new one is created if not given.
 
         Returns:
             UserTrophy if earned, None otherwise
@@ -101,23 +123,30 @@ class TrophyService:
         if not trophy.is_active:
             return None
 
+        if context is None:
+            context = TrophyEvaluationContext(user)
+
         # Check if already earned
-        if (
-            not trophy.is_repeatable
-            and UserTrophy.objects.filter(user=user, trophy=trophy).exists()
-        ):
+        if not trophy.is_repeatable and context.has_earned(trophy):
             return None
 
         # Get the checker for this trophy
-        checker = CheckerRegistry.create_checker(user, trophy)
+        checker = CheckerRegistry.create_checker(user, trophy, context)
         if checker is None:
             logger.warning(f'No checker found for trophy: {trophy.name}')
             return None
 
         try:
             if checker.check():
-                context = checker.get_context_data()
-                return cls.award_trophy(user, trophy, progress=100.0, context_data=context)
+                context_data = checker.get_context_data()
+                user_trophy = cls.award_trophy(
+                    user,
+                    trophy,
+                    progress=100.0,
+                    context_data=context_data,
+                )
+                context.add_earned(user_trophy)
+                return user_trophy
         except Exception as e:
             logger.error(
                 f'Error checking trophy {trophy.name} for user {user.id}: {e}', exc_info=True
@@ -209,6 +238,7 @@ class TrophyService:
         trophies = trophies.order_by('order', 'name')
 
         # Get user's earned trophies
+        context = TrophyEvaluationContext(user)
         earned = {
             ut.trophy_id: ut
             for ut in UserTrophy.objects.filter(
@@ -237,7 +267,7 @@ class TrophyService:
 
             # Calculate progress for progressive trophies that aren't earned
             if trophy.is_progressive and not is_earned:
-                checker = CheckerRegistry.create_checker(user, trophy)
+                checker = CheckerRegistry.create_checker(user, trophy, context)
                 if checker:
                     try:
                         progress_data['progress'] = checker.get_progress()
@@ -323,6 +353,7 @@ class TrophyService:
             # Get active users only
             inactive_threshold = timezone.now() - timedelta(days=TROPHIES_INACTIVE_USER_DAYS)
             users = User.objects.filter(last_login__gte=inactive_threshold)
+        users = users.select_related('userprofile')
 
         users_checked = 0
         trophies_awarded = 0
@@ -333,9 +364,10 @@ class TrophyService:
 
             users_checked += 1
 
+            context = TrophyEvaluationContext(user)
             for trophy in trophies:
                 # Don't skip already earned - this is a re-evaluation
-                user_trophy = cls.evaluate_trophy(user, trophy)
+                user_trophy = cls.evaluate_trophy(user, trophy, context)
                 if user_trophy:
                     trophies_awarded += 1
 
@@ -17,15 +17,15 @@
 """
 Signal handlers for the trophies app.
 
-These signals trigger statistics updates and trophy evaluations
-when workouts are logged, edited, or deleted.
+These signals queue an event when workouts are logged, edited, or deleted.
+The events are applied to the statistics and trophies by TrophyEventService,
+outside of the request that changed the workout.
 """
 
 # Standard Library
 import logging
 
 # Django
-from django.conf import settings
 from django.contrib.auth.models import User
 from django.db.models.signals import (
     post_delete,
@@ -38,12 +38,9 @@ from wger.manager.models import (
     WorkoutLog,
     WorkoutSession,
 )
-from wger.trophies.checkers.registry import CheckerRegistry
-from wger.trophies.models.trophy import Trophy
-from wger.trophies.models.user_trophy import UserTrophy
-from wger.trophies.services import UserStatisticsService
-from wger.trophies.services.trophy import TrophyService
-from wger.trophies.tasks import evaluate_user_trophies_task
+from wger.manager.signals import workout_logs_bulk_saved
+from wger.trophies.models import TrophyEvent
+from wger.trophies.services import TrophyEventService
 from wger.utils.helpers import disable_for_loaddata
 
 
@@ -61,78 +58,54 @@ def _deletion_originates_from_user(origin) -> bool:
     return isinstance(origin, User) or getattr(origin, 'model', None) is User
 
 
-def _trigger_trophy_evaluation(user_id: int):
-    """
-    Trigger async trophy evaluation for a user.
-
-    Uses Celery if available, otherwise evaluates synchronously.
-    """
-    if settings.WGER_SETTINGS['USE_CELERY']:
-        evaluate_user_trophies_task.delay(user_id)
-    else:
-        # Celery not available or configured - evaluate synchronously
-        try:
-            user = User.objects.get(id=user_id)
-            TrophyService.evaluate_all_trophies(user)
-        except User.DoesNotExist:
-            pass
-        except Exception as e:
-            logger.error(f'Error evaluating trophies for user {user_id}: {e}')
-
-
 @receiver(post_save, sender=WorkoutLog)
 @disable_for_loaddata
 def workout_log_saved(sender, instance: WorkoutLog, created: bool, **kwargs):
     """
     Handle WorkoutLog save events.
 
-    Updates user statistics when a new workout log is created.
-    For edits, triggers a full recalculation to ensure accuracy.
-    Then triggers trophy evaluation.
+    New logs are added incrementally to the statistics and checked for
+    personal records. For edits, a full recalculation is queued to ensure
+    accuracy.
     """
     if not instance.user_id:
         return
 
     try:
         if created:
-            # New log - incremental update
-            UserStatisticsService.increment_workout(
-                user=instance.user,
-                workout_log=instance,
-            )
-
-            # Personal Record award (respect the same skip rules as full evaluation)
-            if not TrophyService.should_skip_user(instance.user):
-                trophy = Trophy.objects.get(name='Personal Record', is_active=True)
-                checker = CheckerRegistry.create_checker(instance.user, trophy)
-                checker.params = {'log': instance}
-                existing = UserTrophy.objects.filter(
-                    user=instance.user, trophy=trophy, context_data__log_id=str(instance.id)
-                ).exists()
-                if not existing and checker and checker.check():
-                    context = checker.get_context_data()
-                    TrophyService.award_trophy(
-                        instance.user, trophy, progress=100.0, context_data=context
-                    )
-
+            TrophyEventService.enqueue(instance.user_id, TrophyEvent.TYPE_LOG_CREATED, instance.id)
         else:
-            # Edited log - full recalculation for accuracy
-            UserStatisticsService.update_statistics(instance.user)
-
-        # Trigger trophy evaluation
-        _trigger_trophy_evaluation(instance.user_id)
-    except User.DoesNotExist:
-        pass
+            TrophyEventService.enqueue(instance.user_id, TrophyEvent.TYPE_RECALCULATE)
     except Exception as e:
         logger.error(f'Error updating statistics for user {instance.user_id}: {e}', exc_info=True)
 
 
+@receiver(workout_logs_bulk_saved, sender=WorkoutLog)
+def workout_logs_bulk_saved_handler(sender, user, created, updated, **kwargs):
+    """
+    Handle a batch of saved WorkoutLogs.
+
+    Like workout_log_saved, but all events of the batch are stored at once, and
+    a single recalculation is queued for all edited logs.
+    """
+    events = [(TrophyEvent.TYPE_LOG_CREATED, log.id) for log in created]
+    if updated:
+        events.append((TrophyEvent.TYPE_RECALCULATE, None))
+    if not events:
+        return
+
+    try:
+        TrophyEventService.enqueue_many(user.id, events)
+    except Exception as e:
+        logger.error(f'Error updating statistics for user {user.id}: {e}', exc_info=True)
+
+
 @receiver(post_delete, sender=WorkoutLog)
 def workout_log_deleted(sender, instance: WorkoutLog, origin=None, **kwargs):
     """
     Handle WorkoutLog delete events.
 
-    Triggers full statistics recalculation when a log is deleted.
+    Queues a full statistics recalculation when a log is deleted.
     """
     if not instance.user_id:
         return
@@ -141,9 +114,7 @@ def workout_log_deleted(sender, instance: WorkoutLog, origin=None, **kwargs):
         return
 
     try:
-        UserStatisticsService.handle_workout_deletion(instance.user)
-    except User.DoesNotExist:
-        pass
+        TrophyEventService.enqueue(instance.user_id, TrophyEvent.TYPE_RECALCULATE)
     except Exception as e:
         logger.error(
             f'Error updating statistics after deletion for user {instance.user_id}: {e}',
@@ -157,31 +128,14 @@ def workout_session_saved(sender, instance: WorkoutSession, created: bool, **kwa
     """
     Handle WorkoutSession save events.
 
-    Updates user statistics when a workout session is created or updated.
-    This captures session-level data like start/end times.
-    Then triggers trophy evaluation.
+    Queues an update of the session-level data like start/end times, for
+    new as well as for updated sessions.
     """
     if not instance.user_id:
         return
 
     try:
-        if created:
-            # New session - incremental update for session data
-            UserStatisticsService.increment_workout(
-                user=instance.user,
-                session=instance,
-            )
-        else:
-            # Session updated (e.g., time_start changed) - update times
-            UserStatisticsService.increment_workout(
-                user=instance.user,
-                session=instance,
-            )
-
-        # Trigger trophy evaluation
-        _trigger_trophy_evaluation(instance.user_id)
-    except User.DoesNotExist:
-        pass
+        TrophyEventService.enqueue(instance.user_id, TrophyEvent.TYPE_SESSION_SAVED, instance.id)
     except Exception as e:
         logger.error(f'Error updating statistics for session {instance.id}: {e}', exc_info=True)
 
@@ -191,7 +145,7 @@ def workout_session_deleted(sender, instance: WorkoutSession, origin=None, **kwa
     """
     Handle WorkoutSession delete events.
 
-    Triggers full statistics recalculation when a session is deleted.
+    Queues a full statistics recalculation when a session is deleted.
     """
     if not instance.user_id:
         return
@@ -200,9 +154,7 @@ def workout_session_deleted(sender, instance: WorkoutSession, origin=None, **kwa
         return
 
     try:
-        UserStatisticsService.handle_workout_deletion(instance.user)
-    except User.DoesNotExist:
-        pass
+        TrophyEventService.enqueue(instance.user_id, TrophyEvent.TYPE_RECALCULATE)
     except Exception as e:
         logger.error(
             f'Error updating statistics after session deletion for user {instance.user_id}: {e}',
@@ -29,7 +29,9 @@ from django.utils import timezone
 
 # wger
 from wger.celery_configuration import app
+from wger.trophies.models import Trophy
 from wger.trophies.services import (
+    TrophyEventService,
     TrophyService,
     UserStatisticsService,
 )
@@ -62,6 +64,35 @@ def evaluate_user_trophies_task(user_id: int):
         logger.error(f'Error evaluating trophies for user {user_id}: {e}', exc_info=True)
 
 
+@app.task
+def process_trophy_events_task(user_id: int):
+    """
+    Apply the pending workout events of a user to their statistics and trophies.
+
+    This task is scheduled once per burst of events, see TrophyEventService.
+
+    Args:
+        user_id: The ID of the user whose events to process
+    """
+    try:
+        TrophyEventService.process(user_id)
+    except Exception as e:
+        logger.error(f'Error processing trophy events for user {user_id}: {e}', exc_info=True)
+
+
+@app.task
+def process_pending_trophy_events_task():
+    """
+    Apply the events of all users that are still pending.
+
+    This catches events whose task was lost, e.g. because the worker was
+    restarted before it ran.
+    """
+    processed = TrophyEventService.process_all()
+    if processed:
+        logger.info(f'Processed {processed} pending trophy events')
+
+
 @app.task
 def evaluate_all_users_trophies_task():
     """
@@ -73,14 +104,15 @@ def evaluate_all_users_trophies_task():
     Only processes users who have logged in within TROPHIES_INACTIVE_USER_DAYS.
     """
     inactive_threshold = timezone.now() - timedelta(days=TROPHIES_INACTIVE_USER_DAYS)
-    users = User.objects.filter(last_login__gte=inactive_threshold)
+    users = User.objects.filter(last_login__gte=inactive_threshold).select_related('userprofile')
+    trophies = list(Trophy.objects.filter(is_active=True).order_by('order', 'name'))
 
     total_awarded = 0
     users_processed = 0
 
     for user in users.iterator():
         try:
-            awarded = TrophyService.evaluate_all_trophies(user)
+            awarded = TrophyService.evaluate_all_trophies(user, trophies)
             if awarded:
                 total_awarded += len(awarded)
             users_processed += 1
@@ -137,3 +169,12 @@ def recalculate_all_statistics_task():
             logger.error(f'Error updating statistics for user {user.id}: {e}', exc_info=True)
 
     logger.info(f'Statistics recalculation complete: processed {users_processed} users')
+
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    sender.add_periodic_task(
+        timedelta(minutes=15),
+        process_pending_trophy_events_task.s(),
+        name='Process pending trophy events',
+    )
@@ -0,0 +1,93 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Benchmark for evaluating the trophies of a user with one checker context per
+trophy vs one context shared by all checkers
+
+This is not collected by the regular test run, start it explicitly with:
+
+    python manage.py test wger.trophies.tests.benchmark_trophy_evaluation
+"""
+
+# Standard Library
+import timeit
+
+# Django
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.trophies.models import (
+    Trophy,
+    UserTrophy,
+)
+from wger.trophies.services.trophy import TrophyService
+
+
+REPEAT = 50
+
+
+class TrophyEvaluationBenchmark(WgerTestCase):
+    """
+    Evaluates the default trophies for a user that hasn't earned any of them
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = User.objects.select_related('userprofile').get(username='admin')
+        self.user.last_login = timezone.now()
+        self.user.save()
+        self.trophies = list(Trophy.objects.filter(is_active=True).order_by('order', 'name'))
+
+    def per_trophy(self):
+        """
+        Every trophy loads the user's data again, as before the shared context
+        """
+        for trophy in self.trophies:
+            TrophyService.evaluate_trophy(self.user, trophy)
+
+    def shared(self):
+        TrophyService.evaluate_all_trophies(self.user, self.trophies)
+
+    def measure(self, function) -> tuple[int, float]:
+        with CaptureQueriesContext(connection) as queries:
+            function()
+        UserTrophy.objects.filter(user=self.user).delete()
+
+        def run():
+            function()
+            UserTrophy.objects.filter(user=self.user).delete()
+
+        return len(queries), timeit.timeit(run, number=REPEAT) / REPEAT
+
+    def test_evaluate_all_trophies(self):
+        per_trophy_queries, per_trophy_time = self.measure(self.per_trophy)
+        shared_queries, shared_time = self.measure(self.shared)
+
+        print()
+        print(f'{len(self.trophies)} trophies')
+        print(
+            f'{"Queries per user":<24} per trophy: {per_trophy_queries:8d}'
+            f'  shared: {shared_queries:8d}'
+        )
+        print(
+            f'{"Time per user":<24} per trophy: {per_trophy_time * 1000:8.3f} ms'
+            f'  shared: {shared_time * 1000:8.3f} ms'
+            f'  speedup: {per_trophy_time / shared_time:6.1f}x'
+        )
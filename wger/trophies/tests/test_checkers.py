@@ -35,7 +35,6 @@ from wger.trophies.checkers.workout_count_based import WorkoutCountBasedChecker
 from wger.trophies.models import (
     Trophy,
     UserStatistics,
-    UserTrophy,
 )
 
 
@@ -525,13 +524,10 @@ class PersonalRecordCheckerTestCase(WgerTestCase):
 
     def award_pr_trophy(self, checker: PersonalRecordChecker):
         """
-        Awards the PR trophy, like the signal handler does after a positive check
+        Saves the log, which applies it to the personal record index and awards
+        the PR trophy after a positive check
         """
-        UserTrophy.objects.create(
-            user=self.user,
-            trophy=self.trophy,
-            context_data=checker.get_context_data(),
-        )
+        checker.params['log'].save()
 
     def test_improvement_detected_and_context_values(self):
         log1 = WorkoutLog(user=self.user, exercise=self.exercise, repetitions=10, weight=100)
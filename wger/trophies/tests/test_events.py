@@ -0,0 +1,238 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+from decimal import Decimal
+from unittest import mock
+
+# Django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.exercises.models import (
+    Exercise,
+    ExerciseCategory,
+)
+from wger.manager.models import (
+    WorkoutLog,
+    WorkoutSession,
+)
+from wger.trophies.models import (
+    Trophy,
+    TrophyEvent,
+    UserStatistics,
+    UserTrophy,
+)
+from wger.trophies.services import (
+    TrophyEventService,
+    TrophyService,
+    UserStatisticsService,
+)
+
+
+def async_settings(**kwargs):
+    return override_settings(
+        WGER_SETTINGS={**settings.WGER_SETTINGS, 'TROPHIES_ASYNC': True, **kwargs}
+    )
+
+
+class TrophyEventServiceTestCase(WgerTestCase):
+    """
+    Tests queueing workout changes and processing them in one go
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.user = User.objects.get(username='admin')
+        self.user.last_login = timezone.now()
+        self.user.save()
+
+        WorkoutLog.objects.filter(user=self.user).delete()
+        WorkoutSession.objects.filter(user=self.user).delete()
+        Trophy.objects.all().delete()
+        UserStatistics.objects.all().delete()
+        TrophyEvent.objects.all().delete()
+
+        self.personal_record_trophy = Trophy.objects.create(
+            name='Personal Record',
+            trophy_type=Trophy.TYPE_OTHER,
+            checker_class='personal_record',
+            checker_params={},
+            is_active=True,
+            is_repeatable=True,
+        )
+        self.exercise = Exercise.objects.create(
+            category=ExerciseCategory.objects.create(name='events')
+        )
+
+    def log_burst(self, count=30):
+        for i in range(count):
+            WorkoutLog.objects.create(
+                user=self.user,
+                exercise=self.exercise,
+                repetitions=10,
+                weight=50 + i,
+            )
+
+    @async_settings(USE_CELERY=False)
+    def test_events_are_queued(self):
+        """
+        Saving logs only stores events, nothing is processed on the request path
+        """
+        with (
+            mock.patch('wger.trophies.services.events.trophy_event_worker.submit') as submit,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.log_burst()
+
+        self.assertEqual(
+            TrophyEvent.objects.filter(
+                user=self.user,
+                event_type=TrophyEvent.TYPE_LOG_CREATED,
+            ).count(),
+            30,
+        )
+        self.assertFalse(UserStatistics.objects.filter(user=self.user).exists())
+        self.assertFalse(UserTrophy.objects.filter(user=self.user).exists())
+        submit.assert_called_with(self.user.id)
+
+    @async_settings(USE_CELERY=False)
+    def test_burst_is_processed_once(self):
+        """
+        A burst of 30 logs results in one statistics update and one evaluation
+        """
+        with mock.patch('wger.trophies.services.events.trophy_event_worker.submit'):
+            self.log_burst()
+
+        with (
+            mock.patch.object(
+                UserStatisticsService,
+                'increment_workouts',
+                wraps=UserStatisticsService.increment_workouts,
+            ) as increment,
+            mock.patch.object(
+                TrophyService,
+                'evaluate_all_trophies',
+                wraps=TrophyService.evaluate_all_trophies,
+            ) as evaluate,
+        ):
+            processed = TrophyEventService.process(self.user.id)
+
+        self.assertGreaterEqual(processed, 30)
+        increment.assert_called_once()
+        evaluate.assert_called_once()
+        self.assertFalse(TrophyEvent.objects.filter(user=self.user).exists())
+
+        stats = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.total_weight_lifted, Decimal(sum(10 * (50 + i) for i in range(30))))
+
+        # Every log was heavier than the one before, so every one is a record
+        self.assertEqual(
+            UserTrophy.objects.filter(user=self.user, trophy=self.personal_record_trophy).count(),
+            30,
+        )
+
+        # Nothing left to do
+        self.assertEqual(TrophyEventService.process(self.user.id), 0)
+
+    @async_settings(USE_CELERY=False)
+    def test_recalculate(self):
+        """
+        Edits and deletions are processed with a full recalculation
+        """
+        with mock.patch('wger.trophies.services.events.trophy_event_worker.submit'):
+            self.log_burst(3)
+            log = WorkoutLog.objects.filter(user=self.user).first()
+            log.weight = 500
+            log.save()
+
+        with (
+            mock.patch.object(UserStatisticsService, 'increment_workouts') as increment,
+            mock.patch.object(
+                UserStatisticsService,
+                'update_statistics',
+                wraps=UserStatisticsService.update_statistics,
+            ) as update,
+        ):
+            TrophyEventService.process(self.user.id)
+
+        increment.assert_not_called()
+        update.assert_called_once()
+
+    @async_settings(USE_CELERY=True, TROPHIES_EVENT_DELAY=5)
+    def test_celery_task_is_scheduled_once(self):
+        """
+        Only one task is scheduled for a burst of events
+        """
+        with (
+            mock.patch('wger.trophies.tasks.process_trophy_events_task.apply_async') as apply_async,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.log_burst()
+
+        apply_async.assert_called_once_with((self.user.id,), countdown=5)
+
+        # Once the task ran, the next burst schedules a new one
+        TrophyEventService.process(self.user.id)
+        with (
+            mock.patch('wger.trophies.tasks.process_trophy_events_task.apply_async') as apply_async,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.log_burst(2)
+
+        apply_async.assert_called_once()
+
+    @async_settings(USE_CELERY=False)
+    def test_process_all_continues_after_error(self):
+        """
+        An error with the events of one user doesn't stop the other users
+        """
+        other = User.objects.get(username='test')
+        with mock.patch('wger.trophies.services.events.trophy_event_worker.submit'):
+            TrophyEventService.enqueue(self.user.id, TrophyEvent.TYPE_RECALCULATE)
+            TrophyEventService.enqueue(other.id, TrophyEvent.TYPE_RECALCULATE)
+
+        apply = TrophyEventService._apply
+
+        def fail_for_admin(user, events):
+            if user.pk == self.user.pk:
+                raise ValueError('broken')
+            apply(user, events)
+
+        with mock.patch.object(TrophyEventService, '_apply', side_effect=fail_for_admin):
+            self.assertEqual(TrophyEventService.process_all(), 1)
+
+        self.assertTrue(TrophyEvent.objects.filter(user=self.user).exists())
+        self.assertFalse(TrophyEvent.objects.filter(user=other).exists())
+
+    @async_settings(USE_CELERY=False)
+    def test_process_command(self):
+        """
+        The command applies the events left over without Celery
+        """
+        with mock.patch('wger.trophies.services.events.trophy_event_worker.submit'):
+            self.log_burst(2)
+
+        call_command('process_trophy_events', verbosity=0)
+
+        self.assertFalse(TrophyEvent.objects.exists())
+        self.assertTrue(UserStatistics.objects.filter(user=self.user).exists())
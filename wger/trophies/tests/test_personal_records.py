@@ -0,0 +1,157 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+from decimal import Decimal
+
+# Django
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.exercises.models import (
+    Exercise,
+    ExerciseCategory,
+)
+from wger.manager.consts import WEIGHT_UNIT_LB
+from wger.manager.models import WorkoutLog
+from wger.trophies.checkers.personal_record import PersonalRecordChecker
+from wger.trophies.models import (
+    PersonalRecord,
+    Trophy,
+    UserTrophy,
+)
+from wger.trophies.services import PersonalRecordService
+
+
+class PersonalRecordServiceTestCase(WgerTestCase):
+    """
+    Tests the index of the personal records
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.get(username='admin')
+        self.user.last_login = timezone.now()
+        self.user.save()
+        self.exercise = Exercise.objects.create(
+            category=ExerciseCategory.objects.create(name='records')
+        )
+        self.trophy, _ = Trophy.objects.get_or_create(
+            name='Personal Record',
+            defaults={
+                'trophy_type': Trophy.TYPE_OTHER,
+                'checker_class': 'personal_record',
+                'is_active': True,
+                'is_repeatable': True,
+            },
+        )
+
+    def log(self, weight, repetitions, **kwargs):
+        return WorkoutLog.objects.create(
+            user=self.user,
+            exercise=self.exercise,
+            weight=weight,
+            repetitions=repetitions,
+            **kwargs,
+        )
+
+    def record(self) -> PersonalRecord:
+        return PersonalRecord.objects.get(user=self.user, exercise=self.exercise)
+
+    def test_estimate_one_rep_max(self):
+        estimate = PersonalRecordService.estimate_one_rep_max
+        self.assertEqual(estimate(Decimal(100), None, Decimal(10)), Decimal('133.33'))
+        self.assertEqual(estimate(Decimal(100), None, Decimal(10), Decimal(2)), Decimal('144.00'))
+        self.assertEqual(estimate(Decimal(100), WEIGHT_UNIT_LB, Decimal(1)), Decimal('45.36'))
+        self.assertIsNone(estimate(None, None, Decimal(10)))
+        self.assertIsNone(estimate(Decimal(100), None, Decimal(37)))
+        self.assertIsNone(estimate(Decimal(100), None, Decimal(0)))
+
+    def test_records_are_updated_on_log_creation(self):
+        first = self.log(100, 10)
+        self.log(90, 12)
+        heaviest = self.log(110, 3)
+        self.log(110, 2)
+
+        record = self.record()
+        self.assertEqual(record.one_rep_max_estimate, Decimal('133.33'))
+        self.assertEqual(record.one_rep_max_log, first)
+        self.assertEqual(record.weight, Decimal(110))
+        self.assertEqual(record.repetitions, Decimal(3))
+        self.assertEqual(record.weight_log, heaviest)
+        self.assertEqual(
+            UserTrophy.objects.filter(user=self.user, trophy=self.trophy).count(),
+            1,
+        )
+
+    def test_records_are_rebuilt_on_log_edit_and_deletion(self):
+        first = self.log(100, 10)
+        second = self.log(100, 12)
+
+        second.weight = 50
+        second.save()
+        self.assertEqual(self.record().one_rep_max_log, first)
+
+        first.delete()
+        record = self.record()
+        self.assertEqual(record.one_rep_max_log, second)
+        self.assertEqual(record.weight, Decimal(50))
+
+        second.delete()
+        self.assertFalse(
+            PersonalRecord.objects.filter(user=self.user, exercise=self.exercise).exists()
+        )
+
+    def test_rebuild_matches_incremental_updates(self):
+        for weight, repetitions in ((60, 12), (80, 5), (80, 8), (70, 10), (100, 1)):
+            self.log(weight, repetitions)
+
+        fields = ('one_rep_max_estimate', 'one_rep_max_log', 'weight', 'repetitions', 'weight_log')
+        records = PersonalRecord.objects.filter(user=self.user, exercise=self.exercise)
+        incremental = list(records.values_list(*fields))
+
+        PersonalRecord.objects.all().delete()
+        PersonalRecordService.rebuild()
+
+        self.assertEqual(list(records.values_list(*fields)), incremental)
+
+    def test_check_is_a_single_lookup(self):
+        self.log(100, 10)
+
+        checker = PersonalRecordChecker(
+            self.user,
+            self.trophy,
+            {'log': WorkoutLog(user=self.user, exercise=self.exercise, repetitions=10, weight=105)},
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(checker.check())
+
+    def test_api(self):
+        self.log(100, 10)
+        self.user_login('admin')
+
+        response = self.client.get(reverse('personal-record-list'))
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            [(result['exercise'], result['one_rep_max_estimate']) for result in results],
+            [(self.exercise.id, '133.33')],
+        )
+
+        self.user_login('test')
+        response = self.client.get(reverse('personal-record-list'))
+        self.assertEqual(response.json()['results'], [])
@@ -26,6 +26,7 @@ from wger.manager.models import (
     WorkoutLog,
     WorkoutSession,
 )
+from wger.trophies.checkers.context import TrophyEvaluationContext
 from wger.trophies.models import (
     Trophy,
     UserStatistics,
@@ -218,6 +219,41 @@ class TrophyServiceTestCase(WgerTestCase):
         self.assertEqual(len(awarded), 1)
         self.assertEqual(awarded[0].trophy, self.trophy)
 
+    def test_evaluate_all_trophies_shares_context(self):
+        """The user's data is loaded once, independently of the number of trophies"""
+        for i in range(10):
+            Trophy.objects.create(
+                name=f'Trophy {i}',
+                trophy_type=Trophy.TYPE_COUNT,
+                checker_class='workout_count_based',
+                checker_params={'count': 100 + i},
+                is_active=True,
+            )
+        Trophy.objects.create(
+            name='Date trophy',
+            trophy_type=Trophy.TYPE_DATE,
+            checker_class='date_based',
+            checker_params={'month': 3, 'day': 14},
+            is_active=True,
+        )
+        trophies = list(Trophy.objects.filter(is_active=True))
+        # The profile is checked by should_skip_user
+        _ = self.user.userprofile
+
+        # Earned trophies, statistics and workout dates
+        with self.assertNumQueries(3):
+            awarded = TrophyService.evaluate_all_trophies(self.user, trophies)
+        self.assertEqual(awarded, [])
+
+    def test_evaluate_all_trophies_context_sees_awarded(self):
+        """A trophy awarded during the evaluation is not awarded again"""
+        self.stats.total_workouts = 1
+        self.stats.save()
+
+        context = TrophyEvaluationContext(self.user)
+        self.assertIsNotNone(TrophyService.evaluate_trophy(self.user, self.trophy, context))
+        self.assertIsNone(TrophyService.evaluate_trophy(self.user, self.trophy, context))
+
     def test_get_user_trophies(self):
         """Test getting all earned trophies for a user"""
         # Award some trophies
@@ -154,6 +154,11 @@ router.register(
     basename='exerciseinfo',
 )
 
+router.register(
+    r'exercise-snapshot',
+    exercises_api_views.ExerciseSnapshotViewSet,
+    basename='exercise-snapshot',
+)
 router.register(
     r'exercise-translation',
     exercises_api_views.ExerciseTranslationViewSet,
@@ -257,6 +262,11 @@ router.register(
     trophies_api_views.UserStatisticsViewSet,
     basename='user-statistics',
 )
+router.register(
+    r'personal-record',
+    trophies_api_views.PersonalRecordViewSet,
+    basename='personal-record',
+)
 
 #
 # Sitemaps
@@ -326,6 +336,11 @@ urlpatterns += [
         core_api_views.VerifyEmailView.as_view(),
         name='userprofile-verify-email',
     ),
+    path(
+        'api/v2/user-data-export/',
+        core_api_views.UserDataExportView.as_view(),
+        name='user-data-export',
+    ),
     path('api/v2/', include(router.urls)),
     path('api/v2/token/refresh', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/v2/token/verify', TokenVerifyView.as_view(), name='token_verify'),
@@ -370,6 +385,11 @@ urlpatterns += [
         core_api_views.upload_powersync_data,
         name='powersync-data',
     ),
+    path(
+        'api/v2/upload-powersync-data/batch',
+        core_api_views.upload_powersync_batch,
+        name='powersync-data-batch',
+    ),
     # Api documentation
     #
     # metadata_class=None disables the OPTIONS handler on the HTML views: its
@@ -13,18 +13,29 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Standard Library
+import hashlib
 import logging
+import time
 
 # Django
 from django.core.cache import cache
 from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
 
 
 logger = logging.getLogger(__name__)
 
 
-def reset_exercise_api_cache(uuid: str):
-    cache.delete(CacheKeyMapper.get_exercise_api_key(uuid))
+def reset_exercise_api_cache(*uuids: str):
+    """
+    Removes the exercises from the API cache and queues them for a rebuild,
+    once the current transaction is committed
+    """
+    # wger
+    from wger.exercises.cache import queue_exercise_api_refresh
+
+    cache.delete_many([CacheKeyMapper.get_exercise_api_key(uuid) for uuid in uuids])
+    transaction.on_commit(lambda: queue_exercise_api_refresh(uuids, force=True))
 
 
 class CacheKeyMapper:
@@ -57,33 +68,156 @@ class CacheKeyMapper:
         """
         return f'base-uuid-{base_uuid}'
 
+    @classmethod
+    def exercise_api_refresh_key(cls, base_uuid: str):
+        """
+        get the key that marks an exercise as queued for rebuilding its API cache
+        """
+        return f'exercise-api-refresh-{base_uuid}'
+
+    @classmethod
+    def exercise_snapshot_manifest_key(cls):
+        """
+        get the key of the manifest of the exercise snapshots
+        """
+        return 'exercise-snapshot-manifest'
+
+    @classmethod
+    def exercise_snapshot_scheduled_key(cls):
+        """
+        get the key that marks the export of the exercise snapshots as scheduled
+        """
+        return 'exercise-snapshot-scheduled'
+
+    @classmethod
+    def off_barcode_miss_key(cls, code: str):
+        """
+        get the key that marks a barcode as not found on Open Food Facts
+        """
+        return f'off-barcode-miss-{code}'
+
+    @classmethod
+    def off_barcode_lookup_key(cls, code: str):
+        """
+        get the key that marks a barcode as being looked up on Open Food Facts
+        """
+        return f'off-barcode-lookup-{code}'
+
+    @classmethod
+    def trophy_events_scheduled_key(cls, user_id: int):
+        """
+        get the key that marks the trophy events of a user as scheduled for processing
+        """
+        return f'trophy-events-scheduled-{user_id}'
+
+    @classmethod
+    def routine_generation_key(cls, pk: int):
+        return f'routine-generation-{pk}'
+
+    @classmethod
+    def routine_structure_generation_key(cls, pk: int):
+        return f'routine-structure-generation-{pk}'
+
+    @classmethod
+    def user_routines_generation_key(cls, user_id: int):
+        return f'user-routines-generation-{user_id}'
+
+    @classmethod
+    def get_generations(cls, *keys: str) -> str:
+        """
+        Returns the current values of the given generation counters, joined
+        so that they can be folded into a cache key
+
+        Counters that don't exist yet are created. They start at the current
+        time in nanoseconds, so that a counter that was evicted never starts
+        again at a value that was already used for cached data.
+        """
+        generations = cache.get_many(keys)
+        for key in keys:
+            if key not in generations:
+                cache.add(key, time.time_ns(), None)
+                generations[key] = cache.get(key)
+
+        return '-'.join(str(generations[key]) for key in keys)
+
+    @classmethod
+    def bump_generation(cls, key: str):
+        """
+        Increments a generation counter. All cache keys built with the previous
+        value become unreachable and expire with their TTL.
+        """
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+
     @classmethod
     def routine_date_sequence_key(cls, pk: int):
-        return f'routine-date-sequence-{pk}'
+        generation = cls.get_generations(cls.routine_generation_key(pk))
+        return f'routine-date-sequence-{pk}-{generation}'
+
+    @classmethod
+    def routine_date_sequence_state_key(cls, pk: int):
+        generation = cls.get_generations(cls.routine_structure_generation_key(pk))
+        return f'routine-date-sequence-state-{pk}-{generation}'
 
     @classmethod
     def routine_api_date_sequence_display_key(cls, pk: int, user_id: int):
-        return f'routine-api-date-sequence-display-{user_id}-{pk}'
+        generation = cls.get_generations(
+            cls.routine_generation_key(pk),
+            cls.user_routines_generation_key(user_id),
+        )
+        return f'routine-api-date-sequence-display-{user_id}-{pk}-{generation}'
 
     @classmethod
     def routine_api_date_sequence_gym_key(cls, pk: int, user_id: int):
-        return f'routine-api-date-sequence-gym-{user_id}-{pk}'
+        generation = cls.get_generations(
+            cls.routine_generation_key(pk),
+            cls.user_routines_generation_key(user_id),
+        )
+        return f'routine-api-date-sequence-gym-{user_id}-{pk}-{generation}'
 
     @classmethod
     def routine_api_stats(cls, pk: int, user_id: int):
-        return f'routine-api-stats-{user_id}-{pk}'
+        generation = cls.get_generations(
+            cls.routine_generation_key(pk),
+            cls.user_routines_generation_key(user_id),
+        )
+        return f'routine-api-stats-{user_id}-{pk}-{generation}'
 
     @classmethod
     def routine_api_logs(cls, pk: int, user_id: int):
-        return f'routine-api-logs-{user_id}-{pk}'
+        generation = cls.get_generations(
+            cls.routine_generation_key(pk),
+            cls.user_routines_generation_key(user_id),
+        )
+        return f'routine-api-logs-{user_id}-{pk}-{generation}'
 
     @classmethod
     def routine_api_structure_key(cls, pk: int, user_id: int = None):
-        return f'routine-api-structure-{user_id}-{pk}'
+        generation = cls.get_generations(
+            cls.routine_structure_generation_key(pk),
+            cls.user_routines_generation_key(user_id),
+        )
+        return f'routine-api-structure-{user_id}-{pk}-{generation}'
 
     @classmethod
-    def slot_entry_configs_key(cls, pk: int):
-        return f'slot-entry-configs-{pk}'
+    def slot_entry_configs_key(cls, pk: int, routine_id: int):
+        generation = cls.get_generations(cls.routine_generation_key(routine_id))
+        return f'slot-entry-configs-{pk}-{generation}'
+
+    @classmethod
+    def user_time_series_generation_key(cls, name: str, user_id: int):
+        return f'user-time-series-generation-{name}-{user_id}'
+
+    @classmethod
+    def time_series_key(cls, name: str, user_id: int, query: str):
+        """
+        get the key of a time series of a user, for the given query string
+        """
+        generation = cls.get_generations(cls.user_time_series_generation_key(name, user_id))
+        query_hash = hashlib.sha256(query.encode()).hexdigest()[:16]
+        return f'time-series-{name}-{user_id}-{query_hash}-{generation}'
 
 
 cache_mapper = CacheKeyMapper()
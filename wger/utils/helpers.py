@@ -135,9 +135,12 @@ class BaseImageMixin:
             img_temp = NamedTemporaryFile(delete=True)
         img_temp.write(retrieved_image.content)
         img_temp.flush()
+        self.save_image_file(File(img_temp), json_data)
 
-        # Validate image
-        image_file = File(img_temp)
+    def save_image_file(self, image_file: File, json_data: dict):
+        """
+        Validates and saves an image that was already downloaded to a file
+        """
         validate_image_static_no_animation(image_file)
 
         self.image.save(
@@ -13,7 +13,11 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+# Django
+from django.core.exceptions import ValidationError as DjangoValidationError
+
 # Third Party
+from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 from rest_framework.pagination import (
     CursorPagination,
@@ -65,3 +69,104 @@ class IngredientCursorPagination(CursorPagination):
                 raise NotFound(self.invalid_cursor_message)
 
         return cursor
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination for syncing user data, e.g. the workout logs.
+
+    The entries are ordered by their primary key, which is a time-ordered
+    uuid7 (or an autoincrement ID), and every page continues after the last
+    key of the previous one. Unlike with offsets, each page costs the same no
+    matter how deep the client is, and entries created or deleted in the
+    meantime don't shift the following pages.
+
+    With updated_since, only the entries changed since then are returned,
+    ordered by their last update. This is the delta feed clients use to stay
+    in sync, the deleted entries are available as tombstones.
+    """
+
+    page_size = 100
+    max_page_size = 999
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    ordering = 'pk'
+
+    updated_since_query_param = 'updated_since'
+    updated_field = 'last_update'
+    """The field with the time of the last change, for the delta feed"""
+
+    def get_ordering(self, request, queryset, view):
+        # The ordering filter of the view is ignored, the keys need to be unique
+        if self.updated_since_query_param in request.query_params:
+            return self.updated_field, 'pk'
+        return (self.ordering,)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        updated_since = request.query_params.get(self.updated_since_query_param)
+        if updated_since is not None:
+            try:
+                updated_since = serializers.DateTimeField().to_internal_value(updated_since)
+            except serializers.ValidationError as error:
+                raise serializers.ValidationError({self.updated_since_query_param: error.detail})
+            queryset = queryset.filter(**{f'{self.updated_field}__gte': updated_since})
+
+        try:
+            return super().paginate_queryset(queryset, request, view)
+        except (DjangoValidationError, ValueError):
+            # The position in the cursor is not a valid key
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.updated_since_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Only return the entries changed since this time, '
+                'ordered by their last update',
+                'schema': {'type': 'string', 'format': 'date-time'},
+            },
+        ]
+
+
+class UserDataPagination(WgerLimitOffsetPagination):
+    """
+    Offset pagination that switches to KeysetPagination when the client asks
+    for it, for the endpoints with the (possibly large) history of a user.
+
+    Start with an empty cursor (``?cursor=``) to iterate over all entries, or
+    with ``?updated_since=`` for the delta feed, and follow the ``next`` links.
+    Without either, the endpoints behave as before.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    keyset = None
+    """The keyset pagination of the current request, if used"""
+
+    def use_keyset(self, request) -> bool:
+        keyset = self.keyset_pagination_class
+        return (
+            keyset.cursor_query_param in request.query_params
+            or keyset.updated_since_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        keyset_parameters = self.keyset_pagination_class().get_schema_operation_parameters(view)
+        return super().get_schema_operation_parameters(view) + [
+            parameter
+            for parameter in keyset_parameters
+            if parameter['name'] != self.limit_query_param
+        ]
@@ -12,13 +12,38 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+# Standard Library
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Iterator,
+    NamedTuple,
+)
+
 # Third Party
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # wger
 from wger.version import get_version
 
 
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = (10, 60)
+"""Connect and read timeout, in seconds, of the requests to remote servers"""
+
+REQUEST_RETRIES = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=('GET', 'HEAD'),
+)
+"""Transient failures are retried with an exponential backoff (0.5s, 1s, 2s...)"""
+
+
 def wger_user_agent():
     return f'wger/{get_version()} - https://github.com/wger-project'
 
@@ -27,45 +52,132 @@ def wger_headers():
     return {'User-Agent': wger_user_agent()}
 
 
-def get_all_paginated(url: str, headers=None):
+def wger_session(pool_size: int = 10, retries: Retry = REQUEST_RETRIES) -> requests.Session:
+    """
+    Returns a session with the wger headers, that keeps its connections alive
+    and retries transient failures
+
+    :param pool_size: The number of connections kept per host, should be at
+        least the number of threads sharing the session.
+    :param retries: The retry policy of the requests.
+    """
+    session = requests.Session()
+    session.headers.update(wger_headers())
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class PageTiming(NamedTuple):
+    url: str
+    seconds: float
+    results: int
+
+
+class PageFetcher:
+    """
+    Iterates over the pages of a paginated endpoint
+
+    All pages are requested with the same session, so the connection to the
+    server is reused. While the caller processes a page, the next one is
+    already fetched in a background thread. The time it took to fetch each
+    page is recorded in `timings`.
+    """
+
+    def __init__(
+        self,
+        headers=None,
+        session: requests.Session | None = None,
+        timeout=REQUEST_TIMEOUT,
+        prefetch: bool = True,
+    ):
+        """
+        :param headers: Optional headers to send with every request.
+        :param session: The session to use, a new one is created if not given.
+        :param timeout: The timeout of every request.
+        :param prefetch: Whether to fetch the next page while the current one
+            is being processed.
+        """
+        self.headers = headers if headers is not None else {}
+        self.session = session if session is not None else wger_session()
+        self.timeout = timeout
+        self.prefetch = prefetch
+        self.timings: list[PageTiming] = []
+
+    def fetch(self, url: str) -> dict:
+        """
+        Fetches a single page
+        """
+        start = time.perf_counter()
+        page = self.session.get(url, headers=self.headers, timeout=self.timeout).json()
+        timing = PageTiming(url, time.perf_counter() - start, len(page['results']))
+        self.timings.append(timing)
+        logger.debug(f'Fetched {timing.results} results in {timing.seconds:.3f}s from {url}')
+        return page
+
+    def pages(self, url: str) -> Iterator[dict]:
+        """
+        Generator with the decoded pages, starting with the given URL
+        """
+        if not self.prefetch:
+            while url:
+                page = self.fetch(url)
+                url = page['next']
+                yield page
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wger-prefetch')
+        try:
+            future = executor.submit(self.fetch, url)
+            while future is not None:
+                page = future.result()
+                future = executor.submit(self.fetch, page['next']) if page['next'] else None
+                yield page
+        finally:
+            # Don't fetch any more pages if the caller stopped early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def results(self, url: str) -> Iterator[dict]:
+        """
+        Generator with the contents of the 'results' key of all pages
+        """
+        for page in self.pages(url):
+            yield from page['results']
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(timing.seconds for timing in self.timings)
+
+
+def get_all_paginated(url: str, headers=None, session: requests.Session | None = None):
     """
     Fetch all results from a paginated endpoint.
 
     :param url: The URL to fetch from.
     :param headers: Optional headers to send with the request.
+    :param session: Optional session to send the requests with.
     :return: A list of all results.
     """
-    if headers is None:
-        headers = {}
-
-    results = []
-    while True:
-        response = requests.get(url, headers=headers).json()
-        url = response['next']
-        results.extend(response['results'])
+    return list(get_paginated(url, headers=headers, session=session))
 
-        if not url:
-            break
-    return results
 
-
-def get_paginated(url: str, headers=None):
+def get_paginated(url: str, headers=None, session: requests.Session | None = None):
     """
     Generator that iterates over a paginated endpoint
 
+    The next page is fetched while the current one is being processed, see
+    PageFetcher.
+
     :param url: The URL to fetch from.
     :param headers: Optional headers to send with the request.
+    :param session: Optional session to send the requests with.
     :return: Generator with the contents of the 'result' key
     """
-    if headers is None:
-        headers = {}
-
-    while True:
-        response = requests.get(url, headers=headers).json()
-
-        for result in response['results']:
-            yield result
-
-        url = response['next']
-        if not url:
-            break
+    fetcher = PageFetcher(headers=headers, session=session)
+    yield from fetcher.results(url)
+    if fetcher.timings:
+        logger.info(
+            f'Fetched {len(fetcher.timings)} pages from {url} '
+            f'in {fetcher.total_seconds:.1f}s of request time'
+        )
@@ -0,0 +1,108 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Incremental sync of the data of a user, such as the workout logs, so that
+clients can keep years of history up to date at a constant cost per page.
+"""
+
+# Django
+from django.conf import settings
+from django.utils import timezone
+
+# Third Party
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework.decorators import action
+
+# wger
+from wger.core.models import Tombstone
+from wger.utils.pagination import (
+    KeysetPagination,
+    UserDataPagination,
+)
+
+
+class DeletedQuerySerializer(serializers.Serializer):
+    updated_since = serializers.DateTimeField(
+        required=False,
+        help_text='Only return the entries deleted since this time',
+    )
+
+    def validate_updated_since(self, value):
+        retention = settings.WGER_SETTINGS['SYNC_TOMBSTONE_RETENTION']
+        if value < timezone.now() - retention:
+            raise serializers.ValidationError(
+                f'Deleted entries are only kept for {retention.days} days, '
+                'please sync all entries again.'
+            )
+        return value
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """
+    The ID of a deleted entry
+    """
+
+    id = serializers.CharField(source='object_id')
+
+    class Meta:
+        model = Tombstone
+        fields = (
+            'id',
+            'deleted',
+        )
+
+
+class TombstonePagination(KeysetPagination):
+    updated_field = 'deleted'
+
+
+class SyncViewSetMixin:
+    """
+    Adds keyset pagination and a delta feed to a viewset with the data of a
+    user, e.g.
+
+    - /api/v2/workoutlog/?cursor= - all entries, page by page
+    - /api/v2/workoutlog/?updated_since=2026-01-01T00:00Z - the entries changed
+      since then, ordered by their last update
+    - /api/v2/workoutlog/deleted/?updated_since=2026-01-01T00:00Z - the IDs of
+      the entries deleted since then
+
+    The model needs a last_update field, and the apps connect record_tombstone
+    to its post_delete signal. Requests without cursor or updated_since are
+    paginated with offsets, as before.
+    """
+
+    pagination_class = UserDataPagination
+
+    @extend_schema(
+        parameters=[DeletedQuerySerializer],
+        responses={200: TombstoneSerializer(many=True)},
+    )
+    @action(detail=False, pagination_class=TombstonePagination, filter_backends=[])
+    def deleted(self, request):
+        """
+        Return the IDs of the deleted entries, for the delta feed
+        """
+        query = DeletedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        tombstones = Tombstone.objects.filter(
+            user=request.user,
+            model_name=self.get_queryset().model._meta.label_lower,
+        )
+        page = self.paginate_queryset(tombstones)
+        return self.get_paginated_response(TombstoneSerializer(page, many=True).data)
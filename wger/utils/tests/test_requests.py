@@ -0,0 +1,103 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import threading
+import unittest
+from unittest.mock import (
+    MagicMock,
+    patch,
+)
+
+# wger
+from wger.utils.requests import (
+    REQUEST_TIMEOUT,
+    PageFetcher,
+    get_all_paginated,
+    wger_headers,
+    wger_session,
+)
+
+
+PAGES = {
+    'https://example.com/api/?page=1': {
+        'next': 'https://example.com/api/?page=2',
+        'results': [1, 2],
+    },
+    'https://example.com/api/?page=2': {
+        'next': 'https://example.com/api/?page=3',
+        'results': [3, 4],
+    },
+    'https://example.com/api/?page=3': {
+        'next': None,
+        'results': [5],
+    },
+}
+
+
+def mock_get(url, **kwargs):
+    response = MagicMock()
+    response.json.return_value = PAGES[url]
+    return response
+
+
+class TestPageFetcher(unittest.TestCase):
+    def test_session(self):
+        session = wger_session(pool_size=4)
+        adapter = session.get_adapter('https://example.com')
+
+        self.assertEqual(session.headers['User-Agent'], wger_headers()['User-Agent'])
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertGreater(adapter.max_retries.total, 0)
+
+    @patch('requests.Session.get', side_effect=mock_get)
+    def test_results(self, mock_request):
+        for prefetch in (True, False):
+            fetcher = PageFetcher(headers={'X': 'y'}, prefetch=prefetch)
+
+            self.assertEqual(
+                list(fetcher.results('https://example.com/api/?page=1')),
+                [1, 2, 3, 4, 5],
+            )
+            self.assertEqual(
+                [(timing.url, timing.results) for timing in fetcher.timings],
+                [(url, len(page['results'])) for url, page in PAGES.items()],
+            )
+
+        mock_request.assert_called_with(
+            'https://example.com/api/?page=3',
+            headers={'X': 'y'},
+            timeout=REQUEST_TIMEOUT,
+        )
+
+    def test_prefetch(self):
+        """
+        The next page is requested before the caller is done with the current one
+        """
+        requested = threading.Event()
+
+        def get(url, **kwargs):
+            if url.endswith('page=2'):
+                requested.set()
+            return mock_get(url)
+
+        with patch('requests.Session.get', side_effect=get):
+            pages = PageFetcher().pages('https://example.com/api/?page=1')
+            next(pages)
+            self.assertTrue(requested.wait(timeout=5))
+            pages.close()
+
+    @patch('requests.Session.get', side_effect=mock_get)
+    def test_get_all_paginated(self, mock_request):
+        self.assertEqual(get_all_paginated('https://example.com/api/?page=1'), [1, 2, 3, 4, 5])
@@ -0,0 +1,53 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import unittest
+
+# wger
+from wger.utils.timeseries import lttb
+
+
+class TestLttb(unittest.TestCase):
+    def test_short_series(self):
+        """
+        Series that are not longer than the threshold are returned unchanged
+        """
+        self.assertEqual(lttb([1, 2, 3], [5, 6, 7], 3), [0, 1, 2])
+        self.assertEqual(lttb([1, 2, 3], [5, 6, 7], 10), [0, 1, 2])
+        self.assertEqual(lttb([], [], 10), [])
+
+    def test_threshold(self):
+        xs = list(range(1000))
+        ys = [x % 7 for x in xs]
+        indices = lttb(xs, ys, 100)
+
+        self.assertEqual(len(indices), 100)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertEqual(indices, sorted(set(indices)))
+
+    def test_peaks_are_kept(self):
+        """
+        A single outlier is always selected
+        """
+        xs = list(range(500))
+        ys = [70.0] * 500
+        ys[123] = 90.0
+        ys[321] = 50.0
+
+        indices = lttb(xs, ys, 20)
+
+        self.assertIn(123, indices)
+        self.assertIn(321, indices)
@@ -0,0 +1,85 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# wger
+from wger.core.tests.base_testcase import WgerTestCase
+from wger.manager.models import (
+    Day,
+    Routine,
+    SlotEntry,
+)
+from wger.utils.viewsets import (
+    check_fk_ownership,
+    ownership_memo,
+)
+
+
+class CheckFkOwnershipTestCase(WgerTestCase):
+    """
+    Tests resolving the owners of the objects referenced in a payload
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.entry = SlotEntry.objects.first()
+        self.user_id = self.entry.get_owner_object().user_id
+        self.other_routine = Routine.objects.exclude(user_id=self.user_id).first()
+        self.owner_objects = [(SlotEntry, 'slot_entry'), (Routine, 'routine'), (Day, 'day')]
+
+    def test_owner_path_is_resolved_in_one_query(self):
+        payload = {'slot_entry': self.entry.pk}
+
+        with self.assertNumQueries(1):
+            self.assertTrue(check_fk_ownership(payload, self.owner_objects, self.user_id))
+        self.assertFalse(check_fk_ownership(payload, self.owner_objects, self.user_id + 100))
+
+    def test_one_query_per_model(self):
+        day = self.entry.slot.day
+        payload = {'slot_entry': self.entry.pk, 'routine': day.routine_id, 'day': day.pk}
+
+        with self.assertNumQueries(3):
+            self.assertTrue(check_fk_ownership(payload, self.owner_objects, self.user_id))
+
+    def test_foreign_object(self):
+        payload = {'slot_entry': self.entry.pk, 'routine': self.other_routine.pk}
+        self.assertFalse(check_fk_ownership(payload, self.owner_objects, self.user_id))
+
+    def test_missing_object(self):
+        self.assertFalse(check_fk_ownership({'routine': 99999}, self.owner_objects, self.user_id))
+
+    def test_malformed_pk_is_left_to_the_serializer(self):
+        self.assertTrue(check_fk_ownership({'routine': 'abc'}, self.owner_objects, self.user_id))
+
+    def test_memo(self):
+        """
+        Within a memo block, objects that were already resolved are not loaded again
+        """
+        payload = {'slot_entry': self.entry.pk}
+
+        with ownership_memo():
+            with self.assertNumQueries(1):
+                self.assertTrue(check_fk_ownership(payload, self.owner_objects, self.user_id))
+            with self.assertNumQueries(0):
+                self.assertTrue(check_fk_ownership(payload, self.owner_objects, self.user_id))
+                self.assertFalse(
+                    check_fk_ownership(payload, self.owner_objects, self.user_id + 100)
+                )
+
+            # Objects that were not found are looked up again
+            with self.assertNumQueries(2):
+                self.assertFalse(check_fk_ownership({'routine': 99999}, [(Routine, 'routine')], 1))
+                check_fk_ownership({'routine': 99999}, [(Routine, 'routine')], 1)
+
+        with self.assertNumQueries(1):
+            check_fk_ownership(payload, self.owner_objects, self.user_id)
@@ -0,0 +1,318 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Aggregation and downsampling of time series, such as the weight entries or the
+measurements of a user, so that long ranges can be plotted without sending
+every single row to the client.
+"""
+
+# Standard Library
+from itertools import (
+    batched,
+    groupby,
+)
+from typing import Sequence
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Avg,
+    Count,
+    Max,
+    Min,
+    QuerySet,
+)
+from django.db.models.functions import (
+    TruncDay,
+    TruncMonth,
+    TruncWeek,
+)
+
+# Third Party
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# wger
+from wger.utils.cache import CacheKeyMapper
+
+
+TIME_SERIES_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+TIME_SERIES_MAX_POINTS = 5000
+"""Upper limit for the number of points of a downsampled time series"""
+
+
+def aggregate_time_series(
+    queryset: QuerySet,
+    value_field: str,
+    bucket: str,
+    date_field: str = 'date',
+    group_by: Sequence[str] = (),
+) -> list[dict]:
+    """
+    Aggregates the values of a queryset per day, week or month
+
+    Min, max, average and count are calculated by the database. The last value
+    of each bucket is loaded with a second query, by the date of the latest
+    entry in the bucket.
+
+    :param queryset: The entries of the time series.
+    :param value_field: The field with the values.
+    :param bucket: One of TIME_SERIES_BUCKETS.
+    :param date_field: The field with the dates.
+    :param group_by: Additional fields, every combination of their values is
+        aggregated separately, e.g. the category of a measurement.
+    :return: One dictionary per bucket, ordered by group and date, with the
+        keys of group_by and 'date', 'min', 'max', 'avg', 'last' and 'count'.
+    """
+    rows = list(
+        queryset.order_by()
+        .annotate(bucket_date=TIME_SERIES_BUCKETS[bucket](date_field))
+        .values(*group_by, 'bucket_date')
+        .annotate(
+            min=Min(value_field),
+            max=Max(value_field),
+            avg=Avg(value_field),
+            count=Count('pk'),
+            last_date=Max(date_field),
+        )
+        .order_by(*group_by, 'bucket_date')
+    )
+
+    # With several entries on the same date, the one added last wins
+    last_values = {}
+    for dates in batched({row['last_date'] for row in rows}, 500):
+        last_values.update(
+            ((*group, date), value)
+            for *group, date, value in queryset.filter(**{f'{date_field}__in': dates})
+            .order_by('pk')
+            .values_list(*group_by, date_field, value_field)
+        )
+
+    return [
+        {
+            **{field: row[field] for field in group_by},
+            'date': row['bucket_date'],
+            'min': row['min'],
+            'max': row['max'],
+            'avg': row['avg'],
+            'last': last_values.get((*(row[field] for field in group_by), row['last_date'])),
+            'count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def downsample_time_series(
+    queryset: QuerySet,
+    value_field: str,
+    max_points: int,
+    date_field: str = 'date',
+    group_by: Sequence[str] = (),
+) -> list[dict]:
+    """
+    Reduces a time series to at most max_points representative entries
+
+    The entries are selected with lttb(), which keeps the peaks and the overall
+    shape of the series, unlike plain averaging or taking every n-th entry.
+
+    :return: One dictionary per selected entry, ordered by group and date, with
+        the keys of group_by and 'date' and 'value'.
+    """
+    rows = queryset.order_by(*group_by, date_field).values_list(*group_by, date_field, value_field)
+
+    result = []
+    for group, entries in groupby(rows, key=lambda row: row[: len(group_by)]):
+        entries = list(entries)
+        indices = lttb(
+            [entry[-2].timestamp() for entry in entries],
+            [float(entry[-1]) for entry in entries],
+            max_points,
+        )
+        result.extend(
+            {
+                **dict(zip(group_by, group)),
+                'date': entries[i][-2],
+                'value': entries[i][-1],
+            }
+            for i in indices
+        )
+
+    return result
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    The first and last points are always kept. The points in between are split
+    into threshold - 2 buckets, and from every bucket the point is selected that
+    forms the largest triangle with the point selected from the previous bucket
+    and the average of the next bucket.
+
+    See Sveinn Steinarsson, "Downsampling Time Series for Visual Representation"
+
+    :param xs: The x coordinates, in ascending order.
+    :param ys: The y coordinates.
+    :param threshold: The maximum number of points to keep, at least 3.
+    :return: The indices of the selected points.
+    """
+    length = len(xs)
+    if threshold >= length or threshold < 3:
+        return list(range(length))
+
+    every = (length - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, length)
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        max_area = -1.0
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > max_area:
+                max_area = area
+                next_a = j
+
+        selected.append(next_a)
+        a = next_a
+
+    selected.append(length - 1)
+    return selected
+
+
+class TimeSeriesQuerySerializer(serializers.Serializer):
+    bucket = serializers.ChoiceField(
+        choices=list(TIME_SERIES_BUCKETS),
+        required=False,
+        help_text='Aggregate the values per day, week or month',
+    )
+    points = serializers.IntegerField(
+        min_value=3,
+        max_value=TIME_SERIES_MAX_POINTS,
+        required=False,
+        help_text='Downsample the values to at most this number of points',
+    )
+
+    def validate(self, data):
+        if ('bucket' in data) == ('points' in data):
+            raise serializers.ValidationError('Pass either "bucket" or "points".')
+        return data
+
+
+DECIMAL_KWARGS = {
+    'max_digits': 8,
+    'decimal_places': 2,
+    'coerce_to_string': False,
+    'required': False,
+}
+
+
+class TimeSeriesSerializer(serializers.Serializer):
+    """
+    A bucket of an aggregated time series or a point of a downsampled one
+    """
+
+    date = serializers.DateTimeField()
+    value = serializers.DecimalField(**DECIMAL_KWARGS)
+    min = serializers.DecimalField(**DECIMAL_KWARGS)
+    max = serializers.DecimalField(**DECIMAL_KWARGS)
+    avg = serializers.DecimalField(**DECIMAL_KWARGS)
+    last = serializers.DecimalField(**DECIMAL_KWARGS)
+    count = serializers.IntegerField(required=False)
+
+
+class TimeSeriesViewSetMixin:
+    """
+    Adds a 'timeseries' endpoint to a viewset, that returns its (filtered)
+    entries either aggregated per bucket or downsampled, e.g.
+
+    - /api/v2/weightentry/timeseries/?bucket=week
+    - /api/v2/weightentry/timeseries/?points=500&date__gte=2020-01-01
+
+    The responses are cached per user and query, and invalidated with
+    reset_time_series_cache() whenever one of the user's entries changes.
+    """
+
+    time_series_name: str
+    """Name of the series, used for the cache keys"""
+
+    time_series_value_field: str
+    """The field with the values"""
+
+    time_series_group_by: tuple[str, ...] = ()
+    """Fields whose values are returned as separate series"""
+
+    time_series_serializer_class = TimeSeriesSerializer
+
+    @extend_schema(
+        parameters=[TimeSeriesQuerySerializer],
+        responses={200: TimeSeriesSerializer(many=True)},
+    )
+    @action(detail=False, pagination_class=None)
+    def timeseries(self, request):
+        """
+        Return the entries aggregated per day, week or month, or downsampled
+        """
+        query = TimeSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        cache_key = CacheKeyMapper.time_series_key(
+            self.time_series_name,
+            request.user.id,
+            request.query_params.urlencode(),
+        )
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            return Response(cached_data)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if 'bucket' in query.validated_data:
+            series = aggregate_time_series(
+                queryset,
+                self.time_series_value_field,
+                query.validated_data['bucket'],
+                group_by=self.time_series_group_by,
+            )
+        else:
+            series = downsample_time_series(
+                queryset,
+                self.time_series_value_field,
+                query.validated_data['points'],
+                group_by=self.time_series_group_by,
+            )
+
+        out = self.time_series_serializer_class(series, many=True).data
+        cache.set(cache_key, out, settings.WGER_SETTINGS['TIME_SERIES_CACHE_TTL'])
+        return Response(out)
+
+
+def reset_time_series_cache(name: str, user_id: int):
+    """
+    Resets all cached time series of the given name of a user
+    """
+    CacheKeyMapper.bump_generation(CacheKeyMapper.user_time_series_generation_key(name, user_id))
@@ -17,9 +17,13 @@
 
 # Standard Library
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 # Django
+from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models import Model
 
 # Third Party
 from rest_framework import (
@@ -30,38 +34,142 @@ from rest_framework import (
 
 logger = logging.getLogger(__name__)
 
+_owner_memo: ContextVar[dict | None] = ContextVar('wger_owner_memo', default=None)
+
+
+@contextmanager
+def ownership_memo():
+    """
+    Remember the owners resolved by check_fk_ownership() within the block
+
+    Used for requests that run several writes, e.g. a PowerSync batch upload,
+    so that an object referenced by several of them is only looked up once.
+    Only objects that were found are remembered, since an object that doesn't
+    exist yet might be created by one of the following writes.
+    """
+    token = _owner_memo.set({})
+    try:
+        yield
+    finally:
+        _owner_memo.reset(token)
+
+
+def get_owner_lookup(model_class: type[Model]) -> str | None:
+    """
+    The lookup from a model to the ID of the user owning it, e.g.
+    'slot__day__routine__user_id' for a SlotEntry, or None if the model doesn't
+    declare one
+    """
+    if model_class is User:
+        return 'pk'
+    return getattr(model_class, 'owner_user_lookup', None)
+
+
+def get_owner_user_id(instance: Model) -> int | None:
+    """
+    The ID of the user owning an object, following its owner_user_lookup
+    """
+    field_name, _, lookup = get_owner_lookup(type(instance)).partition('__')
+    if not lookup:
+        return getattr(instance, field_name)
+
+    field = instance._meta.get_field(field_name)
+    return (
+        field.related_model.objects.filter(pk=getattr(instance, field.attname))
+        .values_list(lookup, flat=True)
+        .first()
+    )
+
 
 def check_fk_ownership(payload: dict, owner_objects: list[tuple], user_id: int) -> bool:
     """
     Validate that FK references in payload belong to the given user.
 
-    Uses the same get_owner_object() convention as WgerOwnerObjectModelViewSet:
-    owner_objects is a list of (Model, field_name) tuples. For each field present
-    in payload, the referenced object is loaded and its ownership is verified via
-    get_owner_object().user.
+    Uses the same get_owner_objects() convention as WgerOwnerObjectModelViewSet:
+    owner_objects is a list of (Model, field_name) tuples. For the models that
+    declare an owner_user_lookup, the owners of all referenced objects are
+    loaded with one query per model. For the others, each referenced object is
+    loaded and its ownership is verified via get_owner_object().user.
 
     Returns True if all checks pass, False otherwise.
     """
+    return check_fk_ownership_many([payload], owner_objects, user_id)
+
+
+def check_fk_ownership_many(
+    payloads: list[dict],
+    owner_objects: list[tuple],
+    user_id: int,
+) -> bool:
+    """
+    Like check_fk_ownership(), for the references of several payloads at once,
+    e.g. the objects of a bulk request. The owners are still loaded with one
+    query per model.
+    """
+    memo = _owner_memo.get()
+    if memo is None:
+        memo = {}
+
+    references: dict[type[Model], set] = {}
     for model_class, field_name in owner_objects:
-        pk = payload.get(field_name)
-        if pk is None:
-            continue
-
-        try:
-            obj = model_class.objects.get(pk=pk)
-        except model_class.DoesNotExist:
-            logger.warning(f'{model_class.__name__} with pk {pk} not found during ownership check')
-            return False
-        except (ValidationError, ValueError, TypeError):
-            # The pk itself is malformed, so skip the ownership check here
-            # and let the serializer reject the field with a 400
-            logger.warning(f'{model_class.__name__} pk {pk!r} is malformed during ownership check')
-            continue
-
-        owner = obj.get_owner_object()
-        if owner and hasattr(owner, 'user') and owner.user_id != user_id:
-            logger.warning(f'{model_class.__name__} {pk} does not belong to user {user_id}')
-            return False
+        checked = set()
+        for payload in payloads:
+            pk = payload.get(field_name)
+            if pk is None:
+                continue
+
+            try:
+                pk = model_class._meta.pk.to_python(pk)
+            except (ValidationError, ValueError, TypeError):
+                # The pk itself is malformed, so skip the ownership check here
+                # and let the serializer reject the field with a 400
+                logger.warning(
+                    f'{model_class.__name__} pk {pk!r} is malformed during ownership check'
+                )
+                continue
+
+            if get_owner_lookup(model_class) is None:
+                if pk not in checked and not _check_owner_object(model_class, pk, user_id):
+                    return False
+                checked.add(pk)
+                continue
+
+            references.setdefault(model_class, set()).add(pk)
+
+    for model_class, pks in references.items():
+        missing = [pk for pk in pks if (model_class, pk) not in memo]
+        if missing:
+            owners = model_class.objects.filter(pk__in=missing).values_list(
+                'pk',
+                get_owner_lookup(model_class),
+            )
+            memo.update(((model_class, pk), owner_id) for pk, owner_id in owners)
+
+        for pk in pks:
+            if (model_class, pk) not in memo:
+                logger.warning(
+                    f'{model_class.__name__} with pk {pk} not found during ownership check'
+                )
+                return False
+
+            if memo[(model_class, pk)] != user_id:
+                logger.warning(f'{model_class.__name__} {pk} does not belong to user {user_id}')
+                return False
+
+    return True
+
+
+def _check_owner_object(model_class: type[Model], pk, user_id: int) -> bool:
+    try:
+        obj = model_class.objects.get(pk=pk)
+    except model_class.DoesNotExist:
+        logger.warning(f'{model_class.__name__} with pk {pk} not found during ownership check')
+        return False
+
+    owner = obj.get_owner_object()
+    if owner and hasattr(owner, 'user') and owner.user_id != user_id:
+        logger.warning(f'{model_class.__name__} {pk} does not belong to user {user_id}')
+        return False
     return True
 
 
@@ -36,4 +36,5 @@ class WeightEntrySerializer(serializers.ModelSerializer):
             'date',
             'weight',
             'user',
+            'last_update',
         )
@@ -19,17 +19,21 @@
 from rest_framework import viewsets
 
 # wger
+from wger.utils.sync import SyncViewSetMixin
+from wger.utils.timeseries import TimeSeriesViewSetMixin
 from wger.weight.api.filtersets import WeightEntryFilterSet
 from wger.weight.api.serializers import WeightEntrySerializer
 from wger.weight.models import WeightEntry
 
 
-class WeightEntryViewSet(viewsets.ModelViewSet):
+class WeightEntryViewSet(SyncViewSetMixin, TimeSeriesViewSetMixin, viewsets.ModelViewSet):
     """
     API endpoint for nutrition plan objects
     """
 
     serializer_class = WeightEntrySerializer
+    time_series_name = 'weight'
+    time_series_value_field = 'weight'
 
     is_private = True
     ordering_fields = '__all__'
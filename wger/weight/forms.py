@@ -19,6 +19,7 @@ from django import forms
 from django.forms import (
     CharField,
     DateTimeField,
+    FileField,
     Form,
     Textarea,
 )
@@ -62,3 +63,22 @@ class WeightCsvImportForm(Form):
             'date_format',
         )
         self.helper.form_tag = False
+
+
+class WeightCsvUploadForm(Form):
+    """
+    Form to upload a CSV file with the weight log
+    """
+
+    csv_file = FileField(label=_('CSV file'))
+    date_format = forms.ChoiceField(choices=CSV_DATETIME_FORMAT, label=_('Date format'))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            'csv_file',
+            'date_format',
+        )
+        self.helper.form_tag = False
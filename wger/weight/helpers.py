@@ -20,62 +20,142 @@ import datetime
 import decimal
 import io
 import logging
+from itertools import (
+    batched,
+    chain,
+    islice,
+)
+from typing import (
+    Iterable,
+    Iterator,
+    NamedTuple,
+)
 
 # Django
+from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils.timezone import make_aware
 
 # wger
+from wger.utils.timeseries import reset_time_series_cache
 from wger.weight.models import WeightEntry
 
 
 logger = logging.getLogger(__name__)
 
+IMPORT_BATCH_SIZE = 1000
+"""Number of weight entries inserted with one query"""
 
-def parse_weight_csv(request, cleaned_data):
+PREVIEW_ROW_COUNT = 100
+"""Number of converted entries and of errors shown in the preview of an import"""
+
+SNIFF_LINE_COUNT = 20
+"""Number of lines used to guess the CSV dialect"""
+
+
+class WeightCsvPreview(NamedTuple):
+    weight_list: list[WeightEntry]
+    error_list: list[list[str]]
+    weight_count: int
+    error_count: int
+
+
+def read_weight_csv(
+    lines: Iterable[str],
+    user: User,
+    date_format: str,
+) -> Iterator[tuple[list[str], WeightEntry | None]]:
+    """
+    Parses a CSV weight log one row at a time
+
+    The first column of every row is the date, the second the weight. Yields
+    every row together with the weight entry converted from it, or None if the
+    row could not be converted or there already is an entry for its date, in
+    the database or in a previous row.
+
+    The dates of the user's existing entries are loaded once, so the input can
+    be a file of any length.
+    """
+    lines = iter(lines)
+    head = list(islice(lines, SNIFF_LINE_COUNT))
     try:
-        dialect = csv.Sniffer().sniff(cleaned_data['csv_input'])
+        dialect = csv.Sniffer().sniff(''.join(head))
     except csv.Error:
         dialect = 'excel'
 
-    # csv.reader expects a file-like object, so use StringIO
-    parsed_csv = csv.reader(io.StringIO(cleaned_data['csv_input']), dialect)
-    distinct_weight_entries = []
-    entry_dates = set()
-    weight_list = []
-    error_list = []
-    MAX_ROW_COUNT = 1000
-    row_count = 0
+    entry_dates = set(WeightEntry.objects.filter(user=user).values_list('date', flat=True))
 
-    # Process the CSV items first
-    for row in parsed_csv:
+    for row in csv.reader(chain(head, lines), dialect):
         try:
-            parsed_date = make_aware(
-                datetime.datetime.strptime(row[0], cleaned_data['date_format'])
-            )
+            parsed_date = make_aware(datetime.datetime.strptime(row[0], date_format))
             parsed_weight = decimal.Decimal(row[1].replace(',', '.'))
-            duplicate_date_in_db = WeightEntry.objects.filter(
-                date=parsed_date, user=request.user
-            ).exists()
-            # within the list there are no duplicate dates
-            unique_among_csv = parsed_date not in entry_dates
-
-            # there is no existing weight entry in the database for that date
-            unique_in_db = not duplicate_date_in_db
-
-            if unique_among_csv and unique_in_db and parsed_weight:
-                distinct_weight_entries.append((parsed_date, parsed_weight))
-                entry_dates.add(parsed_date)
-            else:
+        except (ValueError, IndexError, decimal.InvalidOperation):
+            yield row, None
+            continue
+
+        # There are no duplicate dates, neither in the file nor in the database
+        if parsed_date in entry_dates or not parsed_weight:
+            yield row, None
+            continue
+
+        entry_dates.add(parsed_date)
+        yield row, WeightEntry(date=parsed_date, weight=parsed_weight, user=user)
+
+
+def parse_weight_csv(request, cleaned_data) -> WeightCsvPreview:
+    """
+    Previews the import of the CSV weight log entered in the form
+
+    The whole input is read to count the entries and errors, but only the
+    first PREVIEW_ROW_COUNT of each are kept.
+    """
+    weight_list = []
+    error_list = []
+    weight_count = 0
+    error_count = 0
+
+    rows = read_weight_csv(
+        io.StringIO(cleaned_data['csv_input']),
+        request.user,
+        cleaned_data['date_format'],
+    )
+    for row, entry in rows:
+        if entry is None:
+            if error_count < PREVIEW_ROW_COUNT:
                 error_list.append(row)
+            error_count += 1
+        else:
+            if weight_count < PREVIEW_ROW_COUNT:
+                weight_list.append(entry)
+            weight_count += 1
 
-        except (ValueError, IndexError, decimal.InvalidOperation):
-            error_list.append(row)
-        row_count += 1
-        if row_count > MAX_ROW_COUNT:
-            break
+    return WeightCsvPreview(weight_list, error_list, weight_count, error_count)
+
+
+def import_weight_csv(lines: Iterable[str], user: User, date_format: str) -> tuple[int, int]:
+    """
+    Imports a CSV weight log, inserting the entries in batches
+
+    Returns the number of imported entries and of rows that were skipped.
+    """
+    imported = 0
+    skipped = 0
+
+    def entries():
+        nonlocal skipped
+        for row, entry in read_weight_csv(lines, user, date_format):
+            if entry is None:
+                skipped += 1
+            else:
+                yield entry
+
+    with transaction.atomic():
+        for batch in batched(entries(), IMPORT_BATCH_SIZE):
+            WeightEntry.objects.bulk_create(batch)
+            imported += len(batch)
 
-    # Create the valid weight entries
-    for date, weight in distinct_weight_entries:
-        weight_list.append(WeightEntry(date=date, weight=weight, user=request.user))
+    # bulk_create doesn't send the post_save signals
+    if imported:
+        reset_time_series_cache('weight', user.id)
 
-    return weight_list, error_list
+    return imported, skipped
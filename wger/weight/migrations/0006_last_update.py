@@ -0,0 +1,29 @@
+# Generated by Django 6.0.9 on 2026-10-18 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('weight', '0005_add_uuid'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weightentry',
+            name='last_update',
+            field=models.DateTimeField(auto_now=True, null=True, verbose_name='Last update'),
+        ),
+        migrations.AddIndex(
+            model_name='weightentry',
+            index=models.Index(fields=['user', 'id'], name='weight_weig_user_id_49895c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weightentry',
+            index=models.Index(
+                fields=['user', 'last_update'], name='weight_weig_user_id_c918cb_idx'
+            ),
+        ),
+    ]
@@ -64,6 +64,17 @@ class WeightEntry(models.Model):
     value from the form is ignored and the request's user always used.
     """
 
+    last_update = models.DateTimeField(
+        verbose_name='Last update',
+        auto_now=True,
+        editable=False,
+        null=True,
+    )
+    """
+    Last time the entry was changed, used for the delta feeds of the API. Empty for
+    entries loaded from fixtures
+    """
+
     class Meta:
         """
         Metaclass to set some other properties
@@ -74,6 +85,10 @@ class WeightEntry(models.Model):
             'date',
         ]
         get_latest_by = 'date'
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['user', 'last_update']),
+        ]
 
     def __str__(self):
         """
@@ -81,6 +96,8 @@ class WeightEntry(models.Model):
         """
         return '{0}: {1:.2f} kg'.format(self.date, self.weight)
 
+    owner_user_lookup = 'user_id'
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
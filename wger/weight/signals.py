@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Django
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+# wger
+from wger.core.signals import record_tombstone
+from wger.utils.timeseries import reset_time_series_cache
+from wger.weight.models import WeightEntry
+
+
+@receiver(post_save, sender=WeightEntry)
+@receiver(post_delete, sender=WeightEntry)
+def reset_weight_time_series(sender, instance: WeightEntry, **kwargs):
+    """
+    Resets the cached weight time series of the entry's user
+    """
+    reset_time_series_cache('weight', instance.user_id)
+
+
+post_delete.connect(record_tombstone, sender=WeightEntry)
@@ -13,13 +13,21 @@
 # You should have received a copy of the GNU Affero General Public License
 
 # Standard Library
+import datetime
 import logging
 
 # Django
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
+from django.utils.timezone import make_aware
 
 # wger
 from wger.core.tests.base_testcase import WgerTestCase
+from wger.weight.helpers import (
+    PREVIEW_ROW_COUNT,
+    read_weight_csv,
+)
 from wger.weight.models import WeightEntry
 
 
@@ -84,3 +92,89 @@ class WeightCsvImportTestCase(WgerTestCase):
 
         self.user_login('test')
         self.import_csv()
+
+    def test_import_more_than_1000_rows(self):
+        """
+        Long imports are not cut off and the preview only shows a sample
+        """
+        self.user_login('test')
+        start = datetime.datetime(2000, 1, 1)
+        csv_input = '\n'.join(
+            f'{(start + datetime.timedelta(days=i)).strftime("%Y-%m-%d %H:%M")};{70 + i % 10}'
+            for i in range(2500)
+        )
+        data = {'stage': 1, 'csv_input': csv_input, 'date_format': '%Y-%m-%d %H:%M'}
+
+        response = self.client.post(reverse('weight:import-csv'), data)
+        self.assertEqual(response.context['weight_count'], 2500)
+        self.assertEqual(len(response.context['weight_list']), PREVIEW_ROW_COUNT)
+        self.assertEqual(response.context['error_count'], 0)
+
+        count_before = WeightEntry.objects.count()
+        data.update(stage=2, hash=response.context['hash_value'])
+        response = self.client.post(reverse('weight:import-csv'), data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(WeightEntry.objects.count(), count_before + 2500)
+
+    def test_import_file(self):
+        """
+        Test importing an uploaded file, skipping dates that already have an entry
+        """
+        self.user_login('test')
+        user = User.objects.get(username='test')
+        WeightEntry.objects.create(
+            user=user,
+            date=make_aware(datetime.datetime(2001, 1, 3, 8, 0)),
+            weight=80,
+        )
+        rows = [
+            'Date,Weight',
+            '2001-01-03 08:00:00,80',
+            '2001-01-01 08:00:00,80.5',
+            '2001-01-02 08:00:00,80.1',
+            '2001-01-02 08:00:00,80.2',
+        ]
+        count_before = WeightEntry.objects.count()
+
+        response = self.client.post(
+            reverse('weight:import-csv-file'),
+            {
+                'csv_file': SimpleUploadedFile('weight.csv', '\n'.join(rows).encode()),
+                'date_format': '%Y-%m-%d %H:%M:%S',
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(WeightEntry.objects.count(), count_before + 2)
+        self.assertEqual(WeightEntry.objects.get(user=user, weight=80.5).date.day, 1)
+
+    def test_import_file_wrong_encoding(self):
+        """
+        A file that is not encoded as UTF-8 is reported, not imported
+        """
+        self.user_login('test')
+        rows = ['Date,Weight,Note', '2001-01-01 08:00:00,80.5,Müsli']
+        count_before = WeightEntry.objects.count()
+
+        response = self.client.post(
+            reverse('weight:import-csv-file'),
+            {
+                'csv_file': SimpleUploadedFile('weight.csv', '\n'.join(rows).encode('utf-16')),
+                'date_format': '%Y-%m-%d %H:%M:%S',
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('csv_file'))
+        self.assertEqual(WeightEntry.objects.count(), count_before)
+
+    def test_existing_dates_are_loaded_once(self):
+        user = User.objects.get(username='test')
+        lines = (f'{day:02d}.01.2001 08:00,80\n' for day in range(1, 29))
+
+        with self.assertNumQueries(1):
+            rows = list(read_weight_csv(lines, user, '%d.%m.%Y %H:%M'))
+
+        self.assertEqual(len(rows), 28)
+        self.assertTrue(all(entry is not None for row, entry in rows))
@@ -0,0 +1,121 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+# Standard Library
+import datetime
+from decimal import Decimal
+
+# Django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.timezone import make_aware
+
+# Third Party
+from rest_framework import status
+
+# wger
+from wger.core.tests.api_base_test import ApiBaseTestCase
+from wger.core.tests.base_testcase import BaseTestCase
+from wger.weight.models import WeightEntry
+
+
+class WeightTimeSeriesApiTestCase(BaseTestCase, ApiBaseTestCase):
+    """
+    Tests the aggregated and downsampled weight time series
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.user = User.objects.get(username='test')
+        WeightEntry.objects.filter(user=self.user).delete()
+
+        # Two weeks of daily entries, going down by 100 g a day
+        WeightEntry.objects.bulk_create(
+            WeightEntry(
+                user=self.user,
+                date=make_aware(datetime.datetime(2024, 1, 1, 8) + datetime.timedelta(days=day)),
+                weight=Decimal(80) - Decimal('0.1') * day,
+            )
+            for day in range(14)
+        )
+        self.authenticate('test')
+
+    def get(self, **params):
+        return self.client.get(reverse('weightentry-timeseries'), params)
+
+    def test_anonymous(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.get(bucket='week').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_query(self):
+        self.assertEqual(self.get().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(bucket='year').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(points=2).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.get(bucket='week', points=10).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_buckets(self):
+        response = self.get(bucket='week')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 2024-01-01 is a Monday
+        self.assertEqual(
+            [
+                (week['min'], week['max'], week['avg'], week['last'], week['count'])
+                for week in response.json()
+            ],
+            [(79.4, 80.0, 79.7, 79.4, 7), (78.7, 79.3, 79.0, 78.7, 7)],
+        )
+
+    def test_filters(self):
+        response = self.get(bucket='month', date__gte='2024-01-08')
+
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]['count'], 7)
+        self.assertEqual(response.json()[0]['max'], 79.3)
+
+    def test_points(self):
+        response = self.get(points=5)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.json()
+        self.assertEqual(len(points), 5)
+        self.assertEqual(points[0]['value'], 80.0)
+        self.assertEqual(points[-1]['value'], 78.7)
+        self.assertNotIn('min', points[0])
+
+    def test_only_own_entries(self):
+        self.authenticate('admin')
+        response = self.get(bucket='month')
+
+        self.assertNotIn(
+            '2024-01-01',
+            [month['date'][:10] for month in response.json()],
+        )
+
+    def test_cache_is_invalidated_on_write(self):
+        self.get(bucket='week')
+        with self.assertNumQueries(0):
+            self.get(bucket='week')
+
+        WeightEntry.objects.filter(user=self.user).order_by('date').last().delete()
+
+        response = self.get(bucket='week')
+        self.assertEqual(response.json()[-1]['count'], 6)
+        self.assertEqual(response.json()[-1]['last'], 78.8)
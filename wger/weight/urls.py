@@ -39,6 +39,11 @@ urlpatterns = [
         login_required(views.WeightCsvImportFormPreview(WeightCsvImportForm)),
         name='import-csv',
     ),
+    path(
+        'import-csv-file/',
+        views.import_csv_file,
+        name='import-csv-file',
+    ),
     re_path(
         'overview',
         ReactView.as_view(),
@@ -16,14 +16,17 @@
 
 # Standard Library
 import csv
+import io
 import logging
 
 # Django
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import (
     HttpResponse,
     HttpResponseRedirect,
 )
+from django.shortcuts import render
 from django.urls import reverse
 from django.utils.translation import gettext as _
 
@@ -32,6 +35,7 @@ from formtools.preview import FormPreview
 
 # wger
 from wger.weight import helpers
+from wger.weight.forms import WeightCsvUploadForm
 from wger.weight.models import WeightEntry
 
 
@@ -78,12 +82,47 @@ class WeightCsvImportFormPreview(FormPreview):
         }
 
     def process_preview(self, request, form, context):
-        context['weight_list'], context['error_list'] = helpers.parse_weight_csv(
-            request, form.cleaned_data
-        )
+        context.update(helpers.parse_weight_csv(request, form.cleaned_data)._asdict())
         return context
 
     def done(self, request, cleaned_data):
-        weight_list, error_list = helpers.parse_weight_csv(request, cleaned_data)
-        WeightEntry.objects.bulk_create(weight_list)
+        helpers.import_weight_csv(
+            io.StringIO(cleaned_data['csv_input']),
+            request.user,
+            cleaned_data['date_format'],
+        )
         return HttpResponseRedirect(reverse('weight:overview'))
+
+
+@login_required
+def import_csv_file(request):
+    """
+    Imports a CSV file with the weight log, e.g. the history of a smart scale
+
+    The file is read and imported row by row, without a preview, so it can
+    have any number of rows.
+    """
+    form = WeightCsvUploadForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        try:
+            imported, skipped = helpers.import_weight_csv(
+                io.TextIOWrapper(form.cleaned_data['csv_file'], encoding='utf-8-sig', newline=''),
+                request.user,
+                form.cleaned_data['date_format'],
+            )
+        except (UnicodeDecodeError, csv.Error):
+            # Nothing was imported, the entries are inserted in one transaction
+            form.add_error(
+                'csv_file',
+                _('The file could not be read. Please upload a CSV file encoded as UTF-8.'),
+            )
+        else:
+            messages.success(
+                request,
+                _('Imported {0} weight entries, {1} rows could not be imported.').format(
+                    imported, skipped
+                ),
+            )
+            return HttpResponseRedirect(reverse('weight:overview'))
+
+    return render(request, 'import_csv_file.html', {'form': form})